@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Масштабирование проходов по CFG на функциях с тысячами блоков.
+
+Синтетическая функция main из N последовательных if/else с условиями
+через && (~7 блоков на оператор). Замеряются:
+  ir     — генерация IR (вместе с построением рёбер CFG);
+  uce    — UnreachableCodeEliminator;
+  reach  — IRValidator._compute_reachable_blocks;
+  order  — X86Generator._order_blocks (раскладка блоков для кодогенерации).
+При линейной сложности столбец us/block почти не меняется с ростом N.
+
+Для сравнения ревизий укажите несколько деревьев исходников (`--tree`,
+например checkout через `git worktree add`); каждое меряется в отдельном
+процессе. Фаза, упавшая с ошибкой (например, RecursionError), выводится как «—».
+
+Usage:
+  python benchmarks/bench_cfg.py [--statements 250 1000 4000] [--repeat 3] [--tree PATH ...]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PHASES = ('ir', 'uce', 'reach', 'order')
+
+
+def make_source(statements: int) -> str:
+    """Одна функция из statements операторов if/else с логическими условиями."""
+    body = []
+    for i in range(statements):
+        body.append(f"""
+    if (x > {i % 7} && acc < {i * 3}) {{
+        acc = acc + {i % 5};
+    }} else {{
+        acc = acc - 1;
+    }}""")
+    return "fn main() -> int {\n    int x = 3;\n    int acc = 0;" + "".join(body) + "\n    return acc;\n}\n"
+
+
+def measure(tree: str, statements: int, repeat: int) -> dict:
+    """Замер в текущем процессе для исходников компилятора из tree."""
+    sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+    from bench_frontend import best_of, frontend, load_compiler
+    load_compiler(tree)
+    from ir.optimizer import UnreachableCodeEliminator
+    from ir.validator import IRValidator
+    from codegen.x86_generator import X86Generator
+
+    sys.setrecursionlimit(10000)
+    build = frontend(make_source(statements))
+
+    program = build()
+    func = program.functions[0]
+    generator = X86Generator(program)
+    validator = IRValidator()
+    phases = {
+        'ir': lambda _: build(),
+        'uce': lambda p: UnreachableCodeEliminator().eliminate(p),
+        'reach': lambda f: validator._compute_reachable_blocks(f),
+        'order': lambda f: generator._order_blocks(f),
+    }
+    result = {'blocks': len(func.blocks)}
+    for name, fn in phases.items():
+        try:
+            result[name] = best_of(fn, program if name in ('ir', 'uce') else func, repeat)
+        except RecursionError:
+            result[name] = None
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--statements', type=int, nargs='+', default=[250, 1000, 4000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--tree', action='append', help='каталог с исходниками компилятора (по умолчанию — этот)')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure(args.worker, args.statements[0], args.repeat)))
+        return
+
+    trees = args.tree or [ROOT]
+    header = f"{'tree':<24} {'blocks':>7}" + "".join(f" {p + ', ms':>10} {'us/block':>8}" for p in PHASES)
+    print(header)
+    for tree in trees:
+        for n in args.statements:
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--worker', os.path.abspath(tree),
+                 '--statements', str(n), '--repeat', str(args.repeat)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            r = json.loads(out)
+            line = f"{tree[-24:]:<24} {r['blocks']:>7}"
+            for p in PHASES:
+                if r[p] is None:
+                    line += f" {'—':>10} {'—':>8}"
+                else:
+                    line += f" {r[p] * 1e3:>10.1f} {r[p] * 1e6 / r['blocks']:>8.2f}"
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Пропускная способность кодогенератора: инструкций IR в секунду.
+
+IR строится один раз из синтетической программы (bench_frontend.make_source),
+затем X86Generator.generate() запускается repeat раз — без распределения
+регистров (как на -O0/-O1) и с ним (-O2).
+
+Usage:
+  python benchmarks/bench_codegen.py [--functions 500 2000] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lexer.scanner import Scanner
+from parser.parser import Parser
+from semantic.analyzer import SemanticAnalyzer
+from ir.ir_generator import IRGenerator
+from codegen.x86_generator import X86Generator
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_frontend import make_source, best_of
+
+
+def build_ir(functions: int):
+    ast = Parser(Scanner(make_source(functions)).scan_tokens()).parse()
+    analyzer = SemanticAnalyzer()
+    decorated = analyzer.analyze(ast)
+    generator = IRGenerator(analyzer.get_symbol_table())
+    generator.analyzer = analyzer
+    return generator.generate(decorated)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--functions', type=int, nargs='+', default=[500, 2000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'functions':>10} {'instructions':>13} {'regalloc':>9} {'time, s':>8} {'instr/s':>10}")
+    for n in args.functions:
+        program = build_ir(n)
+        count = sum(len(block.instructions) for func in program.functions for block in func.blocks)
+        for allocate in (False, True):
+            elapsed = best_of(lambda p: X86Generator(p, allocate_registers=allocate).generate(),
+                              program, args.repeat)
+            print(f"{n:>10} {count:>13} {'yes' if allocate else 'no':>9} {elapsed:>8.3f} {count / elapsed:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+DeadCodeEliminator на длинных цепочках мёртвого кода.
+
+Синтетическая функция main: цепочка из N переменных `int dI = dJ + I;`,
+результат которой нигде не используется, и N живых операторов `acc`.
+DCE запускается на IR сразу после генерации (без SSA и других проходов).
+Выводятся лучшее время и число удалённых инструкций; мёртвых всего
+2N+1 (ADD + MOVE на звено и инициализация d0) — столбец dead.
+
+Для сравнения ревизий укажите несколько деревьев исходников (`--tree`,
+например checkout через `git worktree add`); каждое меряется в отдельном
+процессе.
+
+Usage:
+  python benchmarks/bench_dce.py [--statements 1000 4000 16000] [--repeat 3] [--tree PATH ...]
+"""
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_source(statements: int) -> str:
+    """Мёртвая цепочка длины statements вперемешку с живыми операторами."""
+    body = ["    int acc = 0;", "    int d0 = 1;"]
+    for i in range(1, statements + 1):
+        body.append(f"    int d{i} = d{i - 1} + {i % 7};")
+        body.append(f"    acc = acc + {i % 5};")
+    return "fn main() -> int {\n" + "\n".join(body) + "\n    return acc;\n}\n"
+
+
+def measure(tree: str, statements: int, repeat: int) -> dict:
+    """Замер в текущем процессе для исходников компилятора из tree."""
+    sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+    from bench_frontend import frontend, load_compiler
+    load_compiler(tree)
+    from ir.optimizer import DeadCodeEliminator
+
+    build = frontend(make_source(statements))
+
+    best = float('inf')
+    for _ in range(repeat):
+        program = build()
+        dce = DeadCodeEliminator()
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            dce.eliminate(program)
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    remaining = sum(len(block.instructions) for func in program.functions for block in func.blocks)
+    return {'dce': best, 'removed': dce.stats['removed'], 'remaining': remaining}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--statements', type=int, nargs='+', default=[1000, 4000, 16000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--tree', action='append', help='каталог с исходниками компилятора (по умолчанию — этот)')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure(args.worker, args.statements[0], args.repeat)))
+        return
+
+    trees = args.tree or [ROOT]
+    print(f"{'tree':<24} {'N':>6} {'dce, ms':>10} {'removed':>8} {'dead':>8} {'remaining':>10}")
+    for tree in trees:
+        for n in args.statements:
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--worker', os.path.abspath(tree),
+                 '--statements', str(n), '--repeat', str(args.repeat)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            r = json.loads(out)
+            print(f"{tree[-24:]:<24} {n:>6} {r['dce'] * 1e3:>10.1f} {r['removed']:>8} {2 * n + 1:>8} {r['remaining']:>10}")
+
+
+if __name__ == '__main__':
+    main()
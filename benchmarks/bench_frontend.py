@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк фронтенда: семантический анализ + генерация IR.
+
+Сравнивает прежний путь (повторный SemanticAnalyzer в IR-фазе и
+generate_from_ast) с текущим (один анализ, IRGenerator.generate по
+DecoratedProgram) на синтетических программах разного размера.
+
+Остальные бенчмарки берут отсюда общие помощники: make_source, best_of,
+load_compiler и frontend (замер другого дерева исходников через --tree),
+а для замеров готовых программ — build_runtime, compile_and_link и best_run.
+
+Usage:
+  python benchmarks/bench_frontend.py [--functions 200 1000 4000] [--repeat 3]
+"""
+
+import argparse
+import gc
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lexer.scanner import Scanner
+from parser.parser import Parser
+from semantic.analyzer import SemanticAnalyzer
+from ir.ir_generator import IRGenerator
+from ir.optimizer import IROptimizer
+from codegen.x86_generator import X86Generator
+from codegen.assembler import assemble_file
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMPILER_PACKAGES = ('lexer', 'parser', 'semantic', 'ir', 'codegen')
+
+
+def make_source(functions: int) -> str:
+    """Программа из functions однотипных функций с циклами и вызовами."""
+    parts = []
+    for i in range(functions):
+        callee = f"f{i - 1}(x, {i})" if i else "x"
+        parts.append(f"""
+fn f{i}(int x, int y) -> int {{
+    int acc = 0;
+    int k = 0;
+    while (k < y) {{
+        if (k % 2 == 0) {{
+            acc = acc + k * 3;
+        }} else {{
+            acc = acc - 1;
+        }}
+        k = k + 1;
+    }}
+    return acc + {callee};
+}}
+""")
+    parts.append("fn main() -> int {\n    return f0(1, 2);\n}\n")
+    return "".join(parts)
+
+
+def two_pass(ast):
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(ast)
+    again = SemanticAnalyzer()
+    again.analyze(ast)
+    generator = IRGenerator(again.get_symbol_table())
+    generator.analyzer = again
+    return generator.generate_from_ast(ast)
+
+
+def one_pass(ast):
+    analyzer = SemanticAnalyzer()
+    decorated = analyzer.analyze(ast)
+    generator = IRGenerator(analyzer.get_symbol_table())
+    generator.analyzer = analyzer
+    return generator.generate(decorated)
+
+
+def load_compiler(tree: str):
+    """
+    Переключает импорт модулей компилятора на исходники из tree (замер
+    ревизии в отдельном процессе): выгружает уже импортированные, в том
+    числе этим модулем, и ставит tree первым в sys.path.
+    """
+    for name in list(sys.modules):
+        if name.split('.')[0] in COMPILER_PACKAGES:
+            del sys.modules[name]
+    sys.path.insert(0, tree)
+
+
+def frontend(source: str):
+    """
+    Разбор и семантический анализ source модулями из текущего sys.path
+    (после load_compiler — из выбранного дерева). Возвращает build():
+    каждый вызов заново генерирует IRProgram.
+    """
+    from lexer.scanner import Scanner
+    from parser.parser import Parser
+    from semantic.analyzer import SemanticAnalyzer
+    from ir.ir_generator import IRGenerator
+
+    ast = Parser(Scanner(source).scan_tokens()).parse()
+    analyzer = SemanticAnalyzer()
+    decorated = analyzer.analyze(ast)
+
+    def build():
+        generator = IRGenerator(analyzer.get_symbol_table())
+        generator.analyzer = analyzer
+        return generator.generate(decorated)
+    return build
+
+
+def best_of(fn, ast, repeat: int) -> float:
+    """Лучшее время из repeat запусков; сборщик мусора отключён, как в timeit."""
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            fn(ast)
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return best
+
+
+def build_runtime(directory: str) -> str:
+    """Собирает runtime/runtime.asm встроенным ассемблером в directory; возвращает путь к объекту."""
+    runtime_obj = os.path.join(directory, 'runtime.o')
+    assemble_file(os.path.join(ROOT, 'runtime', 'runtime.asm'), runtime_obj)
+    return runtime_obj
+
+
+def compile_and_link(source: str, opt_level: int, exe: str, runtime_obj: str,
+                     peephole: bool = True, **optimizer_kwargs) -> tuple:
+    """
+    Компилирует source с IROptimizer(opt_level, **optimizer_kwargs) и
+    распределением регистров, собирает встроенным ассемблером и линкует с
+    runtime_obj в exe. Возвращает (оптимизатор, IR после него, ассемблер).
+    """
+    ast = Parser(Scanner(source).scan_tokens()).parse()
+    analyzer = SemanticAnalyzer()
+    decorated = analyzer.analyze(ast)
+    generator = IRGenerator(analyzer.get_symbol_table())
+    generator.analyzer = analyzer
+    optimizer = IROptimizer(generator.generate(decorated), opt_level, **optimizer_kwargs)
+    program = optimizer.optimize()
+
+    asm = X86Generator(program, allocate_registers=True, peephole=peephole).generate()
+    with tempfile.TemporaryDirectory() as tmp:
+        asm_file, obj_file = os.path.join(tmp, 'prog.asm'), os.path.join(tmp, 'prog.o')
+        with open(asm_file, 'w') as f:
+            f.write(asm)
+        assemble_file(asm_file, obj_file)
+        # Рантайм определяет _start, поэтому линкуем ld с libc, как запасной путь драйвера
+        subprocess.run(['ld', '-o', exe, runtime_obj, obj_file, '-lc',
+                        '-dynamic-linker', '/lib64/ld-linux-x86-64.so.2'], check=True)
+    return optimizer, program, asm
+
+
+def best_run(exe: str, runs: int) -> tuple:
+    """Лучшее время запуска exe из runs и код возврата."""
+    best, code = float('inf'), None
+    for _ in range(runs):
+        start = time.perf_counter()
+        code = subprocess.run([exe], stdout=subprocess.DEVNULL).returncode
+        best = min(best, time.perf_counter() - start)
+    return best, code
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--functions', type=int, nargs='+', default=[200, 1000, 4000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'functions':>10} {'lines':>8} {'two passes, s':>14} {'one pass, s':>12} {'saving':>8}")
+    for n in args.functions:
+        source = make_source(n)
+        ast = Parser(Scanner(source).scan_tokens()).parse()
+        old = best_of(two_pass, ast, args.repeat)
+        new = best_of(one_pass, ast, args.repeat)
+        print(f"{n:>10} {source.count(chr(10)):>8} {old:>14.3f} {new:>12.3f} {(1 - new / old) * 100:>7.1f}%")
+
+
+if __name__ == '__main__':
+    main()
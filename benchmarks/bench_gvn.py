@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Оптимизации -O2 на examples/quicksort.src: размер кода и время работы.
+
+Программа компилируется с распределением регистров в трёх вариантах:
+IROptimizer на уровне 1, на уровне 2 без встраивания (inline-threshold 0:
+GlobalValueNumbering, LoopInvariantCodeMotion,
+InductionVariableStrengthReduction) и на уровне 2 целиком (плюс
+FunctionInliner), поэтому разница между строками — только эти проходы.
+Для каждого варианта выводятся:
+  IR      — инструкций IR после оптимизатора;
+  asm     — инструкций x86-64 в сгенерированном ассемблере;
+  run, ms — лучшее время процесса из --runs запусков.
+
+Исходный main сортирует 5 элементов, и время в нём — почти целиком запуск
+процесса. Поэтому меряется и вариант `scaled`: те же функции quicksort.src
+с main, который --rounds раз заполняет массив из --elements элементов
+псевдослучайными числами и сортирует его.
+
+Сборка — встроенным ассемблером и ld (nasm не нужен).
+
+Usage:
+  python benchmarks/bench_gvn.py [--source examples/quicksort.src] [--elements 1000] [--rounds 200] [--runs 5]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_frontend import ROOT, best_run, build_runtime, compile_and_link
+
+
+def scaled_source(source: str, elements: int, rounds: int) -> str:
+    """Функции исходника без main и main, сортирующий большой массив."""
+    functions = source[:source.index("fn main(")]
+    return functions + f"""fn main() -> int {{
+    int arr[{elements}];
+    int seed = 12345;
+    int check = 0;
+    int round = 0;
+    while (round < {rounds}) {{
+        int i = 0;
+        while (i < {elements}) {{
+            seed = (seed * 1103 + 12345) % 65536;
+            arr[i] = seed % 1000;
+            i = i + 1;
+        }}
+        quicksort(arr, 0, {elements - 1});
+        check = (check + arr[0] + arr[{elements // 2}] * 3 + arr[{elements - 1}] * 7) % 251;
+        round = round + 1;
+    }}
+    return check;
+}}
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source', default=os.path.join(ROOT, 'examples', 'quicksort.src'))
+    parser.add_argument('--elements', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=200)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    with open(args.source) as f:
+        source = f.read()
+    programs = [(os.path.basename(args.source), source),
+                ('scaled', scaled_source(source, args.elements, args.rounds))]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runtime_obj = build_runtime(tmp)
+
+        variants = [('-O1', 1, None), ('-O2 no inline', 2, 0), ('-O2', 2, None)]
+        print(f"{'program':<16} {'variant':<14} {'IR':>6} {'asm':>6} {'run, ms':>9} {'exit':>5}")
+        for name, text in programs:
+            for i, (variant, opt_level, threshold) in enumerate(variants):
+                exe = os.path.join(tmp, f'{name}-{i}')
+                _, program, asm = compile_and_link(text, opt_level, exe, runtime_obj, peephole=False,
+                                                   inline_threshold=threshold)
+                ir_count = sum(len(block.instructions) for func in program.functions for block in func.blocks)
+                asm_count = sum(1 for line in asm.splitlines()
+                                if line.startswith((' ', '\t')) and line.strip()
+                                and not line.strip().startswith(';'))
+                elapsed, code = best_run(exe, args.runs)
+                print(f"{name:<16} {variant:<14} {ir_count:>6} {asm_count:>6} "
+                      f"{elapsed * 1e3:>9.2f} {code:>5}")
+
+
+if __name__ == '__main__':
+    main()
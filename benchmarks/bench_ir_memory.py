@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Память под токены и IR: байт на токен и байт на инструкцию IR.
+
+Считается удерживаемая память (tracemalloc, после сборки мусора) списка
+токенов и готового IRProgram, делённая на число токенов/инструкций.
+AST и таблица символов в замер IR не входят.
+
+Для сравнения «до/после» укажите несколько деревьев исходников (например,
+checkout предыдущей ревизии через `git worktree add`); каждое меряется в
+отдельном процессе.
+
+Usage:
+  python benchmarks/bench_ir_memory.py [--functions 2000] [--tree PATH ...]
+"""
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(tree: str, functions: int) -> dict:
+    """Замер в текущем процессе для исходников компилятора из tree."""
+    sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+    from bench_frontend import load_compiler, make_source
+    load_compiler(tree)
+    from lexer.scanner import Scanner
+    from parser.parser import Parser
+    from semantic.analyzer import SemanticAnalyzer
+    from ir.ir_generator import IRGenerator
+
+    source = make_source(functions)
+
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tokens = Scanner(source).scan_tokens()
+    gc.collect()
+    token_bytes = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+
+    ast = Parser(tokens).parse()
+    token_count = len(tokens)
+    del tokens
+    analyzer = SemanticAnalyzer()
+    decorated = analyzer.analyze(ast)
+
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    generator = IRGenerator(analyzer.get_symbol_table())
+    generator.analyzer = analyzer
+    program = generator.generate(decorated)
+    del generator
+    gc.collect()
+    ir_bytes = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+
+    instructions = sum(len(block.instructions)
+                       for func in program.functions
+                       for block in func.blocks)
+    return {
+        'tokens': token_count,
+        'token_bytes': token_bytes,
+        'instructions': instructions,
+        'ir_bytes': ir_bytes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--functions', type=int, default=2000)
+    parser.add_argument('--tree', action='append', help='каталог с исходниками компилятора (по умолчанию — этот)')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure(args.worker, args.functions)))
+        return
+
+    trees = args.tree or [ROOT]
+    print(f"{'tree':<30} {'tokens':>8} {'B/token':>8} {'instructions':>13} {'B/instr':>8} {'IR, MB':>8}")
+    for tree in trees:
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--worker', os.path.abspath(tree),
+             '--functions', str(args.functions)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        r = json.loads(out)
+        print(f"{tree[-30:]:<30} {r['tokens']:>8} {r['token_bytes'] / r['tokens']:>8.1f} "
+              f"{r['instructions']:>13} {r['ir_bytes'] / r['instructions']:>8.1f} "
+              f"{r['ir_bytes'] / 2**20:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+A/B-бенчмарк движков лексера (Scanner и TableScanner).
+
+Сканирует сгенерированный исходник размером в несколько мегабайт каждым
+движком и проверяет, что потоки токенов совпадают.
+
+Usage:
+  python benchmarks/bench_lexer.py [--size-mb 4] [--repeat 3]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lexer.table_scanner import SCANNER_ENGINES
+
+
+def make_source(size_bytes: int) -> str:
+    """Повторяет типичный фрагмент программы до нужного размера."""
+    chunk = """
+// вычисление суммы
+fn sum_{i}(int n, float scale) -> int {{
+    int acc = 0;
+    for (int k = 0; k < n; k = k + 1) {{
+        if (k % 3 == 0 && k != 7) {{
+            acc += k * 2 - -1;
+        }} else {{
+            acc = acc - 1;   /* уменьшение */
+        }}
+    }}
+    print("sum = %d\\n", acc);
+    return acc + {i};
+}}
+"""
+    parts = []
+    total = 0
+    i = 0
+    while total < size_bytes:
+        part = chunk.format(i=i)
+        parts.append(part)
+        total += len(part)
+        i += 1
+    return "".join(parts)
+
+
+def run(engine: str, source: str):
+    scanner = SCANNER_ENGINES[engine](source)
+    return scanner.scan_tokens()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size-mb', type=float, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    source = make_source(int(args.size_mb * 1024 * 1024))
+    print(f"Source: {len(source)} bytes, {source.count(chr(10))} lines")
+
+    results = {}
+    for engine in SCANNER_ENGINES:
+        best = float('inf')
+        for _ in range(args.repeat):
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                tokens = run(engine, source)
+                best = min(best, time.perf_counter() - start)
+            finally:
+                gc.enable()
+        results[engine] = (best, [(t.type, t.lexeme, t.line, t.column, t.literal) for t in tokens])
+        print(f"{engine:>8}: {best:.3f} s, {len(tokens)} tokens, {len(source) / best / 1e6:.2f} MB/s")
+
+    baseline = results['classic']
+    for engine, (elapsed, tokens) in results.items():
+        if engine == 'classic':
+            continue
+        same = "identical" if tokens == baseline[1] else "DIFFERENT"
+        print(f"{engine} vs classic: {baseline[0] / elapsed:.1f}x faster, token stream {same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Время и качество IROptimizer на больших функциях.
+
+Синтетическая функция main из N фрагментов: константное условие, слияние
+с одинаковой константой на обеих ветках, ветвление по результату слияния
+и короткий цикл (~12 блоков на фрагмент). Для каждого N выводятся:
+  opt, ms  — лучшее время IROptimizer.optimize() (IR строится заново);
+  after    — инструкций IR после оптимизации (до — в столбце before);
+  branches — оставшихся условных переходов;
+  blocks   — оставшихся базовых блоков.
+
+Для сравнения ревизий укажите несколько деревьев исходников (`--tree`,
+например checkout через `git worktree add`); каждое меряется в отдельном
+процессе.
+
+Usage:
+  python benchmarks/bench_optimizer.py [--statements 100 400 1600] [--repeat 3] [--tree PATH ...]
+"""
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_source(statements: int) -> str:
+    """Одна функция из statements фрагментов с константами, слияниями и циклами."""
+    body = []
+    for i in range(statements):
+        body.append(f"""
+    int a{i} = {i % 5};
+    int f{i} = 0;
+    if (a{i} > 2) {{
+        f{i} = 1;
+    }} else {{
+        f{i} = 1;
+    }}
+    if (f{i} == 1) {{
+        acc = acc + a{i} * 2;
+    }} else {{
+        acc = acc - {i};
+    }}
+    int k{i} = 0;
+    while (k{i} < 3) {{
+        acc = acc + k{i};
+        k{i} = k{i} + 1;
+    }}""")
+    return "fn main() -> int {\n    int acc = 0;" + "".join(body) + "\n    return acc;\n}\n"
+
+
+def measure(tree: str, statements: int, repeat: int) -> dict:
+    """Замер в текущем процессе для исходников компилятора из tree."""
+    sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+    from bench_frontend import frontend, load_compiler
+    load_compiler(tree)
+    from ir.ir_instructions import IROpcode
+    from ir.optimizer import IROptimizer
+
+    sys.setrecursionlimit(10000)
+    build = frontend(make_source(statements))
+
+    best = float('inf')
+    for _ in range(repeat):
+        program = build()
+        optimizer = IROptimizer(program)
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            program = optimizer.optimize()
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+
+    instructions = [instr for func in program.functions for block in func.blocks
+                    for instr in block.instructions]
+    stats = optimizer.get_stats()
+    return {
+        'opt': best,
+        'before': stats['total_instructions_before'],
+        'after': len(instructions),
+        'branches': sum(instr.opcode in (IROpcode.JUMP_IF, IROpcode.JUMP_IF_NOT) for instr in instructions),
+        'blocks': sum(len(func.blocks) for func in program.functions),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--statements', type=int, nargs='+', default=[100, 400, 1600])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--tree', action='append', help='каталог с исходниками компилятора (по умолчанию — этот)')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure(args.worker, args.statements[0], args.repeat)))
+        return
+
+    trees = args.tree or [ROOT]
+    print(f"{'tree':<24} {'N':>6} {'before':>8} {'opt, ms':>10} {'after':>8} {'branches':>9} {'blocks':>8}")
+    for tree in trees:
+        for n in args.statements:
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--worker', os.path.abspath(tree),
+                 '--statements', str(n), '--repeat', str(args.repeat)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            r = json.loads(out)
+            print(f"{tree[-24:]:<24} {n:>6} {r['before']:>8} {r['opt'] * 1e3:>10.1f} "
+                  f"{r['after']:>8} {r['branches']:>9} {r['blocks']:>8}")
+
+
+if __name__ == '__main__':
+    main()
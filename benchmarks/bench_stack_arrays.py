@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Локальные массивы в кадре стека против malloc на каждое объявление.
+
+Программа объявляет массив int buf[--size] в теле цикла из --iterations
+итераций, заполняет его и суммирует функцией sum, которая только читает
+массив. Без StackArrayPromoter каждая итерация вызывает malloc (память не
+освобождается), с ним массив живёт в одном месте кадра main.
+
+Программа компилируется на -O2 с распределением регистров в двух
+вариантах: stack_array_limit=0 (всегда malloc) и с порогом по умолчанию.
+Для каждого варианта выводятся:
+  arrays  — массивов, перенесённых в кадр;
+  run, ms — лучшее время процесса из --runs запусков.
+
+Сборка — встроенным ассемблером и ld (nasm не нужен).
+
+Usage:
+  python benchmarks/bench_stack_arrays.py [--iterations 1000000] [--size 16] [--runs 5]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_frontend import best_run, build_runtime, compile_and_link
+
+
+def loop_source(iterations: int, size: int) -> str:
+    """Массив, объявленный в теле цикла и переданный читающей функции."""
+    return f"""fn sum(int a[], int n) -> int {{
+    int s = 0;
+    for (int i = 0; i < n; i = i + 1) {{
+        s = s + a[i];
+    }}
+    return s;
+}}
+
+fn main() -> int {{
+    int check = 0;
+    for (int k = 0; k < {iterations}; k = k + 1) {{
+        int buf[{size}];
+        for (int i = 0; i < {size}; i = i + 1) {{
+            buf[i] = k + i;
+        }}
+        check = (check + sum(buf, {size})) % 251;
+    }}
+    return check;
+}}
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=1000000)
+    parser.add_argument('--size', type=int, default=16)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    source = loop_source(args.iterations, args.size)
+    with tempfile.TemporaryDirectory() as tmp:
+        runtime_obj = build_runtime(tmp)
+
+        variants = [('malloc', 0), ('stack', None)]
+        print(f"{'variant':<8} {'arrays':>6} {'run, ms':>9} {'exit':>5}")
+        for i, (variant, limit) in enumerate(variants):
+            exe = os.path.join(tmp, f'arrays-{i}')
+            optimizer, _, _ = compile_and_link(source, 2, exe, runtime_obj, stack_array_limit=limit)
+            elapsed, code = best_run(exe, args.runs)
+            promoted = optimizer.stats["stack_arrays"]
+            print(f"{variant:<8} {promoted:>6} {elapsed * 1e3:>9.2f} {code:>5}")
+
+
+if __name__ == '__main__':
+    main()
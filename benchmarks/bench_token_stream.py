@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Пиковая память и время связки лексер + парсер: список токенов против
+ленивого потока (Scanner.token_stream()).
+
+Пик памяти измеряется tracemalloc и включает построенное AST; разница между
+режимами — это память под полный список токенов.
+
+Usage:
+  python benchmarks/bench_token_stream.py [--functions 500 2000 8000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lexer.table_scanner import create_scanner
+from parser.parser import Parser
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_frontend import make_source
+
+
+def parse_list(source: str):
+    return Parser(create_scanner(source).scan_tokens()).parse()
+
+
+def parse_stream(source: str):
+    return Parser(create_scanner(source).token_stream()).parse()
+
+
+def measure(fn, source: str):
+    """Время (без трассировки) и пик памяти (отдельным запуском под tracemalloc)."""
+    start = time.perf_counter()
+    fn(source)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    ast = fn(source)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del ast
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--functions', type=int, nargs='+', default=[500, 2000, 8000])
+    args = parser.parse_args()
+
+    print(f"{'functions':>10} {'tokens':>9} {'list peak, MB':>14} {'stream peak, MB':>16} "
+          f"{'list, s':>8} {'stream, s':>10}")
+    for n in args.functions:
+        source = make_source(n)
+        tokens = len(create_scanner(source).scan_tokens())
+        list_time, list_peak = measure(parse_list, source)
+        stream_time, stream_peak = measure(parse_stream, source)
+        print(f"{n:>10} {tokens:>9} {list_peak / 2**20:>14.1f} {stream_peak / 2**20:>16.1f} "
+              f"{list_time:>8.2f} {stream_time:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Векторизованные счётные циклы (SSE2) против скалярных.
+
+Программа --iterations раз прогоняет над массивами из --size элементов
+два цикла: целый a[i] = b[i] * k + a[i] и вещественный
+y[i] = x[i] * alpha + y[i]. Размер нарочно не кратен 4, чтобы работал
+скалярный эпилог.
+
+Программа компилируется на -O2 (скалярные циклы) и -O3 (LoopVectorizer)
+с распределением регистров. Для каждого уровня выводятся:
+  loops   — векторизованных циклов;
+  run, ms — лучшее время процесса из --runs запусков;
+  exit    — код возврата (контрольная сумма, должна совпадать).
+
+Сборка — встроенным ассемблером и ld (nasm не нужен).
+
+Usage:
+  python benchmarks/bench_vectorize.py [--iterations 20000] [--size 1023] [--runs 5]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_frontend import best_run, build_runtime, compile_and_link
+
+
+def loop_source(iterations: int, size: int) -> str:
+    """Целый и вещественный циклы над массивами size элементов."""
+    return f"""fn axpy(int a[], int b[], int n) -> void {{
+    int k = b[1];
+    for (int i = 0; i < n; i = i + 1) {{
+        a[i] = b[i] * k + a[i];
+    }}
+}}
+
+fn saxpy(float y[], float x[], int n) -> void {{
+    float alpha = x[1];
+    for (int i = 0; i < n; i = i + 1) {{
+        y[i] = x[i] * alpha + y[i];
+    }}
+}}
+
+fn main() -> int {{
+    int a[{size}];
+    int b[{size}];
+    float x[{size}];
+    float y[{size}];
+    float f = 0.0;
+    for (int i = 0; i < {size}; i = i + 1) {{
+        a[i] = 0;
+        b[i] = i % 7;
+        x[i] = f;
+        y[i] = 0.0;
+        f = f + 0.001;
+    }}
+    for (int k = 0; k < {iterations}; k = k + 1) {{
+        axpy(a, b, {size});
+        saxpy(y, x, {size});
+    }}
+    int check = 0;
+    for (int i = 0; i < {size}; i = i + 1) {{
+        check = (check + a[i]) % 251;
+        if (y[i] > 1.0) {{ check = check + 1; }}
+    }}
+    return check;
+}}
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--size', type=int, default=1023)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    source = loop_source(args.iterations, args.size)
+    with tempfile.TemporaryDirectory() as tmp:
+        runtime_obj = build_runtime(tmp)
+
+        print(f"{'level':<6} {'loops':>5} {'run, ms':>9} {'exit':>5}")
+        for level in (2, 3):
+            exe = os.path.join(tmp, f'vectorize-O{level}')
+            optimizer, _, _ = compile_and_link(source, level, exe, runtime_obj)
+            elapsed, code = best_run(exe, args.runs)
+            loops = optimizer.stats["loops_vectorized"]
+            print(f"-O{level:<4} {loops:>5} {elapsed * 1e3:>9.2f} {code:>5}")
+
+
+if __name__ == '__main__':
+    main()
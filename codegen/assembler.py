@@ -0,0 +1,376 @@
+# codegen/assembler.py
+"""
+Встроенный ассемблер (--integrated-as): текст NASM -> перемещаемый ELF64 (.o).
+
+Принимает поток строк X86Generator (или runtime.asm) и без запуска nasm
+строит объектный файл с секциями .text/.data/.bss/.rodata, таблицей
+символов и перемещениями для вызовов, глобальных переменных и констант.
+
+Поддерживаемые директивы: section/segment, global, extern, align,
+db/dw/dd/dq, resb/resw/resd/resq; локальные метки (.name) относятся к
+последней нелокальной, как в NASM.
+"""
+
+import re
+import struct
+from typing import Dict, Iterable, List, Tuple
+
+from .x86_encoder import (
+    X86Encoder, AssemblerError, Fixup, parse_operand, parse_number, split_operands,
+    REL32, BRANCH32, ABS32, ABS32S, ABS64,
+)
+
+
+# Типы перемещений x86-64 (System V ABI)
+R_X86_64_64 = 1
+R_X86_64_PC32 = 2
+R_X86_64_PLT32 = 4
+R_X86_64_32 = 10
+R_X86_64_32S = 11
+
+_RELOCATION_TYPES = {REL32: R_X86_64_PC32, ABS32: R_X86_64_32, ABS32S: R_X86_64_32S, ABS64: R_X86_64_64}
+
+# Секции объектного файла: имя -> (тип, флаги, выравнивание)
+SHT_PROGBITS, SHT_SYMTAB, SHT_STRTAB, SHT_RELA, SHT_NOBITS = 1, 2, 3, 4, 8
+SHF_WRITE, SHF_ALLOC, SHF_EXECINSTR, SHF_INFO_LINK = 0x1, 0x2, 0x4, 0x40
+
+SECTIONS = {
+    '.text': (SHT_PROGBITS, SHF_ALLOC | SHF_EXECINSTR, 16),
+    '.data': (SHT_PROGBITS, SHF_WRITE | SHF_ALLOC, 8),
+    '.bss': (SHT_NOBITS, SHF_WRITE | SHF_ALLOC, 8),
+    '.rodata': (SHT_PROGBITS, SHF_ALLOC, 8),
+}
+
+_DATA_UNITS = {'db': 1, 'dw': 2, 'dd': 4, 'dq': 8}
+_RESERVE_UNITS = {'resb': 1, 'resw': 2, 'resd': 4, 'resq': 8}
+
+_LABEL = re.compile(r'^([A-Za-z_.?$@][\w.?$@]*)\s*:(.*)$')
+_DATA_LABEL = re.compile(r'^([A-Za-z_.?$@][\w.?$@]*)\s+(db|dw|dd|dq|resb|resw|resd|resq)\b(.*)$', re.I)
+
+
+def strip_comment(line: str) -> str:
+    """Отрезает комментарий ';' вне строковых литералов."""
+    quote = None
+    for i, ch in enumerate(line):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"`":
+            quote = ch
+        elif ch == ';':
+            return line[:i]
+    return line
+
+
+class Section:
+    def __init__(self, name: str):
+        self.name = name
+        self.data = bytearray()
+        self.size = 0  # для .bss, где данных нет
+        self.fixups: List[Tuple[int, Fixup]] = []  # (смещение в секции, поправка)
+        self.relocations: List[Tuple[int, int, int, int]] = []  # (offset, symbol, type, addend)
+
+    @property
+    def is_bss(self) -> bool:
+        return self.name == '.bss'
+
+    @property
+    def length(self) -> int:
+        return self.size if self.is_bss else len(self.data)
+
+    def emit(self, data: bytes, line_no: int):
+        if self.is_bss:
+            if any(data):
+                raise AssemblerError(f"line {line_no}: initialized data in .bss")
+            self.size += len(data)
+        else:
+            self.data += data
+
+
+class Assembler:
+    """Однопроходный ассемблер подмножества NASM в перемещаемый ELF64."""
+
+    def __init__(self):
+        self.encoder = X86Encoder()
+        self.sections: Dict[str, Section] = {name: Section(name) for name in SECTIONS}
+        self.symbols: Dict[str, Tuple[str, int]] = {}  # имя -> (секция, смещение)
+        self.globals: List[str] = []
+        self.externs: List[str] = []
+        self.current = self.sections['.text']
+        self.scope = ''  # последняя нелокальная метка
+
+    # ============= Разбор =============
+
+    def assemble(self, lines: Iterable[str]) -> bytes:
+        """Ассемблирует строки и возвращает содержимое объектного файла."""
+        for line_no, raw in enumerate(lines, 1):
+            for line in raw.split('\n'):
+                try:
+                    self._line(strip_comment(line).strip(), line_no)
+                except AssemblerError as e:
+                    if str(e).startswith('line '):
+                        raise
+                    raise AssemblerError(f"line {line_no}: {e}") from None
+        self._resolve()
+        return self._write_elf()
+
+    def assemble_file(self, asm_path: str, obj_path: str):
+        with open(asm_path) as f:
+            data = self.assemble(f.read().splitlines())
+        with open(obj_path, 'wb') as f:
+            f.write(data)
+
+    def _qualify(self, name: str) -> str:
+        return self.scope + name if name.startswith('.') else name
+
+    def _line(self, line: str, line_no: int):
+        if not line:
+            return
+        head, _, rest = line.partition(' ')
+        keyword = head.lower()
+        rest = rest.strip()
+
+        if keyword in ('section', 'segment'):
+            name = rest.split()[0] if rest else ''
+            if name not in self.sections:
+                raise AssemblerError(f"unsupported section: {name}")
+            self.current = self.sections[name]
+            return
+        if keyword in ('global', 'extern'):
+            target = self.globals if keyword == 'global' else self.externs
+            for name in split_operands(rest):
+                name = name.split(':')[0].strip()
+                if name not in target:
+                    target.append(name)
+            return
+        if keyword in ('bits', 'default'):
+            return
+        if keyword == 'align':
+            self._align(rest, line_no)
+            return
+
+        match = _LABEL.match(line)
+        if match and not line.lower().startswith(('times ',)):
+            self._define(match.group(1), line_no)
+            self._line(match.group(2).strip(), line_no)
+            return
+        match = _DATA_LABEL.match(line)
+        if match:
+            self._define(match.group(1), line_no)
+            self._line(f"{match.group(2)} {match.group(3).strip()}", line_no)
+            return
+
+        if keyword in _DATA_UNITS:
+            self._data(_DATA_UNITS[keyword], rest, line_no)
+            return
+        if keyword in _RESERVE_UNITS:
+            count = parse_number(rest)
+            if count is None or count < 0:
+                raise AssemblerError(f"invalid reservation: {line}")
+            self.current.emit(bytes(count * _RESERVE_UNITS[keyword]), line_no)
+            return
+
+        if self.current.name != '.text':
+            raise AssemblerError(f"instruction outside .text: {line}")
+        operands = [self._operand(text) for text in split_operands(rest)]
+        encoding = self.encoder.encode(head, operands)
+        offset = self.current.length
+        for fixup in encoding.fixups:
+            self.current.fixups.append((offset + fixup.offset, fixup))
+        self.current.emit(encoding.data, line_no)
+
+    def _operand(self, text: str):
+        operand = parse_operand(text)
+        if getattr(operand, 'symbol', None) is not None:
+            operand.symbol = self._qualify(operand.symbol)
+        return operand
+
+    def _define(self, name: str, line_no: int):
+        if not name.startswith('.'):
+            self.scope = name
+        name = self._qualify(name)
+        if name in self.symbols:
+            raise AssemblerError(f"symbol `{name}' redefined")
+        self.symbols[name] = (self.current.name, self.current.length)
+
+    def _align(self, rest: str, line_no: int):
+        alignment = parse_number(rest.split(',')[0])
+        if not alignment or alignment & (alignment - 1):
+            raise AssemblerError(f"invalid alignment: {rest}")
+        padding = -self.current.length % alignment
+        fill = b'\x90' if self.current.name == '.text' else b'\0'
+        self.current.emit(fill * padding, line_no)
+
+    def _data(self, unit: int, rest: str, line_no: int):
+        out = bytearray()
+        for item in split_operands(rest):
+            if len(item) >= 2 and item[0] == item[-1] and item[0] in "'\"`":
+                text = item[1:-1].encode('latin-1')
+                if unit > 1 and len(text) % unit:
+                    text += bytes(unit - len(text) % unit)
+                out += text
+                continue
+            number = parse_number(item)
+            if number is not None:
+                if not -2 ** (unit * 8 - 1) <= number < 2 ** (unit * 8):
+                    raise AssemblerError(f"value out of range: {item}")
+                out += (number & (2 ** (unit * 8) - 1)).to_bytes(unit, 'little')
+                continue
+            try:
+                value = float(item)
+            except ValueError:
+                value = None
+            if value is not None and unit in (4, 8):
+                out += struct.pack('<f' if unit == 4 else '<d', value)
+                continue
+            operand = self._operand(item)
+            if getattr(operand, 'symbol', None) is None or unit not in (4, 8):
+                raise AssemblerError(f"invalid data item: {item}")
+            kind = ABS32 if unit == 4 else ABS64
+            self.current.fixups.append((self.current.length + len(out),
+                                        Fixup(0, kind, operand.symbol, operand.value)))
+            out += bytes(unit)
+        self.current.emit(bytes(out), line_no)
+
+    # ============= Символы и перемещения =============
+
+    def _resolve(self):
+        """Разрешает ссылки внутри секции, для остальных создаёт перемещения."""
+        self._symbol_order()
+        for section in self.sections.values():
+            for offset, fixup in section.fixups:
+                target = self.symbols.get(fixup.symbol)
+                if target is None and fixup.symbol not in self.externs:
+                    raise AssemblerError(f"symbol `{fixup.symbol}' not defined")
+                pc_relative = fixup.kind in (REL32, BRANCH32)
+                if target is not None and pc_relative and target[0] == section.name:
+                    value = target[1] + fixup.addend - offset
+                    section.data[offset:offset + 4] = struct.pack('<i', value)
+                    continue
+                if target is None:
+                    rel_type = R_X86_64_PLT32 if fixup.kind == BRANCH32 else \
+                        _RELOCATION_TYPES[REL32 if pc_relative else fixup.kind]
+                    section.relocations.append(
+                        (offset, self.symbol_index[fixup.symbol], rel_type, fixup.addend))
+                    continue
+                rel_type = _RELOCATION_TYPES[REL32 if pc_relative else fixup.kind]
+                if fixup.symbol in self.symbol_index and fixup.symbol in self.globals:
+                    section.relocations.append(
+                        (offset, self.symbol_index[fixup.symbol], rel_type, fixup.addend))
+                else:
+                    # Локальный символ: перемещение относительно секции
+                    section.relocations.append(
+                        (offset, self.symbol_index[target[0]], rel_type, fixup.addend + target[1]))
+
+    def _symbol_order(self):
+        """
+        Таблица символов: нулевой, секции, локальные метки, затем глобальные
+        (определённые и внешние, на которые есть ссылки).
+        """
+        referenced = {fixup.symbol for section in self.sections.values() for _, fixup in section.fixups}
+        self.symbol_table: List[Tuple[str, int, int, int]] = [('', 0, 0, 0)]  # (имя, info, shndx, value)
+        self.symbol_index: Dict[str, int] = {}
+        section_numbers = {name: i + 1 for i, name in enumerate(SECTIONS)}
+        for name in SECTIONS:
+            self.symbol_index[name] = len(self.symbol_table)
+            self.symbol_table.append(('', 0x03, section_numbers[name], 0))  # STB_LOCAL, STT_SECTION
+        for name, (section, value) in self.symbols.items():
+            if name not in self.globals:
+                self.symbol_table.append((name, 0x00, section_numbers[section], value))
+        self.first_global = len(self.symbol_table)
+        for name in self.globals + [e for e in self.externs if e not in self.globals]:
+            if name in self.symbols:
+                section, value = self.symbols[name]
+                self.symbol_index[name] = len(self.symbol_table)
+                self.symbol_table.append((name, 0x10, section_numbers[section], value))  # STB_GLOBAL
+            elif name in referenced:
+                self.symbol_index[name] = len(self.symbol_table)
+                self.symbol_table.append((name, 0x10, 0, 0))  # неопределённый (SHN_UNDEF)
+
+    # ============= ELF64 =============
+
+    def _write_elf(self) -> bytes:
+        strtab = _StringTable()
+        shstrtab = _StringTable()
+
+        symtab = bytearray()
+        for name, info, shndx, value in self.symbol_table:
+            symtab += struct.pack('<IBBHQQ', strtab.add(name) if name else 0, info, 0, shndx, value, 0)
+
+        # (имя, тип, флаги, данные/размер, link, info, выравнивание, entsize)
+        headers = []
+        for name, (sh_type, flags, align) in SECTIONS.items():
+            section = self.sections[name]
+            content = section.size if section.is_bss else bytes(section.data)
+            headers.append([name, sh_type, flags, content, 0, 0, align, 0])
+        symtab_index = len(SECTIONS) + 1
+        for number, name in enumerate(SECTIONS, 1):
+            relocations = self.sections[name].relocations
+            if not relocations:
+                continue
+            rela = bytearray()
+            for offset, symbol, rel_type, addend in relocations:
+                rela += struct.pack('<QQq', offset, symbol << 32 | rel_type, addend)
+            headers.append([f".rela{name}", SHT_RELA, SHF_INFO_LINK, bytes(rela), None, number, 8, 24])
+        symtab_index = len(headers) + 1
+        for header in headers:
+            if header[4] is None:
+                header[4] = symtab_index
+        headers.append(['.symtab', SHT_SYMTAB, 0, bytes(symtab), symtab_index + 1, self.first_global, 8, 24])
+        headers.append(['.strtab', SHT_STRTAB, 0, strtab.data(), 0, 0, 1, 0])
+        # Пустая .note.GNU-stack: стек не исполняемый
+        headers.append(['.note.GNU-stack', SHT_PROGBITS, 0, b'', 0, 0, 1, 0])
+        headers.append(['.shstrtab', SHT_STRTAB, 0, b'', 0, 0, 1, 0])
+        for header in headers:
+            shstrtab.add(header[0])
+        headers[-1][3] = shstrtab.data()
+
+        body = bytearray(64)
+        entries = [struct.pack('<IIQQQQIIQQ', 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)]
+        for name, sh_type, flags, content, link, info, align, entsize in headers:
+            if isinstance(content, int):
+                offset, size = len(body), content
+            else:
+                body += bytes(-len(body) % max(align, 1))
+                offset, size = len(body), len(content)
+                body += content
+            entries.append(struct.pack('<IIQQQQIIQQ', shstrtab.add(name), sh_type, flags, 0,
+                                       offset, size, link, info, align, entsize))
+        body += bytes(-len(body) % 8)
+        shoff = len(body)
+        body += b''.join(entries)
+
+        body[:64] = struct.pack(
+            '<4sBBBBB7sHHIQQQIHHHHHH',
+            b'\x7fELF', 2, 1, 1, 0, 0, bytes(7),  # ELFCLASS64, little-endian, EV_CURRENT, System V
+            1, 62, 1,                              # ET_REL, EM_X86_64, EV_CURRENT
+            0, 0, shoff, 0,                        # entry, phoff, shoff, flags
+            64, 0, 0, 64, len(entries), len(entries) - 1,
+        )
+        return bytes(body)
+
+
+class _StringTable:
+    def __init__(self):
+        self._data = bytearray(b'\0')
+        self._offsets: Dict[str, int] = {}
+
+    def add(self, name: str) -> int:
+        offset = self._offsets.get(name)
+        if offset is None:
+            offset = self._offsets[name] = len(self._data)
+            self._data += name.encode() + b'\0'
+        return offset
+
+    def data(self) -> bytes:
+        return bytes(self._data)
+
+
+def assemble(lines: Iterable[str]) -> bytes:
+    """Ассемблирует строки NASM в содержимое объектного файла ELF64."""
+    return Assembler().assemble(lines)
+
+
+def assemble_file(asm_path: str, obj_path: str):
+    """Ассемблирует файл asm_path в объектный файл obj_path."""
+    Assembler().assemble_file(asm_path, obj_path)
@@ -0,0 +1,473 @@
+# codegen/peephole.py
+"""
+Peephole-оптимизатор ассемблера x86-64.
+
+X86Generator складывает тело функции в список AsmLine (метка, инструкция
+или комментарий) вместо готовых строк; PeepholeOptimizer проходит по
+списку окном правил до неподвижной точки, после чего строки попадают в
+вывод. Число срабатываний каждого правила — в stats:
+
+  redundant-load    mov R, M при R == M (после mov M, R или mov R, M)
+  redundant-store   mov M, R при M == R
+  zero-idiom        mov r32, 0 -> xor r32, r32, если флаги дальше не читаются
+  mul-pow2          imul r, 2^k -> shl r, k
+  setcc-branch      test/cmp 0 результата setcc + je/jne -> переход по условию setcc
+  branch-over-jump  jcc A / jmp B / A: -> jncc B
+  jump-thread       переход на метку, за которой сразу jmp B, -> переход на B
+  jump-next         jmp на метку, которая идёт следом
+  unreachable       инструкции между jmp/ret и следующей меткой
+  dead-label        локальные метки, на которые нет переходов
+
+Правила опираются на свойства кода генератора: флаги читает только
+jcc/setcc вскоре после их установки, а слоты [rbp-k] адресуются только
+через rbp — запись через другой регистр (элемент массива) их не меняет.
+"""
+
+from typing import Dict, List, Optional, Set, Tuple
+
+
+def _register_families() -> Dict[str, str]:
+    families = {}
+    for base in ('ax', 'bx', 'cx', 'dx'):
+        family = f'r{base}'
+        for name in (family, f'e{base}', base, f'{base[0]}l', f'{base[0]}h'):
+            families[name] = family
+    for base in ('si', 'di', 'bp', 'sp'):
+        family = f'r{base}'
+        for name in (family, f'e{base}', base, f'{base}l'):
+            families[name] = family
+    for i in range(8, 16):
+        family = f'r{i}'
+        for name in (family, f'{family}d', f'{family}w', f'{family}b'):
+            families[name] = family
+    for i in range(16):
+        families[f'xmm{i}'] = f'xmm{i}'
+    return families
+
+
+REGISTER_FAMILY = _register_families()
+
+# Имена 32-битных регистров по семейству (для xor r32, r32)
+REG32_OF = {REGISTER_FAMILY[name]: name for name in REGISTER_FAMILY
+            if name.startswith('e') and len(name) == 3 or name.endswith('d') and name.startswith('r')}
+
+INVERSE_JCC = {
+    'je': 'jne', 'jne': 'je', 'jz': 'jnz', 'jnz': 'jz',
+    'jl': 'jge', 'jge': 'jl', 'jle': 'jg', 'jg': 'jle',
+    'jb': 'jae', 'jae': 'jb', 'jbe': 'ja', 'ja': 'jbe',
+    'jp': 'jnp', 'jnp': 'jp', 'js': 'jns', 'jns': 'js',
+}
+
+# setcc -> jcc с тем же условием
+SETCC_JCC = {f'set{jcc[1:]}': jcc for jcc in INVERSE_JCC}
+
+# Пишут операнд 0 и не читают флаги
+_DEST_WRITERS = frozenset((
+    'mov', 'movzx', 'movsx', 'movsxd', 'lea', 'movss', 'movd', 'movq', 'movaps', 'movups',
+    'movdqu', 'movdqa', 'cvtsi2ss', 'cvttss2si',
+))
+# Пишут операнд 0 и флаги
+_DEST_FLAG_WRITERS = frozenset((
+    'add', 'sub', 'and', 'or', 'xor', 'imul', 'shl', 'sal', 'shr', 'sar', 'neg', 'not', 'inc', 'dec',
+))
+# SSE-арифметика: пишет операнд 0, флаги не трогает
+_SSE_ARITHMETIC = frozenset((
+    'addss', 'subss', 'mulss', 'divss', 'xorps', 'andps', 'orps', 'minss', 'maxss', 'sqrtss',
+    'addps', 'subps', 'mulps', 'divps', 'paddd', 'psubd', 'pmulld', 'pand', 'por', 'pxor',
+    'shufps', 'pshufd', 'pmuludq', 'punpckldq',
+))
+# Устанавливают флаги, не меняя операнды
+_FLAG_SETTERS = frozenset(('cmp', 'test', 'ucomiss', 'comiss'))
+
+# Окно поиска повторной загрузки и чтения флагов
+WINDOW = 12
+
+
+class AsmLine:
+    """Строка тела функции: метка, инструкция (мнемоника и операнды) или комментарий."""
+    __slots__ = ('kind', 'mnemonic', 'operands', 'text')
+
+    LABEL = 0
+    INSTR = 1
+    COMMENT = 2
+
+    def __init__(self, kind: int, mnemonic: str = '', operands: Optional[List[str]] = None,
+                 text: Optional[str] = None):
+        self.kind = kind
+        self.mnemonic = mnemonic
+        self.operands = operands if operands is not None else []
+        self.text = text
+
+    @classmethod
+    def parse(cls, line: str) -> 'AsmLine':
+        """Строка генератора ('    mov eax, 1', 'f.label:', '; ...') в AsmLine."""
+        stripped = line.strip()
+        if stripped.startswith(';') or not stripped:
+            return cls(cls.COMMENT, text=line)
+        if stripped.endswith(':') and ' ' not in stripped:
+            return cls(cls.LABEL, stripped[:-1])
+        mnemonic, _, rest = stripped.partition(' ')
+        return cls(cls.INSTR, mnemonic, rest.split(', ') if rest else [], line)
+
+    @classmethod
+    def instr(cls, mnemonic: str, *operands: str) -> 'AsmLine':
+        return cls(cls.INSTR, mnemonic, list(operands))
+
+    def render(self) -> str:
+        if self.kind == self.LABEL:
+            return f"{self.mnemonic}:"
+        if self.text is not None:
+            return self.text
+        if self.operands:
+            return f"    {self.mnemonic} {', '.join(self.operands)}"
+        return f"    {self.mnemonic}"
+
+    def rewrite(self, mnemonic: str, *operands: str):
+        self.mnemonic = mnemonic
+        self.operands = list(operands)
+        self.text = None
+
+    def __repr__(self):
+        return f"AsmLine({self.render().strip()!r})"
+
+
+def _is_memory(operand: str) -> bool:
+    return '[' in operand
+
+
+def _address_registers(operand: str) -> Set[str]:
+    """Семейства регистров в адресном выражении [base+index*k+disp]."""
+    inner = operand[operand.index('[') + 1:operand.rindex(']')]
+    for sep in '+-*':
+        inner = inner.replace(sep, ' ')
+    return {REGISTER_FAMILY[token] for token in inner.split() if token in REGISTER_FAMILY}
+
+
+def _frame_slot(operand: str) -> Optional[Tuple[int, int]]:
+    """Диапазон байтов [начало, конец) слота '[rbp-k]' или None."""
+    if '[rbp' not in operand:
+        return None
+    size_word, _, address = operand.rpartition(' ')
+    size = {'byte': 1, 'word': 2, 'dword': 4, 'qword': 8}.get(size_word, 16)
+    try:
+        offset = int(address[4:-1] or 0)
+    except ValueError:
+        return None
+    return offset, offset + size
+
+
+def _is_jcc(mnemonic: str) -> bool:
+    return mnemonic.startswith('j') and mnemonic != 'jmp'
+
+
+def _reads_flags(mnemonic: str) -> bool:
+    return _is_jcc(mnemonic) or mnemonic.startswith(('set', 'cmov')) or mnemonic in ('adc', 'sbb')
+
+
+def _writes(line: AsmLine) -> Optional[Tuple[Set[str], Optional[str]]]:
+    """
+    (семейства записанных регистров, записанный операнд памяти или None);
+    None — инструкция не разобрана или меняет неизвестную память (барьер).
+    """
+    mnemonic, operands = line.mnemonic, line.operands
+    if mnemonic in _DEST_WRITERS or mnemonic in _DEST_FLAG_WRITERS or mnemonic in _SSE_ARITHMETIC \
+            or mnemonic.startswith('set'):
+        if not operands:
+            return None
+        dest = operands[0]
+        if _is_memory(dest):
+            return set(), dest
+        family = REGISTER_FAMILY.get(dest)
+        return ({family}, None) if family else None
+    if mnemonic in _FLAG_SETTERS:
+        return set(), None
+    if mnemonic in ('cdq', 'cqo'):
+        return {'rdx'}, None
+    if mnemonic in ('idiv', 'div'):
+        return {'rax', 'rdx'}, None
+    if mnemonic == 'push':
+        return {'rsp'}, None
+    if mnemonic == 'pop' and operands and operands[0] in REGISTER_FAMILY:
+        return {'rsp', REGISTER_FAMILY[operands[0]]}, None
+    return None
+
+
+def _preserves_flags(mnemonic: str) -> bool:
+    """Инструкция заведомо не меняет флаги (ucomiss, add, idiv и т.п. — меняют)."""
+    return mnemonic in _DEST_WRITERS or mnemonic in _SSE_ARITHMETIC or mnemonic.startswith('set') \
+        or mnemonic in ('cdq', 'cqo', 'push', 'pop')
+
+
+def _power_of_two(text: str) -> Optional[int]:
+    try:
+        value = int(text)
+    except ValueError:
+        return None
+    if value >= 1 and value & (value - 1) == 0:
+        return value.bit_length() - 1
+    return None
+
+
+class PeepholeOptimizer:
+    """Правила окна над списком AsmLine одной функции; счётчики — в stats."""
+
+    RULES = ('redundant-load', 'redundant-store', 'zero-idiom', 'mul-pow2', 'setcc-branch',
+             'branch-over-jump', 'jump-thread', 'jump-next', 'unreachable', 'dead-label')
+
+    def __init__(self):
+        self.stats: Dict[str, int] = {rule: 0 for rule in self.RULES}
+
+    def optimize(self, lines: List[AsmLine]) -> List[AsmLine]:
+        changed = True
+        while changed:
+            self.lines = lines
+            self.labels = {line.mnemonic: i for i, line in enumerate(lines) if line.kind == AsmLine.LABEL}
+            changed = False
+            for i in range(len(lines)):
+                line = lines[i]
+                if line is not None and line.kind == AsmLine.INSTR and self._rewrite(i, line):
+                    changed = True
+            lines = [line for line in lines if line is not None]
+            changed |= self._remove_dead_labels(lines)
+        return lines
+
+    # ---------- обход ----------
+
+    def _next(self, i: int) -> int:
+        """Индекс следующей метки или инструкции после i (len — конец)."""
+        lines = self.lines
+        i += 1
+        while i < len(lines) and (lines[i] is None or lines[i].kind == AsmLine.COMMENT):
+            i += 1
+        return i
+
+    def _at(self, i: int) -> Optional[AsmLine]:
+        return self.lines[i] if i < len(self.lines) else None
+
+    def _delete(self, i: int, rule: str):
+        self.lines[i] = None
+        self.stats[rule] += 1
+
+    def _labels_following(self, i: int) -> Tuple[Set[str], int]:
+        """Метки сразу после строки i и индекс первой инструкции за ними."""
+        labels = set()
+        j = self._next(i)
+        while j < len(self.lines) and self.lines[j].kind == AsmLine.LABEL:
+            labels.add(self.lines[j].mnemonic)
+            j = self._next(j)
+        return labels, j
+
+    def _target(self, label: str) -> Optional[int]:
+        """Индекс первой инструкции после метки label."""
+        i = self.labels.get(label)
+        if i is None or self.lines[i] is None:
+            return None
+        return self._labels_following(i)[1]
+
+    # ---------- правила ----------
+
+    def _rewrite(self, i: int, line: AsmLine) -> bool:
+        mnemonic, operands = line.mnemonic, line.operands
+        if mnemonic in ('mov', 'movss') and len(operands) == 2:
+            if self._redundant_move(i, line):
+                return True
+            if mnemonic == 'mov' and operands[1] == '0' and self._zero_idiom(i, line):
+                return True
+        elif mnemonic == 'imul' and len(operands) == 2:
+            return self._mul_pow2(i, line)
+        elif mnemonic.startswith('set'):
+            return self._setcc_branch(i, line)
+        elif mnemonic == 'jmp' or _is_jcc(mnemonic):
+            return self._jump(i, line)
+        elif mnemonic == 'ret':
+            return self._unreachable(i)
+        return False
+
+    def _redundant_move(self, i: int, line: AsmLine) -> bool:
+        """
+        После mov R, M (или mov M, R) R и M равны, пока ни одно не перезаписано:
+        повторные mov R, M / mov M, R в окне удаляются.
+        """
+        dest, src = line.operands
+        if _is_memory(dest) == _is_memory(src):
+            return False
+        memory, register = (dest, src) if _is_memory(dest) else (src, dest)
+        family = REGISTER_FAMILY.get(register)
+        if family is None:
+            return False
+        address = _address_registers(memory)
+        if family in address:
+            return False
+        slot = _frame_slot(memory)
+        removed = False
+        j = i
+        for _ in range(WINDOW):
+            j = self._next(j)
+            other = self._at(j)
+            if other is None or other.kind != AsmLine.INSTR:
+                break
+            if other.mnemonic == line.mnemonic and len(other.operands) == 2:
+                if other.operands == [register, memory]:
+                    self._delete(j, 'redundant-load')
+                    removed = True
+                    continue
+                if other.operands == [memory, register]:
+                    self._delete(j, 'redundant-store')
+                    removed = True
+                    continue
+            written = _writes(other)
+            if written is None:
+                break
+            registers, written_memory = written
+            if family in registers or address & registers:
+                break
+            if written_memory is not None:
+                other_slot = _frame_slot(written_memory)
+                if slot is None or other_slot is None and _address_registers(written_memory) & {'rbp'}:
+                    break
+                if other_slot is not None and other_slot[0] < slot[1] and slot[0] < other_slot[1]:
+                    break
+        return removed
+
+    def _flags_dead(self, i: int) -> bool:
+        """Флаги, установленные в строке i, не читаются дальше по пути выполнения."""
+        j = i
+        for _ in range(WINDOW):
+            j = self._next(j)
+            other = self._at(j)
+            if other is None:
+                return True
+            if other.kind == AsmLine.LABEL:
+                continue
+            mnemonic = other.mnemonic
+            if _reads_flags(mnemonic):
+                return False
+            if mnemonic in _FLAG_SETTERS or mnemonic in _DEST_FLAG_WRITERS or mnemonic in ('ret', 'call'):
+                return True
+            if mnemonic == 'jmp':
+                target = self.labels.get(other.operands[0]) if other.operands else None
+                if target is None:
+                    return False
+                j = target
+        return False
+
+    def _zero_idiom(self, i: int, line: AsmLine) -> bool:
+        dest = line.operands[0]
+        family = REGISTER_FAMILY.get(dest)
+        reg32 = REG32_OF.get(family)
+        if reg32 is None or dest not in (family, reg32) or not self._flags_dead(i):
+            return False
+        line.rewrite('xor', reg32, reg32)
+        self.stats['zero-idiom'] += 1
+        return True
+
+    def _mul_pow2(self, i: int, line: AsmLine) -> bool:
+        shift = _power_of_two(line.operands[1])
+        if shift is None or not self._flags_dead(i):
+            return False
+        if shift == 0:
+            self._delete(i, 'mul-pow2')
+        else:
+            line.rewrite('shl', line.operands[0], str(shift))
+            self.stats['mul-pow2'] += 1
+        return True
+
+    def _setcc_branch(self, i: int, line: AsmLine) -> bool:
+        """
+        setcc al / movzx R, al / [mov M, R] / test R, R (cmp M, 0) / jne T:
+        значение остаётся материализованным, а переход берёт флаги сравнения.
+        """
+        jcc = SETCC_JCC.get(line.mnemonic)
+        if jcc is None or line.operands != ['al']:
+            return False
+        holders = {'al'}
+        j = i
+        for _ in range(WINDOW):
+            j = self._next(j)
+            other = self._at(j)
+            if other is None or other.kind != AsmLine.INSTR:
+                return False
+            ops = other.operands
+            if other.mnemonic in ('test', 'cmp') and len(ops) == 2:
+                tests_value = ops[0] == ops[1] if other.mnemonic == 'test' else ops[1] == '0'
+                if not tests_value or ops[0] not in holders:
+                    return False
+                k = self._next(j)
+                branch = self._at(k)
+                if branch is None or branch.kind != AsmLine.INSTR \
+                        or branch.mnemonic not in ('jne', 'jnz', 'je', 'jz'):
+                    return False
+                taken = jcc if branch.mnemonic in ('jne', 'jnz') else INVERSE_JCC[jcc]
+                branch.rewrite(taken, *branch.operands)
+                self._delete(j, 'setcc-branch')
+                return True
+            if other.mnemonic in ('movzx', 'mov') and len(ops) == 2 and ops[1] in holders:
+                holders.add(ops[0])
+                continue
+            written = _writes(other)
+            if written is None or not _preserves_flags(other.mnemonic):
+                return False
+            registers, memory = written
+            holders = {h for h in holders if REGISTER_FAMILY.get(h) not in registers and h != memory}
+        return False
+
+    def _jump(self, i: int, line: AsmLine) -> bool:
+        if not line.operands:
+            return False
+        target = line.operands[0]
+        following, after = self._labels_following(i)
+
+        if line.mnemonic == 'jmp' and target in following:
+            self._delete(i, 'jump-next')
+            return True
+
+        # jcc A / jmp B / A:
+        if line.mnemonic in INVERSE_JCC:
+            j = self._next(i)
+            other = self._at(j)
+            if other is not None and other.kind == AsmLine.INSTR and other.mnemonic == 'jmp' \
+                    and other.operands and target in self._labels_following(j)[0]:
+                line.rewrite(INVERSE_JCC[line.mnemonic], other.operands[0])
+                self._delete(j, 'branch-over-jump')
+                return True
+
+        # Цепочка переходов: A: jmp B
+        seen = {target}
+        final = target
+        for _ in range(8):
+            k = self._target(final)
+            hop = self._at(k) if k is not None else None
+            if hop is None or hop.kind != AsmLine.INSTR or hop.mnemonic != 'jmp' \
+                    or not hop.operands or hop.operands[0] in seen:
+                break
+            final = hop.operands[0]
+            seen.add(final)
+        if final != target:
+            line.rewrite(line.mnemonic, final)
+            self.stats['jump-thread'] += 1
+            return True
+
+        if line.mnemonic == 'jmp':
+            return self._unreachable(i)
+        return False
+
+    def _unreachable(self, i: int) -> bool:
+        """Инструкции после безусловного перехода до ближайшей метки."""
+        removed = False
+        j = self._next(i)
+        while j < len(self.lines) and self.lines[j].kind == AsmLine.INSTR:
+            self._delete(j, 'unreachable')
+            removed = True
+            j = self._next(j)
+        return removed
+
+    def _remove_dead_labels(self, lines: List[AsmLine]) -> bool:
+        referenced = {op for line in lines if line.kind == AsmLine.INSTR for op in line.operands}
+        dead = [i for i, line in enumerate(lines)
+                if line.kind == AsmLine.LABEL and line.mnemonic not in referenced]
+        if not dead:
+            return False
+        self.stats['dead-label'] += len(dead)
+        dead_set = set(dead)
+        lines[:] = [line for i, line in enumerate(lines) if i not in dead_set]
+        return True
@@ -0,0 +1,252 @@
+# codegen/register_allocator.py
+"""
+Распределение регистров методом линейного сканирования (linear scan).
+
+Временные переменные функции получают интервалы жизни по линейному порядку
+блоков, после чего интервалы распределяются по физическим регистрам.
+Стековый слот выделяется только тем временным, которым не хватило регистра.
+"""
+
+from bisect import bisect_right
+from typing import Callable, Dict, List, Optional, Set
+
+from ir.dataflow import BitNumbering, DataflowProblem, solve
+from ir.ir_instructions import DEF_OPCODES, IROpcode, IROperandType
+
+
+class LiveInterval:
+    """Интервал жизни временной переменной [start, end] в линейной нумерации."""
+
+    def __init__(self, temp: str, reg_class: str):
+        self.temp = temp
+        self.reg_class = reg_class  # 'int' или 'float'
+        self.start: Optional[int] = None
+        self.end: Optional[int] = None
+        self.crosses_call = False
+        self.register: Optional[str] = None
+
+    def extend(self, pos: int):
+        if self.start is None or pos < self.start:
+            self.start = pos
+        if self.end is None or pos > self.end:
+            self.end = pos
+
+    def __repr__(self):
+        return f"LiveInterval({self.temp}, [{self.start}, {self.end}], {self.register})"
+
+
+class LinearScanAllocator:
+    """
+    Линейное сканирование по интервалам жизни (Poletto & Sarkar).
+
+    Целочисленные временные распределяются по rbx, r12-r15 (callee-saved)
+    и r10, r11 (caller-saved), вещественные — по xmm8-xmm15.
+    Интервалы, пересекающие CALL, получают только callee-saved регистры.
+    """
+
+    INT_CALLER_SAVED = ['r10', 'r11']
+    INT_CALLEE_SAVED = ['rbx', 'r12', 'r13', 'r14', 'r15']
+    FLOAT_REGS = [f'xmm{i}' for i in range(8, 16)]
+
+    def __init__(self, operand_is_float: Callable, aliases: Optional[Dict[str, str]] = None):
+        """
+        operand_is_float(instr, index) — используется ли операнд в вещественном
+        контексте (так же, как его транслирует кодогенератор).
+        aliases — отображение имён параметров на их временные.
+        """
+        self.operand_is_float = operand_is_float
+        self.aliases = aliases or {}
+        self.intervals: Dict[str, LiveInterval] = {}
+        self.stats = {"registers": 0, "spilled": 0}
+
+    def allocate(self, func, blocks_in_order: List, pinned: Set[str] = frozenset()) -> Dict[str, str]:
+        """
+        Распределяет регистры для функции.
+
+        pinned — временные, определённые в прологе (параметры): их интервал
+        начинается с позиции 0.
+        Возвращает отображение имя_временной -> физический регистр.
+        """
+        self.intervals = {}
+        classes: Dict[str, Set[str]] = {}
+        forced_spill: Set[str] = set()
+
+        # 1. Линейная нумерация и локальные use/def блоков
+        positions = []  # (block, [(pos, instr, uses, defs)])
+        call_positions: List[int] = []
+        pos = 0
+        for block in blocks_in_order:
+            entries = []
+            call_index = self._next_call_positions(block, pos)
+            for i, instr in enumerate(block.instructions):
+                uses, defs = self._uses_defs(instr, classes)
+                use_pos = pos
+                if instr.opcode == IROpcode.PARAM:
+                    # PARAM переносится кодогенератором к ближайшему CALL
+                    use_pos = call_index.get(i)
+                    if use_pos is None:
+                        forced_spill.update(uses)
+                        use_pos = pos
+                if instr.opcode == IROpcode.CALL:
+                    call_positions.append(pos)
+                entries.append((pos, use_pos, uses, defs))
+                pos += 1
+            positions.append((block, entries))
+
+        # 2. Живость на уровне блоков
+        live_in, live_out = self._compute_liveness(func, blocks_in_order, positions)
+
+        # 3. Интервалы как выпуклая оболочка всех точек жизни
+        for block, entries in positions:
+            if not entries:
+                continue
+            block_start = entries[0][0]
+            block_end = entries[-1][0]
+            # sorted: порядок создания интервалов не должен зависеть от хэшей строк
+            for temp in sorted(live_in[block]):
+                self._interval(temp, classes).extend(block_start)
+            for temp in sorted(live_out[block]):
+                self._interval(temp, classes).extend(block_end)
+            for instr_pos, use_pos, uses, defs in entries:
+                for temp in uses:
+                    self._interval(temp, classes).extend(use_pos)
+                for temp in defs:
+                    self._interval(temp, classes).extend(instr_pos)
+
+        for temp in pinned:
+            if temp in self.intervals:
+                self.intervals[temp].extend(0)
+
+        # call_positions возрастают: ищем первый CALL правее start
+        for interval in self.intervals.values():
+            i = bisect_right(call_positions, interval.start)
+            interval.crosses_call = i < len(call_positions) and call_positions[i] < interval.end
+
+        # 4. Линейное сканирование
+        candidates = []
+        for temp, interval in self.intervals.items():
+            if temp in forced_spill or len(classes.get(temp, ())) != 1:
+                # Временная используется и как int, и как float — оставляем в памяти
+                continue
+            candidates.append(interval)
+        self._linear_scan(candidates)
+
+        assignment = {}
+        for interval in self.intervals.values():
+            if interval.register:
+                assignment[interval.temp] = interval.register
+                self.stats["registers"] += 1
+            else:
+                self.stats["spilled"] += 1
+        return assignment
+
+    def _linear_scan(self, intervals: List[LiveInterval]):
+        intervals.sort(key=lambda iv: (iv.start, iv.end))
+        active: List[LiveInterval] = []
+        free = {
+            'int': self.INT_CALLER_SAVED + self.INT_CALLEE_SAVED,
+            'float': list(self.FLOAT_REGS),
+        }
+
+        for current in intervals:
+            # Освобождаем регистры закончившихся интервалов (конец строго раньше начала)
+            still_active = []
+            for iv in active:
+                if iv.end < current.start:
+                    free[iv.reg_class].append(iv.register)
+                else:
+                    still_active.append(iv)
+            active = still_active
+
+            allowed = self._allowed_registers(current)
+            reg = next((r for r in free[current.reg_class] if r in allowed), None)
+            if reg is not None:
+                free[current.reg_class].remove(reg)
+                current.register = reg
+                active.append(current)
+                continue
+
+            # Регистров нет: вытесняем интервал с самым дальним концом
+            victims = [iv for iv in active
+                       if iv.reg_class == current.reg_class and iv.register in allowed]
+            if victims:
+                victim = max(victims, key=lambda iv: iv.end)
+                if victim.end > current.end:
+                    current.register = victim.register
+                    victim.register = None
+                    active.remove(victim)
+                    active.append(current)
+
+    def _allowed_registers(self, interval: LiveInterval) -> List[str]:
+        if interval.reg_class == 'float':
+            # В System V все xmm-регистры caller-saved
+            return [] if interval.crosses_call else self.FLOAT_REGS
+        if interval.crosses_call:
+            return self.INT_CALLEE_SAVED
+        return self.INT_CALLER_SAVED + self.INT_CALLEE_SAVED
+
+    def _interval(self, temp: str, classes: Dict[str, Set[str]]) -> LiveInterval:
+        interval = self.intervals.get(temp)
+        if interval is None:
+            kinds = classes.get(temp, {'int'})
+            reg_class = 'float' if kinds == {'float'} else 'int'
+            interval = LiveInterval(temp, reg_class)
+            self.intervals[temp] = interval
+        return interval
+
+    def _next_call_positions(self, block, base: int) -> Dict[int, int]:
+        """Для каждого PARAM блока — позиция CALL, к которому он будет выпущен."""
+        result = {}
+        pending = []
+        for i, instr in enumerate(block.instructions):
+            if instr.opcode == IROpcode.PARAM:
+                pending.append(i)
+            elif instr.opcode == IROpcode.CALL:
+                for p in pending:
+                    result[p] = base + i
+                pending = []
+        return result
+
+    def _temp_name(self, operand) -> Optional[str]:
+        if operand.operand_type == IROperandType.TEMPORARY:
+            return operand.value
+        if operand.operand_type == IROperandType.VARIABLE:
+            return self.aliases.get(operand.value)
+        return None
+
+    def _uses_defs(self, instr, classes: Dict[str, Set[str]]):
+        uses, defs = [], []
+        has_dest = instr.opcode in DEF_OPCODES
+        for i, op in enumerate(instr.operands):
+            name = self._temp_name(op)
+            if name is None:
+                continue
+            kind = 'float' if self.operand_is_float(instr, i) else 'int'
+            classes.setdefault(name, set()).add(kind)
+            if i == 0 and has_dest:
+                defs.append(name)
+            else:
+                uses.append(name)
+        return uses, defs
+
+    def _compute_liveness(self, func, blocks_in_order, positions):
+        """Живость на уровне блоков — обратная задача решателя ir.dataflow."""
+        numbering = BitNumbering()
+        gen, kill = {}, {}
+        for block, entries in positions:
+            g = k = 0
+            for _, _, uses, defs in entries:
+                for temp in uses:
+                    bit = 1 << numbering.add(temp)
+                    if not k & bit:
+                        g |= bit
+                for temp in defs:
+                    k |= 1 << numbering.add(temp)
+            gen[block], kill[block] = g, k
+
+        # Рёбра — из CFG функции (block.successors)
+        problem = DataflowProblem(blocks_in_order, gen, kill, numbering, forward=False)
+        result = solve(problem, func)
+        live_in = {b: result.in_items(b) for b in blocks_in_order}
+        live_out = {b: result.out_items(b) for b in blocks_in_order}
+        return live_in, live_out
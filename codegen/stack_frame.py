@@ -3,21 +3,25 @@
 Управление стековым фреймом для x86-64 кодогенерации.
 """
 
+from typing import Optional
+
+
 class StackFrame:
     def __init__(self):
         self.variables = {}  # имя_переменной -> (offset, size_bytes)
         self.current_offset = 0
 
-    def allocate(self, name: str, size_bytes: int = 8) -> int:
+    def allocate(self, name: str, size_bytes: int = 8, align: Optional[int] = None) -> int:
         """
         Выделяет место на стеке для переменной.
         Возвращает отрицательное смещение от RBP.
+        По умолчанию выравнивание — по размеру (скаляры 1/4/8 байт).
         """
         if name in self.variables:
             return self.variables[name][0]
 
-        # Выравнивание по размеру
-        align = size_bytes
+        if align is None:
+            align = size_bytes
         self.current_offset = (self.current_offset + align - 1) & ~(align - 1)
         self.current_offset += size_bytes
 
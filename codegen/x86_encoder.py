@@ -0,0 +1,764 @@
+# codegen/x86_encoder.py
+"""
+Кодирование инструкций x86-64 в машинный код для встроенного ассемблера.
+
+Поддерживается подмножество синтаксиса NASM, которое выдают X86Generator
+и runtime/runtime.asm: регистры общего назначения и xmm, память
+[база + индекс*масштаб ± смещение] и [символ] (RIP-относительно),
+непосредственные значения, символы и символьные константы.
+
+Переходы и вызовы всегда кодируются с rel32, поэтому длина инструкции не
+зависит от адресов меток и ассемблеру достаточно одного прохода.
+"""
+
+import struct
+from typing import List, Optional, Tuple, Union
+
+
+class AssemblerError(Exception):
+    """Ошибка разбора или кодирования ассемблерной инструкции."""
+    pass
+
+
+class Reg:
+    """Физический регистр: размер в байтах, номер 0-15, класс gpr/xmm."""
+    __slots__ = ('name', 'size', 'num', 'is_xmm')
+
+    def __init__(self, name: str, size: int, num: int, is_xmm: bool = False):
+        self.name = name
+        self.size = size
+        self.num = num
+        self.is_xmm = is_xmm
+
+    def __repr__(self):
+        return self.name
+
+
+class Mem:
+    """Операнд в памяти: [base + index*scale + disp (+ symbol)]."""
+    __slots__ = ('size', 'base', 'index', 'scale', 'disp', 'symbol')
+
+    def __init__(self, size: Optional[int], base: Optional[Reg], index: Optional[Reg],
+                 scale: int, disp: int, symbol: Optional[str]):
+        self.size = size
+        self.base = base
+        self.index = index
+        self.scale = scale
+        self.disp = disp
+        self.symbol = symbol
+
+
+class Imm:
+    """Непосредственное значение; symbol — адрес символа плюс value."""
+    __slots__ = ('value', 'symbol')
+
+    def __init__(self, value: int, symbol: Optional[str] = None):
+        self.value = value
+        self.symbol = symbol
+
+
+Operand = Union[Reg, Mem, Imm]
+
+# Виды поправок (fixup) для ассемблера
+REL32 = 'rel32'      # PC-относительное 32-битное смещение (переходы, [символ])
+BRANCH32 = 'branch32'  # rel32 операнда call/jmp (к внешним функциям — через PLT)
+ABS32 = 'abs32'      # абсолютный адрес, нулевое расширение до 64 бит
+ABS32S = 'abs32s'    # абсолютный адрес, знаковое расширение до 64 бит
+ABS64 = 'abs64'
+
+
+class Fixup:
+    """Ссылка на символ внутри закодированной инструкции."""
+    __slots__ = ('offset', 'kind', 'symbol', 'addend')
+
+    def __init__(self, offset: int, kind: str, symbol: str, addend: int):
+        self.offset = offset  # смещение поля от начала инструкции
+        self.kind = kind
+        self.symbol = symbol
+        self.addend = addend
+
+    def __repr__(self):
+        return f"Fixup({self.offset}, {self.kind}, {self.symbol}, {self.addend})"
+
+
+def _build_registers():
+    names64 = ['rax', 'rcx', 'rdx', 'rbx', 'rsp', 'rbp', 'rsi', 'rdi']
+    names32 = ['eax', 'ecx', 'edx', 'ebx', 'esp', 'ebp', 'esi', 'edi']
+    names16 = ['ax', 'cx', 'dx', 'bx', 'sp', 'bp', 'si', 'di']
+    names8 = ['al', 'cl', 'dl', 'bl', 'spl', 'bpl', 'sil', 'dil']
+    regs = {}
+    for num in range(16):
+        if num < 8:
+            n64, n32, n16, n8 = names64[num], names32[num], names16[num], names8[num]
+        else:
+            n64, n32, n16, n8 = f"r{num}", f"r{num}d", f"r{num}w", f"r{num}b"
+        regs[n64] = Reg(n64, 8, num)
+        regs[n32] = Reg(n32, 4, num)
+        regs[n16] = Reg(n16, 2, num)
+        regs[n8] = Reg(n8, 1, num)
+        regs[f"xmm{num}"] = Reg(f"xmm{num}", 16, num, is_xmm=True)
+    return regs
+
+
+REGISTERS = _build_registers()
+
+# Байтовые регистры, которые кодируются только с префиксом REX
+_REX_BYTE_REGS = frozenset(('spl', 'bpl', 'sil', 'dil'))
+
+SIZE_KEYWORDS = {'byte': 1, 'word': 2, 'dword': 4, 'qword': 8, 'oword': 16}
+
+CONDITION_CODES = {
+    'o': 0x0, 'no': 0x1, 'b': 0x2, 'c': 0x2, 'nae': 0x2, 'ae': 0x3, 'nb': 0x3, 'nc': 0x3,
+    'e': 0x4, 'z': 0x4, 'ne': 0x5, 'nz': 0x5, 'be': 0x6, 'na': 0x6, 'a': 0x7, 'nbe': 0x7,
+    's': 0x8, 'ns': 0x9, 'p': 0xA, 'pe': 0xA, 'np': 0xB, 'po': 0xB,
+    'l': 0xC, 'nge': 0xC, 'ge': 0xD, 'nl': 0xD, 'le': 0xE, 'ng': 0xE, 'g': 0xF, 'nle': 0xF,
+}
+
+# add/or/adc/sbb/and/sub/xor/cmp: код операции = номер * 8, /digit = номер
+_ALU = {'add': 0, 'or': 1, 'adc': 2, 'sbb': 3, 'and': 4, 'sub': 5, 'xor': 6, 'cmp': 7}
+
+# Группа F6/F7 с одним операндом
+_UNARY = {'not': 2, 'neg': 3, 'mul': 4, 'div': 6, 'idiv': 7}
+
+_SHIFTS = {'rol': 0, 'ror': 1, 'shl': 4, 'sal': 4, 'shr': 5, 'sar': 7}
+
+# Инструкции без операндов
+_NO_OPERANDS = {
+    'ret': b'\xc3', 'leave': b'\xc9', 'nop': b'\x90', 'hlt': b'\xf4',
+    'cdq': b'\x99', 'cqo': b'\x48\x99', 'cdqe': b'\x48\x98',
+    'syscall': b'\x0f\x05', 'ud2': b'\x0f\x0b',
+}
+
+# SSE вида xmm, xmm/m: мнемоника -> (обязательный префикс, код операции)
+_SSE = {
+    'addss': (b'\xf3', b'\x0f\x58'), 'subss': (b'\xf3', b'\x0f\x5c'),
+    'mulss': (b'\xf3', b'\x0f\x59'), 'divss': (b'\xf3', b'\x0f\x5e'),
+    'minss': (b'\xf3', b'\x0f\x5d'), 'maxss': (b'\xf3', b'\x0f\x5f'),
+    'sqrtss': (b'\xf3', b'\x0f\x51'),
+    'ucomiss': (b'', b'\x0f\x2e'), 'comiss': (b'', b'\x0f\x2f'),
+    'andps': (b'', b'\x0f\x54'), 'andnps': (b'', b'\x0f\x55'),
+    'orps': (b'', b'\x0f\x56'), 'xorps': (b'', b'\x0f\x57'),
+    'addps': (b'', b'\x0f\x58'), 'subps': (b'', b'\x0f\x5c'),
+    'mulps': (b'', b'\x0f\x59'), 'divps': (b'', b'\x0f\x5e'),
+    'paddd': (b'\x66', b'\x0f\xfe'), 'psubd': (b'\x66', b'\x0f\xfa'),
+    'pmulld': (b'\x66', b'\x0f\x38\x40'), 'pand': (b'\x66', b'\x0f\xdb'),
+    'por': (b'\x66', b'\x0f\xeb'), 'pxor': (b'\x66', b'\x0f\xef'),
+    'pmuludq': (b'\x66', b'\x0f\xf4'), 'punpckldq': (b'\x66', b'\x0f\x62'),
+}
+
+# Пересылки SSE: мнемоника -> (префикс, загрузка xmm <- xmm/m, сохранение m <- xmm)
+_SSE_MOVES = {
+    'movss': (b'\xf3', b'\x0f\x10', b'\x0f\x11'),
+    'movups': (b'', b'\x0f\x10', b'\x0f\x11'),
+    'movaps': (b'', b'\x0f\x28', b'\x0f\x29'),
+    'movdqu': (b'\xf3', b'\x0f\x6f', b'\x0f\x7f'),
+    'movdqa': (b'\x66', b'\x0f\x6f', b'\x0f\x7f'),
+}
+
+
+def _fits_i8(value: int) -> bool:
+    return -128 <= value <= 127
+
+
+def _fits_i32(value: int) -> bool:
+    return -2**31 <= value < 2**31
+
+
+# ============= Разбор операндов =============
+
+def parse_number(text: str) -> Optional[int]:
+    """Целое в синтаксисе NASM (10, -5, 0x1f, 1fh, 'a') или None."""
+    text = text.strip()
+    if len(text) >= 3 and text[0] == text[-1] and text[0] in "'\"`":
+        body = text[1:-1]
+        if not body:
+            return None
+        return int.from_bytes(body.encode('latin-1'), 'little')
+    negative = text.startswith('-')
+    if negative or text.startswith('+'):
+        text = text[1:].strip()
+    try:
+        if text.lower().startswith('0x'):
+            value = int(text[2:], 16)
+        elif text.lower().endswith('h') and text[:1].isdigit():
+            value = int(text[:-1], 16)
+        else:
+            value = int(text, 10)
+    except ValueError:
+        return None
+    return -value if negative else value
+
+
+def _split_terms(expr: str) -> List[Tuple[int, str]]:
+    """'rbp-8+rcx*4' -> [(+1, 'rbp'), (-1, '8'), (+1, 'rcx*4')]"""
+    terms = []
+    sign = 1
+    current = ''
+    for ch in expr:
+        if ch in '+-' and current.strip():
+            terms.append((sign, current.strip()))
+            current = ''
+            sign = 1 if ch == '+' else -1
+        elif ch in '+-':
+            sign = sign * (1 if ch == '+' else -1)
+        else:
+            current += ch
+    if current.strip():
+        terms.append((sign, current.strip()))
+    return terms
+
+
+def _parse_memory(size: Optional[int], expr: str) -> Mem:
+    base = index = None
+    scale = 1
+    disp = 0
+    symbol = None
+    for sign, term in _split_terms(expr):
+        if '*' in term:
+            left, right = (part.strip() for part in term.split('*', 1))
+            if left in REGISTERS:
+                reg, factor = REGISTERS[left], parse_number(right)
+            else:
+                reg, factor = REGISTERS.get(right), parse_number(left)
+            if reg is None or factor not in (1, 2, 4, 8) or sign < 0 or index is not None:
+                raise AssemblerError(f"invalid effective address: [{expr}]")
+            index, scale = reg, factor
+            continue
+        reg = REGISTERS.get(term)
+        if reg is not None:
+            if sign < 0:
+                raise AssemblerError(f"invalid effective address: [{expr}]")
+            if base is None:
+                base = reg
+            elif index is None:
+                index = reg
+            else:
+                raise AssemblerError(f"invalid effective address: [{expr}]")
+            continue
+        number = parse_number(term)
+        if number is not None:
+            disp += sign * number
+            continue
+        if symbol is not None or sign < 0:
+            raise AssemblerError(f"invalid effective address: [{expr}]")
+        symbol = term
+    for reg in (base, index):
+        if reg is not None and (reg.size != 8 or reg.is_xmm):
+            raise AssemblerError(f"invalid effective address: [{expr}]")
+    if index is not None and index.num == 4:
+        raise AssemblerError(f"rsp cannot be an index register: [{expr}]")
+    return Mem(size, base, index, scale, disp, symbol)
+
+
+def parse_operand(text: str) -> Operand:
+    text = text.strip()
+    size = None
+    head, _, rest = text.partition(' ')
+    if head.lower() in SIZE_KEYWORDS and rest:
+        size = SIZE_KEYWORDS[head.lower()]
+        text = rest.strip()
+        if text.startswith('ptr '):
+            text = text[4:].strip()
+    if text.startswith('['):
+        if not text.endswith(']'):
+            raise AssemblerError(f"invalid memory operand: {text}")
+        return _parse_memory(size, text[1:-1].strip())
+    reg = REGISTERS.get(text.lower())
+    if reg is not None:
+        return reg
+    number = parse_number(text)
+    if number is not None:
+        return Imm(number)
+    terms = _split_terms(text)
+    symbol = None
+    value = 0
+    for sign, term in terms:
+        number = parse_number(term)
+        if number is not None:
+            value += sign * number
+        elif symbol is None and sign > 0 and (term[0].isalpha() or term[0] in '._'):
+            symbol = term
+        else:
+            raise AssemblerError(f"invalid operand: {text}")
+    return Imm(value, symbol)
+
+
+def split_operands(text: str) -> List[str]:
+    """Делит строку операндов по запятым вне кавычек и скобок."""
+    parts = []
+    current = ''
+    quote = None
+    depth = 0
+    for ch in text:
+        if quote:
+            current += ch
+            if ch == quote:
+                quote = None
+        elif ch in "'\"`":
+            quote = ch
+            current += ch
+        elif ch == '[':
+            depth += 1
+            current += ch
+        elif ch == ']':
+            depth -= 1
+            current += ch
+        elif ch == ',' and depth == 0:
+            parts.append(current.strip())
+            current = ''
+        else:
+            current += ch
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+# ============= Кодирование =============
+
+class Encoding:
+    """Результат кодирования одной инструкции."""
+    __slots__ = ('data', 'fixups')
+
+    def __init__(self, data: bytes, fixups: List[Fixup]):
+        self.data = data
+        self.fixups = fixups
+
+
+class X86Encoder:
+    """Кодирует одну инструкцию (мнемоника + операнды) в байты и поправки."""
+
+    def encode(self, mnemonic: str, operands: List[Operand]) -> Encoding:
+        mnemonic = mnemonic.lower()
+        if mnemonic in _NO_OPERANDS:
+            self._expect(mnemonic, operands, 0)
+            return Encoding(_NO_OPERANDS[mnemonic], [])
+        if mnemonic in _ALU:
+            return self._alu(mnemonic, operands)
+        if mnemonic in _UNARY:
+            self._expect(mnemonic, operands, 1)
+            rm = operands[0]
+            size = self._rm_size(mnemonic, rm)
+            return self._modrm(b'\xf6' if size == 1 else b'\xf7', _UNARY[mnemonic], rm, size)
+        if mnemonic in _SHIFTS:
+            return self._shift(mnemonic, operands)
+        if mnemonic in _SSE:
+            self._expect(mnemonic, operands, 2)
+            prefix, opcode = _SSE[mnemonic]
+            dst, src = operands
+            self._check_xmm(mnemonic, dst)
+            return self._modrm(opcode, dst.num, self._xmm_rm(mnemonic, src), 4, prefix=prefix)
+        if mnemonic in _SSE_MOVES:
+            return self._sse_move(mnemonic, operands)
+        handler = getattr(self, f"_op_{mnemonic}", None)
+        if handler is not None:
+            return handler(mnemonic, operands)
+        if mnemonic.startswith('set') and mnemonic[3:] in CONDITION_CODES:
+            self._expect(mnemonic, operands, 1)
+            self._rm_size(mnemonic, operands[0], required=1)
+            return self._modrm(bytes((0x0f, 0x90 | CONDITION_CODES[mnemonic[3:]])), 0, operands[0], 1)
+        if mnemonic.startswith('cmov') and mnemonic[4:] in CONDITION_CODES:
+            self._expect(mnemonic, operands, 2)
+            dst, src = operands
+            size = self._reg_size(mnemonic, dst, src)
+            return self._modrm(bytes((0x0f, 0x40 | CONDITION_CODES[mnemonic[4:]])), dst.num, src, size)
+        if mnemonic.startswith('j') and mnemonic[1:] in CONDITION_CODES:
+            self._expect(mnemonic, operands, 1)
+            return self._branch(bytes((0x0f, 0x80 | CONDITION_CODES[mnemonic[1:]])), operands[0], mnemonic)
+        raise AssemblerError(f"unsupported instruction: {mnemonic}")
+
+    # ----- Общие кодировщики -----
+
+    def _modrm(self, opcode: bytes, reg: int, rm: Operand, size: int, prefix: bytes = b'',
+               imm: bytes = b'', imm_fixup: Optional[Fixup] = None, rex_w: Optional[bool] = None,
+               reg_operand: Optional[Reg] = None) -> Encoding:
+        """
+        Инструкция вида [префиксы] [REX] opcode ModRM [SIB] [disp] [imm].
+
+        reg — значение поля reg (номер регистра или /digit), rm — регистр или память,
+        size — размер операнда (2 — префикс 66h, 8 — REX.W, если rex_w не задан явно).
+        """
+        rex = 0
+        if rex_w if rex_w is not None else size == 8:
+            rex |= 0x08
+        if reg & 8:
+            rex |= 0x04
+        force_rex = reg_operand is not None and reg_operand.name in _REX_BYTE_REGS
+        fixups = []
+        if isinstance(rm, Reg):
+            if rm.num & 8:
+                rex |= 0x01
+            force_rex = force_rex or rm.name in _REX_BYTE_REGS
+            address = bytes((0xc0 | (reg & 7) << 3 | (rm.num & 7),))
+            disp_fixup = None
+        elif isinstance(rm, Mem):
+            address, index_ext, base_ext, disp_fixup = self._address(reg, rm)
+            rex |= (0x02 if index_ext else 0) | (0x01 if base_ext else 0)
+        else:
+            raise AssemblerError("immediate cannot be used as an address")
+
+        head = (b'\x66' if size == 2 else b'') + prefix
+        if rex or force_rex:
+            head += bytes((0x40 | rex,))
+        head += opcode
+        data = head + address + imm
+        if disp_fixup is not None:
+            offset = len(head) + disp_fixup[0]
+            if disp_fixup[1] == REL32:
+                # [символ]: смещение считается от конца инструкции
+                addend = disp_fixup[3] - (len(data) - offset)
+            else:
+                addend = disp_fixup[3]
+            fixups.append(Fixup(offset, disp_fixup[1], disp_fixup[2], addend))
+        if imm_fixup is not None:
+            imm_fixup.offset = len(head) + len(address)
+            fixups.append(imm_fixup)
+        return Encoding(data, fixups)
+
+    def _address(self, reg: int, mem: Mem):
+        """ModRM/SIB/disp для операнда в памяти; возвращает (байты, REX.X, REX.B, поправка)."""
+        reg_bits = (reg & 7) << 3
+        base, index = mem.base, mem.index
+        if base is None and index is None:
+            if mem.symbol is not None:
+                # RIP-относительная адресация: mod=00, rm=101, disp32
+                return (bytes((reg_bits | 0x05,)) + b'\0\0\0\0', False, False,
+                        (1, REL32, mem.symbol, mem.disp))
+            # Абсолютный адрес: SIB без базы и индекса
+            return bytes((reg_bits | 0x04, 0x25)) + struct.pack('<i', mem.disp), False, False, None
+
+        if mem.symbol is not None:
+            # [reg + символ]: абсолютный 32-битный адрес символа в disp32
+            mod, disp = 0x80, b'\0\0\0\0'
+        elif mem.disp == 0 and (base is None or base.num & 7 != 5):
+            mod, disp = 0x00, b''
+        elif _fits_i8(mem.disp) and base is not None:
+            mod, disp = 0x40, struct.pack('<b', mem.disp)
+        elif _fits_i32(mem.disp):
+            mod, disp = 0x80, struct.pack('<i', mem.disp)
+        else:
+            raise AssemblerError("displacement out of range")
+
+        if index is None and base.num & 7 != 4:
+            address = bytes((mod | reg_bits | (base.num & 7),))
+        else:
+            scale_bits = {1: 0, 2: 1, 4: 2, 8: 3}[mem.scale]
+            index_bits = (index.num & 7) if index is not None else 4
+            if base is None:
+                # Только индекс: mod=00, base=101, всегда disp32
+                mod = 0x00
+                disp = disp if len(disp) == 4 else struct.pack('<i', mem.disp)
+                base_bits = 5
+            else:
+                base_bits = base.num & 7
+            address = bytes((mod | reg_bits | 0x04, scale_bits << 6 | index_bits << 3 | base_bits))
+        fixup = None
+        if mem.symbol is not None:
+            fixup = (len(address), ABS32S, mem.symbol, mem.disp)
+        return (address + disp, index is not None and index.num >= 8,
+                base is not None and base.num >= 8, fixup)
+
+    def _immediate(self, imm: Imm, size: int, kind: str = ABS32S) -> Tuple[bytes, Optional[Fixup]]:
+        """Непосредственное значение размера size (для 8-байтных операций — imm32)."""
+        width = min(size, 4)
+        if imm.symbol is not None:
+            if width != 4:
+                raise AssemblerError(f"symbol '{imm.symbol}' needs a 32-bit immediate")
+            return b'\0\0\0\0', Fixup(0, kind, imm.symbol, imm.value)
+        value = imm.value
+        if width == 1:
+            if not -128 <= value <= 255:
+                raise AssemblerError(f"immediate out of range: {value}")
+            return struct.pack('<B', value & 0xff), None
+        if width == 2:
+            if not -2**15 <= value < 2**16:
+                raise AssemblerError(f"immediate out of range: {value}")
+            return struct.pack('<H', value & 0xffff), None
+        if size == 8 and not _fits_i32(value):
+            raise AssemblerError(f"immediate out of range: {value}")
+        if not -2**31 <= value < 2**32:
+            raise AssemblerError(f"immediate out of range: {value}")
+        return struct.pack('<I', value & 0xffffffff), None
+
+    def _branch(self, opcode: bytes, target: Operand, mnemonic: str) -> Encoding:
+        if not isinstance(target, Imm) or target.symbol is None:
+            raise AssemblerError(f"{mnemonic} needs a label operand")
+        kind = BRANCH32 if mnemonic in ('call', 'jmp') else REL32
+        return Encoding(opcode + b'\0\0\0\0', [Fixup(len(opcode), kind, target.symbol, target.value - 4)])
+
+    # ----- Проверки -----
+
+    @staticmethod
+    def _expect(mnemonic: str, operands: List[Operand], count: int):
+        if len(operands) != count:
+            raise AssemblerError(f"invalid combination of opcode and operands: {mnemonic}")
+
+    @staticmethod
+    def _rm_size(mnemonic: str, rm: Operand, required: Optional[int] = None) -> int:
+        if isinstance(rm, Reg) and not rm.is_xmm:
+            size = rm.size
+        elif isinstance(rm, Mem) and rm.size is not None:
+            size = rm.size
+        elif isinstance(rm, Mem):
+            raise AssemblerError(f"operation size not specified: {mnemonic}")
+        else:
+            raise AssemblerError(f"invalid combination of opcode and operands: {mnemonic}")
+        if required is not None and size != required:
+            raise AssemblerError(f"invalid operand size for {mnemonic}")
+        return size
+
+    @staticmethod
+    def _reg_size(mnemonic: str, reg: Operand, other: Operand) -> int:
+        if not isinstance(reg, Reg) or reg.is_xmm:
+            raise AssemblerError(f"invalid combination of opcode and operands: {mnemonic}")
+        if isinstance(other, Reg) and other.size != reg.size:
+            raise AssemblerError(f"mismatch in operand sizes: {mnemonic}")
+        if isinstance(other, Mem) and other.size is not None and other.size != reg.size:
+            raise AssemblerError(f"mismatch in operand sizes: {mnemonic}")
+        return reg.size
+
+    @staticmethod
+    def _check_xmm(mnemonic: str, operand: Operand):
+        if not isinstance(operand, Reg) or not operand.is_xmm:
+            raise AssemblerError(f"invalid combination of opcode and operands: {mnemonic}")
+
+    def _xmm_rm(self, mnemonic: str, operand: Operand) -> Operand:
+        if isinstance(operand, Reg) and operand.is_xmm or isinstance(operand, Mem):
+            return operand
+        raise AssemblerError(f"invalid combination of opcode and operands: {mnemonic}")
+
+    # ----- Группы инструкций -----
+
+    def _alu(self, mnemonic: str, operands: List[Operand]) -> Encoding:
+        self._expect(mnemonic, operands, 2)
+        digit = _ALU[mnemonic]
+        dst, src = operands
+        if isinstance(src, Imm):
+            size = self._rm_size(mnemonic, dst)
+            if size == 1:
+                imm, fixup = self._immediate(src, 1)
+                return self._modrm(b'\x80', digit, dst, size, imm=imm, imm_fixup=fixup)
+            if src.symbol is None and _fits_i8(src.value):
+                return self._modrm(b'\x83', digit, dst, size, imm=struct.pack('<b', src.value))
+            imm, fixup = self._immediate(src, size)
+            return self._modrm(b'\x81', digit, dst, size, imm=imm, imm_fixup=fixup)
+        if isinstance(src, Reg) and not src.is_xmm:
+            size = self._reg_size(mnemonic, src, dst)
+            opcode = digit * 8 + (0 if size == 1 else 1)
+            return self._modrm(bytes((opcode,)), src.num, dst, size, reg_operand=src)
+        if isinstance(dst, Reg) and isinstance(src, Mem):
+            size = self._reg_size(mnemonic, dst, src)
+            opcode = digit * 8 + (2 if size == 1 else 3)
+            return self._modrm(bytes((opcode,)), dst.num, src, size, reg_operand=dst)
+        raise AssemblerError(f"invalid combination of opcode and operands: {mnemonic}")
+
+    def _shift(self, mnemonic: str, operands: List[Operand]) -> Encoding:
+        self._expect(mnemonic, operands, 2)
+        digit = _SHIFTS[mnemonic]
+        dst, count = operands
+        size = self._rm_size(mnemonic, dst)
+        byte = size == 1
+        if isinstance(count, Reg) and count.name == 'cl':
+            return self._modrm(b'\xd2' if byte else b'\xd3', digit, dst, size)
+        if isinstance(count, Imm) and count.symbol is None:
+            if count.value == 1:
+                return self._modrm(b'\xd0' if byte else b'\xd1', digit, dst, size)
+            return self._modrm(b'\xc0' if byte else b'\xc1', digit, dst, size,
+                               imm=struct.pack('<B', count.value & 0xff))
+        raise AssemblerError(f"invalid combination of opcode and operands: {mnemonic}")
+
+    def _sse_move(self, mnemonic: str, operands: List[Operand]) -> Encoding:
+        self._expect(mnemonic, operands, 2)
+        prefix, load, store = _SSE_MOVES[mnemonic]
+        dst, src = operands
+        if isinstance(dst, Reg) and dst.is_xmm:
+            return self._modrm(load, dst.num, self._xmm_rm(mnemonic, src), 4, prefix=prefix)
+        if isinstance(dst, Mem):
+            self._check_xmm(mnemonic, src)
+            return self._modrm(store, src.num, dst, 4, prefix=prefix)
+        raise AssemblerError(f"invalid combination of opcode and operands: {mnemonic}")
+
+    # ----- Отдельные инструкции -----
+
+    def _op_mov(self, mnemonic, operands):
+        self._expect(mnemonic, operands, 2)
+        dst, src = operands
+        if isinstance(src, Imm):
+            if isinstance(dst, Reg) and not dst.is_xmm:
+                size = dst.size
+                rex = (0x48 if size == 8 else 0x40 if dst.num >= 8 or dst.name in _REX_BYTE_REGS else 0) \
+                    | (0x01 if dst.num >= 8 else 0)
+                head = (b'\x66' if size == 2 else b'') + (bytes((rex,)) if rex else b'')
+                if size == 8:
+                    if src.symbol is None and not _fits_i32(src.value):
+                        # movabs r64, imm64
+                        return Encoding(head + bytes((0xb8 | dst.num & 7,)) +
+                                        struct.pack('<q', src.value), [])
+                    # mov r/m64, imm32 (знаковое расширение)
+                    return self._modrm(b'\xc7', 0, dst, 8, *self._imm_args(src, 8))
+                imm, fixup = self._immediate(src, size, ABS32)
+                opcode = bytes(((0xb0 if size == 1 else 0xb8) | dst.num & 7,))
+                fixups = []
+                if fixup is not None:
+                    fixup.offset = len(head) + 1
+                    fixups.append(fixup)
+                return Encoding(head + opcode + imm, fixups)
+            size = self._rm_size(mnemonic, dst)
+            return self._modrm(b'\xc6' if size == 1 else b'\xc7', 0, dst, size, *self._imm_args(src, size))
+        if isinstance(src, Reg) and not src.is_xmm:
+            size = self._reg_size(mnemonic, src, dst)
+            return self._modrm(b'\x88' if size == 1 else b'\x89', src.num, dst, size, reg_operand=src)
+        if isinstance(dst, Reg) and isinstance(src, Mem):
+            size = self._reg_size(mnemonic, dst, src)
+            return self._modrm(b'\x8a' if size == 1 else b'\x8b', dst.num, src, size, reg_operand=dst)
+        raise AssemblerError(f"invalid combination of opcode and operands: {mnemonic}")
+
+    def _imm_args(self, imm: Imm, size: int):
+        data, fixup = self._immediate(imm, size)
+        return b'', data, fixup
+
+    def _op_movzx(self, mnemonic, operands, signed=False):
+        self._expect(mnemonic, operands, 2)
+        dst, src = operands
+        if not isinstance(dst, Reg) or dst.is_xmm:
+            raise AssemblerError(f"invalid combination of opcode and operands: {mnemonic}")
+        src_size = self._rm_size(mnemonic, src)
+        if src_size not in (1, 2) or src_size >= dst.size:
+            raise AssemblerError(f"invalid operand size for {mnemonic}")
+        opcode = (0xbe if signed else 0xb6) + (src_size - 1)
+        return self._modrm(bytes((0x0f, opcode)), dst.num, src, dst.size)
+
+    def _op_movsx(self, mnemonic, operands):
+        return self._op_movzx(mnemonic, operands, signed=True)
+
+    def _op_movsxd(self, mnemonic, operands):
+        self._expect(mnemonic, operands, 2)
+        dst, src = operands
+        if not isinstance(dst, Reg) or dst.size != 8 or self._rm_size(mnemonic, src) != 4:
+            raise AssemblerError(f"invalid combination of opcode and operands: {mnemonic}")
+        return self._modrm(b'\x63', dst.num, src, 8)
+
+    def _op_lea(self, mnemonic, operands):
+        self._expect(mnemonic, operands, 2)
+        dst, src = operands
+        if not isinstance(dst, Reg) or dst.is_xmm or not isinstance(src, Mem):
+            raise AssemblerError(f"invalid combination of opcode and operands: {mnemonic}")
+        return self._modrm(b'\x8d', dst.num, src, dst.size)
+
+    def _op_test(self, mnemonic, operands):
+        self._expect(mnemonic, operands, 2)
+        dst, src = operands
+        if isinstance(dst, Reg) and isinstance(src, Mem):
+            dst, src = src, dst
+        if isinstance(src, Imm):
+            size = self._rm_size(mnemonic, dst)
+            return self._modrm(b'\xf6' if size == 1 else b'\xf7', 0, dst, size, *self._imm_args(src, size))
+        if isinstance(src, Reg) and not src.is_xmm:
+            size = self._reg_size(mnemonic, src, dst)
+            return self._modrm(b'\x84' if size == 1 else b'\x85', src.num, dst, size, reg_operand=src)
+        raise AssemblerError(f"invalid combination of opcode and operands: {mnemonic}")
+
+    def _op_imul(self, mnemonic, operands):
+        if len(operands) == 1:
+            size = self._rm_size(mnemonic, operands[0])
+            return self._modrm(b'\xf6' if size == 1 else b'\xf7', 5, operands[0], size)
+        if len(operands) == 2 and isinstance(operands[1], Imm):
+            # imul r, imm == imul r, r, imm
+            operands = [operands[0], operands[0], operands[1]]
+        if len(operands) == 2:
+            dst, src = operands
+            size = self._reg_size(mnemonic, dst, src)
+            return self._modrm(b'\x0f\xaf', dst.num, src, size)
+        self._expect(mnemonic, operands, 3)
+        dst, src, imm = operands
+        size = self._reg_size(mnemonic, dst, src)
+        if not isinstance(imm, Imm):
+            raise AssemblerError(f"invalid combination of opcode and operands: {mnemonic}")
+        if imm.symbol is None and _fits_i8(imm.value):
+            return self._modrm(b'\x6b', dst.num, src, size, imm=struct.pack('<b', imm.value))
+        return self._modrm(b'\x69', dst.num, src, size, *self._imm_args(imm, size))
+
+    def _op_inc(self, mnemonic, operands, digit=0):
+        self._expect(mnemonic, operands, 1)
+        size = self._rm_size(mnemonic, operands[0])
+        return self._modrm(b'\xfe' if size == 1 else b'\xff', digit, operands[0], size)
+
+    def _op_dec(self, mnemonic, operands):
+        return self._op_inc(mnemonic, operands, digit=1)
+
+    def _op_push(self, mnemonic, operands, base=0x50):
+        self._expect(mnemonic, operands, 1)
+        operand = operands[0]
+        if isinstance(operand, Reg) and operand.size == 8 and not operand.is_xmm:
+            rex = b'\x41' if operand.num >= 8 else b''
+            return Encoding(rex + bytes((base | operand.num & 7,)), [])
+        if base == 0x50 and isinstance(operand, Imm):
+            if operand.symbol is None and _fits_i8(operand.value):
+                return Encoding(b'\x6a' + struct.pack('<b', operand.value), [])
+            imm, fixup = self._immediate(operand, 8)
+            if fixup is not None:
+                fixup.offset = 1
+            return Encoding(b'\x68' + imm, [fixup] if fixup else [])
+        if isinstance(operand, Mem):
+            if base == 0x50:
+                return self._modrm(b'\xff', 6, operand, 8, rex_w=False)
+            return self._modrm(b'\x8f', 0, operand, 8, rex_w=False)
+        raise AssemblerError(f"invalid combination of opcode and operands: {mnemonic}")
+
+    def _op_pop(self, mnemonic, operands):
+        return self._op_push(mnemonic, operands, base=0x58)
+
+    def _op_jmp(self, mnemonic, operands, digit=4, opcode=b'\xe9'):
+        self._expect(mnemonic, operands, 1)
+        target = operands[0]
+        if isinstance(target, (Reg, Mem)):
+            if isinstance(target, Reg) and (target.size != 8 or target.is_xmm):
+                raise AssemblerError(f"invalid combination of opcode and operands: {mnemonic}")
+            return self._modrm(b'\xff', digit, target, 8, rex_w=False)
+        return self._branch(opcode, target, mnemonic)
+
+    def _op_call(self, mnemonic, operands):
+        return self._op_jmp(mnemonic, operands, digit=2, opcode=b'\xe8')
+
+    def _op_movd(self, mnemonic, operands, rex_w=False):
+        self._expect(mnemonic, operands, 2)
+        dst, src = operands
+        if isinstance(dst, Reg) and dst.is_xmm and not (isinstance(src, Reg) and src.is_xmm):
+            return self._modrm(b'\x0f\x6e', dst.num, src, 8 if rex_w else 4, prefix=b'\x66')
+        if isinstance(src, Reg) and src.is_xmm and not (isinstance(dst, Reg) and dst.is_xmm):
+            return self._modrm(b'\x0f\x7e', src.num, dst, 8 if rex_w else 4, prefix=b'\x66')
+        raise AssemblerError(f"invalid combination of opcode and operands: {mnemonic}")
+
+    def _op_movq(self, mnemonic, operands):
+        return self._op_movd(mnemonic, operands, rex_w=True)
+
+    def _op_cvtsi2ss(self, mnemonic, operands):
+        self._expect(mnemonic, operands, 2)
+        dst, src = operands
+        self._check_xmm(mnemonic, dst)
+        size = self._rm_size(mnemonic, src)
+        return self._modrm(b'\x0f\x2a', dst.num, src, size, prefix=b'\xf3')
+
+    def _op_cvttss2si(self, mnemonic, operands):
+        self._expect(mnemonic, operands, 2)
+        dst, src = operands
+        if not isinstance(dst, Reg) or dst.is_xmm:
+            raise AssemblerError(f"invalid combination of opcode and operands: {mnemonic}")
+        return self._modrm(b'\x0f\x2c', dst.num, self._xmm_rm(mnemonic, src), dst.size, prefix=b'\xf3')
+
+    def _op_pshufd(self, mnemonic, operands):
+        self._expect(mnemonic, operands, 3)
+        dst, src, order = operands
+        self._check_xmm(mnemonic, dst)
+        if not isinstance(order, Imm) or order.symbol is not None:
+            raise AssemblerError(f"invalid combination of opcode and operands: {mnemonic}")
+        return self._modrm(b'\x0f\x70', dst.num, self._xmm_rm(mnemonic, src), 4, prefix=b'\x66',
+                           imm=struct.pack('<B', order.value & 0xff))
+
+    def _op_shufps(self, mnemonic, operands):
+        self._expect(mnemonic, operands, 3)
+        dst, src, order = operands
+        self._check_xmm(mnemonic, dst)
+        if not isinstance(order, Imm) or order.symbol is not None:
+            raise AssemblerError(f"invalid combination of opcode and operands: {mnemonic}")
+        return self._modrm(b'\x0f\xc6', dst.num, self._xmm_rm(mnemonic, src), 4,
+                           imm=struct.pack('<B', order.value & 0xff))
@@ -9,13 +9,92 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from ir.ir_instructions import IROpcode, IROperandType
+from ir.ir_instructions import IROpcode, IROperandType, is_vector_type, used_temps
 from .stack_frame import StackFrame
+from .register_allocator import LinearScanAllocator
+from .peephole import AsmLine, PeepholeOptimizer, INVERSE_JCC
+
+
+# 32-битные имена регистров общего назначения из пула распределителя
+REG32 = {
+    'rbx': 'ebx', 'r10': 'r10d', 'r11': 'r11d', 'r12': 'r12d',
+    'r13': 'r13d', 'r14': 'r14d', 'r15': 'r15d',
+}
+
+GPR_NAMES = frozenset(REG32) | frozenset(REG32.values())
+
+CMP_OPCODES = (IROpcode.CMP_EQ, IROpcode.CMP_NE, IROpcode.CMP_LT,
+               IROpcode.CMP_LE, IROpcode.CMP_GT, IROpcode.CMP_GE)
+
+JUMP_OPCODES = (IROpcode.JUMP, IROpcode.JUMP_IF, IROpcode.JUMP_IF_NOT)
+
+# Регистры аргументов System V AMD64
+INT_ARG_REGS_64 = ('rdi', 'rsi', 'rdx', 'rcx', 'r8', 'r9')
+INT_ARG_REGS_32 = ('edi', 'esi', 'edx', 'ecx', 'r8d', 'r9d')
+FLOAT_ARG_REGS = ('xmm0', 'xmm1', 'xmm2', 'xmm3', 'xmm4', 'xmm5', 'xmm6', 'xmm7')
+
+# Функции с переменным числом аргументов: перед вызовом обнуляется AL
+VARIADIC_FUNCTIONS = frozenset(('printf', 'scanf', 'fprintf', 'sprintf'))
+
+SETCC = {
+    IROpcode.CMP_EQ: "sete",
+    IROpcode.CMP_NE: "setne",
+    IROpcode.CMP_LT: "setl",
+    IROpcode.CMP_LE: "setle",
+    IROpcode.CMP_GT: "setg",
+    IROpcode.CMP_GE: "setge",
+}
+
+# Условный переход сразу по флагам cmp (сравнение, слитое с JUMP_IF)
+JCC = {
+    IROpcode.CMP_EQ: "je",
+    IROpcode.CMP_NE: "jne",
+    IROpcode.CMP_LT: "jl",
+    IROpcode.CMP_LE: "jle",
+    IROpcode.CMP_GT: "jg",
+    IROpcode.CMP_GE: "jge",
+}
+
+BITWISE_MNEMONICS = {IROpcode.AND: "and", IROpcode.OR: "or", IROpcode.XOR: "xor"}
+
+# Векторная арифметика SSE2: (опкод, вещественные элементы) -> мнемоника.
+# Целого умножения по 32 бита в SSE2 нет (pmulld — SSE4.1), см. _vector_int_mul
+VECTOR_MNEMONICS = {
+    (IROpcode.ADD, False): "paddd", (IROpcode.SUB, False): "psubd",
+    (IROpcode.ADD, True): "addps", (IROpcode.SUB, True): "subps",
+    (IROpcode.MUL, True): "mulps", (IROpcode.DIV, True): "divps",
+}
+
+# Вещественные сравнения через ucomiss: (заголовок, операнды переставлены, условие).
+# Условия a/ae ложны для неупорядоченных операндов (NaN); e и ne
+# дополняются флагом чётности: == ложно при NaN, != истинно
+FLOAT_COMPARISONS = {
+    IROpcode.CMP_EQ: ("EQ", False, "e"),
+    IROpcode.CMP_NE: ("NE", False, "ne"),
+    IROpcode.CMP_LT: ("LT (swapped)", True, "a"),
+    IROpcode.CMP_LE: ("LE (swapped)", True, "ae"),
+    IROpcode.CMP_GT: ("GT", False, "a"),
+    IROpcode.CMP_GE: ("GE", False, "ae"),
+}
+
+# Флаги классификации типа операнда
+_FLOAT = 1
+_PTR = 2
+_VECTOR = 4
 
 
 class X86Generator:
-    def __init__(self, ir_program):
+    def __init__(self, ir_program, allocate_registers: bool = False, peephole: bool = False):
         self.ir_program = ir_program
+        self.allocate_registers = allocate_registers
+        # Peephole: тело функции собирается списком AsmLine и оптимизируется перед выводом
+        self.peephole = PeepholeOptimizer() if peephole else None
+        self.body = None
+        self.reg_map = {}
+        self.saved_registers = []
+        self.regalloc_stats = {"registers": 0, "spilled": 0}
+        self.fused_branches = 0
+        self.fused = {}
         self.output = []
         self.current_stack_frame = None
         self.current_function_name = None
@@ -25,8 +104,35 @@ class X86Generator:
         self.param_to_temp = {}
         self.pending_params = []
         self.float_compare_counter = 0
+        self.alloca_offsets = {}
         self.external_functions = set()
         self.emitted_globals = set()
+        self._type_classes = {}
+
+        # Таблица диспетчеризации: опкод -> обработчик (CALL, PARAM и ALLOCA
+        # обрабатываются в _generate_function)
+        self._handlers = {
+            IROpcode.MOVE: self._gen_move,
+            IROpcode.RETURN: self._gen_return,
+            IROpcode.JUMP: self._gen_jump,
+            IROpcode.JUMP_IF: self._gen_cond_jump,
+            IROpcode.JUMP_IF_NOT: self._gen_cond_jump,
+            IROpcode.ADD: self._gen_add_sub,
+            IROpcode.SUB: self._gen_add_sub,
+            IROpcode.MUL: self._gen_mul,
+            IROpcode.DIV: self._gen_div_mod,
+            IROpcode.MOD: self._gen_div_mod,
+            IROpcode.NEG: self._gen_unary,
+            IROpcode.NOT: self._gen_unary,
+            IROpcode.AND: self._gen_bitwise,
+            IROpcode.OR: self._gen_bitwise,
+            IROpcode.XOR: self._gen_bitwise,
+            IROpcode.LOAD: self._gen_load,
+            IROpcode.STORE: self._gen_store,
+            IROpcode.BROADCAST: self._gen_broadcast,
+        }
+        for opcode in CMP_OPCODES:
+            self._handlers[opcode] = self._gen_compare
 
     def generate(self) -> str:
         self.output = []
@@ -34,6 +140,7 @@ class X86Generator:
         self.string_literals = []
         self.external_functions = set()
         self.emitted_globals = set()
+        self._type_classes = {}
 
         self._collect_external_functions()
         self._generate_data_section()
@@ -50,19 +157,19 @@ class X86Generator:
         return "\n".join(self.output)
 
     def _collect_external_functions(self):
+        defined = {f.name for f in self.ir_program.functions}
         for func in self.ir_program.functions:
             for block in func.blocks:
                 for instr in block.instructions:
-                    if instr.opcode == IROpcode.CALL and len(instr.operands) >= 2:
+                    if instr.opcode is IROpcode.CALL and len(instr.operands) >= 2:
                         callee = instr.operands[1]
-                        if callee.operand_type == IROperandType.LITERAL:
+                        if callee.operand_type is IROperandType.LITERAL:
                             callee_name = str(callee.value)
-                            is_defined = any(f.name == callee_name for f in self.ir_program.functions)
-                            if not is_defined:
+                            if callee_name not in defined:
                                 self.external_functions.add(callee_name)
 
     def _generate_extern_declarations(self):
-        for func in self.external_functions:
+        for func in sorted(self.external_functions):
             self.output.append(f"extern {func}")
         if self.external_functions:
             self.output.append("")
@@ -146,26 +253,35 @@ class X86Generator:
             return "''"
         return ", ".join(result)
 
-    def _is_float_type(self, operand) -> bool:
-        if hasattr(operand, 'ir_type') and operand.ir_type:
-            type_name = operand.ir_type.name if hasattr(operand.ir_type, 'name') else ''
-            return type_name == 'float'
-        return False
+    def _type_class(self, operand) -> int:
+        """Флаги типа операнда (_FLOAT, _PTR, _VECTOR); результат кэшируется по объекту типа."""
+        ir_type = getattr(operand, 'ir_type', None)
+        if not ir_type:
+            return 0
+        cached = self._type_classes.get(id(ir_type))
+        if cached is not None:
+            return cached[1]
+        flags = 0
+        name = ir_type.name if hasattr(ir_type, 'name') else ''
+        if name == 'float':
+            flags |= _FLOAT
+        if getattr(ir_type, 'is_array', False) or getattr(ir_type, 'is_struct', False) \
+                or name.startswith('ptr'):
+            flags |= _PTR
+        if is_vector_type(ir_type):
+            flags |= _VECTOR
+        # Сам тип храним в кэше, чтобы его id не был переиспользован
+        self._type_classes[id(ir_type)] = (ir_type, flags)
+        return flags
 
-    def _is_float_op_str(self, op_str: str) -> bool:
-        return 'LC' in op_str or 'LC' in str(op_str)
+    def _is_float_type(self, operand) -> bool:
+        return bool(self._type_class(operand) & _FLOAT)
 
     def _is_ptr_type(self, operand) -> bool:
-        if hasattr(operand, 'ir_type') and operand.ir_type:
-            if hasattr(operand.ir_type, 'is_array') and operand.ir_type.is_array:
-                return True
-            if hasattr(operand.ir_type, 'is_struct') and operand.ir_type.is_struct:
-                return True
-            if hasattr(operand.ir_type, 'name'):
-                name = operand.ir_type.name
-                if name == 'ptr' or name.startswith('ptr'):
-                    return True
-        return False
+        return bool(self._type_class(operand) & _PTR)
+
+    def _is_vector_type(self, operand) -> bool:
+        return bool(self._type_class(operand) & _VECTOR)
 
     def _make_label(self, label: str) -> str:
         # Строковые и float метки не префиксуем
@@ -183,32 +299,50 @@ class X86Generator:
         self.pending_params = []
         self.float_compare_counter = 0
 
+        param_names = {param.value for param in func.parameters}
+        self.fused = self._fusible_compares(func)
+        fused_temps = {cmp_instr.operands[0].value for cmp_instr in self.fused.values()}
+
         # Выводим блоки в правильном порядке: entry, потом в порядке следования в IR
         blocks_in_order = self._order_blocks(func)
         for block in blocks_in_order:
             for instr in block.instructions:
-                if instr.opcode == IROpcode.MOVE and len(instr.operands) >= 2:
+                if instr.opcode is IROpcode.MOVE and len(instr.operands) >= 2:
                     dest = instr.operands[0]
                     src = instr.operands[1]
-                    if src.operand_type == IROperandType.VARIABLE:
-                        for param in func.parameters:
-                            if param.value == src.value:
-                                self.param_to_temp[param.value] = dest.value
-                                break
+                    if src.operand_type is IROperandType.VARIABLE and src.value in param_names:
+                        self.param_to_temp[src.value] = dest.value
+
+        self.reg_map = {}
+        self.saved_registers = []
+        if self.allocate_registers:
+            allocator = LinearScanAllocator(self._operand_is_float, aliases=self.param_to_temp)
+            self.reg_map = allocator.allocate(func, blocks_in_order,
+                                              pinned=set(self.param_to_temp.values()))
+            self.regalloc_stats["registers"] += allocator.stats["registers"]
+            self.regalloc_stats["spilled"] += allocator.stats["spilled"]
 
         temps_in_func = {}
         for block in func.blocks:
             for instr in block.instructions:
                 for op in instr.operands:
-                    if op.operand_type == IROperandType.TEMPORARY:
-                        if self._is_ptr_type(op):
-                            size = 8
-                        else:
-                            size = 4
-                        temps_in_func[op.value] = max(temps_in_func.get(op.value, 4), size)
+                    if op.operand_type is IROperandType.TEMPORARY and op.value not in fused_temps:
+                        flags = self._type_class(op)
+                        size = 16 if flags & _VECTOR else 8 if flags & _PTR else 4
+                        if size > temps_in_func.get(op.value, 0):
+                            temps_in_func[op.value] = size
 
+        # Стековый слот нужен только временным, не получившим регистр
         for temp_name, size in temps_in_func.items():
-            self.current_stack_frame.allocate(temp_name, size)
+            if temp_name not in self.reg_map:
+                self.current_stack_frame.allocate(temp_name, size)
+
+        # Используемые callee-saved регистры сохраняем в слотах фрейма
+        used_registers = set(self.reg_map.values())
+        for reg in LinearScanAllocator.INT_CALLEE_SAVED:
+            if reg in used_registers:
+                self.saved_registers.append(reg)
+                self.current_stack_frame.allocate(f"__saved_{reg}", 8)
 
         for name, var_type in func.local_vars.items():
             if hasattr(var_type, 'is_struct') and var_type.is_struct:
@@ -224,13 +358,18 @@ class X86Generator:
                 size = type_sizes.get(var_type.name, 4)
             self.current_stack_frame.allocate(name, size)
 
+        # ALLOCA (массивы и структуры): у каждой инструкции своя область кадра
+        self.alloca_offsets = {}
+        for block in func.blocks:
+            for instr in block.instructions:
+                if instr.opcode is IROpcode.ALLOCA and len(instr.operands) >= 2:
+                    size = (instr.operands[1].value + 15) & ~15
+                    self.alloca_offsets[id(instr)] = self.current_stack_frame.allocate(
+                        f"__alloca_{len(self.alloca_offsets)}", size, align=16)
+
         for param in func.parameters:
             param_name = param.value if hasattr(param, 'value') else str(param)
             param_size = 4
-            if hasattr(param, 'ir_type') and param.ir_type:
-                type_name = param.ir_type.name if hasattr(param.ir_type, 'name') else 'int'
-                if type_name == 'float':
-                    param_size = 4
 
             if param_name in self.param_to_temp:
                 temp_name = self.param_to_temp[param_name]
@@ -245,6 +384,8 @@ class X86Generator:
             self.emitted_globals.add(func.name)
 
         self.output.append(f"{func.name}:")
+        if self.peephole is not None:
+            self.body = []
         self._emit("push rbp")
         self._emit("mov rbp, rsp")
 
@@ -252,150 +393,165 @@ class X86Generator:
         if total_size > 0:
             self._emit(f"sub rsp, {total_size}")
 
+        for reg in self.saved_registers:
+            offset = self.current_stack_frame.get_offset(f"__saved_{reg}")
+            self._emit(f"mov qword [rbp{offset}], {reg}")
+
         self._save_parameters(func)
 
+        handlers = self._handlers
         for block in func.blocks:
             unique_label = self._make_label(block.label)
             if unique_label not in self.emitted_labels:
                 self.emitted_labels.add(unique_label)
-                self.output.append(f"{unique_label}:")
+                self._emit(f"{unique_label}:", indent=False)
 
             for instr in block.instructions:
-                if instr.opcode == IROpcode.ALLOCA:
+                opcode = instr.opcode
+                ops = instr.operands
+
+                if opcode is IROpcode.ALLOCA:
                     self._translate_alloca(instr, func)
                     continue
 
-                if instr.opcode == IROpcode.MOVE and len(instr.operands) >= 2:
-                    src = instr.operands[1]
-                    if src.operand_type == IROperandType.VARIABLE:
-                        is_param = any(p.value == src.value for p in func.parameters)
-                        if is_param:
-                            continue
+                # Сравнение, слитое со следующим переходом, выводит _gen_cond_jump
+                if opcode in CMP_OPCODES and ops[0].value in fused_temps:
+                    continue
+
+                if opcode is IROpcode.MOVE and len(ops) >= 2:
+                    src = ops[1]
+                    if src.operand_type is IROperandType.VARIABLE and src.value in param_names:
+                        continue
 
-                if instr.opcode == IROpcode.PARAM:
+                if opcode is IROpcode.PARAM:
                     self.pending_params.append(instr)
                     continue
 
-                if instr.opcode == IROpcode.CALL:
+                if opcode is IROpcode.CALL:
                     for param_instr in self.pending_params:
-                        asm = self._translate_instruction(param_instr, func)
-                        if asm:
-                            for line in asm.split('\n'):
-                                line = line.strip()
-                                if line:
-                                    self._emit(line)
+                        self._gen_param(param_instr, param_instr.operands, func)
                     self.pending_params = []
-
-                    asm = self._translate_instruction(instr, func)
-                    if asm:
-                        for line in asm.split('\n'):
-                            line = line.strip()
-                            if line:
-                                self._emit(line)
-
-                    if len(instr.operands) > 0:
-                        dest = instr.operands[0]
-                        if dest.operand_type == IROperandType.TEMPORARY:
-                            dest_str = self._op(dest)
-                            is_float = self._is_float_type(dest)
-                            is_ptr = self._is_ptr_type(dest)
-                            if is_float:
-                                self._emit(f"movss {dest_str}, xmm0")
-                            elif is_ptr:
-                                self._emit(f"mov qword {dest_str}, rax")
-                            else:
-                                self._emit(f"mov dword {dest_str}, eax")
+                    self._gen_call(instr, ops, func)
                     continue
 
-                asm = self._translate_instruction(instr, func)
-                if asm:
-                    for line in asm.split('\n'):
-                        line = line.strip()
-                        if line:
-                            self._emit(line)
+                handlers.get(opcode, self._gen_unknown)(instr, ops, func)
 
         return_label = self._make_label(f"{func.name}_return")
         if return_label not in self.emitted_labels:
             self.emitted_labels.add(return_label)
-            self.output.append(f"{return_label}:")
+            self._emit(f"{return_label}:", indent=False)
+        for reg in self.saved_registers:
+            offset = self.current_stack_frame.get_offset(f"__saved_{reg}")
+            self._emit(f"mov {reg}, qword [rbp{offset}]")
         self._emit("mov rsp, rbp")
         self._emit("pop rbp")
         self._emit("ret")
+        if self.body is not None:
+            self.output.extend(line.render() for line in self.peephole.optimize(self.body))
+            self.body = None
         self.output.append("")
 
 
-    def _translate_alloca(self, instr, func):
-        """ALLOCA для структур (стек)."""
-        ops = instr.operands
-        if len(ops) >= 2:
-            dest = ops[0]
-            size = ops[1].value
-            aligned_size = (size + 15) & ~15
-            self._emit(f"sub rsp, {aligned_size}")
-
-            dest_name = dest.value
-            offset = self.current_stack_frame.get_offset(dest_name)
-            if offset is None:
-                offset = self.current_stack_frame.allocate(dest_name, 8)
+    def _fusible_compares(self, func):
+        """
+        Переходы JUMP_IF/JUMP_IF_NOT, сливаемые с CMP_* прямо перед ними:
+        id перехода -> сравнение. Результат сравнения не должен читать никто,
+        кроме этого перехода, — тогда 0/1 не материализуется.
+        """
+        uses = {}
+        candidates = {}
+        for block in func.blocks:
+            previous = None
+            for instr in block.instructions:
+                for name in used_temps(instr):
+                    uses[name] = uses.get(name, 0) + 1
+                if (instr.opcode is IROpcode.JUMP_IF or instr.opcode is IROpcode.JUMP_IF_NOT) \
+                        and previous is not None and previous.opcode in CMP_OPCODES \
+                        and len(previous.operands) == 3 and len(instr.operands) == 2:
+                    dest = previous.operands[0]
+                    cond = instr.operands[0]
+                    if dest.operand_type is IROperandType.TEMPORARY \
+                            and cond.operand_type is IROperandType.TEMPORARY and cond.value == dest.value:
+                        candidates[id(instr)] = previous
+                previous = instr
+        return {key: cmp_instr for key, cmp_instr in candidates.items()
+                if uses.get(cmp_instr.operands[0].value) == 1}
 
-            self._emit(f"mov qword [rbp{offset}], rsp")
+    def _translate_alloca(self, instr, func):
+        """ALLOCA: адрес области, выделенной в кадре функции."""
+        offset = self.alloca_offsets.get(id(instr))
+        if offset is None:
+            return
+        dest = self._sized(instr.operands[0], 'qword')
+        if self._is_mem(dest):
+            self._emit(f"lea rax, [rbp{offset}]")
+            self._emit(f"mov {dest}, rax")
+        else:
+            self._emit(f"lea {dest}, [rbp{offset}]")
 
     def _order_blocks(self, func):
-        """Упорядочивает блоки для корректного вывода: entry первым, затем по связям."""
+        """Упорядочивает блоки для корректного вывода: entry первым, затем DFS по рёбрам CFG."""
         blocks = list(func.blocks)
         if not blocks:
             return blocks
 
-        # Начинаем с entry блока
-        ordered = []
-        visited = set()
-
-        # Находим entry блок
-        entry = func.entry_block if hasattr(func, 'entry_block') else blocks[0]
-
-        def dfs(block):
-            if block.label in visited:
-                return
-            visited.add(block.label)
-            ordered.append(block)
-
-            # Ищем, куда ведут переходы из этого блока
-            for instr in block.instructions:
-                if instr.opcode in (IROpcode.JUMP, IROpcode.JUMP_IF, IROpcode.JUMP_IF_NOT):
-                    for op in instr.operands:
-                        if op.operand_type == IROperandType.LABEL:
-                            target_label = op.value
-                            # Ищем блок с такой меткой
-                            for b in blocks:
-                                if b.label == target_label and b.label not in visited:
-                                    dfs(b)
-                                    break
-
-        dfs(entry)
+        entry = func.entry_block if getattr(func, 'entry_block', None) in blocks else blocks[0]
+
+        # Итеративный DFS в прямом порядке (тысячи блоков не упираются в лимит рекурсии)
+        ordered = [entry]
+        visited = {entry}
+        stack = [iter(entry.successors)]
+        while stack:
+            for succ in stack[-1]:
+                if succ not in visited:
+                    visited.add(succ)
+                    ordered.append(succ)
+                    stack.append(iter(succ.successors))
+                    break
+            else:
+                stack.pop()
 
         # Добавляем оставшиеся блоки (если есть недостижимые)
-        for block in blocks:
-            if block.label not in visited:
-                ordered.append(block)
+        if len(ordered) < len(blocks):
+            ordered.extend(b for b in blocks if b not in visited)
 
         return ordered
 
     def _save_parameters(self, func):
-        int_regs_64 = ['rdi', 'rsi', 'rdx', 'rcx', 'r8', 'r9']
-        int_regs_32 = ['edi', 'esi', 'edx', 'ecx', 'r8d', 'r9d']
-        float_regs = ['xmm0', 'xmm1', 'xmm2', 'xmm3', 'xmm4', 'xmm5', 'xmm6', 'xmm7']
+        int_regs_64 = INT_ARG_REGS_64
+        int_regs_32 = INT_ARG_REGS_32
+        float_regs = FLOAT_ARG_REGS
         int_idx = 0
         float_idx = 0
 
         for param in func.parameters:
             param_name = param.value if hasattr(param, 'value') else str(param)
+            is_float = self._is_float_type(param)
+            is_ptr = self._is_ptr_type(param)
+
+            reg = self._reg_of(param)
+            if reg:
+                # Параметр живёт в регистре, выделенном его временной
+                if is_float and float_idx < len(float_regs):
+                    if reg.startswith('xmm'):
+                        self._emit(f"movss {reg}, {float_regs[float_idx]}")
+                    else:
+                        self._emit(f"movd {REG32[reg]}, {float_regs[float_idx]}")
+                    float_idx += 1
+                elif not is_float and int_idx < len(int_regs_64):
+                    if reg.startswith('xmm'):
+                        self._emit(f"movd {reg}, {int_regs_32[int_idx]}")
+                    elif is_ptr:
+                        self._emit(f"mov {reg}, {int_regs_64[int_idx]}")
+                    else:
+                        self._emit(f"mov {REG32[reg]}, {int_regs_32[int_idx]}")
+                    int_idx += 1
+                continue
+
             offset = self.current_stack_frame.get_offset(param_name)
             if offset is None:
                 continue
 
-            is_float = self._is_float_type(param)
-            is_ptr = self._is_ptr_type(param)
-
             if is_float and float_idx < len(float_regs):
                 self._emit(f"movss dword [rbp{offset}], {float_regs[float_idx]}")
                 float_idx += 1
@@ -406,381 +562,556 @@ class X86Generator:
                 self._emit(f"mov dword [rbp{offset}], {int_regs_32[int_idx]}")
                 int_idx += 1
 
-    def _translate_instruction(self, instr, func):
+    def _operand_is_float(self, instr, index) -> bool:
+        """Используется ли операнд instr.operands[index] в вещественном контексте."""
         opcode = instr.opcode
         ops = instr.operands
+        if index >= len(ops):
+            return False
+        # Векторы живут в xmm-регистрах целиком
+        if self._is_vector_type(ops[index]):
+            return True
+
+        if opcode is IROpcode.BROADCAST:
+            return self._is_float_type(ops[1]) or self._is_float_literal(ops[1])
+        if opcode is IROpcode.MOVE:
+            return len(ops) >= 2 and (self._is_float_type(ops[0]) or self._is_float_type(ops[1])
+                                      or self._is_float_literal(ops[1]))
+        if opcode in (IROpcode.ADD, IROpcode.SUB, IROpcode.DIV, IROpcode.NEG):
+            return self._is_float_type(ops[0])
+        if opcode is IROpcode.MUL:
+            return self._is_float_type(ops[0]) or any(self._is_float_literal(op) for op in ops[1:])
+        if opcode in CMP_OPCODES:
+            return index > 0 and self._is_float_comparison(instr)
+        if opcode is IROpcode.LOAD:
+            return index == 0 and self._is_float_type(ops[0])
+        if opcode is IROpcode.STORE:
+            return index == 1 and self._is_float_type(ops[1])
+        if opcode is IROpcode.PARAM:
+            return index == 1 and (self._is_float_type(ops[1]) or self._is_float_literal(ops[1]))
+        if opcode is IROpcode.RETURN:
+            return self._is_float_type(ops[0])
+        if opcode is IROpcode.CALL:
+            return index == 0 and self._is_float_type(ops[0])
+        return False
 
-        is_float_compare = getattr(instr, 'is_float_comparison', False)
-        is_float = self._is_float_type(ops[0]) if ops else False
-
-        if opcode == IROpcode.ALLOCA:
-            return None
-
-        elif opcode == IROpcode.MOVE:
-            if len(ops) < 2:
-                return None
-            dest = self._op(ops[0])
-            src = self._op(ops[1])
+    def _is_float_comparison(self, instr) -> bool:
+        ops = instr.operands
+        return (instr.is_float_comparison
+                or (len(ops) > 2 and (self._is_float_type(ops[1]) or self._is_float_type(ops[2]))))
+
+    # ============= Трансляция инструкций =============
+    #
+    # Обработчик на каждый опкод: _gen_<opcode>(instr, ops, func).
+    # Обработчики пишут строки сразу в self.output через _emit.
+
+    def _gen_move(self, instr, ops, func):
+        if len(ops) < 2:
+            return
+
+        if self._is_vector_type(ops[0]):
+            dest = self._vector_operand(ops[0])
+            reg = dest if self._is_xmm(dest) else 'xmm0'
+            self._vector_to_reg(reg, ops[1])
+            self._vector_result(ops[0], reg)
+            return
+
+        if self._operand_is_float(instr, 0):
+            dest = self._fsized(ops[0])
+            src = self._fsized(ops[1])
             if dest == src:
-                return None
-
-            is_float_move = self._is_float_type(ops[0]) or self._is_float_type(ops[1]) or self._is_float_op_str(src)
-            is_ptr_move = self._is_ptr_type(ops[0]) or self._is_ptr_type(ops[1])
-
-            if is_float_move:
-                return f"movss xmm0, {src}\n    movss {dest}, xmm0"
-            elif is_ptr_move:
-                return f"mov rax, qword {src}\n    mov qword {dest}, rax"
+                return
+            if self._is_xmm(dest) or self._is_xmm(src):
+                self._emit(f"movss {dest}, {src}")
             else:
-                return f"mov eax, dword {src}\n    mov dword {dest}, eax"
-
-        elif opcode == IROpcode.RETURN:
-            if ops:
-                ret_val = self._op(ops[0])
-                ret_label = self._make_label(f"{func.name}_return")
-                if self._is_float_type(ops[0]):
-                    return f"movss xmm0, {ret_val}\n    jmp {ret_label}"
-                return f"mov eax, dword {ret_val}\n    jmp {ret_label}"
+                self._emit(f"movss xmm0, {src}")
+                self._emit(f"movss {dest}, xmm0")
+            return
+
+        width = 'qword' if (self._type_class(ops[0]) | self._type_class(ops[1])) & _PTR else 'dword'
+        dest = self._sized(ops[0], width)
+        src = self._sized(ops[1], width)
+        if dest == src:
+            return
+        if not (self._is_mem(dest) and self._is_mem(src)):
+            self._emit(f"mov {dest}, {src}")
+            return
+        scratch = 'rax' if width == 'qword' else 'eax'
+        self._emit(f"mov {scratch}, {src}")
+        self._emit(f"mov {dest}, {scratch}")
+
+    def _gen_return(self, instr, ops, func):
+        ret_label = self._make_label(f"{func.name}_return")
+        if ops:
+            if self._is_float_type(ops[0]):
+                self._emit(f"movss xmm0, {self._fsized(ops[0])}")
             else:
-                ret_label = self._make_label(f"{func.name}_return")
-                return f"xor eax, eax\n    jmp {ret_label}"
+                self._emit(f"mov eax, {self._sized(ops[0])}")
+        else:
+            self._emit("xor eax, eax")
+        self._emit(f"jmp {ret_label}")
 
-        elif opcode == IROpcode.CALL:
-            if len(ops) < 2:
-                return None
+    def _gen_call(self, instr, ops, func):
+        if len(ops) >= 2:
             callee = ops[1].value
             # Для variadic-функций обнуляем AL (количество XMM-регистров)
-            if callee in ('printf', 'scanf', 'fprintf', 'sprintf') or callee in self.external_functions:
-                return f"xor eax, eax\n    call {callee}"
-            return f"call {callee}"
-
-        elif opcode == IROpcode.PARAM:
-            if len(ops) < 2:
-                return None
-            idx = ops[0].value
-            if isinstance(idx, int):
-                val = self._op(ops[1])
-                is_float_param = self._is_float_type(ops[1]) or self._is_float_op_str(val)
-                is_ptr_param = self._is_ptr_type(ops[1])
-                if is_float_param:
-                    float_regs = ['xmm0', 'xmm1', 'xmm2', 'xmm3', 'xmm4', 'xmm5', 'xmm6', 'xmm7']
-                    if idx < len(float_regs):
-                        return f"movss {float_regs[idx]}, {val}"
-                elif is_ptr_param:
-                    int_regs = ['rdi', 'rsi', 'rdx', 'rcx', 'r8', 'r9']
-                    if idx < len(int_regs):
-                        return f"mov {int_regs[idx]}, {val}"
-                else:
-                    int_regs = ['edi', 'esi', 'edx', 'ecx', 'r8d', 'r9d']
-                    if idx < len(int_regs):
-                        return f"mov {int_regs[idx]}, {val}"
-            return None
-
-        elif opcode == IROpcode.JUMP:
-            target = self._make_label(ops[0].value)
-            return f"jmp {target}"
-
-        elif opcode == IROpcode.JUMP_IF:
-            cond = self._op(ops[0])
-            target = self._make_label(ops[1].value)
-            return f"cmp dword {cond}, 0\n    jne {target}"
-
-        elif opcode == IROpcode.JUMP_IF_NOT:
-            cond = self._op(ops[0])
-            target = self._make_label(ops[1].value)
-            return f"cmp dword {cond}, 0\n    je {target}"
-
-        elif opcode in [IROpcode.CMP_EQ, IROpcode.CMP_NE, IROpcode.CMP_LT,
-                        IROpcode.CMP_LE, IROpcode.CMP_GT, IROpcode.CMP_GE]:
-
-            dest = self._op(ops[0])
-            left = self._op(ops[1])
-            right = self._op(ops[2])
-
-            if is_float_compare or self._is_float_type(ops[1]) or self._is_float_type(ops[2]):
-                return self._translate_float_comparison(opcode, dest, left, right)
-
-            setcc_map = {
-                IROpcode.CMP_EQ: "sete",
-                IROpcode.CMP_NE: "setne",
-                IROpcode.CMP_LT: "setl",
-                IROpcode.CMP_LE: "setle",
-                IROpcode.CMP_GT: "setg",
-                IROpcode.CMP_GE: "setge"
-            }
-            return f"mov eax, dword {left}\n    cmp eax, dword {right}\n    {setcc_map[opcode]} al\n    movzx eax, al\n    mov dword {dest}, eax"
-
-        elif opcode == IROpcode.ADD:
-            dest = self._op(ops[0])
-            src1 = self._op(ops[1])
-            src2 = self._op(ops[2])
-            if is_float:
-                if dest == src1:
-                    return f"addss {dest}, {src2}"
-                return f"movss xmm0, {src1}\n    addss xmm0, {src2}\n    movss {dest}, xmm0"
+            if callee in VARIADIC_FUNCTIONS or callee in self.external_functions:
+                self._emit("xor eax, eax")
+            self._emit(f"call {callee}")
+
+        # Результат вызова: xmm0 или rax/eax
+        if not ops:
+            return
+        dest = ops[0]
+        if dest.operand_type is IROperandType.TEMPORARY:
+            flags = self._type_class(dest)
+            if flags & _FLOAT:
+                self._emit(f"movss {self._fsized(dest)}, xmm0")
+            elif flags & _PTR:
+                self._emit(f"mov {self._sized(dest, 'qword')}, rax")
             else:
-                is_ptr = self._is_ptr_type(ops[1])
-                if is_ptr:
-                    if ops[2].operand_type == IROperandType.LITERAL:
-                        return f"mov rax, qword {src1}\n    add rax, {src2}\n    mov qword {dest}, rax"
-                    else:
-                        return f"mov rax, qword {src1}\n    movsxd rdx, dword {src2}\n    add rax, rdx\n    mov qword {dest}, rax"
-                else:
-                    if dest == src1:
-                        return f"add dword {dest}, {src2}"
-                    return f"mov eax, dword {src1}\n    add eax, dword {src2}\n    mov dword {dest}, eax"
-
-        elif opcode == IROpcode.SUB:
-            dest = self._op(ops[0])
-            src1 = self._op(ops[1])
-            src2 = self._op(ops[2])
-            if is_float:
-                if dest == src1:
-                    return f"subss {dest}, {src2}"
-                return f"movss xmm0, {src1}\n    subss xmm0, {src2}\n    movss {dest}, xmm0"
-            else:
-                if dest == src1:
-                    return f"sub dword {dest}, {src2}"
-                return f"mov eax, dword {src1}\n    sub eax, dword {src2}\n    mov dword {dest}, eax"
-
-        elif opcode == IROpcode.MUL:
-            dest = self._op(ops[0])
-            src1 = self._op(ops[1])
-            src2 = self._op(ops[2])
-            if is_float or self._is_float_op_str(src1) or self._is_float_op_str(src2):
-                if dest == src1:
-                    return f"mulss {dest}, {src2}"
-                return f"movss xmm0, {src1}\n    mulss xmm0, {src2}\n    movss {dest}, xmm0"
-            else:
-                if dest == src1:
-                    return f"imul dword {dest}, {src2}"
-                return f"mov eax, dword {src1}\n    imul eax, dword {src2}\n    mov dword {dest}, eax"
-
-        elif opcode == IROpcode.DIV:
-            dest = self._op(ops[0])
-            left = self._op(ops[1])
-            right = self._op(ops[2])
-            if is_float:
-                if dest == left:
-                    return f"divss {dest}, {right}"
-                return f"movss xmm0, {left}\n    divss xmm0, {right}\n    movss {dest}, xmm0"
-            else:
-                if ops[2].operand_type == IROperandType.LITERAL:
-                    return f"mov eax, dword {left}\n    cdq\n    mov ecx, {right}\n    idiv ecx\n    mov dword {dest}, eax"
-                return f"mov eax, dword {left}\n    cdq\n    idiv dword {right}\n    mov dword {dest}, eax"
-
-        elif opcode == IROpcode.MOD:
-            dest = self._op(ops[0])
-            left = self._op(ops[1])
-            right = self._op(ops[2])
-            # Если right - литерал, загружаем в регистр
-            if ops[2].operand_type == IROperandType.LITERAL:
-                return f"mov eax, dword {left}\n    cdq\n    mov ecx, {right}\n    idiv ecx\n    mov dword {dest}, edx"
-            return f"mov eax, dword {left}\n    cdq\n    idiv dword {right}\n    mov dword {dest}, edx"
-
-        elif opcode == IROpcode.NEG:
-            dest = self._op(ops[0])
-            src = self._op(ops[1])
-            if is_float:
-                return f"movss xmm0, {src}\n    xorps xmm0, xmm0\n    subss xmm0, {src}\n    movss {dest}, xmm0"
-            if dest == src:
-                return f"neg dword {dest}"
-            return f"mov eax, dword {src}\n    neg eax\n    mov dword {dest}, eax"
+                self._emit(f"mov {self._sized(dest)}, eax")
+
+    def _gen_param(self, instr, ops, func):
+        if len(ops) < 2:
+            return
+        idx = ops[0].value
+        if not isinstance(idx, int):
+            return
+        if self._operand_is_float(instr, 1):
+            if idx < len(FLOAT_ARG_REGS):
+                self._emit(f"movss {FLOAT_ARG_REGS[idx]}, {self._fsized(ops[1])}")
+        elif self._is_ptr_type(ops[1]):
+            if idx < len(INT_ARG_REGS_64):
+                self._emit(f"mov {INT_ARG_REGS_64[idx]}, {self._sized(ops[1], 'qword')}")
+        elif idx < len(INT_ARG_REGS_32):
+            self._emit(f"mov {INT_ARG_REGS_32[idx]}, {self._sized(ops[1])}")
+
+    def _gen_jump(self, instr, ops, func):
+        self._emit(f"jmp {self._make_label(ops[0].value)}")
+
+    def _gen_cond_jump(self, instr, ops, func):
+        target = self._make_label(ops[1].value)
+        jump_on_true = instr.opcode is IROpcode.JUMP_IF
+        compare = self.fused.get(id(instr))
+        if compare is not None:
+            self._gen_compare_branch(compare, target, jump_on_true)
+            return
+        if ops[0].operand_type is IROperandType.LITERAL:
+            # Условие известно на этапе компиляции
+            if bool(ops[0].value) == jump_on_true:
+                self._emit(f"jmp {target}")
+            return
+        cond = self._sized(ops[0])
+        jcc = "jne" if jump_on_true else "je"
+        if self._is_mem(cond):
+            self._emit(f"cmp {cond}, 0")
+        else:
+            self._emit(f"test {cond}, {cond}")
+        self._emit(f"{jcc} {target}")
 
-        elif opcode == IROpcode.NOT:
-            dest = self._op(ops[0])
-            src = self._op(ops[1])
-            if dest == src:
-                return f"not dword {dest}"
-            return f"mov eax, dword {src}\n    not eax\n    mov dword {dest}, eax"
-
-        elif opcode == IROpcode.AND:
-            dest = self._op(ops[0])
-            src1 = self._op(ops[1])
-            src2 = self._op(ops[2])
-            if dest == src1:
-                return f"and dword {dest}, {src2}"
-            return f"mov eax, dword {src1}\n    and eax, dword {src2}\n    mov dword {dest}, eax"
-
-        elif opcode == IROpcode.OR:
-            dest = self._op(ops[0])
-            src1 = self._op(ops[1])
-            src2 = self._op(ops[2])
-            if dest == src1:
-                return f"or dword {dest}, {src2}"
-            return f"mov eax, dword {src1}\n    or eax, dword {src2}\n    mov dword {dest}, eax"
-
-        elif opcode == IROpcode.XOR:
-            dest = self._op(ops[0])
-            src1 = self._op(ops[1])
-            src2 = self._op(ops[2])
-            if dest == src1:
-                return f"xor dword {dest}, {src2}"
-            return f"mov eax, dword {src1}\n    xor eax, dword {src2}\n    mov dword {dest}, eax"
-
-        elif opcode == IROpcode.LOAD:
-            if len(ops) < 2:
-                return None
-            dest = self._op(ops[0])
-            src = self._op(ops[1])
-
-            # Если src - глобальная переменная (не содержит '['), читаем напрямую
-            if '[' not in src:
-                if self._is_float_type(ops[0]):
-                    return f"movss xmm0, dword [{src}]\n    movss {dest}, xmm0"
-                else:
-                    return f"mov eax, dword [{src}]\n    mov dword {dest}, eax"
+    def _gen_compare_branch(self, instr, target, jump_on_true):
+        """Слитые CMP_* и условный переход: cmp/ucomiss и jcc без setcc."""
+        self.fused_branches += 1
+        opcode = instr.opcode
+        ops = instr.operands
 
-            if self._is_float_type(ops[0]):
-                return f"mov rbx, qword {src}\n    movss xmm0, dword [rbx]\n    movss {dest}, xmm0"
+        if self._is_float_comparison(instr):
+            _, swapped, condition = FLOAT_COMPARISONS[opcode]
+            self._emit_ucomiss(self._fsized(ops[1]), self._fsized(ops[2]), swapped)
+            jcc = f"j{condition}"
+            if not jump_on_true:
+                jcc = INVERSE_JCC[jcc]
+            # При NaN (PF=1) «равно» ложно, «не равно» истинно
+            if jcc == "je":
+                ordered_label = self._make_label(f".ordered_{self.float_compare_counter}")
+                self.float_compare_counter += 1
+                self._emit(f"jp {ordered_label}")
+                self._emit(f"je {target}")
+                self._emit(f"{ordered_label}:", indent=False)
+            elif jcc == "jne":
+                self._emit(f"jp {target}")
+                self._emit(f"jne {target}")
             else:
-                return f"mov rbx, qword {src}\n    mov eax, dword [rbx]\n    mov dword {dest}, eax"
-
-        elif opcode == IROpcode.STORE:
-            if len(ops) < 2:
-                return None
-            addr = self._op(ops[0])
-            src = self._op(ops[1])
-
-            # Если адрес - глобальная переменная (не содержит '['), пишем напрямую
-            if '[' not in addr:
-                if self._is_float_type(ops[1]):
-                    return f"movss xmm0, {src}\n    movss dword [{addr}], xmm0"
-                else:
-                    return f"mov eax, dword {src}\n    mov dword [{addr}], eax"
+                self._emit(f"{jcc} {target}")
+            return
 
-            if self._is_float_type(ops[1]):
-                return f"mov rbx, qword {addr}\n    movss xmm0, {src}\n    movss dword [rbx], xmm0"
+        left = self._sized(ops[1])
+        right = self._sized(ops[2])
+        if self._is_gpr(left) or (self._is_mem(left) and not self._is_mem(right)):
+            self._emit(f"cmp {left}, {right}")
+        else:
+            self._emit(f"mov eax, {left}")
+            self._emit(f"cmp eax, {right}")
+        jcc = JCC[opcode]
+        self._emit(f"{jcc if jump_on_true else INVERSE_JCC[jcc]} {target}")
+
+    def _gen_compare(self, instr, ops, func):
+        opcode = instr.opcode
+        dest = self._sized(ops[0])
+
+        if self._is_float_comparison(instr):
+            left = self._fsized(ops[1])
+            right = self._fsized(ops[2])
+            self._translate_float_comparison(opcode, dest, left, right)
+            return
+
+        left = self._sized(ops[1])
+        right = self._sized(ops[2])
+        if self._is_gpr(left):
+            self._emit(f"cmp {left}, {right}")
+        else:
+            self._emit(f"mov eax, {left}")
+            self._emit(f"cmp eax, {right}")
+        self._emit(f"{SETCC[opcode]} al")
+        if self._is_mem(dest):
+            self._emit("movzx eax, al")
+            self._emit(f"mov {dest}, eax")
+        else:
+            self._emit(f"movzx {dest}, al")
+
+    def _gen_add_sub(self, instr, ops, func):
+        opcode = instr.opcode
+        mnemonic = "add" if opcode is IROpcode.ADD else "sub"
+        if self._is_vector_type(ops[0]):
+            self._vector_binop(instr, ops)
+            return
+        if self._is_float_type(ops[0]):
+            self._float_binop(f"{mnemonic}ss", ops)
+            return
+        if opcode is IROpcode.ADD and self._is_ptr_type(ops[2]) and not self._is_ptr_type(ops[1]):
+            # смещение + указатель: складываем в 64 битах, как указатель + смещение
+            ops = [ops[0], ops[2], ops[1]]
+        if opcode is IROpcode.ADD and self._is_ptr_type(ops[1]):
+            dest = self._sized(ops[0], 'qword')
+            src1 = self._sized(ops[1], 'qword')
+            self._emit(f"mov rax, {src1}")
+            if ops[2].operand_type is IROperandType.LITERAL:
+                self._emit(f"add rax, {self._sized(ops[2])}")
             else:
-                return f"mov rbx, qword {addr}\n    mov eax, dword {src}\n    mov dword [rbx], eax"
+                self._emit(f"movsxd rdx, {self._sized(ops[2])}")
+                self._emit("add rax, rdx")
+            self._emit(f"mov {dest}, rax")
+            return
+        self._int_binop(mnemonic, ops)
+
+    def _gen_mul(self, instr, ops, func):
+        if self._is_vector_type(ops[0]):
+            self._vector_binop(instr, ops)
+        elif self._operand_is_float(instr, 0):
+            self._float_binop("mulss", ops)
+        else:
+            self._int_binop("imul", ops)
+
+    def _gen_div_mod(self, instr, ops, func):
+        opcode = instr.opcode
+        if opcode is IROpcode.DIV and self._is_vector_type(ops[0]):
+            self._vector_binop(instr, ops)
+            return
+        if opcode is IROpcode.DIV and self._is_float_type(ops[0]):
+            self._float_binop("divss", ops)
+            return
+        dest = self._sized(ops[0])
+        left = self._sized(ops[1])
+        right = self._sized(ops[2])
+        result_reg = "eax" if opcode is IROpcode.DIV else "edx"
+        self._emit(f"mov eax, {left}")
+        self._emit("cdq")
+        # Если right - литерал, загружаем в регистр
+        if ops[2].operand_type is IROperandType.LITERAL:
+            self._emit(f"mov ecx, {right}")
+            self._emit("idiv ecx")
+        else:
+            self._emit(f"idiv {right}")
+        self._emit(f"mov {dest}, {result_reg}")
 
-        return f"; Unknown: {opcode.name}"
+    def _gen_unary(self, instr, ops, func):
+        opcode = instr.opcode
+        if opcode is IROpcode.NEG and self._is_float_type(ops[0]):
+            dest = self._fsized(ops[0])
+            src = self._fsized(ops[1])
+            self._emit("xorps xmm0, xmm0")
+            self._emit(f"subss xmm0, {src}")
+            self._emit(f"movss {dest}, xmm0")
+            return
+        mnemonic = "neg" if opcode is IROpcode.NEG else "not"
+        dest = self._sized(ops[0])
+        src = self._sized(ops[1])
+        if dest == src:
+            self._emit(f"{mnemonic} {dest}")
+        elif self._is_gpr(dest):
+            self._emit(f"mov {dest}, {src}")
+            self._emit(f"{mnemonic} {dest}")
+        else:
+            self._emit(f"mov eax, {src}")
+            self._emit(f"{mnemonic} eax")
+            self._emit(f"mov {dest}, eax")
+
+    def _gen_bitwise(self, instr, ops, func):
+        self._int_binop(BITWISE_MNEMONICS[instr.opcode], ops)
+
+    def _gen_load(self, instr, ops, func):
+        if len(ops) < 2:
+            return
+        mem = self._address(ops[1])
+        if self._is_vector_type(ops[0]):
+            _, move = self._vector_moves(ops[0])
+            dest = self._vector_operand(ops[0])
+            reg = dest if self._is_xmm(dest) else 'xmm0'
+            self._emit(f"{move} {reg}, {mem}")
+            self._vector_result(ops[0], reg)
+            return
+        if self._is_float_type(ops[0]):
+            dest = self._fsized(ops[0])
+            if self._is_xmm(dest):
+                self._emit(f"movss {dest}, dword {mem}")
+            else:
+                self._emit(f"movss xmm0, dword {mem}")
+                self._emit(f"movss {dest}, xmm0")
+            return
+        dest = self._sized(ops[0])
+        if self._is_gpr(dest):
+            self._emit(f"mov {dest}, dword {mem}")
+        else:
+            self._emit(f"mov eax, dword {mem}")
+            self._emit(f"mov {dest}, eax")
+
+    def _gen_store(self, instr, ops, func):
+        if len(ops) < 2:
+            return
+        mem = self._address(ops[0])
+        if self._is_vector_type(ops[1]):
+            _, move = self._vector_moves(ops[1])
+            src = self._vector_operand(ops[1])
+            if not self._is_xmm(src):
+                self._vector_to_reg('xmm0', ops[1])
+                src = 'xmm0'
+            self._emit(f"{move} {mem}, {src}")
+            return
+        if self._is_float_type(ops[1]):
+            src = self._fsized(ops[1])
+            if self._is_xmm(src):
+                self._emit(f"movss dword {mem}, {src}")
+            else:
+                self._emit(f"movss xmm0, {src}")
+                self._emit(f"movss dword {mem}, xmm0")
+            return
+        src = self._sized(ops[1])
+        if not self._is_mem(src):
+            self._emit(f"mov dword {mem}, {src}")
+        else:
+            self._emit(f"mov eax, {src}")
+            self._emit(f"mov dword {mem}, eax")
+
+    def _gen_broadcast(self, instr, ops, func):
+        """Скаляр во все элементы вектора: movd + pshufd или movss + shufps."""
+        dest = self._vector_operand(ops[0])
+        reg = dest if self._is_xmm(dest) else 'xmm0'
+        src = ops[1]
+        if ops[0].ir_type.name == 'vector_float':
+            self._emit(f"movss {reg}, {self._fsized(src)}")
+            self._emit(f"shufps {reg}, {reg}, 0")
+        else:
+            value = self._sized(src)
+            if src.operand_type is IROperandType.LITERAL:
+                self._emit(f"mov eax, {value}")
+                value = "eax"
+            self._emit(f"movd {reg}, {value}")
+            self._emit(f"pshufd {reg}, {reg}, 0")
+        self._vector_result(ops[0], reg)
+
+    def _gen_unknown(self, instr, ops, func):
+        self._emit(f"; Unknown: {instr.opcode.name}")
+
+    def _int_binop(self, mnemonic, ops):
+        """Целочисленная бинарная операция dest = src1 op src2."""
+        dest = self._sized(ops[0])
+        src1 = self._sized(ops[1])
+        src2 = self._sized(ops[2])
+        if dest == src1 and not (self._is_mem(dest) and (self._is_mem(src2) or mnemonic == "imul")):
+            self._emit(f"{mnemonic} {dest}, {src2}")
+        elif self._is_gpr(dest) and dest != src2:
+            self._emit(f"mov {dest}, {src1}")
+            self._emit(f"{mnemonic} {dest}, {src2}")
+        else:
+            self._emit(f"mov eax, {src1}")
+            self._emit(f"{mnemonic} eax, {src2}")
+            self._emit(f"mov {dest}, eax")
+
+    def _float_binop(self, mnemonic, ops):
+        """Вещественная бинарная операция (addss/subss/mulss/divss)."""
+        dest = self._fsized(ops[0])
+        src1 = self._fsized(ops[1])
+        src2 = self._fsized(ops[2])
+        if self._is_xmm(dest) and dest != src2:
+            if dest != src1:
+                self._emit(f"movss {dest}, {src1}")
+            self._emit(f"{mnemonic} {dest}, {src2}")
+            return
+        self._emit(f"movss xmm0, {src1}")
+        self._emit(f"{mnemonic} xmm0, {src2}")
+        self._emit(f"movss {dest}, xmm0")
+
+    def _vector_binop(self, instr, ops):
+        """
+        Векторная операция над 4 элементами. Операнд в памяти сначала
+        загружается в xmm: слоты кадра не обязаны быть выровнены на 16.
+        """
+        is_float = ops[0].ir_type.name == 'vector_float'
+        if instr.opcode is IROpcode.MUL and not is_float:
+            self._vector_int_mul(ops)
+            return
+        dest = self._vector_operand(ops[0])
+        src2 = self._vector_operand(ops[2])
+        reg = dest if self._is_xmm(dest) and dest != src2 else 'xmm0'
+        self._vector_to_reg(reg, ops[1])
+        if not self._is_xmm(src2):
+            self._vector_to_reg('xmm1', ops[2])
+            src2 = 'xmm1'
+        self._emit(f"{VECTOR_MNEMONICS[instr.opcode, is_float]} {reg}, {src2}")
+        self._vector_result(ops[0], reg)
+
+    def _vector_int_mul(self, ops):
+        """
+        Целое умножение 4 x 32 бита на SSE2: pmuludq перемножает чётные
+        элементы, нечётные сдвигаются на их место pshufd; младшие половины
+        произведений собираются обратно pshufd и punpckldq.
+        """
+        self._vector_to_reg('xmm0', ops[1])
+        self._vector_to_reg('xmm1', ops[2])
+        self._emit("pshufd xmm2, xmm0, 0xF5")
+        self._emit("pshufd xmm3, xmm1, 0xF5")
+        self._emit("pmuludq xmm0, xmm1")
+        self._emit("pmuludq xmm2, xmm3")
+        self._emit("pshufd xmm0, xmm0, 0x08")
+        self._emit("pshufd xmm2, xmm2, 0x08")
+        self._emit("punpckldq xmm0, xmm2")
+        self._vector_result(ops[0], 'xmm0')
+
+    def _vector_moves(self, operand):
+        """Пересылки вектора: (регистр-регистр, с памятью без выравнивания)."""
+        if operand.ir_type.name == 'vector_float':
+            return 'movaps', 'movups'
+        return 'movdqa', 'movdqu'
+
+    def _vector_operand(self, operand) -> str:
+        """Вектор: xmm-регистр или 16-байтовый слот кадра."""
+        return self._reg_of(operand) or self._op(operand)
+
+    def _vector_to_reg(self, reg, operand):
+        src = self._vector_operand(operand)
+        if src != reg:
+            reg_move, mem_move = self._vector_moves(operand)
+            self._emit(f"{reg_move if self._is_xmm(src) else mem_move} {reg}, {src}")
+
+    def _vector_result(self, operand, reg):
+        dest = self._vector_operand(operand)
+        if dest != reg:
+            reg_move, mem_move = self._vector_moves(operand)
+            self._emit(f"{reg_move if self._is_xmm(dest) else mem_move} {dest}, {reg}")
+
+    def _address(self, operand):
+        """
+        Адрес для LOAD/STORE. Глобальные переменные адресуются по имени,
+        указатели — через регистр (загрузка в rcx выводится сразу).
+        """
+        reg = self._reg_of(operand)
+        if reg:
+            return f"[{reg}]"
+        addr = self._op(operand)
+        # Если адрес - глобальная переменная (не содержит '['), обращаемся напрямую
+        if '[' not in addr:
+            return f"[{addr}]"
+        self._emit(f"mov rcx, qword {addr}")
+        return "[rcx]"
+
+    def _emit_ucomiss(self, left, right, swapped):
+        if swapped:
+            left, right = right, left
+        if not self._is_xmm(left):
+            self._emit(f"movss xmm0, {left}")
+            left = "xmm0"
+        self._emit(f"ucomiss {left}, {right}")
 
     def _translate_float_comparison(self, opcode, dest, left, right):
-        counter = self.float_compare_counter
-        self.float_compare_counter += 1
-
-        unordered_label = self._make_label(f".unordered_{counter}")
-        equal_label = self._make_label(f".equal_{counter}")
-        ne_label = self._make_label(f".ne_{counter}")
-        lt_label = self._make_label(f".lt_{counter}")
-        le_label = self._make_label(f".le_{counter}")
-        gt_label = self._make_label(f".gt_{counter}")
-        ge_label = self._make_label(f".ge_{counter}")
-        end_label = self._make_label(f".end_{counter}")
-
-        if opcode == IROpcode.CMP_EQ:
-            return f"""; Float comparison EQ
-    movss xmm0, {left}
-    ucomiss xmm0, {right}
-    jp {unordered_label}
-    je {equal_label}
-    mov eax, 0
-    jmp {end_label}
-{unordered_label}:
-    mov eax, 0
-    jmp {end_label}
-{equal_label}:
-    mov eax, 1
-{end_label}:
-    mov dword {dest}, eax"""
-
-        elif opcode == IROpcode.CMP_NE:
-            return f"""; Float comparison NE
-    movss xmm0, {left}
-    ucomiss xmm0, {right}
-    jp {unordered_label}
-    jne {ne_label}
-    mov eax, 0
-    jmp {end_label}
-{unordered_label}:
-    mov eax, 1
-    jmp {end_label}
-{ne_label}:
-    mov eax, 1
-{end_label}:
-    mov dword {dest}, eax"""
-
-        elif opcode == IROpcode.CMP_LT:
-            return f"""; Float comparison LT
-    movss xmm0, {left}
-    ucomiss xmm0, {right}
-    jp {unordered_label}
-    jb {lt_label}
-    mov eax, 0
-    jmp {end_label}
-{unordered_label}:
-    mov eax, 0
-    jmp {end_label}
-{lt_label}:
-    mov eax, 1
-{end_label}:
-    mov dword {dest}, eax"""
-
-        elif opcode == IROpcode.CMP_LE:
-            return f"""; Float comparison LE
-    movss xmm0, {left}
-    ucomiss xmm0, {right}
-    jp {unordered_label}
-    jbe {le_label}
-    mov eax, 0
-    jmp {end_label}
-{unordered_label}:
-    mov eax, 0
-    jmp {end_label}
-{le_label}:
-    mov eax, 1
-{end_label}:
-    mov dword {dest}, eax"""
-
-        elif opcode == IROpcode.CMP_GT:
-            return f"""; Float comparison GT (swapped)
-    movss xmm0, {right}
-    ucomiss xmm0, {left}
-    jp {unordered_label}
-    jb {gt_label}
-    mov eax, 0
-    jmp {end_label}
-{unordered_label}:
-    mov eax, 0
-    jmp {end_label}
-{gt_label}:
-    mov eax, 1
-{end_label}:
-    mov dword {dest}, eax"""
-
-        elif opcode == IROpcode.CMP_GE:
-            return f"""; Float comparison GE (swapped)
-    movss xmm0, {right}
-    ucomiss xmm0, {left}
-    jp {unordered_label}
-    jbe {ge_label}
-    mov eax, 0
-    jmp {end_label}
-{unordered_label}:
-    mov eax, 0
-    jmp {end_label}
-{ge_label}:
-    mov eax, 1
-{end_label}:
-    mov dword {dest}, eax"""
-
-        return f"; Unknown float comparison: {opcode}"
+        """Вещественное сравнение без переходов: ucomiss и setcc (для ==/!= с учётом PF)."""
+        title, swapped, condition = FLOAT_COMPARISONS[opcode]
+        emit = self._emit
+        emit(f"; Float comparison {title}")
+        self._emit_ucomiss(left, right, swapped)
+        emit(f"set{condition} al")
+        if condition == "e":
+            emit("setnp cl")
+            emit("and al, cl")
+        elif condition == "ne":
+            emit("setp cl")
+            emit("or al, cl")
+        if self._is_mem(dest):
+            emit("movzx eax, al")
+            emit(f"mov {dest}, eax")
+        else:
+            emit(f"movzx {dest}, al")
+
+    def _reg_of(self, operand):
+        """Физический регистр операнда, если он выделен распределителем."""
+        if not self.reg_map:
+            return None
+        if operand.operand_type is IROperandType.TEMPORARY:
+            return self.reg_map.get(operand.value)
+        if operand.operand_type is IROperandType.VARIABLE:
+            temp_name = self.param_to_temp.get(operand.value)
+            if temp_name is not None:
+                return self.reg_map.get(temp_name)
+        return None
+
+    def _sized(self, operand, width: str = 'dword') -> str:
+        """Операнд с указанием размера: 'dword [rbp-8]', 'ebx', 'rbx' или литерал."""
+        reg = self._reg_of(operand)
+        if reg:
+            if reg.startswith('xmm') or width == 'qword':
+                return reg
+            return REG32[reg]
+        op = self._op(operand)
+        if operand.operand_type is not IROperandType.LITERAL and op.startswith('['):
+            return f"{width} {op}"
+        return op
+
+    def _fsized(self, operand) -> str:
+        """Операнд в вещественном контексте: xmm-регистр, память или константа в .rodata."""
+        if operand.operand_type is IROperandType.LITERAL and isinstance(operand.value, (int, bool)) \
+                and not isinstance(operand.value, float):
+            label = f"LC{len(self.float_literals)}"
+            self.float_literals.append((label, float(operand.value)))
+            return f"dword [{label}]"
+        return self._sized(operand)
+
+    def _is_float_literal(self, operand) -> bool:
+        return operand.operand_type is IROperandType.LITERAL and isinstance(operand.value, float)
+
+    def _is_mem(self, op_str: str) -> bool:
+        return '[' in op_str
+
+    def _is_xmm(self, op_str: str) -> bool:
+        return op_str.startswith('xmm')
+
+    def _is_gpr(self, op_str: str) -> bool:
+        return op_str in GPR_NAMES
 
     def _op(self, operand):
-        if operand.operand_type == IROperandType.TEMPORARY:
+        operand_type = operand.operand_type
+        if operand_type is IROperandType.TEMPORARY:
             offset = self.current_stack_frame.get_offset(operand.value)
             if offset is not None:
                 return f"[rbp{offset}]"
             return f"[rbp-8]"
 
-        elif operand.operand_type == IROperandType.VARIABLE:
+        elif operand_type is IROperandType.VARIABLE:
             offset = self.current_stack_frame.get_offset(operand.value)
             if offset is not None:
                 return f"[rbp{offset}]"
             return f"[{operand.value}]"
 
-        elif operand.operand_type == IROperandType.LITERAL:
+        elif operand_type is IROperandType.LITERAL:
             val = operand.value
             if isinstance(val, float):
                 label = f"LC{len(self.float_literals)}"
@@ -794,10 +1125,10 @@ class X86Generator:
                 return label
             return str(val)
 
-        elif operand.operand_type == IROperandType.LABEL:
+        elif operand_type is IROperandType.LABEL:
             return self._make_label(str(operand.value))
 
-        elif operand.operand_type == IROperandType.GLOBAL:
+        elif operand_type is IROperandType.GLOBAL:
             # Возвращаем просто имя, LOAD/STORE сами добавят скобки
             return operand.value
 
@@ -805,6 +1136,8 @@ class X86Generator:
 
     def _emit(self, line: str, indent: bool = True):
         if indent:
-            self.output.append(f"    {line}")
+            line = f"    {line}"
+        if self.body is not None:
+            self.body.append(AsmLine.parse(line))
         else:
-            self.output.append(line)
\ No newline at end of file
+            self.output.append(line)
@@ -0,0 +1,227 @@
+"""
+Персистентный кэш результатов компиляции.
+
+Артефакты (.asm, .o, исполняемые файлы) хранятся по адресу, вычисленному из
+содержимого исходника, уровня оптимизации, целевой платформы и версии
+компилятора. Размер кэша ограничен: при переполнении удаляются записи,
+к которым дольше всего не обращались (LRU по времени модификации).
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024  # 256 MiB
+
+# Каталоги компилятора, от исходников которых зависит сгенерированный код
+COMPILER_DIRS = ('lexer', 'parser', 'semantic', 'ir', 'codegen', 'runtime')
+
+
+def default_cache_dir() -> Path:
+    """Каталог кэша: $MYCC_CACHE_DIR, иначе $XDG_CACHE_HOME/mycc или ~/.cache/mycc."""
+    env = os.environ.get('MYCC_CACHE_DIR')
+    if env:
+        return Path(env)
+    xdg = os.environ.get('XDG_CACHE_HOME')
+    base = Path(xdg) if xdg else Path.home() / '.cache'
+    return base / 'mycc'
+
+
+def compiler_fingerprint(root: Path, dirs: Iterable[str] = COMPILER_DIRS) -> str:
+    """
+    Отпечаток исходников компилятора (путь, размер, mtime).
+
+    Версия в `__version__` меняется редко, поэтому в ключ кэша дополнительно
+    входит состояние самих модулей: правка любого из них инвалидирует кэш.
+    """
+    h = hashlib.sha256()
+    files = [root / 'mycc.py']
+    for d in dirs:
+        files.extend(sorted((root / d).glob('*.py')))
+        files.extend(sorted((root / d).glob('*.asm')))
+    for path in files:
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        h.update(f"{path.relative_to(root)}:{st.st_size}:{st.st_mtime_ns};".encode())
+    return h.hexdigest()
+
+
+class CompileCache:
+    """Контентно-адресуемый кэш артефактов компиляции с LRU-вытеснением."""
+
+    STATS_FILE = 'stats.json'
+
+    def __init__(self, directory: Optional[Path] = None, max_size: Optional[int] = None):
+        self.directory = Path(directory) if directory else default_cache_dir()
+        if max_size is None:
+            max_size = int(os.environ.get('MYCC_CACHE_MAX_SIZE', DEFAULT_MAX_SIZE))
+        self.max_size = max_size
+        self.objects_dir = self.directory / 'objects'
+
+    @staticmethod
+    def make_key(source: bytes, **params) -> str:
+        """Ключ кэша: SHA-256 от исходника и параметров компиляции."""
+        h = hashlib.sha256(source)
+        for name in sorted(params):
+            h.update(f"\0{name}={params[name]}".encode())
+        return h.hexdigest()
+
+    def _entry_path(self, key: str, kind: str) -> Path:
+        return self.objects_dir / key[:2] / f"{key}.{kind}"
+
+    def lookup(self, key: str, kind: str) -> Optional[Path]:
+        """Возвращает путь к артефакту или None. Попадание обновляет время доступа."""
+        path = self._entry_path(key, kind)
+        if path.is_file():
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            self._bump('hits')
+            return path
+        self._bump('misses')
+        return None
+
+    def fetch(self, key: str, kind: str, destination: str) -> bool:
+        """Копирует артефакт из кэша в destination; True при попадании."""
+        path = self.lookup(key, kind)
+        if path is None:
+            return False
+        try:
+            shutil.copyfile(path, destination)
+            shutil.copymode(path, destination)
+        except OSError:
+            return False
+        return True
+
+    def store(self, key: str, kind: str, artifact: str):
+        """Сохраняет артефакт в кэш (атомарно) и при необходимости вытесняет старые записи."""
+        path = self._entry_path(key, kind)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix='.tmp')
+            os.close(fd)
+            shutil.copyfile(artifact, tmp)
+            shutil.copymode(artifact, tmp)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        self._bump('stores')
+        self.evict()
+
+    def runtime_object(self, runtime_asm: Path, assemble: Callable[[str, str], bool],
+                       tag: str = '') -> Optional[Path]:
+        """
+        Возвращает собранный объект рантайма, ассемблируя его только при
+        изменении runtime.asm (имя файла содержит хэш исходника).
+
+        assemble(asm_path, obj_path) запускает ассемблер и возвращает успех;
+        tag различает объекты разных ассемблеров.
+        Вытеснению LRU объект рантайма не подлежит.
+        """
+        digest = hashlib.sha256(Path(runtime_asm).read_bytes()).hexdigest()
+        name = f"runtime-{tag}-{digest[:16]}.o" if tag else f"runtime-{digest[:16]}.o"
+        path = self.directory / 'runtime' / name
+        if path.is_file():
+            return path
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix='.tmp')
+            os.close(fd)
+        except OSError:
+            return None
+        try:
+            if not assemble(str(runtime_asm), tmp):
+                return None
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        return path
+
+    def entries(self) -> List[Path]:
+        if not self.objects_dir.is_dir():
+            return []
+        return [p for p in self.objects_dir.glob('*/*') if p.is_file() and p.suffix != '.tmp']
+
+    def evict(self) -> int:
+        """Удаляет давно неиспользуемые записи, пока размер кэша превышает лимит."""
+        entries = []
+        total = 0
+        for path in self.entries():
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+            total += st.st_size
+
+        removed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        if removed:
+            self._bump('evictions', removed)
+        return removed
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def stats(self) -> Dict[str, int]:
+        counters = self._load_counters()
+        entries = self.entries()
+        counters['entries'] = len(entries)
+        counters['size'] = sum(p.stat().st_size for p in entries)
+        counters['max_size'] = self.max_size
+        return counters
+
+    def format_stats(self) -> str:
+        s = self.stats()
+        lookups = s['hits'] + s['misses']
+        rate = (s['hits'] / lookups * 100) if lookups else 0
+        lines = [
+            f"Cache directory: {self.directory}",
+            f"Entries:         {s['entries']}",
+            f"Size:            {s['size']} / {s['max_size']} bytes",
+            f"Hits:            {s['hits']}",
+            f"Misses:          {s['misses']}",
+            f"Hit rate:        {rate:.1f}%",
+            f"Stores:          {s['stores']}",
+            f"Evictions:       {s['evictions']}",
+        ]
+        return '\n'.join(lines)
+
+    def _load_counters(self) -> Dict[str, int]:
+        counters = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        try:
+            with open(self.directory / self.STATS_FILE) as f:
+                counters.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+        return counters
+
+    def _bump(self, counter: str, amount: int = 1):
+        counters = self._load_counters()
+        counters[counter] = counters.get(counter, 0) + amount
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=str(self.directory), suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(counters, f)
+            os.replace(tmp, self.directory / self.STATS_FILE)
+        except OSError:
+            pass
@@ -11,7 +11,20 @@ from .ir_writer import IRWriter
 from .dot_generator import IRDotGenerator
 from .json_generator import IRJsonGenerator
 from .validator import IRValidator
-from .optimizer import IROptimizer, ConstantFolder, ConstantPropagator, DeadCodeEliminator, UnreachableCodeEliminator
+from .ssa import DominatorTree, SSABuilder, SSADestructor
+from .dataflow import (
+    BitNumbering, DataflowProblem, DataflowResult, solve,
+    live_variables, reaching_definitions, available_expressions
+)
+from .loops import Loop, natural_loops
+from .call_graph import CallGraph
+from .escape import EscapeAnalysis
+from .pass_manager import AnalysisManager, Pass, StatsPass, FunctionPass, FixedPoint, PassManager
+from .optimizer import (
+    IROptimizer, ConstantFolder, ConstantPropagator, SparseConditionalConstantPropagator,
+    TailCallEliminator, FunctionInliner, StackArrayPromoter, GlobalValueNumbering, LoopInvariantCodeMotion, InductionVariableStrengthReduction,
+    LoopVectorizer, DeadCodeEliminator, UnreachableCodeEliminator
+)
 
 __all__ = [
     # IR instructions
@@ -32,6 +45,7 @@ __all__ = [
     # Control flow
     'IRFunction',
     'IRProgram',
+    'DefUseChains',
     # Generators
     'IRGenerator',
     'IRWriter',
@@ -39,10 +53,44 @@ __all__ = [
     'IRJsonGenerator',
     # Validator
     'IRValidator',
+    # SSA
+    'DominatorTree',
+    'SSABuilder',
+    'SSADestructor',
+    # Dataflow
+    'BitNumbering',
+    'DataflowProblem',
+    'DataflowResult',
+    'solve',
+    'live_variables',
+    'reaching_definitions',
+    'available_expressions',
+    # Loops
+    'Loop',
+    'natural_loops',
+    # Call graph
+    'CallGraph',
+    # Escape analysis
+    'EscapeAnalysis',
+    # Pass manager
+    'AnalysisManager',
+    'Pass',
+    'StatsPass',
+    'FunctionPass',
+    'FixedPoint',
+    'PassManager',
     # Optimizer
     'IROptimizer',
     'ConstantFolder',
     'ConstantPropagator',
+    'SparseConditionalConstantPropagator',
+    'TailCallEliminator',
+    'FunctionInliner',
+    'StackArrayPromoter',
+    'GlobalValueNumbering',
+    'LoopInvariantCodeMotion',
+    'InductionVariableStrengthReduction',
+    'LoopVectorizer',
     'DeadCodeEliminator',
     'UnreachableCodeEliminator'
 ]
\ No newline at end of file
@@ -5,7 +5,7 @@
 
 from typing import List, Optional, Set, Dict, Any
 from dataclasses import dataclass, field
-from .ir_instructions import IRInstruction, IROpcode, LabelInst, PhiInst
+from .ir_instructions import IRInstruction, IROpcode, LabelInst, used_temps
 
 
 class BasicBlock:
@@ -18,8 +18,9 @@ class BasicBlock:
         self.name = name
         self.label = label if label else name
         self.instructions: List[IRInstruction] = []
-        self.predecessors: Set['BasicBlock'] = set()
-        self.successors: Set['BasicBlock'] = set()
+        # Рёбра CFG в порядке появления переходов (поддерживает IRFunction)
+        self.predecessors: List['BasicBlock'] = []
+        self.successors: List['BasicBlock'] = []
 
         # Для анализа
         self.dominators: Set['BasicBlock'] = set()
@@ -53,6 +54,8 @@ class BasicBlock:
         return "\n".join(lines)
 
     def get_all_vars_used(self) -> Set[str]:
-        """Возвращает множество всех переменных, используемых в блоке."""
-        # Базовая реализация
-        return set()
\ No newline at end of file
+        """Возвращает множество всех временных, используемых в блоке."""
+        result: Set[str] = set()
+        for instr in self.instructions:
+            result.update(used_temps(instr))
+        return result
\ No newline at end of file
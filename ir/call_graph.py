@@ -0,0 +1,101 @@
+# ir/call_graph.py
+"""
+Граф вызовов программы IR.
+
+Вершины — функции IRProgram, рёбра — инструкции CALL с именем функции
+этой же программы (вызовы printf, malloc и других внешних функций в граф
+не входят). Компоненты сильной связности (Tarjan) выдаются в обратном
+топологическом порядке: вызываемые раньше вызывающих. Функция рекурсивна,
+если её компонента содержит больше одной функции или она вызывает сама себя.
+"""
+
+from typing import Dict, List, Set, Tuple
+
+from .basic_block import BasicBlock
+from .control_flow import IRFunction, IRProgram
+from .ir_instructions import IRInstruction, IROpcode
+
+
+def call_target(instr: IRInstruction) -> str:
+    """Имя вызываемой функции CALL (пустая строка, если её нет)."""
+    if instr.opcode != IROpcode.CALL or len(instr.operands) < 2:
+        return ""
+    return str(instr.operands[1].value)
+
+
+class CallGraph:
+    """Граф вызовов: функции, места вызовов и компоненты сильной связности."""
+
+    def __init__(self, program: IRProgram):
+        self.functions: Dict[str, IRFunction] = {func.name: func for func in program.functions}
+        self.callees: Dict[str, List[str]] = {name: [] for name in self.functions}
+        self.callers: Dict[str, List[str]] = {name: [] for name in self.functions}
+        self.sites: Dict[str, List[Tuple[BasicBlock, IRInstruction]]] = {name: [] for name in self.functions}
+        for func in program.functions:
+            for block in func.blocks:
+                for instr in block.instructions:
+                    target = call_target(instr)
+                    if target not in self.functions:
+                        continue
+                    self.sites[func.name].append((block, instr))
+                    if target not in self.callees[func.name]:
+                        self.callees[func.name].append(target)
+                        self.callers[target].append(func.name)
+        self.components = self._strongly_connected()
+        self.component_of: Dict[str, int] = {}
+        for i, component in enumerate(self.components):
+            for name in component:
+                self.component_of[name] = i
+
+    def _strongly_connected(self) -> List[List[str]]:
+        """Алгоритм Tarjan без рекурсии; компоненты — вызываемые раньше."""
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        stack: List[str] = []
+        on_stack: Set[str] = set()
+        components: List[List[str]] = []
+
+        for root in self.functions:
+            if root in index:
+                continue
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self.callees[root]))]
+            while work:
+                name, callees = work[-1]
+                for callee in callees:
+                    if callee not in index:
+                        index[callee] = low[callee] = len(index)
+                        stack.append(callee)
+                        on_stack.add(callee)
+                        work.append((callee, iter(self.callees[callee])))
+                        break
+                    if callee in on_stack:
+                        low[name] = min(low[name], index[callee])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[name])
+                    if low[name] == index[name]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == name:
+                                break
+                        components.append(component)
+        return components
+
+    def is_recursive(self, name: str) -> bool:
+        component = self.components[self.component_of[name]]
+        return len(component) > 1 or name in self.callees[name]
+
+    def same_component(self, a: str, b: str) -> bool:
+        return self.component_of[a] == self.component_of[b]
+
+    def bottom_up(self) -> List[IRFunction]:
+        """Функции в порядке компонент: вызываемые раньше вызывающих."""
+        return [self.functions[name] for component in self.components for name in component]
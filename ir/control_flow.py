@@ -3,15 +3,97 @@
 Управление Control Flow Graph (CFG) и функциями.
 """
 
-from typing import List, Dict, Optional, Set, Any
+from typing import List, Dict, Optional, Set, Any, Tuple
 from dataclasses import dataclass, field
 from .basic_block import BasicBlock
-from .ir_instructions import IRInstruction, IROpcode, IROperand, IROperandType, Temp
+from .ir_instructions import (
+    IRInstruction, IROpcode, IROperand, IROperandType, Temp, Label, PhiInst,
+    defined_temp, used_temps
+)
+
+
+JUMP_OPCODES = (IROpcode.JUMP, IROpcode.JUMP_IF, IROpcode.JUMP_IF_NOT)
+# После них инструкции блока не выполняются
+BLOCK_ENDING_OPCODES = (IROpcode.JUMP, IROpcode.RETURN)
+
+
+def jump_targets(block: BasicBlock) -> List[str]:
+    """Метки переходов блока до первого безусловного JUMP/RETURN."""
+    targets = []
+    for instr in block.instructions:
+        if instr.opcode in JUMP_OPCODES:
+            for op in instr.operands:
+                if op.operand_type is IROperandType.LABEL:
+                    targets.append(op.value)
+        if instr.opcode in BLOCK_ENDING_OPCODES:
+            break
+    return targets
+
+
+class DefUseChains:
+    """
+    Цепочки def-use функции: для каждой временной — определяющие её
+    инструкции и инструкции, которые её читают (каждая один раз, даже если
+    читает несколько раз). Инструкции не хэшируются, поэтому использования
+    хранятся по id(). Строятся за один проход; remove() поддерживает цепочки
+    при удалении инструкции за время, пропорциональное числу её операндов.
+    """
+    __slots__ = ('defs', 'uses')
+
+    def __init__(self):
+        self.defs: Dict[str, List[Tuple[BasicBlock, IRInstruction]]] = {}
+        self.uses: Dict[str, Dict[int, Tuple[BasicBlock, IRInstruction]]] = {}
+
+    @classmethod
+    def build(cls, blocks: List[BasicBlock]) -> 'DefUseChains':
+        chains = cls()
+        for block in blocks:
+            for instr in block.instructions:
+                chains.add(block, instr)
+        return chains
+
+    def add(self, block: BasicBlock, instr: IRInstruction):
+        dest = defined_temp(instr)
+        if dest is not None:
+            self.defs.setdefault(dest, []).append((block, instr))
+        for name in used_temps(instr):
+            self.uses.setdefault(name, {})[id(instr)] = (block, instr)
+
+    def remove(self, block: BasicBlock, instr: IRInstruction) -> List[str]:
+        """
+        Убирает инструкцию из цепочек (сам блок не меняется). Возвращает
+        временные, у которых после этого не осталось использований.
+        """
+        dest = defined_temp(instr)
+        if dest is not None:
+            self.defs[dest] = [(b, i) for b, i in self.defs[dest] if i is not instr]
+        unused = []
+        for name in used_temps(instr):
+            users = self.uses.get(name)
+            if users and users.pop(id(instr), None) is not None and not users:
+                unused.append(name)
+        return unused
+
+    def use_count(self, name: str) -> int:
+        return len(self.uses.get(name, ()))
+
+    def users(self, name: str) -> List[Tuple[BasicBlock, IRInstruction]]:
+        return list(self.uses.get(name, {}).values())
 
 
 class IRFunction:
     """
     Представление функции в IR.
+
+    Хранит индекс метка -> блок и рёбра CFG (successors/predecessors блоков).
+    IRGenerator добавляет рёбра по мере генерации переходов; проходы,
+    меняющие переходы или удаляющие блоки, обновляют их через
+    refresh_successors()/remove_blocks(). Для IR, собранного вручную,
+    есть rebuild_cfg().
+
+    Цепочки def-use (def_use_chains()) строятся по требованию и
+    кэшируются; проход, меняющий инструкции не через них, вызывает
+    invalidate_def_use().
     """
 
     def __init__(self, name: str, return_type: Any = None):
@@ -29,6 +111,23 @@ class IRFunction:
         # Информация о типах
         self.local_vars: Dict[str, Any] = {}  # имя -> тип
 
+        # CFG: первый блок с каждой меткой; блоки, на которые уже есть переходы,
+        # но которые ещё не созданы через create_block
+        self.block_by_label: Dict[str, BasicBlock] = {}
+        self._reserved_blocks: Dict[str, BasicBlock] = {}
+        self.def_use: Optional[DefUseChains] = None
+        # Решатель потока данных (ir/dataflow.py): задачи, итерации, секунды
+        self.dataflow_stats: Dict[str, Any] = {"solves": 0, "iterations": 0, "time": 0.0}
+
+    def def_use_chains(self) -> DefUseChains:
+        """Цепочки def-use (строятся при первом обращении после изменения IR)."""
+        if self.def_use is None:
+            self.def_use = DefUseChains.build(self.blocks)
+        return self.def_use
+
+    def invalidate_def_use(self):
+        self.def_use = None
+
     def new_temp(self, hint: str = "t", ir_type=None) -> IROperand:
         """Создает новый уникальный временный регистр."""
         self.temp_counter += 1
@@ -43,10 +142,15 @@ class IRFunction:
         """Создает и добавляет новый базовый блок."""
         if not name:
             name = self.new_label("B")
-        block = BasicBlock(name)
+        block = self._reserved_blocks.pop(name, None) or BasicBlock(name)
         self.blocks.append(block)
+        self.block_by_label.setdefault(block.label, block)
         return block
 
+    def get_block(self, label: str) -> Optional[BasicBlock]:
+        """Блок с меткой label (O(1))."""
+        return self.block_by_label.get(label)
+
     def set_entry(self, block: BasicBlock):
         self.entry_block = block
 
@@ -55,8 +159,99 @@ class IRFunction:
 
     def add_edge(self, from_block: BasicBlock, to_block: BasicBlock):
         """Добавляет ребро CFG между блоками."""
-        from_block.successors.add(to_block)
-        to_block.predecessors.add(from_block)
+        if to_block not in from_block.successors:
+            from_block.successors.append(to_block)
+            to_block.predecessors.append(from_block)
+
+    def add_jump_edge(self, from_block: BasicBlock, label: str):
+        """
+        Ребро по переходу на метку. Если блок ещё не создан, он резервируется
+        и будет возвращён create_block(label) — рёбра идут в порядке переходов.
+        """
+        target = self.block_by_label.get(label) or self._reserved_blocks.get(label)
+        if target is None:
+            target = self._reserved_blocks[label] = BasicBlock(label)
+        self.add_edge(from_block, target)
+
+    def drop_unresolved_edges(self):
+        """Убирает рёбра на метки, для которых блок так и не был создан."""
+        for block in self._reserved_blocks.values():
+            for pred in list(block.predecessors):
+                self.remove_edge(pred, block)
+        self._reserved_blocks = {}
+
+    def remove_edge(self, from_block: BasicBlock, to_block: BasicBlock):
+        """Удаляет ребро; PHI целевого блока теряют источник из from_block."""
+        if to_block in from_block.successors:
+            from_block.successors.remove(to_block)
+            to_block.predecessors.remove(from_block)
+            for instr in to_block.instructions:
+                if not isinstance(instr, PhiInst):
+                    break
+                instr.sources = [(value, label) for value, label in instr.sources
+                                 if label != from_block.label]
+
+    def refresh_successors(self, block: BasicBlock):
+        """Пересчитывает исходящие рёбра блока по его переходам."""
+        targets = []
+        for label in jump_targets(block):
+            target = self.block_by_label.get(label)
+            if target is not None and target not in targets:
+                targets.append(target)
+        for succ in list(block.successors):
+            if succ not in targets:
+                self.remove_edge(block, succ)
+        for target in targets:
+            self.add_edge(block, target)
+        block.successors = targets
+
+    def split_edge(self, from_block: BasicBlock, to_block: BasicBlock) -> BasicBlock:
+        """
+        Вставляет на ребро from_block -> to_block новый блок с единственным
+        JUMP; переходы from_block и источники PHI перенаправляются на него.
+        Порядок рёбер у соседних блоков сохраняется.
+        """
+        middle = self.create_block(f"{to_block.label}_from_{from_block.label}")
+        middle.add_instruction(IRInstruction(IROpcode.JUMP, [Label(to_block.label)]))
+        middle_label = Label(middle.label)
+        for instr in from_block.instructions:
+            if instr.opcode in JUMP_OPCODES:
+                instr.operands = [middle_label if op.operand_type is IROperandType.LABEL
+                                  and op.value == to_block.label else op
+                                  for op in instr.operands]
+        for instr in to_block.instructions:
+            if not isinstance(instr, PhiInst):
+                break
+            instr.sources = [(value, middle.label if label == from_block.label else label)
+                             for value, label in instr.sources]
+        from_block.successors[from_block.successors.index(to_block)] = middle
+        to_block.predecessors[to_block.predecessors.index(from_block)] = middle
+        middle.predecessors.append(from_block)
+        middle.successors.append(to_block)
+        return middle
+
+    def remove_blocks(self, removed: Set[BasicBlock]):
+        """Удаляет блоки из функции вместе с их рёбрами и метками."""
+        for block in removed:
+            for succ in list(block.successors):
+                self.remove_edge(block, succ)
+            for pred in list(block.predecessors):
+                self.remove_edge(pred, block)
+            if self.block_by_label.get(block.label) is block:
+                del self.block_by_label[block.label]
+        self.blocks = [b for b in self.blocks if b not in removed]
+        self.invalidate_def_use()
+
+    def rebuild_cfg(self):
+        """Строит индекс меток и все рёбра заново за O(V+E)."""
+        self.block_by_label = {}
+        self._reserved_blocks = {}
+        for block in self.blocks:
+            self.block_by_label.setdefault(block.label, block)
+            block.successors = []
+            block.predecessors = []
+        for block in self.blocks:
+            self.refresh_successors(block)
 
     def __str__(self) -> str:
         params_str = ", ".join(str(p) for p in self.parameters)
@@ -0,0 +1,321 @@
+# ir/dataflow.py
+"""
+Итеративный решатель задач потока данных на битовых векторах.
+
+Элементы задачи (временные, определения, выражения) получают плотные
+номера в BitNumbering; множество элементов — целое число Python, бит i
+которого соответствует элементу i. Решатель обходит блоки в обратном
+постпорядке (обратные задачи — в постпорядке) до неподвижной точки и
+накапливает число итераций и время в IRFunction.dataflow_stats.
+
+Готовые задачи: live_variables (живые временные), reaching_definitions
+(достигающие определения), available_expressions (доступные выражения).
+"""
+
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from .basic_block import BasicBlock
+from .control_flow import IRFunction
+from .ir_instructions import (
+    IRInstruction, IROpcode, IROperandType, PhiInst, defined_temp, used_temps
+)
+
+
+class BitNumbering:
+    """Плотная нумерация элементов: ключ -> номер бита."""
+    __slots__ = ('index', 'items')
+
+    def __init__(self):
+        self.index: Dict[Hashable, int] = {}
+        self.items: List[Any] = []
+
+    def add(self, key: Hashable, item: Any = None) -> int:
+        """Номер элемента (новые ключи получают следующий номер)."""
+        i = self.index.get(key)
+        if i is None:
+            i = self.index[key] = len(self.items)
+            self.items.append(key if item is None else item)
+        return i
+
+    def bit(self, key: Hashable) -> int:
+        """Битовая маска элемента; 0 для ключа, которого нет в нумерации."""
+        i = self.index.get(key)
+        return 0 if i is None else 1 << i
+
+    def bits(self, keys: Iterable[Hashable]) -> int:
+        result = 0
+        for key in keys:
+            result |= self.bit(key)
+        return result
+
+    def decode(self, bits: int) -> List[Any]:
+        """Элементы множества в порядке номеров."""
+        result = []
+        while bits:
+            low = bits & -bits
+            result.append(self.items[low.bit_length() - 1])
+            bits ^= low
+        return result
+
+    @property
+    def universe(self) -> int:
+        return (1 << len(self.items)) - 1
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+class DataflowProblem:
+    """
+    Задача потока данных: gen/kill блоков, направление и оператор слияния.
+
+    forward — прямая задача (IN из OUT предшественников), иначе обратная.
+    union — слияние объединением (may), иначе пересечением (must).
+    boundary — значение на входе entry (прямая) или выходе блоков без
+    преемников (обратная). edge_gen[(pred, succ)] добавляется к значению,
+    приходящему по ребру (для обратных задач: использования в PHI).
+    """
+
+    def __init__(self, blocks: List[BasicBlock], gen: Dict[BasicBlock, int], kill: Dict[BasicBlock, int],
+                 numbering: BitNumbering, forward: bool = True, union: bool = True, boundary: int = 0,
+                 successors: Optional[Callable[[BasicBlock], List[BasicBlock]]] = None,
+                 edge_gen: Optional[Dict[Tuple[BasicBlock, BasicBlock], int]] = None):
+        self.blocks = blocks
+        self.gen = gen
+        self.kill = kill
+        self.numbering = numbering
+        self.forward = forward
+        self.union = union
+        self.boundary = boundary
+        self.successors = successors or (lambda block: block.successors)
+        self.edge_gen = edge_gen or {}
+
+
+class DataflowResult:
+    """Решение задачи: значения на входе и выходе каждого блока."""
+
+    def __init__(self, numbering: BitNumbering, in_bits: Dict[BasicBlock, int],
+                 out_bits: Dict[BasicBlock, int], iterations: int):
+        self.numbering = numbering
+        self.in_bits = in_bits
+        self.out_bits = out_bits
+        self.iterations = iterations
+
+    def contains_in(self, block: BasicBlock, key: Hashable) -> bool:
+        return bool(self.in_bits[block] & self.numbering.bit(key))
+
+    def contains_out(self, block: BasicBlock, key: Hashable) -> bool:
+        return bool(self.out_bits[block] & self.numbering.bit(key))
+
+    def in_items(self, block: BasicBlock) -> List[Any]:
+        return self.numbering.decode(self.in_bits[block])
+
+    def out_items(self, block: BasicBlock) -> List[Any]:
+        return self.numbering.decode(self.out_bits[block])
+
+
+def reverse_postorder(blocks: List[BasicBlock], successors: Dict[BasicBlock, List[BasicBlock]]) -> List[BasicBlock]:
+    """Обратный постпорядок от blocks[0]; недостижимые блоки — в конце, в исходном порядке."""
+    if not blocks:
+        return []
+    postorder = []
+    visited = {blocks[0]}
+    stack = [(blocks[0], iter(successors[blocks[0]]))]
+    while stack:
+        block, succs = stack[-1]
+        for succ in succs:
+            if succ not in visited:
+                visited.add(succ)
+                stack.append((succ, iter(successors[succ])))
+                break
+        else:
+            stack.pop()
+            postorder.append(block)
+    postorder.reverse()
+    postorder.extend(block for block in blocks if block not in visited)
+    return postorder
+
+
+def solve(problem: DataflowProblem, func: Optional[IRFunction] = None) -> DataflowResult:
+    """
+    Решает задачу круговыми проходами по блокам до неподвижной точки.
+    Если передана func, число итераций и время добавляются в её dataflow_stats.
+    """
+    start = time.perf_counter()
+    blocks = problem.blocks
+    block_set = set(blocks)
+    succs = {block: [s for s in problem.successors(block) if s in block_set] for block in blocks}
+    preds: Dict[BasicBlock, List[BasicBlock]] = {block: [] for block in blocks}
+    for block in blocks:
+        for succ in succs[block]:
+            preds[succ].append(block)
+
+    order = reverse_postorder(blocks, succs)
+    if problem.forward:
+        sources, edge_of = preds, lambda block, other: (other, block)
+    else:
+        order.reverse()
+        sources, edge_of = succs, lambda block, other: (block, other)
+
+    gen, kill, edge_gen = problem.gen, problem.kill, problem.edge_gen
+    initial = 0 if problem.union else problem.numbering.universe
+    # before — значение на стороне слияния (IN прямой задачи / OUT обратной)
+    before = {block: initial for block in blocks}
+    after = {block: initial for block in blocks}
+    entry = blocks[0] if blocks else None
+
+    iterations = 0
+    changed = True
+    while changed:
+        changed = False
+        iterations += 1
+        for block in order:
+            incoming = sources[block]
+            if (problem.forward and block is entry) or (not problem.forward and not incoming):
+                value = problem.boundary
+            elif not incoming:
+                value = initial
+            else:
+                value = None
+                for other in incoming:
+                    edge_value = after[other] | edge_gen.get(edge_of(block, other), 0)
+                    if value is None:
+                        value = edge_value
+                    elif problem.union:
+                        value |= edge_value
+                    else:
+                        value &= edge_value
+            result = gen.get(block, 0) | (value & ~kill.get(block, 0))
+            if value != before[block] or result != after[block]:
+                before[block], after[block] = value, result
+                changed = True
+
+    if problem.forward:
+        in_bits, out_bits = before, after
+    else:
+        in_bits, out_bits = after, before
+    if func is not None:
+        stats = func.dataflow_stats
+        stats["solves"] += 1
+        stats["iterations"] += iterations
+        stats["time"] += time.perf_counter() - start
+    return DataflowResult(problem.numbering, in_bits, out_bits, iterations)
+
+
+def live_variables(func: IRFunction, tracked: Optional[Callable[[str], bool]] = None,
+                   blocks: Optional[List[BasicBlock]] = None) -> DataflowResult:
+    """
+    Живые временные на входе/выходе блоков (обратная задача, объединение).
+    Приёмники PHI определяются на входе блока; источник PHI используется
+    на ребре из соответствующего предшественника. tracked ограничивает
+    задачу частью временных.
+    """
+    blocks = blocks if blocks is not None else func.blocks
+    numbering = BitNumbering()
+    gen, kill = {}, {}
+    edge_gen: Dict[Tuple[BasicBlock, BasicBlock], int] = {}
+    for block in blocks:
+        g = k = 0
+        for instr in block.instructions:
+            if isinstance(instr, PhiInst):
+                for value, label in instr.sources:
+                    if value is None or value.operand_type is not IROperandType.TEMPORARY:
+                        continue
+                    if tracked is None or tracked(value.value):
+                        pred = func.get_block(label)
+                        if pred is not None:
+                            key = (pred, block)
+                            edge_gen[key] = edge_gen.get(key, 0) | 1 << numbering.add(value.value)
+            else:
+                for name in used_temps(instr):
+                    if tracked is None or tracked(name):
+                        bit = 1 << numbering.add(name)
+                        if not k & bit:
+                            g |= bit
+            dest = defined_temp(instr)
+            if dest is not None and (tracked is None or tracked(dest)):
+                k |= 1 << numbering.add(dest)
+        gen[block], kill[block] = g, k
+    problem = DataflowProblem(blocks, gen, kill, numbering, forward=False, edge_gen=edge_gen)
+    return solve(problem, func)
+
+
+def reaching_definitions(func: IRFunction) -> DataflowResult:
+    """
+    Достигающие определения (прямая задача, объединение). Элементы
+    нумерации — пары (блок, инструкция), ключ — id инструкции.
+    """
+    numbering = BitNumbering()
+    defs_of: Dict[str, int] = {}
+    block_defs = []
+    for block in func.blocks:
+        last: Dict[str, int] = {}
+        for instr in block.instructions:
+            dest = defined_temp(instr)
+            if dest is not None:
+                bit = 1 << numbering.add(id(instr), (block, instr))
+                defs_of[dest] = defs_of.get(dest, 0) | bit
+                last[dest] = bit
+        block_defs.append((block, last))
+
+    gen, kill = {}, {}
+    for block, last in block_defs:
+        g = k = 0
+        for dest, bit in last.items():
+            g |= bit
+            k |= defs_of[dest]
+        gen[block], kill[block] = g, k & ~g
+    problem = DataflowProblem(func.blocks, gen, kill, numbering, forward=True)
+    return solve(problem, func)
+
+
+# Чистые операции, которые можно переиспользовать, пока операнды не переопределены
+EXPRESSION_OPCODES = frozenset({
+    IROpcode.ADD, IROpcode.SUB, IROpcode.MUL, IROpcode.DIV, IROpcode.MOD,
+    IROpcode.NEG, IROpcode.NOT, IROpcode.AND, IROpcode.OR, IROpcode.XOR,
+    IROpcode.CMP_EQ, IROpcode.CMP_NE, IROpcode.CMP_LT,
+    IROpcode.CMP_LE, IROpcode.CMP_GT, IROpcode.CMP_GE, IROpcode.GEP,
+})
+
+
+def expression_key(instr: IRInstruction) -> Optional[tuple]:
+    """Ключ выражения инструкции: опкод и операнды-источники."""
+    if instr.opcode not in EXPRESSION_OPCODES or len(instr.operands) < 2:
+        return None
+    return (instr.opcode,) + tuple((op.operand_type, op.value) for op in instr.operands[1:])
+
+
+def available_expressions(func: IRFunction) -> DataflowResult:
+    """
+    Доступные выражения (прямая задача, пересечение): выражение доступно,
+    если на каждом пути оно вычислено и его операнды после этого не менялись.
+    Элементы нумерации — ключи expression_key.
+    """
+    numbering = BitNumbering()
+    uses_of: Dict[str, int] = {}
+    for block in func.blocks:
+        for instr in block.instructions:
+            key = expression_key(instr)
+            if key is None:
+                continue
+            bit = 1 << numbering.add(key)
+            for op in instr.operands[1:]:
+                if op.operand_type is IROperandType.TEMPORARY:
+                    uses_of[op.value] = uses_of.get(op.value, 0) | bit
+
+    gen, kill = {}, {}
+    for block in func.blocks:
+        g = k = 0
+        for instr in block.instructions:
+            key = expression_key(instr)
+            if key is not None:
+                g |= numbering.bit(key)
+            dest = defined_temp(instr)
+            if dest is not None:
+                killed = uses_of.get(dest, 0)
+                g &= ~killed
+                k |= killed
+        gen[block], kill[block] = g, k & ~g
+    problem = DataflowProblem(func.blocks, gen, kill, numbering, forward=True, union=False)
+    return solve(problem, func)
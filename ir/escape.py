@@ -0,0 +1,113 @@
+# ir/escape.py
+"""
+Анализ убегания указателей на массивы.
+
+Указатель убегает из функции, если он сам, его копия или производный
+адрес (arr + k) возвращается RETURN, записывается значением STORE,
+передаётся внешней функции или в убегающий параметр функции программы.
+Адрес в LOAD/STORE, сравнение и передача в неубегающий параметр указатель
+не удерживают: после возврата из функции на массив никто не ссылается.
+
+Убегающие параметры считаются для всей программы сразу: сначала все
+параметры неубегающие, затем функции пересматриваются, пока множество
+убегающих растёт — рекурсивные вызовы сходятся к наименьшей неподвижной
+точке. Анализ работает на IR до построения SSA (PHI учитываются как копии).
+"""
+
+from typing import Dict, Iterable, Set
+
+from .call_graph import call_target
+from .control_flow import IRFunction, IRProgram
+from .ir_instructions import IRInstruction, IROpcode, IROperandType, PhiInst, DEF_OPCODES
+
+# Результат — тот же указатель или адрес внутри того же массива
+DERIVING_OPCODES = frozenset((IROpcode.MOVE, IROpcode.ADD, IROpcode.SUB, IROpcode.GEP))
+
+# Читают указатель, не сохраняя его
+NON_CAPTURING_OPCODES = frozenset((
+    IROpcode.CMP_EQ, IROpcode.CMP_NE, IROpcode.CMP_LT,
+    IROpcode.CMP_LE, IROpcode.CMP_GT, IROpcode.CMP_GE,
+))
+
+_NAMED = (IROperandType.TEMPORARY, IROperandType.VARIABLE)
+
+
+def _name(op) -> str:
+    """Имя временной или переменной (пустая строка для остальных операндов)."""
+    return op.value if op is not None and op.operand_type in _NAMED else ""
+
+
+class EscapeAnalysis:
+    """Убегающие параметры функций программы; проверка отдельных указателей."""
+
+    def __init__(self, program: IRProgram):
+        self.functions: Dict[str, IRFunction] = {func.name: func for func in program.functions}
+        self.escaping_params: Dict[str, Set[int]] = {name: set() for name in self.functions}
+        self.iterations = 0
+        changed = True
+        while changed:
+            changed = False
+            self.iterations += 1
+            for func in program.functions:
+                escaping = self.escaping_params[func.name]
+                for index, param in enumerate(func.parameters):
+                    if index not in escaping and self.escapes(func, [param.value]):
+                        escaping.add(index)
+                        changed = True
+
+    def param_escapes(self, name: str, index: int) -> bool:
+        """Убегает ли параметр index функции name (внешние функции — всегда)."""
+        escaping = self.escaping_params.get(name)
+        return escaping is None or index in escaping
+
+    def aliases(self, func: IRFunction, roots: Iterable[str]) -> Set[str]:
+        """roots и все имена, получающие их копию или производный адрес."""
+        names = set(roots)
+        changed = True
+        while changed:
+            changed = False
+            for block in func.blocks:
+                for instr in block.instructions:
+                    if isinstance(instr, PhiInst):
+                        sources = [value for value, _ in instr.sources]
+                    elif instr.opcode in DERIVING_OPCODES:
+                        sources = instr.operands[1:]
+                    else:
+                        continue
+                    dest = _name(instr.operands[0])
+                    if dest and dest not in names and any(_name(op) in names for op in sources):
+                        names.add(dest)
+                        changed = True
+        return names
+
+    def escapes(self, func: IRFunction, roots: Iterable[str]) -> bool:
+        """Убегает ли из func значение roots (временные или параметры @name)."""
+        names = self.aliases(func, roots)
+        for block in func.blocks:
+            instructions = block.instructions
+            for i, instr in enumerate(instructions):
+                if isinstance(instr, PhiInst):
+                    continue
+                opcode = instr.opcode
+                ops = instr.operands
+                start = 1 if opcode in DEF_OPCODES else 0
+                for k in range(start, len(ops)):
+                    if _name(ops[k]) in names and self._captures(instr, k, instructions, i):
+                        return True
+        return False
+
+    def _captures(self, instr: IRInstruction, k: int, instructions, i: int) -> bool:
+        """Удерживает ли instr указатель, стоящий операндом k."""
+        opcode = instr.opcode
+        if opcode in DERIVING_OPCODES:
+            # Копия в глобальную или память — убегание
+            return not _name(instr.operands[0])
+        if opcode in NON_CAPTURING_OPCODES or (opcode == IROpcode.LOAD and k == 1):
+            return False
+        if opcode == IROpcode.STORE:
+            return k != 0
+        if opcode == IROpcode.PARAM and k == 1:
+            index = instr.operands[0].value
+            call = next((x for x in instructions[i + 1:] if x.opcode == IROpcode.CALL), None)
+            return call is None or not isinstance(index, int) or self.param_escapes(call_target(call), index)
+        return True
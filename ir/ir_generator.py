@@ -4,7 +4,7 @@
 """
 
 from semantic.symbol_table import SymbolTable, SymbolInfo, SymbolKind, Type
-from typing import List, Optional, Any, Dict, Tuple, Union
+from typing import List, Optional, Set, Union
 from semantic.decorated_ast import (
     DecoratedProgram, DecoratedFunction, DecoratedBlock, DecoratedVar,
     DecoratedIf, DecoratedWhile, DecoratedFor, DecoratedReturn,
@@ -23,13 +23,20 @@ from parser.ast import (
     ExpressionNode, StatementNode, DeclarationNode
 )
 
-from .control_flow import IRProgram, IRFunction
+from .control_flow import IRProgram, IRFunction, JUMP_OPCODES, BLOCK_ENDING_OPCODES
 from .basic_block import BasicBlock
 from .ir_instructions import (
     IRInstruction, IROpcode, IROperand, IROperandType,
     Temp, Var, Lit, Label, Mem, Global, LabelInst, PhiInst
 )
 
+# Арифметика, результат которой вещественный, если оба операнда вещественные
+FLOAT_ARITHMETIC = frozenset(('+', '-', '*', '/'))
+
+
+def _is_float(operand: IROperand) -> bool:
+    return operand is not None and getattr(operand.ir_type, 'name', None) == 'float'
+
 
 class IRGenerator:
     """
@@ -44,11 +51,26 @@ class IRGenerator:
         self.current_block: Optional[BasicBlock] = None
         self.break_stack: List[BasicBlock] = []
         self.continue_stack: List[BasicBlock] = []
+        self.closed_blocks: Set[BasicBlock] = set()  # блоки, уже завершённые JUMP/RETURN
         self.last_value: Optional[IROperand] = None
         self.current_node = None
         self.label_counter = 0
 
-    def generate(self, ast: DecoratedProgram) -> IRProgram:
+    def generate(self, program: DecoratedProgram) -> IRProgram:
+        """
+        Генерирует IR из декорированной программы, построенной анализатором.
+
+        Используется таблица символов из DecoratedProgram, поэтому повторный
+        семантический анализ не нужен. DecoratedBlock не раскрывает операторы,
+        так что тела функций понижаются по исходным узлам (original).
+        """
+        if program.symbol_table is not None:
+            self.symbol_table = program.symbol_table
+        for decl in program.declarations:
+            if isinstance(decl, DecoratedFunction):
+                self._generate_function_from_ast(decl.original)
+            elif isinstance(decl, DecoratedVar):
+                self._generate_global_var_from_ast(decl.original)
         return self.program
 
     def generate_from_ast(self, ast: ProgramNode) -> IRProgram:
@@ -73,6 +95,7 @@ class IRGenerator:
         return_type = func_info.return_type_node if func_info else None
 
         func = IRFunction(node.name, return_type)
+        self.closed_blocks = set()
 
         entry_block = func.create_block("entry")
         func.set_entry(entry_block)
@@ -83,7 +106,8 @@ class IRGenerator:
 
             # Проверяем, является ли параметр массивом
             if hasattr(param, 'is_array') and param.is_array:
-                param_type = Type('ptr', is_array=True, size_bytes=8, alignment=8)
+                param_type = Type('ptr', is_array=True, size_bytes=8, alignment=8,
+                                  element_type=self._element_type(param.type_name))
             elif param.type_name == 'int':
                 param_type = Type('int', size_bytes=4, alignment=4)
             elif param.type_name == 'float':
@@ -113,6 +137,7 @@ class IRGenerator:
             else:
                 self._emit_return(Lit(0, return_type), node)
 
+        func.drop_unresolved_edges()
         self.current_function = None
         self.current_block = None
         self.current_node = None
@@ -156,7 +181,7 @@ class IRGenerator:
             else:
                 array_size = 10
 
-            element_type = Type('int', size_bytes=4, alignment=4)
+            element_type = self._element_type(node.type_name)
             array_type = Type(
                 name=f"array_{node.type_name}",
                 is_array=True,
@@ -171,6 +196,7 @@ class IRGenerator:
             ptr_type = Type(
                 name=f"array_{node.type_name}",
                 is_array=True,
+                element_type=element_type,
                 size_bytes=8
             )
             array_ptr = self.current_function.new_temp(f"array_{node.name}", ptr_type)
@@ -553,6 +579,8 @@ class IRGenerator:
                 right_val = self.last_value
 
                 expr_type = self._get_type_from_symbol_table(expr)
+                if expr.operator in FLOAT_ARITHMETIC and _is_float(left_val) and _is_float(right_val):
+                    expr_type = Type('float', size_bytes=4, alignment=4)
                 result = self.current_function.new_temp("binop", expr_type)
                 self._emit_binary(result, expr.operator, left_val, right_val, expr_type, expr)
                 self.last_value = result
@@ -610,7 +638,7 @@ class IRGenerator:
         addr_temp = self.current_function.new_temp("addr", Type('ptr'))
         self._emit(IRInstruction(IROpcode.ADD, [addr_temp, array_ptr, offset_temp]), node)
 
-        elem_type = self._get_type_from_symbol_table(node)
+        elem_type = getattr(array_ptr.ir_type, 'element_type', None) or self._get_type_from_symbol_table(node)
         result = self.current_function.new_temp("array_elem", elem_type)
         self._emit_load(result, addr_temp, node)
         self.last_value = result
@@ -673,6 +701,9 @@ class IRGenerator:
         else:
             # Обычный вызов функции, возвращающей простой тип
             expr_type = self._get_type_from_symbol_table(expr)
+            if return_type is not None and return_type.name == 'float':
+                # Результат приходит в xmm0
+                expr_type = return_type
             result = self.current_function.new_temp("call", expr_type)
             self._emit_call(result, callee_name, len(args), expr)
             self.last_value = result
@@ -779,6 +810,13 @@ class IRGenerator:
         self._emit_store(addr_temp, val, target)
         self.last_value = val
 
+    @staticmethod
+    def _element_type(type_name: str) -> Type:
+        """Тип элемента массива (4 байта: int или float)."""
+        if type_name == 'float':
+            return Type('float', size_bytes=4, alignment=4)
+        return Type('int', size_bytes=4, alignment=4)
+
     def _get_type_from_symbol_table(self, expr) -> Optional[Type]:
         if isinstance(expr, IdentifierExprNode):
             info = self.symbol_table.lookup(expr.name)
@@ -823,8 +861,20 @@ class IRGenerator:
     def _emit(self, instr: IRInstruction, node=None):
         if node and hasattr(node, 'line'):
             instr.comment = f"line {node.line}"
-        if self.current_block:
-            self.current_block.add_instruction(instr)
+        block = self.current_block
+        if block:
+            block.add_instruction(instr)
+            if instr.opcode in JUMP_OPCODES or instr.opcode is IROpcode.RETURN:
+                self._add_cfg_edge(block, instr)
+
+    def _add_cfg_edge(self, block: BasicBlock, instr: IRInstruction):
+        """Ребро CFG для перехода; после JUMP/RETURN блок закрыт, дальше мёртвый код."""
+        if block in self.closed_blocks:
+            return
+        if instr.opcode in BLOCK_ENDING_OPCODES:
+            self.closed_blocks.add(block)
+        if instr.opcode in JUMP_OPCODES:
+            self.current_function.add_jump_edge(block, instr.operands[-1].value)
 
     def _emit_binary(self, dest: IROperand, op: str, left: IROperand, right: IROperand, ir_type=None, node=None):
         opcode_map = {
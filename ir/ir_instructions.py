@@ -4,8 +4,7 @@
 """
 
 from enum import Enum, auto
-from typing import List, Optional, Union, Any
-from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union, Any
 
 
 class IROpcode(Enum):
@@ -53,6 +52,29 @@ class IROpcode(Enum):
     # Data Movement
     MOVE = auto()
 
+    # Vector
+    BROADCAST = auto()  # Скаляр во все элементы вектора
+
+
+# Опкоды, у которых operands[0] — результат (приёмник)
+DEF_OPCODES = frozenset({
+    IROpcode.ADD, IROpcode.SUB, IROpcode.MUL, IROpcode.DIV, IROpcode.MOD,
+    IROpcode.NEG, IROpcode.NOT, IROpcode.AND, IROpcode.OR, IROpcode.XOR,
+    IROpcode.CMP_EQ, IROpcode.CMP_NE, IROpcode.CMP_LT,
+    IROpcode.CMP_LE, IROpcode.CMP_GT, IROpcode.CMP_GE,
+    IROpcode.LOAD, IROpcode.ALLOCA, IROpcode.GEP, IROpcode.MOVE,
+    IROpcode.CALL, IROpcode.PHI, IROpcode.BROADCAST,
+})
+
+# Векторы SSE: VECTOR_WIDTH элементов по 4 байта. ADD/SUB/MUL/DIV, LOAD и
+# STORE над временными такого типа обрабатывают все элементы сразу
+VECTOR_WIDTH = 4
+VECTOR_TYPE_NAMES = frozenset(('vector_int', 'vector_float'))
+
+
+def is_vector_type(ir_type) -> bool:
+    return getattr(ir_type, 'name', None) in VECTOR_TYPE_NAMES
+
 
 class IROperandType(Enum):
     """Типы операндов IR."""
@@ -64,16 +86,34 @@ class IROperandType(Enum):
     GLOBAL = auto()      # @global_var
 
 
-@dataclass
 class IROperand:
-    """Операнд инструкции IR."""
-    operand_type: IROperandType
-    value: Any  # Имя, номер или литерал
-    ir_type: Optional[Any] = None  # Тип из семантического анализатора
-
-    # Для адресной арифметики (MEMORY)
-    base: Optional[str] = None
-    offset: int = 0
+    """
+    Операнд инструкции IR.
+
+    Класс со __slots__ вместо dataclass: операндов в программе десятки тысяч,
+    и словарь атрибутов у каждого из них — основная статья расхода памяти IR.
+    Сравнение — по полям, как у dataclass; операнды не хэшируются.
+    """
+    __slots__ = ('operand_type', 'value', 'ir_type', 'base', 'offset')
+
+    def __init__(self, operand_type: IROperandType, value: Any,
+                 ir_type: Optional[Any] = None, base: Optional[str] = None, offset: int = 0):
+        self.operand_type = operand_type
+        self.value = value  # Имя, номер или литерал
+        self.ir_type = ir_type  # Тип из семантического анализатора
+
+        # Для адресной арифметики (MEMORY)
+        self.base = base
+        self.offset = offset
+
+    def __eq__(self, other: Any) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.operand_type == other.operand_type and self.value == other.value and
+                self.ir_type == other.ir_type and self.base == other.base and
+                self.offset == other.offset)
+
+    __hash__ = None
 
     def __str__(self) -> str:
         if self.operand_type == IROperandType.TEMPORARY:
@@ -100,12 +140,28 @@ class IROperand:
         return self.__str__()
 
 
-@dataclass
 class IRInstruction:
     """Базовый класс для всех инструкций IR."""
-    opcode: IROpcode
-    operands: List[IROperand] = field(default_factory=list)
-    comment: Optional[str] = None  # Для отладки (связь с исходным кодом)
+    __slots__ = ('opcode', 'operands', 'comment', 'is_float_comparison')
+
+    def __init__(self, opcode: IROpcode, operands: Optional[List[IROperand]] = None,
+                 comment: Optional[str] = None):
+        self.opcode = opcode
+        self.operands = operands if operands is not None else []
+        self.comment = comment  # Для отладки (связь с исходным кодом)
+        self.is_float_comparison = False  # Сравнение вещественных (ставит IRGenerator)
+
+    def __eq__(self, other: Any) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.opcode == other.opcode and self.operands == other.operands and
+                self.comment == other.comment)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (f"{self.__class__.__name__}(opcode={self.opcode!r}, "
+                f"operands={self.operands!r}, comment={self.comment!r})")
 
     def __str__(self) -> str:
         # Определяем, нужен ли dest
@@ -125,7 +181,7 @@ class IRInstruction:
                 instr_str = f"{dest} = {self.opcode.name} {op1}"
             else:
                 instr_str = f"{self.opcode.name} " + ", ".join(str(op) for op in self.operands)
-        elif self.opcode in (IROpcode.NEG, IROpcode.NOT):
+        elif self.opcode in (IROpcode.NEG, IROpcode.NOT, IROpcode.BROADCAST):
             if len(self.operands) >= 2:
                 dest = self.operands[0]
                 op1 = self.operands[1]
@@ -173,6 +229,33 @@ class IRInstruction:
 
 
 # ============= Фабрики для создания операндов =============
+#
+# Литералы и метки встречаются в IR многократно (Lit(0), Lit(1), размеры
+# элементов, метки переходов), поэтому Lit и Label возвращают общий
+# экземпляр для одинаковых аргументов. Общие операнды нельзя изменять на
+# месте — вместо этого создаётся новый операнд. Временные (Temp) не
+# интернируются: IRGenerator уточняет их ir_type после создания.
+
+# Целые литералы, которые интернируются (индексы, размеры, 0/1 для bool)
+_INTERNED_INT_RANGE = range(-1, 257)
+
+# Ограничение на число интернированных меток: при превышении кэш сбрасывается,
+# чтобы долгоживущий процесс (тесты, -j) не копил метки прошлых компиляций
+_LABEL_CACHE_LIMIT = 4096
+
+_lit_cache: Dict[tuple, IROperand] = {}
+_label_cache: Dict[str, IROperand] = {}
+
+
+def _scalar_type_key(ir_type) -> Optional[tuple]:
+    """Ключ скалярного типа для кэша литералов; None — тип не подходит для интернирования."""
+    if not hasattr(ir_type, 'size_bytes'):
+        return None
+    if (ir_type.is_struct or ir_type.is_array or ir_type.fields or ir_type.param_types or
+            ir_type.return_type is not None or ir_type.element_type is not None):
+        return None
+    return ir_type.name, ir_type.size_bytes, ir_type.alignment
+
 
 def Temp(name: Union[str, int], ir_type=None) -> IROperand:
     return IROperand(IROperandType.TEMPORARY, str(name), ir_type)
@@ -183,11 +266,29 @@ def Var(name: str, ir_type=None) -> IROperand:
 
 
 def Lit(value: Any, ir_type=None) -> IROperand:
+    value_class = value.__class__
+    if (value_class is bool or value_class is int) and value in _INTERNED_INT_RANGE:
+        if ir_type is None:
+            key = (value_class, value, None)
+        else:
+            type_key = _scalar_type_key(ir_type)
+            if type_key is None:
+                return IROperand(IROperandType.LITERAL, value, ir_type)
+            key = (value_class, value, type_key)
+        operand = _lit_cache.get(key)
+        if operand is None:
+            operand = _lit_cache[key] = IROperand(IROperandType.LITERAL, value, ir_type)
+        return operand
     return IROperand(IROperandType.LITERAL, value, ir_type)
 
 
 def Label(name: str) -> IROperand:
-    return IROperand(IROperandType.LABEL, name)
+    operand = _label_cache.get(name)
+    if operand is None:
+        if len(_label_cache) >= _LABEL_CACHE_LIMIT:
+            _label_cache.clear()
+        operand = _label_cache[name] = IROperand(IROperandType.LABEL, name)
+    return operand
 
 
 def Mem(base: str, offset: int = 0, ir_type=None) -> IROperand:
@@ -202,6 +303,8 @@ def Global(name: str, ir_type=None) -> IROperand:
 
 class LabelInst(IRInstruction):
     """Инструкция-метка."""
+    __slots__ = ('name',)
+
     def __init__(self, name: str):
         super().__init__(IROpcode.LABEL, [Label(name)])
         self.name = name
@@ -212,6 +315,8 @@ class LabelInst(IRInstruction):
 
 class PhiInst(IRInstruction):
     """PHI инструкция."""
+    __slots__ = ('sources',)
+
     def __init__(self, dest: IROperand, sources: List[tuple]):
         """
         sources: список кортежей (значение, имя_блока)
@@ -222,4 +327,22 @@ class PhiInst(IRInstruction):
     def __str__(self):
         dest = self.operands[0]
         sources_str = ", ".join(f"[ {val}, %{block} ]" for val, block in self.sources)
-        return f"{dest} = PHI {sources_str}"
\ No newline at end of file
+        return f"{dest} = PHI {sources_str}"
+
+
+def defined_temp(instr: IRInstruction) -> Optional[str]:
+    """Имя временной, которую определяет инструкция."""
+    if instr.opcode in DEF_OPCODES and instr.operands:
+        dest = instr.operands[0]
+        if dest.operand_type is IROperandType.TEMPORARY:
+            return dest.value
+    return None
+
+
+def used_temps(instr: IRInstruction) -> List[str]:
+    """Имена временных, которые читает инструкция (для PHI — источники)."""
+    if isinstance(instr, PhiInst):
+        return [value.value for value, _ in instr.sources
+                if value is not None and value.operand_type is IROperandType.TEMPORARY]
+    operands = instr.operands[1:] if instr.opcode in DEF_OPCODES else instr.operands
+    return [op.value for op in operands if op.operand_type is IROperandType.TEMPORARY]
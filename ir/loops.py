@@ -0,0 +1,143 @@
+# ir/loops.py
+"""
+Естественные циклы и предзаголовки.
+
+Обратное ребро — ребро latch -> header, где header доминирует над latch.
+Тело естественного цикла — header и все блоки, из которых latch достижим
+без прохода через header; циклы с общим заголовком объединяются.
+
+Предзаголовок — единственный внешний предшественник заголовка с
+единственным преемником (заголовком). Если его нет, insert_preheader
+создаёт новый блок, перенаправляет в него внешние входы и, для SSA,
+переносит внешние источники PHI заголовка в PHI предзаголовка.
+"""
+
+from typing import Dict, List, Optional, Set
+
+from .basic_block import BasicBlock
+from .control_flow import IRFunction, JUMP_OPCODES
+from .ir_instructions import IRInstruction, IROpcode, IROperandType, PhiInst, Label, Temp
+from .ssa import DominatorTree, VERSION_SEPARATOR, phis, ssa_base
+
+
+class Loop:
+    """Естественный цикл: заголовок, тело, блоки с обратными рёбрами."""
+
+    def __init__(self, header: BasicBlock):
+        self.header = header
+        self.blocks: Set[BasicBlock] = {header}
+        self.latches: List[BasicBlock] = []
+        self.preheader: Optional[BasicBlock] = None
+
+    def outside_predecessors(self) -> List[BasicBlock]:
+        return [pred for pred in self.header.predecessors if pred not in self.blocks]
+
+    def __contains__(self, block: BasicBlock) -> bool:
+        return block in self.blocks
+
+    def __repr__(self) -> str:
+        return f"Loop({self.header.label}, {len(self.blocks)} blocks)"
+
+
+def natural_loops(func: IRFunction, dom: Optional[DominatorTree] = None) -> List[Loop]:
+    """
+    Естественные циклы функции, вложенные — раньше объемлющих (по размеру
+    тела). Для каждого цикла заполняется preheader, если он уже есть.
+    """
+    if not func.blocks:
+        return []
+    dom = dom or DominatorTree(func)
+    loops: Dict[BasicBlock, Loop] = {}
+    for block in dom.rpo:
+        for succ in block.successors:
+            if succ in dom.idom and dom.dominates(succ, block):
+                loop = loops.get(succ)
+                if loop is None:
+                    loop = loops[succ] = Loop(succ)
+                loop.latches.append(block)
+                work = [block]
+                while work:
+                    member = work.pop()
+                    if member in loop.blocks:
+                        continue
+                    loop.blocks.add(member)
+                    work.extend(pred for pred in member.predecessors if pred in dom.idom)
+
+    for loop in loops.values():
+        outside = loop.outside_predecessors()
+        if len(outside) == 1 and outside[0].successors == [loop.header]:
+            loop.preheader = outside[0]
+    return sorted(loops.values(), key=lambda loop: len(loop.blocks))
+
+
+def insert_preheader(func: IRFunction, loop: Loop) -> Optional[BasicBlock]:
+    """
+    Предзаголовок цикла; при необходимости создаётся новый блок.
+    None — если у заголовка нет внешних входов (цикл через entry).
+    """
+    if loop.preheader is not None:
+        return loop.preheader
+    header = loop.header
+    outside = loop.outside_predecessors()
+    if not outside:
+        return None
+
+    preheader = func.create_block(f"{header.label}_preheader")
+    preheader.add_instruction(IRInstruction(IROpcode.JUMP, [Label(header.label)]))
+    outside_labels = {pred.label for pred in outside}
+
+    # Внешние источники PHI сливаются в предзаголовке
+    for phi in phis(header):
+        incoming = [(value, label) for value, label in phi.sources if label in outside_labels]
+        inside = [(value, label) for value, label in phi.sources if label not in outside_labels]
+        values = {None if value is None else (value.operand_type, value.value) for value, _ in incoming}
+        if len(values) == 1:
+            merged = incoming[0][0]
+        else:
+            dest = phi.operands[0]
+            name = f"{ssa_base(dest.value)}{VERSION_SEPARATOR}{func.new_label('ph')}"
+            merged = Temp(name, dest.ir_type)
+            preheader.instructions.insert(0, PhiInst(merged, incoming))
+        phi.sources = inside + [(merged, preheader.label)]
+
+    preheader_label = Label(preheader.label)
+    for pred in outside:
+        for instr in pred.instructions:
+            if instr.opcode in JUMP_OPCODES:
+                instr.operands = [preheader_label if op.operand_type is IROperandType.LABEL
+                                  and op.value == header.label else op
+                                  for op in instr.operands]
+        pred.successors[pred.successors.index(header)] = preheader
+        header.predecessors.remove(pred)
+        preheader.predecessors.append(pred)
+    header.predecessors.append(preheader)
+    preheader.successors.append(header)
+
+    # Источники PHI — в порядке предшественников
+    order = {pred.label: i for i, pred in enumerate(header.predecessors)}
+    for phi in phis(header):
+        phi.sources.sort(key=lambda source: order[source[1]])
+
+    func.invalidate_def_use()
+    loop.preheader = preheader
+    return preheader
+
+
+def loops_with_preheaders(func: IRFunction, dom: Optional[DominatorTree] = None):
+    """
+    Циклы функции с предзаголовками (недостающие создаются).
+    Возвращает (дерево доминаторов, циклы, число созданных предзаголовков);
+    после вставки блоков циклы и доминаторы строятся заново.
+    """
+    if not func.blocks:
+        return None, [], 0
+    dom = dom or DominatorTree(func)
+    loops = natural_loops(func, dom)
+    created = 0
+    for loop in loops:
+        if loop.preheader is None and insert_preheader(func, loop) is not None:
+            created += 1
+    if created:
+        dom = DominatorTree(func)
+        loops = natural_loops(func, dom)
+    return dom, loops, created
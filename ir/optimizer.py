@@ -4,12 +4,22 @@
 """
 
 from typing import List, Dict, Set, Optional, Any, Tuple
-from .control_flow import IRProgram, IRFunction
+from semantic.symbol_table import Type
+from .control_flow import IRProgram, IRFunction, JUMP_OPCODES, BLOCK_ENDING_OPCODES
 from .basic_block import BasicBlock
 from .ir_instructions import (
     IRInstruction, IROpcode, IROperand, IROperandType,
-    Temp, Lit, Label, Var, Global, LabelInst, PhiInst
+    Temp, Lit, Label, Var, Global, LabelInst, PhiInst, DEF_OPCODES, VECTOR_WIDTH, defined_temp, used_temps
 )
+from .call_graph import CallGraph, call_target
+from .dataflow import EXPRESSION_OPCODES, DataflowResult, live_variables
+from .escape import EscapeAnalysis
+from .loops import loops_with_preheaders
+from .pass_manager import (
+    Pass, PassManager, StatsPass, FunctionPass, FixedPoint, CFG, DOMINATORS, LIVENESS,
+    EDGE_ANALYSES, INSTRUCTION_ANALYSES
+)
+from .ssa import DominatorTree, SSABuilder, SSADestructor, VERSION_SEPARATOR, phis
 
 
 class ConstantFolder:
@@ -26,6 +36,7 @@ class ConstantFolder:
 
     def _fold_function(self, func: IRFunction):
         """Выполняет константную свертку над одной функцией."""
+        func.invalidate_def_use()
         for block in func.blocks:
             self._fold_block(block)
 
@@ -92,18 +103,22 @@ class ConstantFolder:
             elif instr.opcode == IROpcode.DIV:
                 if right.value == 0:
                     return instr
-                # Если оба int — целочисленное деление
+                # Если оба int — целочисленное деление с усечением к нулю, как idiv
                 if isinstance(left.value, int) and isinstance(right.value, int):
-                    result = left.value // right.value
+                    result = _c_div(left.value, right.value)
                 else:
                     result = left.value / right.value
             elif instr.opcode == IROpcode.MOD:
                 if right.value == 0:
                     return instr
-                result = int(left.value) % int(right.value)
+                a, b = int(left.value), int(right.value)
+                result = a - b * _c_div(a, b)
             else:
                 return instr
 
+            if isinstance(left.value, int) and isinstance(right.value, int):
+                result = _wrap_int32(result)
+
             # Приводим float к int, если результат целый
             if isinstance(result, float) and result == int(result):
                 result = int(result)
@@ -200,13 +215,20 @@ class ConstantFolder:
             return instr
 
         result = -operand.value
+        if isinstance(result, int):
+            result = _wrap_int32(result)
         lit = Lit(result, dest.ir_type)
         self.stats["folded"] += 1
         return IRInstruction(IROpcode.MOVE, [dest, lit])
 
 
 class ConstantPropagator:
-    """Распространение констант - замена переменных на известные константы."""
+    """
+    Распространение констант - замена переменных на известные константы.
+
+    Не учитывает поток управления; IROptimizer использует
+    SparseConditionalConstantPropagator.
+    """
 
     def __init__(self):
         self.stats = {"propagated": 0}
@@ -221,6 +243,7 @@ class ConstantPropagator:
 
     def _propagate_function(self, func: IRFunction):
         """Выполняет распространение констант в функции."""
+        func.invalidate_def_use()
         changed = True
         iteration = 0
         max_iterations = 10
@@ -299,66 +322,1519 @@ class ConstantPropagator:
         return instr
 
 
-class DeadCodeEliminator:
-    """Удаление мертвого кода - инструкций, результат которых не используется."""
+def _c_div(a: int, b: int) -> int:
+    """Целочисленное деление с усечением к нулю (C, x86 idiv), а не к минус бесконечности."""
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+
+def _wrap_int32(value: int) -> int:
+    """Приводит результат к знаковому 32-битному int, как 32-битные регистры."""
+    return (value + 0x80000000) % 0x100000000 - 0x80000000
+
+
+# Решётка SCCP: значение отсутствует в словаре — TOP (ещё не вычислено),
+# Lit — константа, _OVERDEFINED — не константа
+_OVERDEFINED = object()
+
+_FOLDABLE_OPCODES = frozenset({
+    IROpcode.ADD, IROpcode.SUB, IROpcode.MUL, IROpcode.DIV, IROpcode.MOD,
+    IROpcode.AND, IROpcode.OR, IROpcode.XOR, IROpcode.NOT, IROpcode.NEG,
+    IROpcode.CMP_EQ, IROpcode.CMP_NE, IROpcode.CMP_LT,
+    IROpcode.CMP_LE, IROpcode.CMP_GT, IROpcode.CMP_GE,
+})
+
+
+class FunctionInliner:
+    """
+    Встраивание функций по графу вызовов (до построения SSA).
+
+    Функции обходятся снизу вверх по компонентам сильной связности, поэтому
+    вызываемая функция встраивается уже со своими встроенными вызовами.
+    Встраивается вызов функции этой же программы, если она не рекурсивна,
+    не длиннее threshold инструкций IR, не использует ALLOCA и не
+    возвращает структуру. Временные и метки копии тела получают суффикс
+    _inlN; PARAM вызова становятся MOVE в новые временные, которые заменяют
+    параметры @name, RETURN — MOVE в приёмник CALL и JUMP в блок
+    продолжения с инструкциями, шедшими после вызова.
+    """
+
+    DEFAULT_THRESHOLD = 30
+
+    def __init__(self, threshold: Optional[int] = None):
+        self.threshold = self.DEFAULT_THRESHOLD if threshold is None else threshold
+        self.stats = {"inlined": 0, "functions": 0}
+        self.sizes: Dict[str, int] = {}
+
+    def run(self, program: IRProgram) -> IRProgram:
+        if self.threshold <= 0:
+            return program
+        graph = CallGraph(program)
+        for func in graph.bottom_up():
+            if graph.sites[func.name]:
+                self._run_function(func, graph)
+        return program
+
+    def _run_function(self, func: IRFunction, graph: CallGraph):
+        inlined = 0
+        position, start = 0, 0
+        while position < len(func.blocks):
+            site = self._find_site(func.blocks[position], graph, start)
+            if site is None:
+                position, start = position + 1, 0
+                continue
+            # Поиск продолжается после встроенного тела: оно уже обработано
+            position, start = self._inline(func, position, *site)
+            inlined += 1
+        if inlined:
+            func.rebuild_cfg()
+            func.invalidate_def_use()
+            self.stats["inlined"] += inlined
+            self.stats["functions"] += 1
+
+    def _size(self, func: IRFunction) -> int:
+        size = self.sizes.get(func.name)
+        if size is None:
+            size = self.sizes[func.name] = sum(len(block.instructions) for block in func.blocks)
+        return size
+
+    def _find_site(self, block: BasicBlock, graph: CallGraph, start: int) -> Optional[Tuple[int, IRFunction]]:
+        """Первый встраиваемый вызов блока от start: (индекс CALL, вызываемая функция)."""
+        for index in range(start, len(block.instructions)):
+            instr = block.instructions[index]
+            callee = graph.functions.get(call_target(instr))
+            if callee is not None and self._inlinable(block, index, callee, graph):
+                return index, callee
+            if instr.opcode in BLOCK_ENDING_OPCODES:
+                break
+        return None
+
+    def _inlinable(self, block: BasicBlock, index: int, callee: IRFunction, graph: CallGraph) -> bool:
+        if graph.is_recursive(callee.name) or self._size(callee) > self.threshold:
+            return False
+        if getattr(callee.return_type, 'is_struct', False):
+            return False
+        if any(instr.opcode == IROpcode.ALLOCA for b in callee.blocks for instr in b.instructions):
+            return False
+        call = block.instructions[index]
+        count = len(callee.parameters)
+        if len(call.operands) < 3 or call.operands[2].value != count or index < count:
+            return False
+        # Аргументы передаются PARAM непосредственно перед CALL; тип (целый или
+        # вещественный) должен совпадать, иначе вызов передал бы другие регистры
+        for k, (param, instr) in enumerate(zip(callee.parameters, block.instructions[index - count:index])):
+            if instr.opcode != IROpcode.PARAM or instr.operands[0].value != k \
+                    or _float_operand(instr.operands[1]) != _float_operand(param):
+                return False
+        dest = call.operands[0]
+        if dest.value != "void" and _float_operand(dest) != (getattr(callee.return_type, 'name', '') == 'float'):
+            return False
+        return True
+
+    def _inline(self, func: IRFunction, position: int, index: int, callee: IRFunction) -> Tuple[int, int]:
+        """
+        Встраивает CALL block.instructions[index] блока func.blocks[position].
+        Возвращает (номер блока, индекс инструкции), с которых продолжать поиск.
+        Тело из одного блока с RETURN в конце вставляется прямо в блок вызова.
+        """
+        block = func.blocks[position]
+        call = block.instructions[index]
+        count = len(callee.parameters)
+        tag = func.new_label("inl")
+
+        args: Dict[str, IROperand] = {}
+        moves = []
+        for k, (param, instr) in enumerate(zip(callee.parameters, block.instructions[index - count:index])):
+            arg = Temp(f"{tag}_arg{k}", param.ir_type)
+            args[param.value] = arg
+            moves.append(IRInstruction(IROpcode.MOVE, [arg, instr.operands[1]], instr.comment))
+
+        dest = call.operands[0]
+        result = dest if dest.value != "void" else None
+        before, after = block.instructions[:index - count], block.instructions[index + 1:]
+
+        def copy(op: IROperand) -> IROperand:
+            if op.operand_type is IROperandType.TEMPORARY and op.value != "void":
+                return Temp(f"{op.value}_{tag}", op.ir_type)
+            if op.operand_type is IROperandType.LABEL:
+                return Label(f"{op.value}_{tag}")
+            if op.operand_type is IROperandType.VARIABLE:
+                return args.get(op.value, op)
+            return op
+
+        def copy_block(instructions: List[IRInstruction], continuation: Optional[str]) -> List[IRInstruction]:
+            copied = []
+            for instr in instructions:
+                if instr.opcode == IROpcode.RETURN:
+                    if result is not None and instr.operands:
+                        copied.append(IRInstruction(IROpcode.MOVE, [result, copy(instr.operands[0])], instr.comment))
+                    if continuation is not None:
+                        copied.append(IRInstruction(IROpcode.JUMP, [Label(continuation)], instr.comment))
+                    continue
+                new_instr = IRInstruction(instr.opcode, [copy(op) for op in instr.operands], instr.comment)
+                new_instr.is_float_comparison = instr.is_float_comparison
+                copied.append(new_instr)
+            return copied
+
+        callee_blocks = callee.blocks
+        returns = [instr for instr in callee_blocks[0].instructions if instr.opcode == IROpcode.RETURN]
+        if len(callee_blocks) == 1 and returns and callee_blocks[0].instructions[-1] is returns[0]:
+            body = copy_block(callee_blocks[0].instructions, None)
+            block.instructions = before + moves + body
+            start = len(block.instructions)
+            block.instructions.extend(after)
+            return position, start
+
+        continuation = BasicBlock(f"{callee.name}_return_{tag}")
+        continuation.instructions = after
+        entry_label = f"{callee_blocks[0].label}_{tag}"
+        block.instructions = before + moves + [IRInstruction(IROpcode.JUMP, [Label(entry_label)], call.comment)]
+        body = []
+        for callee_block in callee_blocks:
+            new_block = BasicBlock(f"{callee_block.label}_{tag}")
+            new_block.instructions = copy_block(callee_block.instructions, continuation.label)
+            body.append(new_block)
+        func.blocks[position + 1:position + 1] = body + [continuation]
+        return position + len(body) + 1, 0
+
+
+class TailCallEliminator:
+    """
+    Устранение хвостовой саморекурсии (до построения SSA).
+
+    Хвостовой вызов — CALL самой функции, после которого (через копии MOVE
+    и безусловные переходы) выполняется RETURN его результата или RETURN
+    без значения. Он заменяется присваиванием аргументов временным
+    параметров и переходом в начало тела: entry делится на копирование
+    параметров @name и новый заголовок цикла tailrecurseN.
+
+    Для целых функций допускается и RETURN r + x / RETURN r * x, где r —
+    результат вызова, а x вычислен до него (fib(n - 1) + fib(n - 2)):
+    x накапливается в аккумуляторе (начальное значение 0 или 1), а каждый
+    оставшийся RETURN v возвращает acc + v (acc * v).
+    """
+
+    ACCUMULATOR_IDENTITY = {IROpcode.ADD: 0, IROpcode.MUL: 1}
 
     def __init__(self):
-        self.stats = {"removed": 0}
+        self.stats = {"eliminated": 0, "accumulated": 0}
 
-    def eliminate(self, program: IRProgram) -> IRProgram:
-        """Удаляет мертвый код."""
+    def run(self, program: IRProgram) -> IRProgram:
         for func in program.functions:
-            self._eliminate_function(func)
+            self._run_function(func)
         return program
 
-    def _eliminate_function(self, func: IRFunction):
-        """Удаляет мертвый код из функции (глобальный анализ)."""
-        changed = True
-        max_iterations = 10
-        iteration = 0
+    def _run_function(self, func: IRFunction):
+        if not func.blocks:
+            return
+        integer = getattr(func.return_type, 'name', '') == 'int'
+        sites = []
+        for block in func.blocks:
+            for index, instr in enumerate(block.instructions):
+                if call_target(instr) == func.name and self._arguments_ready(block, index, func):
+                    accumulate = self._tail_use(func, block, index)
+                    if accumulate is not None and (accumulate is True or integer):
+                        sites.append((block, index, accumulate))
+                        break
+                if instr.opcode in BLOCK_ENDING_OPCODES:
+                    break
+        # Аккумулятор один на функцию: сайты с другой операцией остаются вызовами
+        opcodes = {accumulate[0] for _, _, accumulate in sites if accumulate is not True}
+        if len(opcodes) > 1:
+            first = next(accumulate[0] for _, _, accumulate in sites if accumulate is not True)
+            sites = [site for site in sites if site[2] is True or site[2][0] == first]
+            opcodes = {first}
+        if not sites:
+            return
+        param_temps = self._parameter_temps(func)
+        if param_temps is None:
+            return
 
-        while changed and iteration < max_iterations:
-            changed = False
-            iteration += 1
+        # entry: копии параметров; остальное — в заголовок, куда ведут хвостовые вызовы
+        entry = func.blocks[0]
+        count = len(func.parameters)
+        header = BasicBlock(func.new_label("tailrecurse"))
+        header.instructions = entry.instructions[count:]
+        entry.instructions = entry.instructions[:count]
+        func.blocks.insert(1, header)
+        sites = [(header, index - count, accumulate) if block is entry else (block, index, accumulate)
+                 for block, index, accumulate in sites]
+        accumulator = None
+        if opcodes:
+            opcode = opcodes.pop()
+            accumulator = func.new_temp("acc", func.return_type)
+            entry.add_instruction(IRInstruction(
+                IROpcode.MOVE, [accumulator, Lit(self.ACCUMULATOR_IDENTITY[opcode], func.return_type)]))
+            self._accumulate_returns(func, opcode, accumulator, {id(block) for block, _, _ in sites})
+        entry.add_instruction(IRInstruction(IROpcode.JUMP, [Label(header.label)]))
+
+        for block, index, accumulate in sites:
+            call = block.instructions[index]
+            instructions = block.instructions[:index - count]
+            temps = []
+            for k, instr in enumerate(block.instructions[index - count:index]):
+                temp = func.new_temp("tail_arg", param_temps[k].ir_type)
+                temps.append(temp)
+                instructions.append(IRInstruction(IROpcode.MOVE, [temp, instr.operands[1]], instr.comment))
+            if accumulate is not True:
+                opcode, other = accumulate
+                instructions.append(IRInstruction(opcode, [accumulator, accumulator, other], call.comment))
+                self.stats["accumulated"] += 1
+            for param_temp, temp in zip(param_temps, temps):
+                instructions.append(IRInstruction(IROpcode.MOVE, [param_temp, temp], call.comment))
+            instructions.append(IRInstruction(IROpcode.JUMP, [Label(header.label)], call.comment))
+            block.instructions = instructions
+            self.stats["eliminated"] += 1
+
+        func.rebuild_cfg()
+        func.invalidate_def_use()
+
+    @staticmethod
+    def _arguments_ready(block: BasicBlock, index: int, func: IRFunction) -> bool:
+        """Аргументы вызова — PARAM 0..n-1 сразу перед CALL."""
+        count = len(func.parameters)
+        call = block.instructions[index]
+        if len(call.operands) < 3 or call.operands[2].value != count or index < count:
+            return False
+        return all(instr.opcode == IROpcode.PARAM and instr.operands[0].value == k
+                   for k, instr in enumerate(block.instructions[index - count:index]))
+
+    def _tail_use(self, func: IRFunction, block: BasicBlock, index: int):
+        """
+        Как используется результат вызова: True — сразу возвращается,
+        (опкод, x) — возвращается r op x, None — вызов не хвостовой.
+        """
+        values = {block.instructions[index].operands[0].value}
+        accumulate = None
+        visited = set()
+        instructions = block.instructions[index + 1:]
+        while True:
+            for instr in instructions:
+                ops = instr.operands
+                if instr.opcode == IROpcode.MOVE and len(ops) == 2 and ops[1].value in values \
+                        and ops[1].operand_type is IROperandType.TEMPORARY:
+                    values.add(ops[0].value)
+                elif instr.opcode in self.ACCUMULATOR_IDENTITY and accumulate is None and len(ops) == 3:
+                    a, b = ops[1], ops[2]
+                    in_a = a.operand_type is IROperandType.TEMPORARY and a.value in values
+                    in_b = b.operand_type is IROperandType.TEMPORARY and b.value in values
+                    if in_a == in_b:
+                        return None
+                    accumulate = (instr.opcode, b if in_a else a)
+                    values = {ops[0].value}
+                elif instr.opcode == IROpcode.RETURN:
+                    if not ops:
+                        return True if accumulate is None else None
+                    if ops[0].operand_type is not IROperandType.TEMPORARY or ops[0].value not in values:
+                        return None
+                    return True if accumulate is None else accumulate
+                elif instr.opcode == IROpcode.JUMP:
+                    target = func.get_block(ops[0].value)
+                    if target is None or target in visited:
+                        return None
+                    visited.add(target)
+                    instructions = target.instructions
+                    break
+                else:
+                    return None
+            else:
+                return None
+
+    @staticmethod
+    def _parameter_temps(func: IRFunction) -> Optional[List[IROperand]]:
+        """Временные, в которые entry копирует параметры (первые инструкции entry)."""
+        entry = func.blocks[0]
+        count = len(func.parameters)
+        if len(entry.instructions) < count:
+            return None
+        temps = []
+        for param, instr in zip(func.parameters, entry.instructions[:count]):
+            ops = instr.operands
+            if instr.opcode != IROpcode.MOVE or len(ops) != 2 \
+                    or ops[1].operand_type is not IROperandType.VARIABLE or ops[1].value != param.value:
+                return None
+            temps.append(ops[0])
+        return temps
+
+    def _accumulate_returns(self, func: IRFunction, opcode: IROpcode, accumulator: IROperand, sites: Set[int]):
+        """RETURN v вне хвостовых вызовов возвращает acc op v."""
+        for block in func.blocks:
+            if id(block) in sites:
+                continue
+            instructions = []
+            for instr in block.instructions:
+                if instr.opcode == IROpcode.RETURN and instr.operands:
+                    result = func.new_temp("acc_ret", func.return_type)
+                    instructions.append(IRInstruction(opcode, [result, accumulator, instr.operands[0]], instr.comment))
+                    instr = IRInstruction(IROpcode.RETURN, [result], instr.comment)
+                instructions.append(instr)
+            block.instructions = instructions
+
+
+class StackArrayPromoter:
+    """
+    Локальные массивы постоянного размера на стеке вместо malloc (до SSA).
+
+    IRGenerator выделяет каждый массив парой PARAM 0, n / %arr = CALL
+    "malloc", 1. Пара заменяется на %arr = ALLOCA n, если n не больше limit
+    байт и указатель не убегает из функции (EscapeAnalysis). ALLOCA получает
+    одно место в кадре на все свои выполнения, поэтому в точке выделения
+    не должна быть жива ни одна копия указателя: массив прошлой итерации
+    цикла (или прошлого вызова, ставшего циклом после устранения хвостовой
+    рекурсии) к этому моменту уже мёртв.
+    """
+
+    DEFAULT_LIMIT = 1024
+
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = self.DEFAULT_LIMIT if limit is None else limit
+        self.stats = {"promoted": 0, "escaping": 0, "live": 0, "too_large": 0}
+        self.analyses = None
+
+    def run(self, program: IRProgram) -> IRProgram:
+        if any(func.name == "malloc" for func in program.functions):
+            return program
+        escape = None
+        for func in program.functions:
+            sites = self._malloc_sites(func)
+            if not sites:
+                continue
+            if escape is None:
+                escape = EscapeAnalysis(program)
+            live = None
+            promoted = []
+            for block, index, size in sites:
+                dest = block.instructions[index].operands[0]
+                if size > self.limit:
+                    self.stats["too_large"] += 1
+                    continue
+                aliases = escape.aliases(func, [dest.value])
+                if escape.escapes(func, aliases):
+                    self.stats["escaping"] += 1
+                    continue
+                if live is None:
+                    live = _liveness(self.analyses, func)
+                if self._live_after(block, index, live) & (aliases - {dest.value}):
+                    self.stats["live"] += 1
+                    continue
+                promoted.append((block, index, size))
+            # С конца: индексы в блоке остаются верными
+            for block, index, size in reversed(promoted):
+                call = block.instructions[index]
+                alloca = IRInstruction(IROpcode.ALLOCA, [call.operands[0], Lit(size)], call.comment)
+                block.instructions[index - 1:index + 1] = [alloca]
+                self.stats["promoted"] += 1
+        return program
 
-            # Собираем используемые временные переменные
-            used_temps: Set[str] = set()
-            for block in func.blocks:
+    @staticmethod
+    def _malloc_sites(func: IRFunction) -> List[Tuple[BasicBlock, int, int]]:
+        """(блок, индекс CALL, байт) для malloc с литеральным размером под массив."""
+        sites = []
+        for block in func.blocks:
+            instructions = block.instructions
+            for i, instr in enumerate(instructions):
+                if i == 0 or call_target(instr) != "malloc" or len(instr.operands) != 3:
+                    continue
+                dest, param = instr.operands[0], instructions[i - 1]
+                if dest.operand_type is not IROperandType.TEMPORARY or not getattr(dest.ir_type, 'is_array', False):
+                    continue
+                if param.opcode != IROpcode.PARAM or param.operands[0].value != 0 \
+                        or not _int_literal(param.operands[1]) or param.operands[1].value <= 0:
+                    continue
+                sites.append((block, i, param.operands[1].value))
+        return sites
+
+    @staticmethod
+    def _live_after(block: BasicBlock, index: int, live: DataflowResult) -> Set[str]:
+        """Временные, живые сразу после инструкции index блока."""
+        names = set(live.out_items(block))
+        for instr in reversed(block.instructions[index + 1:]):
+            dest = defined_temp(instr)
+            if dest is not None:
+                names.discard(dest)
+            names.update(used_temps(instr))
+        return names
+
+
+def _dominators(analyses, func: IRFunction) -> DominatorTree:
+    """Дерево доминаторов из кэша менеджера проходов, если проход запущен им."""
+    return analyses.get(DOMINATORS, func) if analyses is not None else DominatorTree(func)
+
+
+def _liveness(analyses, func: IRFunction) -> DataflowResult:
+    """Живость временных из кэша менеджера проходов, если проход запущен им."""
+    return analyses.get(LIVENESS, func) if analyses is not None else live_variables(func)
+
+
+def _float_operand(op: IROperand) -> bool:
+    if op.ir_type is not None:
+        return getattr(op.ir_type, 'name', '') == 'float'
+    return op.operand_type is IROperandType.LITERAL and type(op.value) is float
+
+
+class SparseConditionalConstantPropagator:
+    """
+    Sparse conditional constant propagation (Wegman-Zadeck) над SSA-формой.
+
+    Два списка работ: рёбра CFG, ставшие исполнимыми, и инструкции, чьи
+    операнды изменили значение. Каждая временная опускается по решётке
+    TOP → константа → overdefined не более двух раз, поэтому проход
+    линеен по размеру функции. Инструкции в исполнимых блоках с константным
+    результатом заменяются на MOVE литерала, использования — литералами,
+    условные переходы с константным условием — на JUMP (или удаляются).
+    Недостижимые блоки затем удаляет UnreachableCodeEliminator.
+    """
+
+    def __init__(self):
+        self.stats = {"folded": 0, "propagated": 0, "branches_pruned": 0}
+        # Вычисление операций — та же семантика, что и у свёртки
+        self._folder = ConstantFolder()
+
+    def propagate(self, program: IRProgram) -> IRProgram:
+        for func in program.functions:
+            self._propagate_function(func)
+        return program
+
+    def _propagate_function(self, func: IRFunction):
+        if not func.blocks:
+            return
+        self.func = func
+        self.values: Dict[str, Any] = {}
+        self.chains = func.def_use_chains()
+
+        self.executable_blocks: Set[BasicBlock] = set()
+        self.executable_edges: Set[Tuple[BasicBlock, BasicBlock]] = set()
+        self.cfg_work: List[Tuple[Optional[BasicBlock], BasicBlock]] = [(None, func.entry_block or func.blocks[0])]
+        self.ssa_work: List[Tuple[BasicBlock, IRInstruction]] = []
+
+        while self.cfg_work or self.ssa_work:
+            while self.cfg_work:
+                pred, block = self.cfg_work.pop()
+                if pred is not None:
+                    if (pred, block) in self.executable_edges:
+                        continue
+                    self.executable_edges.add((pred, block))
+                if block in self.executable_blocks:
+                    # Новое входящее ребро влияет только на PHI
+                    for phi in phis(block):
+                        self._visit(block, phi)
+                    continue
+                self.executable_blocks.add(block)
                 for instr in block.instructions:
-                    for i, op in enumerate(instr.operands):
-                        if op.operand_type == IROperandType.TEMPORARY:
-                            # Первый операнд MOVE — это приёмник (не считается использованием)
-                            if i == 0 and instr.opcode == IROpcode.MOVE:
-                                continue
-                            used_temps.add(op.value)
-
-            # Удаляем неиспользуемые инструкции
-            for block in func.blocks:
-                new_instructions = []
+                    self._visit(block, instr)
+            while self.ssa_work:
+                block, instr = self.ssa_work.pop()
+                if block in self.executable_blocks:
+                    self._visit(block, instr)
+
+        self._rewrite(func)
+        func.invalidate_def_use()
+
+    def _value(self, op: IROperand):
+        """Значение операнда на решётке (None — TOP)."""
+        if op.operand_type == IROperandType.LITERAL:
+            return op if isinstance(op.value, (int, float)) else _OVERDEFINED
+        if op.operand_type == IROperandType.TEMPORARY and op.value in self.chains.defs:
+            return self.values.get(op.value)
+        # Параметры, неинициализированные переменные, память, глобальные
+        return _OVERDEFINED
+
+    @staticmethod
+    def _meet(a, b):
+        if a is None:
+            return b
+        if b is None or a is _OVERDEFINED:
+            return a
+        if b is _OVERDEFINED:
+            return b
+        if type(a.value) is type(b.value) and a.value == b.value:
+            return a
+        return _OVERDEFINED
+
+    def _visit(self, block: BasicBlock, instr: IRInstruction):
+        if isinstance(instr, PhiInst):
+            value = None
+            for source, label in instr.sources:
+                if (self.func.get_block(label), block) in self.executable_edges:
+                    value = self._meet(value, self._value(source))
+        elif instr.opcode in JUMP_OPCODES:
+            self._visit_branches(block)
+            return
+        elif defined_temp(instr) is not None:
+            value = self._evaluate(instr)
+        else:
+            return
+
+        dest = instr.operands[0].value
+        old = self.values.get(dest)
+        new = self._meet(old, value)
+        if new is not old:
+            self.values[dest] = new
+            self.ssa_work.extend(self.chains.uses.get(dest, {}).values())
+
+    def _evaluate(self, instr: IRInstruction):
+        if instr.opcode == IROpcode.MOVE and len(instr.operands) == 2:
+            return self._value(instr.operands[1])
+        if instr.opcode not in _FOLDABLE_OPCODES:
+            return _OVERDEFINED
+        operands = [instr.operands[0]]
+        pending = False
+        for op in instr.operands[1:]:
+            value = self._value(op)
+            if value is _OVERDEFINED:
+                return _OVERDEFINED
+            if value is None:
+                pending = True
+            operands.append(value)
+        if pending:
+            return None
+        folded = self._folder._try_fold_instruction(IRInstruction(instr.opcode, operands))
+        if folded.opcode == IROpcode.MOVE:
+            return folded.operands[1]
+        return _OVERDEFINED
+
+    def _visit_branches(self, block: BasicBlock):
+        """Помечает исполнимыми рёбра, по которым блок может передать управление."""
+        for instr in block.instructions:
+            if instr.opcode == IROpcode.RETURN:
+                return
+            if instr.opcode not in JUMP_OPCODES:
+                continue
+            target = self.func.get_block(instr.operands[-1].value)
+            if instr.opcode == IROpcode.JUMP:
+                taken = True
+            else:
+                cond = self._value(instr.operands[0])
+                if cond is None:
+                    return  # условие ещё не вычислено
+                taken = None if cond is _OVERDEFINED else \
+                    bool(cond.value) == (instr.opcode == IROpcode.JUMP_IF)
+            if taken is not False and target is not None:
+                self.cfg_work.append((block, target))
+            if taken:
+                return
+
+    def _constant(self, op: IROperand) -> Optional[IROperand]:
+        if op is not None and op.operand_type == IROperandType.TEMPORARY:
+            value = self.values.get(op.value)
+            if value is not None and value is not _OVERDEFINED and op.value in self.chains.defs:
+                return Lit(value.value, op.ir_type)
+        return None
+
+    def _rewrite(self, func: IRFunction):
+        for block in func.blocks:
+            if block not in self.executable_blocks:
+                continue
+            new_instructions = []
+            pruned = False
+            for instr in block.instructions:
+                if isinstance(instr, PhiInst):
+                    instr.sources = [(self._constant(value) or value, label)
+                                     for value, label in instr.sources]
+                    new_instructions.append(instr)
+                    continue
+
+                dest = defined_temp(instr)
+                const = self._constant(instr.operands[0]) if dest is not None else None
+                if const is not None and instr.opcode != IROpcode.CALL:
+                    if instr.opcode != IROpcode.MOVE:
+                        self.stats["folded"] += 1
+                    elif instr.operands[1].operand_type != IROperandType.LITERAL:
+                        self.stats["propagated"] += 1
+                    instr = IRInstruction(IROpcode.MOVE, [instr.operands[0], const], instr.comment)
+                else:
+                    start = 1 if dest is not None or instr.opcode == IROpcode.CALL else 0
+                    operands = instr.operands[:start]
+                    for op in instr.operands[start:]:
+                        replaced = self._constant(op)
+                        if replaced is not None:
+                            self.stats["propagated"] += 1
+                        operands.append(replaced or op)
+                    if operands != instr.operands:
+                        instr = IRInstruction(instr.opcode, operands, instr.comment)
+
+                if instr.opcode in (IROpcode.JUMP_IF, IROpcode.JUMP_IF_NOT) and \
+                        instr.operands[0].operand_type == IROperandType.LITERAL:
+                    pruned = True
+                    self.stats["branches_pruned"] += 1
+                    if bool(instr.operands[0].value) == (instr.opcode == IROpcode.JUMP_IF):
+                        new_instructions.append(IRInstruction(IROpcode.JUMP, [instr.operands[1]]))
+                    continue
+                new_instructions.append(instr)
+            block.instructions = new_instructions
+            if pruned:
+                func.refresh_successors(block)
+
+
+# Операнды-временные, которые проходы заменяют другими значениями
+def _replacement(op: IROperand, leader: Dict[str, IROperand]) -> IROperand:
+    if op is not None and op.operand_type is IROperandType.TEMPORARY:
+        return leader.get(op.value, op)
+    return op
+
+
+def replace_uses(func: IRFunction, leader: Dict[str, IROperand], dead: Set[int]):
+    """
+    Удаляет инструкции с id из dead и заменяет использования временных по
+    таблице leader (значения таблицы сами не заменяются).
+    """
+    for block in func.blocks:
+        new_instructions = []
+        for instr in block.instructions:
+            if id(instr) in dead:
+                continue
+            if isinstance(instr, PhiInst):
+                instr.sources = [(_replacement(value, leader), label) for value, label in instr.sources]
+            else:
+                start = 1 if defined_temp(instr) is not None or instr.opcode == IROpcode.CALL else 0
+                operands = instr.operands[:start] + [_replacement(op, leader) for op in instr.operands[start:]]
+                if operands != instr.operands:
+                    instr = IRInstruction(instr.opcode, operands, instr.comment)
+            new_instructions.append(instr)
+        block.instructions = new_instructions
+    func.invalidate_def_use()
+
+
+class GlobalValueNumbering:
+    """
+    Глобальная нумерация значений (GVN/CSE) над SSA-формой.
+
+    Дерево доминаторов обходится в глубину с хэш-таблицей выражений
+    (опкод, тип, номера операндов); выражение видно только в поддереве
+    блока, где оно вычислено. Повторное вычисление удаляется, его
+    использования переписываются на доминирующее. MOVE между временными
+    одного типа распространяет копию, PHI с одним значением на всех
+    входах заменяется этим значением.
+
+    LOAD и выражения над операндами в памяти (переменные, глобальные)
+    получают в ключе версию памяти: её меняют STORE, CALL и запись в
+    не временную. Блок с единственным предшественником продолжает версию
+    предшественника, остальные начинают с новой.
+    """
+
+    # Коммутативные операции: операнды ключа упорядочиваются
+    COMMUTATIVE_OPCODES = frozenset({
+        IROpcode.ADD, IROpcode.MUL, IROpcode.AND, IROpcode.OR, IROpcode.XOR,
+        IROpcode.CMP_EQ, IROpcode.CMP_NE,
+    })
+    VALUE_OPCODES = EXPRESSION_OPCODES | {IROpcode.LOAD}
+
+    def __init__(self):
+        self.stats = {"eliminated": 0, "loads": 0, "copies": 0, "phis": 0}
+        self.analyses = None
+
+    def run(self, program: IRProgram) -> IRProgram:
+        for func in program.functions:
+            self._run_function(func)
+        return program
+
+    def _run_function(self, func: IRFunction):
+        if not func.blocks:
+            return
+        dom = _dominators(self.analyses, func)
+        self.chains = func.def_use_chains()
+        self.leader: Dict[str, IROperand] = {}
+        self.table: Dict[tuple, IROperand] = {}
+        self.dead: Set[int] = set()
+        self.memory = 0
+        end_memory: Dict[BasicBlock, int] = {}
+
+        # Список ключей в стеке — выход из поддерева блока, добавившего их
+        stack: List[Any] = [dom.entry]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, list):
+                for key in item:
+                    del self.table[key]
+                continue
+            block = item
+            preds = block.predecessors
+            if len(preds) == 1 and preds[0] in end_memory:
+                memory = end_memory[preds[0]]
+            else:
+                memory = self._new_memory()
+            added: List[tuple] = []
+            for instr in block.instructions:
+                memory = self._visit(instr, memory, added)
+            end_memory[block] = memory
+            stack.append(added)
+            stack.extend(reversed(dom.children[block]))
+
+        if self.dead or self.leader:
+            replace_uses(func, self.leader, self.dead)
+
+    def _new_memory(self) -> int:
+        self.memory += 1
+        return self.memory
+
+    def _canonical(self, op: IROperand) -> IROperand:
+        return _replacement(op, self.leader)
+
+    @staticmethod
+    def _operand_key(op: IROperand) -> tuple:
+        return op.operand_type, op.value, type(op.value)
+
+    def _visit(self, instr: IRInstruction, memory: int, added: List[tuple]) -> int:
+        """Нумерует инструкцию; возвращает версию памяти после неё."""
+        if isinstance(instr, PhiInst):
+            self._visit_phi(instr)
+            return memory
+
+        opcode = instr.opcode
+        dest = defined_temp(instr)
+        if opcode in (IROpcode.STORE, IROpcode.CALL) or (opcode in DEF_OPCODES and dest is None):
+            return self._new_memory()
+
+        if opcode == IROpcode.MOVE:
+            src = self._canonical(instr.operands[1])
+            if (src.operand_type is IROperandType.TEMPORARY and src.value in self.chains.defs
+                    and src.ir_type == instr.operands[0].ir_type):
+                self.leader[dest] = src
+                self.dead.add(id(instr))
+                self.stats["copies"] += 1
+            return memory
+        if dest is None or opcode not in self.VALUE_OPCODES:
+            return memory
+
+        operands = [self._canonical(op) for op in instr.operands[1:]]
+        keys = [self._operand_key(op) for op in operands]
+        if opcode in self.COMMUTATIVE_OPCODES:
+            keys.sort(key=repr)
+        key = (opcode, str(instr.operands[0].ir_type), *keys)
+        if opcode == IROpcode.LOAD or any(op.operand_type not in (IROperandType.TEMPORARY, IROperandType.LITERAL)
+                                          for op in operands):
+            key += (memory,)
+
+        found = self.table.get(key)
+        if found is None:
+            self.table[key] = instr.operands[0]
+            added.append(key)
+        else:
+            self.leader[dest] = found
+            self.dead.add(id(instr))
+            self.stats["eliminated"] += 1
+            if opcode == IROpcode.LOAD:
+                self.stats["loads"] += 1
+        return memory
+
+    def _visit_phi(self, phi: PhiInst):
+        """PHI, все входы которого (кроме него самого) — одно значение."""
+        dest = phi.operands[0].value
+        value = None
+        for source, _ in phi.sources:
+            if source is None:
+                return
+            source = self._canonical(source)
+            if source.operand_type is IROperandType.TEMPORARY:
+                if source.value == dest:
+                    continue
+                if source.value not in self.chains.defs:
+                    return  # неинициализированное значение
+            if value is None:
+                value = source
+            elif self._operand_key(source) != self._operand_key(value):
+                return
+        if value is not None and value.ir_type == phi.operands[0].ir_type:
+            self.leader[dest] = value
+            self.dead.add(id(phi))
+            self.stats["phis"] += 1
+
+
+class LoopInvariantCodeMotion:
+    """
+    Вынос инвариантов циклов (LICM) над SSA-формой.
+
+    Чистая инструкция выносится в предзаголовок, если все её операнды —
+    литералы или временные, определённые вне цикла (в том числе уже
+    вынесенные). DIV и MOD не выносятся: на пути, где цикл не выполняется,
+    они могли бы завершиться ошибкой. Циклы обрабатываются от вложенных
+    к объемлющим, поэтому инвариант поднимается через несколько уровней.
+    """
+
+    HOISTABLE_OPCODES = EXPRESSION_OPCODES - {IROpcode.DIV, IROpcode.MOD}
+
+    def __init__(self):
+        self.stats = {"loops": 0, "preheaders": 0, "hoisted": 0}
+        self.analyses = None
+
+    def run(self, program: IRProgram) -> IRProgram:
+        for func in program.functions:
+            self._run_function(func)
+        return program
+
+    def _run_function(self, func: IRFunction):
+        if not func.blocks:
+            return
+        dom, loops, created = loops_with_preheaders(func, _dominators(self.analyses, func))
+        self.stats["preheaders"] += created
+        self.stats["loops"] += len(loops)
+        if not loops:
+            return
+
+        def_block: Dict[str, BasicBlock] = {}
+        for block in func.blocks:
+            for instr in block.instructions:
+                name = defined_temp(instr)
+                if name is not None:
+                    def_block[name] = block
+
+        for loop in loops:
+            preheader = loop.preheader
+            if preheader is None:
+                continue
+            hoisted = []
+            for block in dom.rpo:
+                if block not in loop:
+                    continue
+                kept = []
                 for instr in block.instructions:
-                    # Всегда сохраняем управляющие инструкции
-                    if instr.opcode in (IROpcode.STORE, IROpcode.CALL, IROpcode.RETURN,
-                                        IROpcode.JUMP, IROpcode.JUMP_IF, IROpcode.JUMP_IF_NOT,
-                                        IROpcode.PARAM):
-                        new_instructions.append(instr)
-                        continue
+                    if self._invariant(instr, loop, def_block):
+                        hoisted.append(instr)
+                        def_block[instr.operands[0].value] = preheader
+                    else:
+                        kept.append(instr)
+                if len(kept) < len(block.instructions):
+                    block.instructions = kept
+            if hoisted:
+                position = next(i for i, instr in enumerate(preheader.instructions)
+                                if instr.opcode in JUMP_OPCODES)
+                preheader.instructions[position:position] = hoisted
+                self.stats["hoisted"] += len(hoisted)
+        func.invalidate_def_use()
+
+    def _invariant(self, instr: IRInstruction, loop, def_block: Dict[str, BasicBlock]) -> bool:
+        if instr.opcode not in self.HOISTABLE_OPCODES or defined_temp(instr) is None:
+            return False
+        for op in instr.operands[1:]:
+            if op.operand_type is IROperandType.LITERAL:
+                continue
+            if op.operand_type is not IROperandType.TEMPORARY or op.value not in def_block \
+                    or def_block[op.value] in loop:
+                return False
+        return True
+
+
+class _InductionVariable:
+    """Индуктивная переменная: PHI заголовка, начальное значение и шаг."""
+    __slots__ = ('phi', 'init', 'step', 'step_type', 'block', 'update', 'derived')
+
+    def __init__(self, phi: IROperand, init: IROperand, step: int, step_type,
+                 block: BasicBlock, update: IRInstruction, derived: bool):
+        self.phi = phi
+        self.init = init
+        self.step = step
+        self.step_type = step_type
+        self.block = block          # блок, где вычисляется следующее значение
+        self.update = update
+        self.derived = derived
+
+
+class InductionVariableStrengthReduction:
+    """
+    Понижение силы индуктивных выражений над SSA-формой.
+
+    Базовая индуктивная переменная — PHI заголовка
+    i = PHI(init из предзаголовка, i ± c из latch) с целым литералом c.
+    MUL i, k (k — целый литерал) заменяется новой переменной
+    t = PHI(init * k, t + c * k); ADD t, inv над такой переменной и
+    инвариантом цикла — ещё одной, поэтому адрес arr + i * 4 становится
+    указателем, который увеличивается на 4. Новые переменные — версии одного
+    имени ivN.0/.1/.2, и выход из SSA объединяет их без копий; ставшие
+    ненужными (их читает только собственное приращение) удаляются.
+    Нужны предзаголовок и единственное обратное ребро.
+    """
 
-                    if isinstance(instr, (PhiInst, LabelInst)):
-                        new_instructions.append(instr)
+    def __init__(self):
+        self.stats = {"reduced": 0, "induction_variables": 0, "preheaders": 0}
+        self.analyses = None
+
+    def run(self, program: IRProgram) -> IRProgram:
+        for func in program.functions:
+            self._run_function(func)
+        return program
+
+    def _run_function(self, func: IRFunction):
+        if not func.blocks:
+            return
+        dom, loops, created = loops_with_preheaders(func, _dominators(self.analyses, func))
+        self.stats["preheaders"] += created
+        if not loops:
+            return
+        self.func = func
+        self.def_of: Dict[str, Tuple[BasicBlock, IRInstruction]] = {}
+        for block in func.blocks:
+            for instr in block.instructions:
+                name = defined_temp(instr)
+                if name is not None:
+                    self.def_of[name] = (block, instr)
+        self.leader: Dict[str, IROperand] = {}
+        self.dead: Set[int] = set()
+        self.created: List[_InductionVariable] = []
+        self.updates: Set[int] = set()
+
+        for loop in loops:
+            if loop.preheader is not None and len(loop.latches) == 1 and len(loop.header.predecessors) == 2:
+                self._reduce_loop(loop, dom)
+
+        if not self.created:
+            return
+        replace_uses(func, self.leader, self.dead)
+        self._remove_unused(func)
+
+    def _basic_variables(self, loop) -> Dict[str, _InductionVariable]:
+        preheader, latch = loop.preheader, loop.latches[0]
+        ivs = {}
+        for phi in phis(loop.header):
+            sources = {label: value for value, label in phi.sources}
+            init, nxt = sources.get(preheader.label), sources.get(latch.label)
+            if init is None or nxt is None or nxt.operand_type is not IROperandType.TEMPORARY \
+                    or nxt.value not in self.def_of or not _integer_operand(phi.operands[0]):
+                continue
+            block, update = self.def_of[nxt.value]
+            if block not in loop or update.opcode not in (IROpcode.ADD, IROpcode.SUB):
+                continue
+            dest = phi.operands[0].value
+            a, b = update.operands[1], update.operands[2]
+            if a.operand_type is IROperandType.TEMPORARY and a.value == dest and _int_literal(b):
+                step = b.value if update.opcode == IROpcode.ADD else -b.value
+                step_type = b.ir_type
+            elif update.opcode == IROpcode.ADD and b.operand_type is IROperandType.TEMPORARY \
+                    and b.value == dest and _int_literal(a):
+                step, step_type = a.value, a.ir_type
+            else:
+                continue
+            ivs[dest] = _InductionVariable(phi.operands[0], init, step, step_type, block, update, False)
+        return ivs
+
+    def _reduce_loop(self, loop, dom: DominatorTree):
+        ivs = self._basic_variables(loop)
+        if not ivs:
+            return
+        # dest -> (переменная, смещение): значение iv + смещение, которое
+        # само по себе не выгодно делать переменной, но (iv + c) * k — выгодно
+        affine: Dict[str, Tuple[_InductionVariable, IROperand]] = {}
+        for block in dom.rpo:
+            if block not in loop:
+                continue
+            for instr in list(block.instructions):
+                dest = defined_temp(instr)
+                if dest is None or id(instr) in self.dead or instr.opcode not in (IROpcode.MUL, IROpcode.ADD) \
+                        or id(instr) in self.updates:
+                    continue
+                if not _integer_operand(instr.operands[0]):
+                    continue
+                a, b = (_replacement(op, self.leader) for op in instr.operands[1:3])
+                iv = None
+                for x, y in ((a, b), (b, a)):
+                    if x.operand_type is not IROperandType.TEMPORARY:
                         continue
+                    if x.value in ivs:
+                        parent, other = ivs[x.value], y
+                        if instr.opcode == IROpcode.MUL and _int_literal(other):
+                            iv = self._derive(loop, parent, instr, other, parent.step * other.value)
+                        elif instr.opcode == IROpcode.ADD and parent.derived and self._invariant(other, loop):
+                            iv = self._derive(loop, parent, instr, other, parent.step)
+                        elif instr.opcode == IROpcode.ADD and (_int_literal(y) or self._invariant(y, loop)):
+                            affine[dest] = (parent, y)
+                    elif x.value in affine and instr.opcode == IROpcode.MUL and _int_literal(y):
+                        parent, offset = affine[x.value]
+                        iv = self._derive(loop, parent, instr, y, parent.step * y.value, offset)
+                    if iv is not None:
+                        break
+                if iv is None:
+                    continue
+                ivs[iv.phi.value] = iv
+                self.leader[dest] = iv.phi
+                self.dead.add(id(instr))
+                self.stats["reduced"] += 1
+
+    def _invariant(self, op: IROperand, loop) -> bool:
+        """Временная, определённая вне цикла (ADD с литералом не выгоднее исходного)."""
+        return op.operand_type is IROperandType.TEMPORARY and op.value in self.def_of \
+            and self.def_of[op.value][0] not in loop
+
+    def _derive(self, loop, parent: _InductionVariable, instr: IRInstruction, other: IROperand,
+                step: int, offset: Optional[IROperand] = None) -> _InductionVariable:
+        """
+        Новая индуктивная переменная со значением instr(parent, other) на каждой
+        итерации; с offset — instr(parent + offset, other).
+        """
+        func, header, preheader = self.func, loop.header, loop.preheader
+        dest = instr.operands[0]
+        base = func.new_label("iv")
+
+        def version(n: int) -> IROperand:
+            return Temp(f"{base}{VERSION_SEPARATOR}{n}", dest.ir_type)
+
+        # Начальное значение — та же операция над начальным значением родителя
+        start = parent.init
+        if offset is not None:
+            start = self._emit_init(preheader, IROpcode.ADD, start, offset, func.new_temp("iv", dest.ir_type), instr)
+        a, b = start, other
+        if instr.opcode == IROpcode.ADD and _pointer_operand(other) and not _pointer_operand(start):
+            # База — первым слагаемым: ADD ptr, int складывается в 64 битах
+            a, b = other, start
+        init = self._emit_init(preheader, instr.opcode, a, b, version(0), instr)
+
+        phi_dest, update_dest = version(1), version(2)
+        sources = [(init if pred is preheader else update_dest, pred.label) for pred in header.predecessors]
+        header.instructions.insert(len(phis(header)), PhiInst(phi_dest, sources))
+        step_type = parent.step_type if instr.opcode == IROpcode.ADD else other.ir_type
+        update = IRInstruction(IROpcode.ADD, [update_dest, phi_dest, Lit(step, step_type)], instr.comment)
+        block = parent.block
+        index = next(i for i, x in enumerate(block.instructions) if x is parent.update)
+        block.instructions.insert(index + 1, update)
+        self.def_of[update_dest.value] = (block, update)
+        self.updates.add(id(update))
+
+        iv = _InductionVariable(phi_dest, init, step, step_type, block, update, True)
+        self.created.append(iv)
+        return iv
+
+    def _emit_init(self, preheader: BasicBlock, opcode: IROpcode, a: IROperand, b: IROperand,
+                   dest: IROperand, instr: IRInstruction) -> IROperand:
+        """a op b в предзаголовке; литералы сворачиваются, x + 0 и x * 1 — это x."""
+        if _int_literal(a) and _int_literal(b):
+            value = a.value * b.value if opcode == IROpcode.MUL else a.value + b.value
+            return Lit(value, dest.ir_type)
+        identity = 1 if opcode == IROpcode.MUL else 0
+        if _int_literal(a) and a.value == identity:
+            return b
+        if _int_literal(b) and b.value == identity:
+            return a
+        position = next(i for i, x in enumerate(preheader.instructions) if x.opcode in JUMP_OPCODES)
+        init_instr = IRInstruction(opcode, [dest, a, b], instr.comment)
+        preheader.instructions.insert(position, init_instr)
+        self.def_of[dest.value] = (preheader, init_instr)
+        return dest
+
+    def _remove_unused(self, func: IRFunction):
+        """Удаляет новые переменные, которые читает только их приращение."""
+        chains = func.def_use_chains()
+        dead: Set[int] = set()
+        for iv in self.created:
+            phi_name, update_name = iv.phi.value, iv.update.operands[0].value
+            if chains.use_count(phi_name) == 1 and chains.use_count(update_name) == 1:
+                for _, instr in chains.defs[phi_name] + chains.defs[update_name]:
+                    dead.add(id(instr))
+            else:
+                self.stats["induction_variables"] += 1
+        if dead:
+            for block in func.blocks:
+                block.instructions = [instr for instr in block.instructions if id(instr) not in dead]
+            func.invalidate_def_use()
+
+
+def _pointer_operand(op: IROperand) -> bool:
+    ir_type = op.ir_type
+    return getattr(ir_type, 'is_array', False) or getattr(ir_type, 'name', '').startswith('ptr')
+
+
+def _int_literal(op: IROperand) -> bool:
+    return op.operand_type is IROperandType.LITERAL and type(op.value) is int
+
+
+def _integer_operand(op: IROperand) -> bool:
+    """Целочисленный (или указательный) результат: float не участвует в индукции."""
+    return getattr(op.ir_type, 'name', '') != 'float'
 
-                    # Проверяем, используется ли результат инструкции
-                    if len(instr.operands) > 0 and instr.operands[0].operand_type == IROperandType.TEMPORARY:
-                        dest = instr.operands[0].value
-                        if dest in used_temps:
-                            new_instructions.append(instr)
-                        else:
-                            self.stats["removed"] += 1
-                            changed = True
-                    else:
-                        new_instructions.append(instr)
 
-                block.instructions = new_instructions
+def _vector_type(element) -> Type:
+    """Тип вектора из VECTOR_WIDTH элементов int или float (регистр xmm)."""
+    return Type(f"vector_{element.name}", array_size=VECTOR_WIDTH, element_type=element,
+                size_bytes=16, alignment=16)
+
+
+class _VectorPlan:
+    """Разобранный цикл для векторизации."""
+    __slots__ = ('phi', 'compare', 'chain', 'increment', 'kinds')
+
+    def __init__(self, phi: PhiInst, compare: IRInstruction, chain: List[BasicBlock],
+                 increment: Set[int], kinds: Dict[str, tuple]):
+        self.phi = phi
+        self.compare = compare
+        self.chain = chain              # блоки тела от заголовка до latch
+        self.increment = increment      # id инструкций приращения счётчика
+        self.kinds = kinds              # временная тела -> вид значения
+
+
+class LoopVectorizer:
+    """
+    Векторизация простых счётных циклов (SSE2) над SSA-формой.
+
+    Подходит вложенный цикл из заголовка и прямой цепочки блоков тела:
+    единственный PHI заголовка — счётчик i = PHI(init, i + 1), условие
+    i < n или i <= n с инвариантом n. Тело обращается к массивам int и
+    float только по адресам base + i * 4 (base — инвариант) и вычисляет
+    ADD/SUB/MUL (вещественный DIV) над загруженными элементами и
+    инвариантами. Зависимостей между итерациями у такого тела нет:
+    элемент i читается и пишется только на итерации i, а массивы либо
+    совпадают, либо не пересекаются.
+
+    Перед циклом вставляется векторный: пока условие верно для i + 3,
+    тело выполняется над VECTOR_WIDTH элементами (LOAD, STORE и
+    арифметика векторного типа, инварианты размножаются BROADCAST), и
+    i увеличивается на VECTOR_WIDTH. Исходный цикл остаётся эпилогом и
+    начинает с того значения счётчика, на котором остановился векторный.
+    """
+
+    VECTOR_OPCODES = frozenset((IROpcode.ADD, IROpcode.SUB, IROpcode.MUL, IROpcode.DIV))
+    ELEMENT_TYPES = frozenset(('int', 'float'))
+
+    def __init__(self):
+        self.stats = {"loops": 0, "vectorized": 0, "preheaders": 0}
+        self.analyses = None
+
+    def run(self, program: IRProgram) -> IRProgram:
+        for func in program.functions:
+            self._run_function(func)
+        return program
+
+    def _run_function(self, func: IRFunction):
+        if not func.blocks:
+            return
+        dom, loops, created = loops_with_preheaders(func, _dominators(self.analyses, func))
+        self.stats["preheaders"] += created
+        if not loops:
+            return
+        self.func = func
+        self.def_block: Dict[str, BasicBlock] = {}
+        for block in func.blocks:
+            for instr in block.instructions:
+                name = defined_temp(instr)
+                if name is not None:
+                    self.def_block[name] = block
+
+        vectorized = False
+        for loop in loops:
+            if any(other is not loop and other.header in loop for other in loops):
+                continue
+            self.stats["loops"] += 1
+            plan = self._analyze(loop)
+            if plan is not None:
+                self._vectorize(loop, plan)
+                self.stats["vectorized"] += 1
+                vectorized = True
+        if vectorized:
+            func.invalidate_def_use()
+
+    # ---------- Разбор цикла ----------
+
+    def _invariant(self, op: IROperand, loop) -> bool:
+        if op.operand_type is IROperandType.LITERAL:
+            return type(op.value) in (int, float)
+        return op.operand_type is IROperandType.TEMPORARY and op.value in self.def_block \
+            and self.def_block[op.value] not in loop
+
+    def _analyze(self, loop) -> Optional[_VectorPlan]:
+        func, header, preheader = self.func, loop.header, loop.preheader
+        if preheader is None or len(loop.latches) != 1 or len(header.predecessors) != 2 \
+                or not preheader.instructions or preheader.instructions[-1].opcode != IROpcode.JUMP:
+            return None
+        header_phis = phis(header)
+        if len(header_phis) != 1 or len(header.instructions) != 4:
+            return None
+        phi = header_phis[0]
+        iv = phi.operands[0].value
+        if getattr(phi.operands[0].ir_type, 'name', None) != 'int':
+            return None
+
+        # Заголовок: CMP_LT/CMP_LE i, n; JUMP_IF в тело; JUMP на выход
+        compare, branch, jump = header.instructions[1:]
+        if compare.opcode not in (IROpcode.CMP_LT, IROpcode.CMP_LE) or branch.opcode != IROpcode.JUMP_IF \
+                or jump.opcode != IROpcode.JUMP:
+            return None
+        counter, bound = compare.operands[1], compare.operands[2]
+        if counter.operand_type is not IROperandType.TEMPORARY or counter.value != iv \
+                or not self._invariant(bound, loop) or branch.operands[0].value != compare.operands[0].value:
+            return None
+
+        # Тело — цепочка блоков с безусловными переходами обратно в заголовок
+        chain: List[BasicBlock] = []
+        block = func.get_block(branch.operands[1].value)
+        while block is not header:
+            if block is None or block not in loop or block in chain or len(block.predecessors) != 1:
+                return None
+            last = block.instructions[-1] if block.instructions else None
+            if last is None or last.opcode != IROpcode.JUMP or phis(block) \
+                    or any(instr.opcode in JUMP_OPCODES for instr in block.instructions[:-1]):
+                return None
+            chain.append(block)
+            block = func.get_block(last.operands[0].value)
+        if len(chain) + 1 != len(loop.blocks):
+            return None
+
+        # Приращение: i.next = ADD i, 1 через цепочку MOVE
+        defs = {defined_temp(instr): instr for block in chain for instr in block.instructions
+                if defined_temp(instr) is not None}
+        sources = {label: value for value, label in phi.sources}
+        step = sources.get(loop.latches[0].label)
+        increment: Set[int] = set()
+        while step is not None and step.operand_type is IROperandType.TEMPORARY and step.value in defs:
+            instr = defs[step.value]
+            increment.add(id(instr))
+            if instr.opcode != IROpcode.MOVE:
+                break
+            step = instr.operands[1]
+        else:
+            return None
+        if instr.opcode != IROpcode.ADD or not any(
+                x.operand_type is IROperandType.TEMPORARY and x.value == iv and _int_literal(y) and y.value == 1
+                for x, y in ((instr.operands[1], instr.operands[2]), (instr.operands[2], instr.operands[1]))):
+            return None
+        increment_names = {defined_temp(x) for x in defs.values() if id(x) in increment}
+
+        kinds: Dict[str, tuple] = {}
+        for block in chain:
+            for instr in block.instructions[:-1]:
+                if id(instr) in increment:
+                    continue
+                kind = self._classify(instr, iv, loop, kinds)
+                if kind is None:
+                    return None
+                for op in instr.operands:
+                    if op.operand_type is IROperandType.TEMPORARY and op.value in increment_names:
+                        return None
+                dest = defined_temp(instr)
+                if dest is not None:
+                    kinds[dest] = kind
+        if not any(kind[0] == 'lane' for kind in kinds.values()):
+            return None
+        return _VectorPlan(phi, compare, chain, increment, kinds)
+
+    def _classify(self, instr: IRInstruction, iv: str, loop, kinds: Dict[str, tuple]) -> Optional[tuple]:
+        """
+        Вид значения инструкции тела: ('offset',) — i * 4, ('addr',) — адрес
+        элемента i, ('lane', тип) — элементы, ('scalar',) — инвариант,
+        вычисленный в теле, ('store',) для STORE; None — цикл не векторизуется.
+        """
+        opcode, ops = instr.opcode, instr.operands
+        if isinstance(instr, PhiInst) or opcode not in DEF_OPCODES | {IROpcode.STORE}:
+            return None
+
+        def kind(op: IROperand) -> Optional[tuple]:
+            if op.operand_type is IROperandType.TEMPORARY and op.value == iv:
+                return ('iv',)
+            if self._invariant(op, loop):
+                return ('invariant',)
+            if op.operand_type is IROperandType.TEMPORARY:
+                return kinds.get(op.value)
+            return None
+
+        def element(op: IROperand) -> Optional[str]:
+            """Тип элемента скалярного операнда (литерал — по типу значения)."""
+            if op.operand_type is IROperandType.LITERAL:
+                return 'float' if type(op.value) is float else 'int'
+            name = getattr(op.ir_type, 'name', None)
+            return name if name in self.ELEMENT_TYPES else None
+
+        operand_kinds = [kind(op) for op in ops[1:]] if opcode != IROpcode.STORE else [kind(op) for op in ops]
+        if any(k is None for k in operand_kinds):
+            return None
+        names = [k[0] for k in operand_kinds]
+
+        if opcode == IROpcode.STORE:
+            if names[0] != 'addr':
+                return None
+            if names[1] == 'lane' or (names[1] in ('invariant', 'scalar') and element(ops[1])):
+                return ('store',)
+            return None
+        if opcode == IROpcode.LOAD:
+            dest_type = getattr(ops[0].ir_type, 'name', None)
+            return ('lane', dest_type) if names == ['addr'] and dest_type in self.ELEMENT_TYPES else None
+        if opcode == IROpcode.MOVE:
+            return operand_kinds[0] if names[0] in ('lane', 'scalar', 'invariant') else None
+        if all(name in ('invariant', 'scalar') for name in names):
+            return ('scalar',) if opcode in EXPRESSION_OPCODES - {IROpcode.DIV, IROpcode.MOD} else None
+        if opcode == IROpcode.MUL and sorted(names) == ['invariant', 'iv']:
+            other = ops[2] if names[0] == 'iv' else ops[1]
+            return ('offset',) if _int_literal(other) and other.value == 4 else None
+        if opcode == IROpcode.ADD and sorted(names) == ['invariant', 'offset']:
+            base = ops[1] if names[0] == 'invariant' else ops[2]
+            base_type = base.ir_type
+            if getattr(base_type, 'is_array', False) or getattr(base_type, 'name', '').startswith('ptr'):
+                return ('addr',)
+            return None
+        if opcode in self.VECTOR_OPCODES and 'lane' in names:
+            dest_type = getattr(ops[0].ir_type, 'name', None)
+            if dest_type not in self.ELEMENT_TYPES or (opcode == IROpcode.DIV and dest_type != 'float'):
+                return None
+            for op, k in zip(ops[1:], operand_kinds):
+                if k[0] == 'lane' and k[1] != dest_type:
+                    return None
+                if k[0] in ('invariant', 'scalar') and element(op) != dest_type:
+                    return None
+                if k[0] not in ('lane', 'invariant', 'scalar'):
+                    return None
+            return ('lane', dest_type)
+        return None
+
+    # ---------- Построение векторного цикла ----------
+
+    def _vectorize(self, loop, plan: _VectorPlan):
+        func, header, preheader = self.func, loop.header, loop.preheader
+        phi, compare = plan.phi, plan.compare
+        iv = phi.operands[0]
+        int_type = iv.ir_type
+        init = next(value for value, label in phi.sources if label == preheader.label)
+
+        base = func.new_label("vi")
+        counter = Temp(f"{base}{VERSION_SEPARATOR}1", int_type)
+        counter_next = Temp(f"{base}{VERSION_SEPARATOR}2", int_type)
+        vector_header = func.create_block(func.new_label("vector_header"))
+        vector_body = func.create_block(func.new_label("vector_body"))
+        vector_exit = func.create_block(func.new_label("vector_exit"))
+        # Векторный цикл размещается перед скалярным
+        for block in (vector_header, vector_body, vector_exit):
+            func.blocks.remove(block)
+        position = func.blocks.index(header)
+        func.blocks[position:position] = [vector_header, vector_body, vector_exit]
+
+        # Условие для последнего элемента: i + 3 < n (i + 3 <= n)
+        last = func.new_temp("vlast", int_type)
+        condition = func.new_temp("vcond", compare.operands[0].ir_type)
+        vector_header.instructions = [
+            PhiInst(counter, [(init, preheader.label), (counter_next, vector_body.label)]),
+            IRInstruction(IROpcode.ADD, [last, counter, Lit(VECTOR_WIDTH - 1, int_type)], compare.comment),
+            IRInstruction(compare.opcode, [condition, last, compare.operands[2]], compare.comment),
+            IRInstruction(IROpcode.JUMP_IF, [condition, Label(vector_body.label)], compare.comment),
+            IRInstruction(IROpcode.JUMP, [Label(vector_exit.label)], compare.comment),
+        ]
+
+        self.renamed: Dict[str, IROperand] = {iv.value: counter}
+        self.broadcasts: Dict[tuple, IROperand] = {}
+        self.preheader_broadcasts: List[IRInstruction] = []
+        body: List[IRInstruction] = []
+        for block in plan.chain:
+            for instr in block.instructions[:-1]:
+                if id(instr) not in plan.increment:
+                    self._emit_vector(instr, plan.kinds, loop, body)
+        body.append(IRInstruction(IROpcode.ADD, [counter_next, counter, Lit(VECTOR_WIDTH, int_type)]))
+        body.append(IRInstruction(IROpcode.JUMP, [Label(vector_header.label)]))
+        vector_body.instructions = body
+        vector_exit.instructions = [IRInstruction(IROpcode.JUMP, [Label(header.label)])]
+
+        # Предзаголовок: инварианты-векторы и переход в векторный цикл
+        jump = preheader.instructions[-1]
+        jump.operands = [Label(vector_header.label)]
+        preheader.instructions[-1:-1] = self.preheader_broadcasts
+
+        # Скалярный цикл продолжает со счётчика векторного; порядок
+        # предшественников заголовка (и источников PHI) сохраняется
+        phi.sources = [(counter, vector_exit.label) if label == preheader.label else (value, label)
+                       for value, label in phi.sources]
+        preheader.successors[preheader.successors.index(header)] = vector_header
+        header.predecessors[header.predecessors.index(preheader)] = vector_exit
+        vector_header.predecessors = [preheader, vector_body]
+        vector_header.successors = [vector_body, vector_exit]
+        vector_body.predecessors = [vector_header]
+        vector_body.successors = [vector_header]
+        vector_exit.predecessors = [vector_header]
+        vector_exit.successors = [header]
+
+    def _operand(self, op: IROperand) -> IROperand:
+        if op.operand_type is IROperandType.TEMPORARY:
+            return self.renamed.get(op.value, op)
+        return op
+
+    def _broadcast(self, op: IROperand, element: str, loop, body: List[IRInstruction]) -> IROperand:
+        """Вектор из значения op: инварианты — в предзаголовке, один на значение."""
+        key = (op.operand_type, op.value, type(op.value), element)
+        vector = self.broadcasts.get(key)
+        if vector is None:
+            element_type = op.ir_type
+            if getattr(element_type, 'name', None) != element:
+                element_type = Type(element, size_bytes=4, alignment=4)
+            vector = self.broadcasts[key] = self.func.new_temp("vsplat", _vector_type(element_type))
+            instr = IRInstruction(IROpcode.BROADCAST, [vector, self._operand(op)])
+            if self._invariant(op, loop):
+                self.preheader_broadcasts.append(instr)
+            else:
+                body.append(instr)
+        return vector
+
+    def _emit_vector(self, instr: IRInstruction, kinds: Dict[str, tuple], loop, body: List[IRInstruction]):
+        opcode, ops = instr.opcode, instr.operands
+        if opcode == IROpcode.STORE:
+            value = ops[1]
+            if value.operand_type is IROperandType.TEMPORARY and kinds.get(value.value, ('',))[0] == 'lane':
+                value = self._operand(value)
+            else:
+                float_value = type(value.value) is float or getattr(value.ir_type, 'name', None) == 'float'
+                value = self._broadcast(value, 'float' if float_value else 'int', loop, body)
+            body.append(IRInstruction(IROpcode.STORE, [self._operand(ops[0]), value], instr.comment))
+            return
+
+        dest = ops[0]
+        kind = kinds[dest.value]
+        if opcode == IROpcode.MOVE and ops[1].operand_type is IROperandType.TEMPORARY:
+            self.renamed[dest.value] = self._operand(ops[1])
+            return
+        if kind[0] == 'lane':
+            element = kind[1]
+            operands = []
+            for op in ops[1:]:
+                lane = op.operand_type is IROperandType.TEMPORARY and kinds.get(op.value, ('',))[0] == 'lane'
+                if opcode == IROpcode.LOAD or lane:
+                    operands.append(self._operand(op))
+                else:
+                    operands.append(self._broadcast(op, element, loop, body))
+            ir_type = _vector_type(dest.ir_type)
+        else:
+            operands = [self._operand(op) for op in ops[1:]]
+            ir_type = dest.ir_type
+        new_dest = self.func.new_temp("vec", ir_type)
+        self.renamed[dest.value] = new_dest
+        body.append(IRInstruction(opcode, [new_dest, *operands], instr.comment))
+
+
+class DeadCodeEliminator:
+    """Удаление мертвого кода - инструкций, результат которых не используется."""
+
+    def __init__(self):
+        self.stats = {"removed": 0}
+
+    def eliminate(self, program: IRProgram) -> IRProgram:
+        """Удаляет мертвый код."""
+        for func in program.functions:
+            self._eliminate_function(func)
+        return program
+
+    # Сохраняются всегда, даже если результат не используется
+    SIDE_EFFECT_OPCODES = frozenset({
+        IROpcode.STORE, IROpcode.CALL, IROpcode.PARAM, IROpcode.RETURN,
+        IROpcode.JUMP, IROpcode.JUMP_IF, IROpcode.JUMP_IF_NOT, IROpcode.LABEL,
+    })
+
+    def _eliminate_function(self, func: IRFunction):
+        """
+        Удаляет мертвый код из функции: список работ по цепочкам def-use.
+
+        Определение мертво, если у временной не осталось использований.
+        Удаление инструкции уменьшает число использований её операндов, и
+        определения, ставшие мертвыми, попадают в список — цепочка любой
+        длины удаляется за один проход. Вне SSA временная может иметь
+        несколько определений; все они живы, пока есть хоть одно использование.
+        """
+        chains = func.def_use_chains()
+        worklist = [(block, instr) for name, defs in chains.defs.items()
+                    if not chains.use_count(name) for block, instr in defs]
+        dead: Set[int] = set()
+        while worklist:
+            block, instr = worklist.pop()
+            if id(instr) in dead or instr.opcode in self.SIDE_EFFECT_OPCODES:
+                continue
+            if chains.use_count(defined_temp(instr)):
+                continue
+            dead.add(id(instr))
+            for name in chains.remove(block, instr):
+                worklist.extend(chains.defs.get(name, ()))
+
+        if not dead:
+            return
+        self.stats["removed"] += len(dead)
+        for block in func.blocks:
+            block.instructions = [instr for instr in block.instructions if id(instr) not in dead]
 
 
 class UnreachableCodeEliminator:
@@ -378,28 +1854,14 @@ class UnreachableCodeEliminator:
         if not func.entry_block:
             return
 
-        # Собираем все достижимые блоки через successors И явные переходы
-        reachable = set()
+        # Обход CFG от entry: O(V+E)
+        reachable = {func.entry_block}
         worklist = [func.entry_block]
-
         while worklist:
-            block = worklist.pop()
-            if block in reachable:
-                continue
-            reachable.add(block)
-            worklist.extend(block.successors)
-
-        # Добавляем блоки, на которые есть явные JUMP из достижимых блоков
-        for block in list(reachable):
-            for instr in block.instructions:
-                if instr.opcode in (IROpcode.JUMP, IROpcode.JUMP_IF, IROpcode.JUMP_IF_NOT):
-                    for op in instr.operands:
-                        if op.operand_type == IROperandType.LABEL:
-                            target_label = op.value
-                            for b in func.blocks:
-                                if b.label == target_label and b not in reachable:
-                                    reachable.add(b)
-                                    worklist.append(b)
+            for succ in worklist.pop().successors:
+                if succ not in reachable:
+                    reachable.add(succ)
+                    worklist.append(succ)
 
         new_blocks = [b for b in func.blocks if b in reachable]
         removed_count = len(func.blocks) - len(new_blocks)
@@ -415,7 +1877,8 @@ class UnreachableCodeEliminator:
                 return  # Не удаляем, если нет RETURN
 
         self.stats["blocks_removed"] += removed_count
-        func.blocks = new_blocks
+        if removed_count:
+            func.remove_blocks({b for b in func.blocks if b not in reachable})
 
 
 class JumpOptimizer:
@@ -430,8 +1893,12 @@ class JumpOptimizer:
         return program
 
     def _optimize_function(self, func: IRFunction):
+        func.invalidate_def_use()
         for block in func.blocks:
+            before = self.stats["jumps_optimized"]
             self._optimize_block(block)
+            if self.stats["jumps_optimized"] != before:
+                func.refresh_successors(block)
 
     def _optimize_block(self, block: BasicBlock):
         new_instructions = []
@@ -467,42 +1934,148 @@ class JumpOptimizer:
 class IROptimizer:
     """Основной класс оптимизатора IR."""
 
-    def __init__(self, program: IRProgram):
+    def __init__(self, program: IRProgram, opt_level: int = 1, inline_threshold: Optional[int] = None,
+                 time_passes: bool = False, stack_array_limit: Optional[int] = None):
         self.program = program
-        self.folder = ConstantFolder()
-        self.propagator = ConstantPropagator()
+        self.opt_level = opt_level
+        self.time_passes = time_passes
+        self.tail_calls = TailCallEliminator()
+        self.inliner = FunctionInliner(inline_threshold)
+        self.stack_arrays = StackArrayPromoter(stack_array_limit)
+        self.sccp = SparseConditionalConstantPropagator()
+        self.gvn = GlobalValueNumbering()
+        self.licm = LoopInvariantCodeMotion()
+        self.ivsr = InductionVariableStrengthReduction()
+        self.vectorizer = LoopVectorizer()
         self.dce = DeadCodeEliminator()
         self.uce = UnreachableCodeEliminator()
+        self.ssa_builder = SSABuilder()
+        self.ssa_destructor = SSADestructor()
+        self.pass_manager: Optional[PassManager] = None
 
         self.stats = {
             "constant_folding": 0,
             "constant_propagation": 0,
+            "branches_pruned": 0,
+            "tail_calls_eliminated": 0,
+            "calls_inlined": 0,
+            "stack_arrays": 0,
+            "cse_eliminated": 0,
+            "copies_propagated": 0,
+            "licm_hoisted": 0,
+            "iv_strength_reduced": 0,
+            "loops_vectorized": 0,
             "dead_code_removed": 0,
             "unreachable_blocks_removed": 0,
+            "phi_inserted": 0,
+            "phi_copies": 0,
+            "optimization_iterations": 0,
             "total_instructions_before": 0,
             "total_instructions_after": 0
         }
 
+    def pipeline(self, max_passes: int = 5) -> List[Pass]:
+        """
+        Конвейер проходов для уровня opt_level.
+
+        -O0 — пустой конвейер. -O1: устранение хвостовых вызовов, массивы
+        на стеке, SSA, SCCP → удаление недостижимых блоков → DCE, выход из
+        SSA и чистка. -O2 и -O3 добавляют встраивание перед массивами на
+        стеке, а DCE заменяет группа
+        GVN → LICM → понижение силы → DCE, повторяемая до неподвижной
+        точки (не больше max_passes раз). -O3 перед этой группой
+        векторизует простые счётные циклы.
+        """
+        if self.opt_level < 1:
+            return []
+        # Хвостовая рекурсия становится циклом до встраивания: функция без
+        # оставшихся рекурсивных вызовов уже не рекурсивна и может быть встроена
+        passes: List[Pass] = [
+            StatsPass("tail-calls", self.tail_calls, "run", ["eliminated"], invalidates=EDGE_ANALYSES),
+        ]
+        # Встраивание — на обычном IR: копии тел затем оптимизируются вместе с вызывающей
+        if self.opt_level >= 2:
+            passes.append(StatsPass("inline", self.inliner, "run", ["inlined"], invalidates=EDGE_ANALYSES))
+        # После встраивания: массивы встроенных функций тоже попадают в кадр вызывающей
+        passes.append(StatsPass("stack-arrays", self.stack_arrays, "run", ["promoted"],
+                                invalidates=INSTRUCTION_ANALYSES))
+
+        # Проходы ниже работают над SSA: у каждой временной одно определение.
+        # Сначала недостижимые блоки: их использования не держат живыми определения
+        scalar: List[Pass] = [
+            StatsPass("sccp", self.sccp, "propagate", ["folded", "propagated", "branches_pruned"],
+                      invalidates=EDGE_ANALYSES),
+            StatsPass("unreachable", self.uce, "eliminate", ["blocks_removed"], invalidates=EDGE_ANALYSES),
+        ]
+        dce = StatsPass("dce", self.dce, "eliminate", ["removed"], invalidates=INSTRUCTION_ANALYSES)
+        if self.opt_level >= 3:
+            # До GVN и понижения силы: тело ещё читает массивы по base + i * 4,
+            # а векторный цикл затем оптимизируется вместе с остальными
+            scalar.append(StatsPass("vectorize", self.vectorizer, "run", ["preheaders", "vectorized"],
+                                    requires=(DOMINATORS,), invalidates=EDGE_ANALYSES))
+        if self.opt_level >= 2:
+            # SCCP полон на SSA и после встраивания новых констант не находит;
+            # GVN, LICM и понижение силы открывают возможности друг другу
+            scalar.append(FixedPoint([
+                StatsPass("gvn", self.gvn, "run", ["eliminated", "copies", "phis"],
+                          requires=(DOMINATORS,), invalidates=INSTRUCTION_ANALYSES),
+                StatsPass("licm", self.licm, "run", ["preheaders", "hoisted"],
+                          requires=(DOMINATORS,), invalidates=EDGE_ANALYSES),
+                StatsPass("iv-strength", self.ivsr, "run", ["preheaders", "reduced"],
+                          requires=(DOMINATORS,), invalidates=EDGE_ANALYSES),
+                dce,
+            ], max_passes, "gvn-loops"))
+        else:
+            scalar.append(dce)
+
+        passes += [
+            StatsPass("ssa-build", self.ssa_builder, "build", requires=(CFG,), invalidates=INSTRUCTION_ANALYSES),
+            *scalar,
+            # Выход из SSA до кодогенерации
+            StatsPass("ssa-destruct", self.ssa_destructor, "destruct", invalidates=EDGE_ANALYSES),
+            FunctionPass("truncate", self._truncate_after_jumps, invalidates=EDGE_ANALYSES),
+            StatsPass("final-unreachable", self.uce, "eliminate", ["blocks_removed"], invalidates=EDGE_ANALYSES),
+            FunctionPass("merge-entry", self._merge_entry, invalidates=EDGE_ANALYSES),
+        ]
+        return passes
+
     def optimize(self, max_passes: int = 5) -> IRProgram:
-        """Выполняет полную оптимизацию IR."""
+        """
+        Выполняет оптимизацию IR конвейером pipeline() уровня opt_level.
+
+        SCCP находит все константы и недостижимые ветви за один проход;
+        группа GVN и циклов на -O2 обычно сходится за два повтора.
+        """
         self.stats["total_instructions_before"] = self._count_instructions()
 
-        jump_opt = JumpOptimizer()
+        self.pass_manager = PassManager(self.pipeline(max_passes), self.time_passes)
+        self.program = self.pass_manager.run(self.program)
 
-        for _ in range(max_passes):
-            # Несколько проходов свёртки и propagation
-            for __ in range(3):
-                self.program = self.folder.fold(self.program)
-                self.program = self.propagator.propagate(self.program)
+        self.stats["total_instructions_after"] = self._count_instructions()
+        self.stats["constant_folding"] = self.sccp.stats["folded"]
+        self.stats["constant_propagation"] = self.sccp.stats["propagated"]
+        self.stats["branches_pruned"] = self.sccp.stats["branches_pruned"]
+        self.stats["tail_calls_eliminated"] = self.tail_calls.stats["eliminated"]
+        self.stats["calls_inlined"] = self.inliner.stats["inlined"]
+        self.stats["stack_arrays"] = self.stack_arrays.stats["promoted"]
+        self.stats["cse_eliminated"] = self.gvn.stats["eliminated"]
+        self.stats["copies_propagated"] = self.gvn.stats["copies"] + self.gvn.stats["phis"]
+        self.stats["licm_hoisted"] = self.licm.stats["hoisted"]
+        self.stats["iv_strength_reduced"] = self.ivsr.stats["reduced"]
+        self.stats["loops_vectorized"] = self.vectorizer.stats["vectorized"]
+        self.stats["dead_code_removed"] = self.dce.stats["removed"]
+        self.stats["unreachable_blocks_removed"] = self.uce.stats["blocks_removed"]
+        self.stats["phi_inserted"] = self.ssa_builder.stats["phi_inserted"]
+        self.stats["phi_copies"] = self.ssa_destructor.stats["copies"]
+        self.stats["optimization_iterations"] = sum(
+            p.iterations for p in self.pass_manager.passes if isinstance(p, FixedPoint))
 
-            self.program = jump_opt.optimize(self.program)
-            self.program = self.dce.eliminate(self.program)
-            self.program = self.uce.eliminate(self.program)
-            self.program = self.folder.fold(self.program)
-            self.program = self.propagator.propagate(self.program)
+        return self.program
 
-        # Финальный проход: обрезаем мёртвые инструкции после JUMP/RETURN
-        for func in self.program.functions:
+    def _truncate_after_jumps(self, program: IRProgram) -> bool:
+        """Обрезает мёртвые инструкции после JUMP/RETURN."""
+        changed = False
+        for func in program.functions:
             for block in func.blocks:
                 final = []
                 for instr in block.instructions:
@@ -511,13 +2084,15 @@ class IROptimizer:
                         break
                 if len(final) < len(block.instructions):
                     self.dce.stats["removed"] += len(block.instructions) - len(final)
-                block.instructions = final
-
-        # Финальное удаление недостижимых блоков
-        self.program = self.uce.eliminate(self.program)
+                    block.instructions = final
+                    func.refresh_successors(block)
+                    changed = True
+        return changed
 
-        # Склеивание блоков: если entry содержит только JUMP на следующий блок
-        for func in self.program.functions:
+    def _merge_entry(self, program: IRProgram) -> bool:
+        """Склеивание блоков: если entry содержит только JUMP на следующий блок."""
+        changed = False
+        for func in program.functions:
             if len(func.blocks) == 2:
                 entry = func.blocks[0]
                 target = func.blocks[1]
@@ -528,16 +2103,11 @@ class IROptimizer:
                     if jump_target == target.label:
                         # Переносим инструкции из target в entry
                         entry.instructions = target.instructions[:]
-                        func.blocks = [entry]
+                        func.remove_blocks({target})
+                        func.refresh_successors(entry)
                         self.dce.stats["removed"] += 1  # За удалённый JUMP
-
-        self.stats["total_instructions_after"] = self._count_instructions()
-        self.stats["constant_folding"] = self.folder.stats["folded"]
-        self.stats["constant_propagation"] = self.propagator.stats["propagated"]
-        self.stats["dead_code_removed"] = self.dce.stats["removed"]
-        self.stats["unreachable_blocks_removed"] = self.uce.stats["blocks_removed"]
-
-        return self.program
+                        changed = True
+        return changed
 
     def _count_instructions(self) -> int:
         """Подсчитывает общее количество инструкций в программе."""
@@ -566,8 +2136,16 @@ class IROptimizer:
             "Optimization Report:",
             f"  Constant folding: {stats['constant_folding']} expressions folded",
             f"  Constant propagation: {stats['constant_propagation']} variables propagated",
+            f"  Branches pruned: {stats['branches_pruned']} conditional jumps resolved",
+            f"  Tail calls: {stats['tail_calls_eliminated']} self-recursive calls turned into jumps",
+            f"  Inlining: {stats['calls_inlined']} calls inlined",
+            f"  Common subexpressions: {stats['cse_eliminated']} eliminated, {stats['copies_propagated']} copies propagated",
+            f"  Loops: {stats['licm_hoisted']} invariant instructions hoisted, "
+            f"{stats['iv_strength_reduced']} induction expressions strength-reduced",
+            f"  Vectorization: {stats['loops_vectorized']} loops vectorized",
             f"  Dead code elimination: {stats['dead_code_removed']} instructions removed",
             f"  Unreachable blocks removed: {stats['unreachable_blocks_removed']} blocks",
+            f"  SSA: {stats['phi_inserted']} phi nodes inserted, {stats['phi_copies']} copies after SSA destruction",
             f"  Total instructions: {stats['total_instructions_before']} → {stats['total_instructions_after']}",
             f"  Reduction: {stats['reduction_percent']}%"
         ]
@@ -0,0 +1,261 @@
+# ir/pass_manager.py
+"""
+Менеджер проходов оптимизатора.
+
+Проход (Pass) объявляет анализы, которые ему нужны (requires), и анализы,
+которые становятся неверными, если он изменил IR (invalidates). Анализы —
+граф потока управления, дерево доминаторов, живость временных и цепочки
+def-use — хранит AnalysisManager: результат строится при первом запросе и
+переиспользуется следующими проходами, пока его не сбросит проход,
+изменивший IR.
+
+FixedPoint повторяет группу проходов, пока хотя бы один из них меняет IR
+(не больше max_iterations раз). PassManager выполняет конвейер и при
+time_passes собирает по каждому проходу время и изменение числа инструкций.
+"""
+
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .control_flow import IRFunction, IRProgram
+from .dataflow import live_variables
+from .ssa import DominatorTree
+
+CFG = "cfg"
+DOMINATORS = "dominators"
+LIVENESS = "liveness"
+DEF_USE = "def_use"
+ALL_ANALYSES: Tuple[str, ...] = (CFG, DOMINATORS, LIVENESS, DEF_USE)
+# Проход сам обновляет рёбра CFG (refresh_successors, remove_blocks, rebuild_cfg)
+EDGE_ANALYSES: Tuple[str, ...] = (DOMINATORS, LIVENESS, DEF_USE)
+# Проход меняет только инструкции внутри блоков: рёбра и доминаторы сохраняются
+INSTRUCTION_ANALYSES: Tuple[str, ...] = (LIVENESS, DEF_USE)
+
+
+def _rebuild_cfg(func: IRFunction) -> IRFunction:
+    func.rebuild_cfg()
+    return func
+
+
+class AnalysisManager:
+    """
+    Кэш анализов по функциям.
+
+    CFG поддерживают сами IRFunction и проходы (refresh_successors,
+    remove_blocks), поэтому в начале он считается построенным; после
+    прохода, который его сбрасывает, рёбра восстанавливаются rebuild_cfg().
+    Цепочки def-use хранятся в IRFunction, менеджер только сбрасывает их.
+    """
+
+    COMPUTE: Dict[str, Callable[[IRFunction], Any]] = {
+        CFG: _rebuild_cfg,
+        DOMINATORS: DominatorTree,
+        LIVENESS: live_variables,
+        DEF_USE: IRFunction.def_use_chains,
+    }
+
+    def __init__(self, program: Optional[IRProgram] = None):
+        self.results: Dict[IRFunction, Dict[str, Any]] = {}
+        self.stats = {"computed": 0, "reused": 0, "invalidated": 0}
+        if program is not None:
+            for func in program.functions:
+                self.results[func] = {CFG: func}
+
+    def get(self, name: str, func: IRFunction) -> Any:
+        results = self.results.setdefault(func, {})
+        if name in results:
+            self.stats["reused"] += 1
+            return results[name]
+        self.stats["computed"] += 1
+        result = results[name] = self.COMPUTE[name](func)
+        return result
+
+    def cached(self, name: str, func: IRFunction) -> bool:
+        return name in self.results.get(func, {})
+
+    def invalidate(self, program: IRProgram, names: Sequence[str]):
+        for func in program.functions:
+            results = self.results.get(func)
+            if results:
+                for name in names:
+                    if results.pop(name, None) is not None:
+                        self.stats["invalidated"] += 1
+            if DEF_USE in names:
+                func.invalidate_def_use()
+
+
+class Pass:
+    """
+    Проход конвейера. run() возвращает True, если IR изменился;
+    нужные анализы берутся из manager.analyses.
+    """
+
+    name = "pass"
+    requires: Tuple[str, ...] = ()
+    invalidates: Tuple[str, ...] = ALL_ANALYSES
+
+    def run(self, program: IRProgram, manager: 'PassManager') -> bool:
+        raise NotImplementedError
+
+
+class StatsPass(Pass):
+    """
+    Проход оптимизатора (объект со словарём stats) как элемент конвейера.
+
+    IR считается изменённым, если выросла сумма счётчиков changes; без
+    счётчиков — всегда. Если у объекта есть атрибут analyses, на время
+    запуска в него передаётся кэш анализов.
+    """
+
+    def __init__(self, name: str, target: Any, method: str, changes: Optional[Sequence[str]] = None,
+                 requires: Tuple[str, ...] = (), invalidates: Tuple[str, ...] = ALL_ANALYSES):
+        self.name = name
+        self.target = target
+        self.method = method
+        self.changes = tuple(changes) if changes is not None else None
+        self.requires = requires
+        self.invalidates = invalidates
+
+    def _changes(self) -> int:
+        return sum(self.target.stats[key] for key in self.changes)
+
+    def run(self, program: IRProgram, manager: 'PassManager') -> bool:
+        before = self._changes() if self.changes is not None else 0
+        uses_analyses = hasattr(self.target, 'analyses')
+        if uses_analyses:
+            self.target.analyses = manager.analyses
+        try:
+            getattr(self.target, self.method)(program)
+        finally:
+            if uses_analyses:
+                self.target.analyses = None
+        return self.changes is None or self._changes() > before
+
+
+class FunctionPass(Pass):
+    """Функция (program) -> bool как проход конвейера."""
+
+    def __init__(self, name: str, function: Callable[[IRProgram], bool],
+                 requires: Tuple[str, ...] = (), invalidates: Tuple[str, ...] = ALL_ANALYSES):
+        self.name = name
+        self.function = function
+        self.requires = requires
+        self.invalidates = invalidates
+
+    def run(self, program: IRProgram, manager: 'PassManager') -> bool:
+        return self.function(program)
+
+
+class FixedPoint(Pass):
+    """
+    Группа проходов, повторяемая до неподвижной точки.
+
+    Проходы считаются идемпотентными: проход пропускается, если после его
+    последнего запуска IR не менял ни один другой проход. Группа
+    останавливается, когда пропускаются все проходы, или после
+    max_iterations повторов.
+    """
+
+    requires = ()
+    invalidates = ()
+
+    def __init__(self, passes: Sequence[Pass], max_iterations: int = 5, name: str = "fixed-point"):
+        self.name = name
+        self.passes = list(passes)
+        self.max_iterations = max_iterations
+        self.iterations = 0
+
+    def run(self, program: IRProgram, manager: 'PassManager') -> bool:
+        # Номер запуска, после которого IR видел каждый проход, и номер последнего изменения
+        seen: Dict[int, int] = {}
+        last_change = -1
+        step = 0
+        for _ in range(self.max_iterations):
+            ran = False
+            for i, p in enumerate(self.passes):
+                if seen.get(i, -2) >= last_change:
+                    continue
+                ran = True
+                if manager.run_pass(p, program):
+                    last_change = step
+                seen[i] = step
+                step += 1
+            if not ran:
+                break
+            self.iterations += 1
+        return last_change >= 0
+
+class PassTiming:
+    """Суммарные время и изменение числа инструкций одного прохода."""
+    __slots__ = ('name', 'runs', 'changed', 'seconds', 'delta')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.runs = 0
+        self.changed = 0
+        self.seconds = 0.0
+        self.delta = 0
+
+
+def count_instructions(program: IRProgram) -> int:
+    return sum(len(block.instructions) for func in program.functions for block in func.blocks)
+
+
+class PassManager:
+    """Конвейер проходов с кэшем анализов и, по запросу, замером времени."""
+
+    def __init__(self, passes: Sequence[Pass], time_passes: bool = False):
+        self.passes = list(passes)
+        self.time_passes = time_passes
+        self.analyses = AnalysisManager()
+        self.timings: Dict[str, PassTiming] = {}
+
+    def run(self, program: IRProgram) -> IRProgram:
+        self.analyses = AnalysisManager(program)
+        for p in self.passes:
+            self.run_pass(p, program)
+        return program
+
+    def run_pass(self, p: Pass, program: IRProgram) -> bool:
+        if isinstance(p, FixedPoint):
+            return p.run(program, self)
+        for name in p.requires:
+            for func in program.functions:
+                if func.blocks:
+                    self.analyses.get(name, func)
+
+        if not self.time_passes:
+            changed = p.run(program, self)
+        else:
+            before = count_instructions(program)
+            start = time.perf_counter()
+            changed = p.run(program, self)
+            seconds = time.perf_counter() - start
+            timing = self.timings.get(p.name)
+            if timing is None:
+                timing = self.timings[p.name] = PassTiming(p.name)
+            timing.runs += 1
+            timing.changed += changed
+            timing.seconds += seconds
+            timing.delta += count_instructions(program) - before
+
+        if changed and p.invalidates:
+            self.analyses.invalidate(program, p.invalidates)
+        return changed
+
+    def report(self) -> List[str]:
+        """Строки для --time-passes: время и изменение числа инструкций по проходам."""
+        lines = [f"{'Pass':<22} {'Runs':>4} {'Changed':>7} {'Time, ms':>9} {'Instrs':>7}"]
+        total = 0.0
+        for timing in self.timings.values():
+            total += timing.seconds
+            lines.append(f"{timing.name:<22} {timing.runs:>4} {timing.changed:>7} "
+                         f"{timing.seconds * 1000:>9.2f} {timing.delta:>+7}")
+        lines.append(f"{'Total':<22} {'':>4} {'':>7} {total * 1000:>9.2f}")
+        for p in self.passes:
+            if isinstance(p, FixedPoint):
+                lines.append(f"{p.name}: {p.iterations} iterations (limit {p.max_iterations})")
+        stats = self.analyses.stats
+        lines.append(f"Analyses: {stats['computed']} computed, {stats['reused']} reused, "
+                     f"{stats['invalidated']} invalidated")
+        return lines
@@ -0,0 +1,414 @@
+# ir/ssa.py
+"""
+Построение SSA-формы и выход из неё.
+
+DominatorTree — доминаторы по Cooper-Harvey-Kennedy ("A Simple, Fast
+Dominance Algorithm") и границы доминирования.
+
+SSABuilder — перевод функции в pruned SSA: переменные (var_to_temp и все
+временные с несколькими определениями) получают версии `имя.N`, PHI
+ставятся в итерированной границе доминирования только там, где
+переменная жива. Используется без версии (исходное имя) означает
+неинициализированное значение, как и до SSA.
+
+SSADestructor — выход из SSA перед кодогенерацией: версии одной
+переменной, живые интервалы которых не пересекаются, снова получают общее
+имя (PHI между ними исчезают); остальные PHI заменяются параллельными
+копиями на рёбрах (критические рёбра расщепляются).
+"""
+
+from typing import Dict, List, Optional, Set, Tuple
+
+from .basic_block import BasicBlock
+from .control_flow import IRProgram, IRFunction, JUMP_OPCODES, BLOCK_ENDING_OPCODES
+from .dataflow import live_variables
+from .ir_instructions import (
+    IRInstruction, IROpcode, IROperand, IROperandType, DEF_OPCODES, PhiInst, Temp,
+    defined_temp, used_temps
+)
+
+
+VERSION_SEPARATOR = '.'
+
+
+def ssa_base(name: str) -> str:
+    """Имя переменной без номера версии (new_temp не порождает точек в именах)."""
+    return name.split(VERSION_SEPARATOR, 1)[0]
+
+
+def phis(block: BasicBlock) -> List[PhiInst]:
+    """PHI в начале блока."""
+    result = []
+    for instr in block.instructions:
+        if not isinstance(instr, PhiInst):
+            break
+        result.append(instr)
+    return result
+
+
+class DominatorTree:
+    """Дерево доминаторов функции (только достижимые из entry блоки)."""
+
+    def __init__(self, func: IRFunction):
+        self.entry = func.entry_block or func.blocks[0]
+        self.rpo = self._reverse_postorder()
+        self.order = {block: i for i, block in enumerate(self.rpo)}
+        self.idom: Dict[BasicBlock, BasicBlock] = self._compute_idom()
+        self.children: Dict[BasicBlock, List[BasicBlock]] = {block: [] for block in self.rpo}
+        for block in self.rpo[1:]:
+            self.children[self.idom[block]].append(block)
+        for block in self.rpo:
+            block.idom = self.idom[block] if block is not self.entry else None
+
+    def _reverse_postorder(self) -> List[BasicBlock]:
+        postorder = []
+        visited = {self.entry}
+        stack = [(self.entry, iter(self.entry.successors))]
+        while stack:
+            block, successors = stack[-1]
+            for succ in successors:
+                if succ not in visited:
+                    visited.add(succ)
+                    stack.append((succ, iter(succ.successors)))
+                    break
+            else:
+                stack.pop()
+                postorder.append(block)
+        postorder.reverse()
+        return postorder
+
+    def _compute_idom(self) -> Dict[BasicBlock, BasicBlock]:
+        order = self.order
+        idom = {self.entry: self.entry}
+
+        def intersect(a: BasicBlock, b: BasicBlock) -> BasicBlock:
+            while a is not b:
+                while order[a] > order[b]:
+                    a = idom[a]
+                while order[b] > order[a]:
+                    b = idom[b]
+            return a
+
+        changed = True
+        while changed:
+            changed = False
+            for block in self.rpo[1:]:
+                new_idom = None
+                for pred in block.predecessors:
+                    if pred in idom:
+                        new_idom = pred if new_idom is None else intersect(pred, new_idom)
+                if idom.get(block) is not new_idom:
+                    idom[block] = new_idom
+                    changed = True
+        return idom
+
+    def dominates(self, a: BasicBlock, b: BasicBlock) -> bool:
+        """a доминирует над b (проход вверх по дереву от b)."""
+        while b is not a:
+            if b is self.entry or b not in self.idom:
+                return False
+            b = self.idom[b]
+        return True
+
+    def frontiers(self) -> Dict[BasicBlock, List[BasicBlock]]:
+        """Границы доминирования (алгоритм из той же статьи CHK)."""
+        frontier: Dict[BasicBlock, List[BasicBlock]] = {block: [] for block in self.rpo}
+        for block in self.rpo:
+            preds = [p for p in block.predecessors if p in self.idom]
+            if len(preds) < 2:
+                continue
+            for runner in preds:
+                while runner is not self.idom[block]:
+                    if block not in frontier[runner]:
+                        frontier[runner].append(block)
+                    runner = self.idom[runner]
+        return frontier
+
+
+class SSABuilder:
+    """Перевод функций в pruned SSA."""
+
+    def __init__(self):
+        self.stats = {"variables": 0, "phi_inserted": 0}
+
+    def build(self, program: IRProgram) -> IRProgram:
+        for func in program.functions:
+            self.build_function(func)
+        return program
+
+    def build_function(self, func: IRFunction):
+        if not func.blocks:
+            return
+        func.invalidate_def_use()
+        if not func.block_by_label:
+            # IR собран вручную, без create_block — восстанавливаем CFG
+            func.rebuild_cfg()
+
+        dom = DominatorTree(func)
+        blocks = dom.rpo
+        variables, def_blocks, types = self._collect_variables(func, blocks)
+        if not variables:
+            return
+        self.stats["variables"] += len(variables)
+
+        # Pruned: PHI только там, где переменная жива на входе
+        live = live_variables(func, variables.__contains__, blocks)
+        frontier = dom.frontiers()
+        phi_of: Dict[BasicBlock, Dict[str, PhiInst]] = {}
+        for name in variables:
+            has_phi, seen = set(), set(def_blocks[name])
+            work = list(def_blocks[name])
+            while work:
+                for block in frontier[work.pop()]:
+                    if block in has_phi or not live.contains_in(block, name):
+                        continue
+                    has_phi.add(block)
+                    phi = PhiInst(Temp(name, types[name]), [(None, p.label) for p in block.predecessors])
+                    phi_of.setdefault(block, {})[name] = phi
+                    if block not in seen:
+                        seen.add(block)
+                        work.append(block)
+        for block, block_phis in phi_of.items():
+            # Порядок PHI — порядок переменных (внешний цикл выше)
+            block.instructions[:0] = list(block_phis.values())
+            self.stats["phi_inserted"] += len(block_phis)
+
+        self._rename(func, dom, variables, types, phi_of)
+
+    def _collect_variables(self, func: IRFunction, blocks: List[BasicBlock]):
+        """Переменные функции: var_to_temp и временные с несколькими определениями."""
+        order: Dict[str, None] = {}
+        counts: Dict[str, int] = {}
+        def_blocks: Dict[str, List[BasicBlock]] = {}
+        types = {}
+        for block in blocks:
+            for instr in block.instructions:
+                name = defined_temp(instr)
+                if name is None or name == 'void':
+                    continue
+                order.setdefault(name, None)
+                counts[name] = counts.get(name, 0) + 1
+                # Блоки обходятся по порядку: повтор может быть только последним
+                blocks_of = def_blocks.setdefault(name, [])
+                if not blocks_of or blocks_of[-1] is not block:
+                    blocks_of.append(block)
+                types.setdefault(name, instr.operands[0].ir_type)
+        named = {op.value for op in func.var_to_temp.values()
+                 if op.operand_type is IROperandType.TEMPORARY}
+        variables = {name: None for name in order if counts[name] > 1 or name in named}
+        return variables, def_blocks, types
+
+    def _rename(self, func: IRFunction, dom: DominatorTree, variables: Dict[str, None],
+                types: Dict[str, object], phi_of: Dict[BasicBlock, Dict[str, PhiInst]]):
+        stacks: Dict[str, List[str]] = {name: [] for name in variables}
+        counters = {name: 0 for name in variables}
+
+        def new_version(name: str) -> str:
+            counters[name] += 1
+            version = f"{name}{VERSION_SEPARATOR}{counters[name]}"
+            stacks[name].append(version)
+            return version
+
+        def current(op: IROperand) -> IROperand:
+            stack = stacks.get(op.value)
+            if not stack:
+                return op
+            return Temp(stack[-1], op.ir_type)
+
+        def fill_phis(block: BasicBlock, succ: BasicBlock):
+            for name, phi in phi_of.get(succ, {}).items():
+                stack = stacks[name]
+                value = Temp(stack[-1] if stack else name, types[name])
+                phi.sources = [(value, label) if label == block.label and old is None else (old, label)
+                               for old, label in phi.sources]
+
+        work: List[Tuple[BasicBlock, Optional[List[str]]]] = [(dom.entry, None)]
+        while work:
+            block, pushed = work.pop()
+            if pushed is not None:
+                for name in pushed:
+                    stacks[name].pop()
+                continue
+
+            pushed = []
+            filled = set()
+            closed = False
+            for instr in block.instructions:
+                if isinstance(instr, PhiInst):
+                    name = instr.operands[0].value
+                    instr.operands[0] = Temp(new_version(name), instr.operands[0].ir_type)
+                    pushed.append(name)
+                    continue
+
+                has_dest = instr.opcode in DEF_OPCODES
+                for i, op in enumerate(instr.operands):
+                    if (i or not has_dest) and op.operand_type is IROperandType.TEMPORARY:
+                        instr.operands[i] = current(op)
+
+                if not closed and instr.opcode in JUMP_OPCODES:
+                    # Источники PHI — значения в точке перехода
+                    target = func.get_block(instr.operands[-1].value)
+                    if target is not None and target not in filled:
+                        filled.add(target)
+                        fill_phis(block, target)
+
+                name = defined_temp(instr)
+                if name in stacks:
+                    instr.operands[0] = Temp(new_version(name), instr.operands[0].ir_type)
+                    pushed.append(name)
+                if instr.opcode in BLOCK_ENDING_OPCODES:
+                    closed = True
+
+            for succ in block.successors:
+                if succ not in filled:
+                    fill_phis(block, succ)
+
+            work.append((block, pushed))
+            for child in reversed(dom.children[block]):
+                work.append((child, None))
+
+        # Предшественники вне дерева (недостижимые) дают неинициализированное значение
+        for block, block_phis in phi_of.items():
+            for name, phi in block_phis.items():
+                phi.sources = [(Temp(name, types[name]) if value is None else value, label)
+                               for value, label in phi.sources]
+
+
+class SSADestructor:
+    """Выход из SSA: объединение версий и PHI -> копии на рёбрах."""
+
+    def __init__(self):
+        self.stats = {"coalesced": 0, "copies": 0, "edges_split": 0}
+
+    def destruct(self, program: IRProgram) -> IRProgram:
+        for func in program.functions:
+            self.destruct_function(func)
+        return program
+
+    def destruct_function(self, func: IRFunction):
+        if not func.blocks:
+            return
+        func.invalidate_def_use()
+        families = self._families(func)
+        if families:
+            self._coalesce(func, families)
+        self._lower_phis(func)
+
+    def _families(self, func: IRFunction) -> Dict[str, Set[str]]:
+        """Базовое имя -> все его версии (включая само имя)."""
+        families: Dict[str, Set[str]] = {}
+        for block in func.blocks:
+            for instr in block.instructions:
+                for name in used_temps(instr) + [defined_temp(instr)]:
+                    if name and VERSION_SEPARATOR in name:
+                        base = ssa_base(name)
+                        families.setdefault(base, {base}).add(name)
+        return families
+
+    def _coalesce(self, func: IRFunction, families: Dict[str, Set[str]]):
+        """Версии без пересекающихся интервалов жизни получают базовое имя."""
+        dom = DominatorTree(func)
+        blocks = dom.rpo
+        tracked = lambda name: ssa_base(name) in families
+        liveness = live_variables(func, tracked, blocks)
+
+        conflicts: Set[str] = set()
+        for block in blocks:
+            live: Dict[str, Set[str]] = {}
+            for name in liveness.out_items(block):
+                live.setdefault(ssa_base(name), set()).add(name)
+            for instr in reversed(block.instructions):
+                if isinstance(instr, PhiInst):
+                    continue
+                dest = defined_temp(instr)
+                if dest is not None and tracked(dest):
+                    versions = live.setdefault(ssa_base(dest), set())
+                    if versions - {dest}:
+                        conflicts.add(ssa_base(dest))
+                    versions.discard(dest)
+                for name in used_temps(instr):
+                    if tracked(name):
+                        live.setdefault(ssa_base(name), set()).add(name)
+            # PHI определяют значения одновременно на входе блока
+            for phi in phis(block):
+                dest = phi.operands[0].value
+                if live.get(ssa_base(dest), set()) - {dest}:
+                    conflicts.add(ssa_base(dest))
+
+        merged = {base for base in families if base not in conflicts}
+        self.stats["coalesced"] += len(merged)
+        if not merged:
+            return
+
+        def rename(op: IROperand) -> IROperand:
+            if op is not None and op.operand_type is IROperandType.TEMPORARY \
+                    and VERSION_SEPARATOR in op.value and ssa_base(op.value) in merged:
+                return Temp(ssa_base(op.value), op.ir_type)
+            return op
+
+        for block in func.blocks:
+            new_instructions = []
+            for instr in block.instructions:
+                instr.operands = [rename(op) for op in instr.operands]
+                if isinstance(instr, PhiInst):
+                    instr.sources = [(rename(value), label) for value, label in instr.sources]
+                    dest = instr.operands[0].value
+                    if all(value.operand_type is IROperandType.TEMPORARY and value.value == dest
+                           for value, _ in instr.sources):
+                        continue
+                elif instr.opcode is IROpcode.MOVE and len(instr.operands) == 2 \
+                        and instr.operands[1].operand_type is IROperandType.TEMPORARY \
+                        and instr.operands[0].value == instr.operands[1].value \
+                        and ssa_base(instr.operands[0].value) in merged:
+                    continue
+                new_instructions.append(instr)
+            block.instructions = new_instructions
+
+    def _lower_phis(self, func: IRFunction):
+        for block in list(func.blocks):
+            block_phis = phis(block)
+            if not block_phis:
+                continue
+            del block.instructions[:len(block_phis)]
+            for pred in list(block.predecessors):
+                copies = []
+                for phi in block_phis:
+                    dest = phi.operands[0]
+                    for value, label in phi.sources:
+                        if label == pred.label and not (value.operand_type is IROperandType.TEMPORARY
+                                                        and value.value == dest.value):
+                            copies.append((dest, value))
+                if not copies:
+                    continue
+                if len(pred.successors) > 1:
+                    target = func.split_edge(pred, block)
+                    self.stats["edges_split"] += 1
+                    position = 0
+                else:
+                    target = pred
+                    position = next((i for i, instr in enumerate(pred.instructions)
+                                     if instr.opcode in JUMP_OPCODES), len(pred.instructions))
+                sequence = self._sequentialize(func, copies)
+                target.instructions[position:position] = sequence
+                self.stats["copies"] += len(sequence)
+
+    @staticmethod
+    def _sequentialize(func: IRFunction, copies: List[Tuple[IROperand, IROperand]]) -> List[IRInstruction]:
+        """Параллельные копии -> последовательность MOVE (циклы разрываются временной)."""
+        pending = list(copies)
+        result = []
+        while pending:
+            sources = {src.value for _, src in pending if src.operand_type is IROperandType.TEMPORARY}
+            for i, (dest, src) in enumerate(pending):
+                if dest.value not in sources:
+                    result.append(IRInstruction(IROpcode.MOVE, [dest, src]))
+                    del pending[i]
+                    break
+            else:
+                # Цикл: сохраняем старое значение приёмника первой копии
+                dest = pending[0][0]
+                saved = func.new_temp("phi_tmp", dest.ir_type)
+                result.append(IRInstruction(IROpcode.MOVE, [saved, dest]))
+                pending = [(d, saved if s.operand_type is IROperandType.TEMPORARY and s.value == dest.value
+                            else s) for d, s in pending]
+        return result
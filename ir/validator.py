@@ -7,7 +7,8 @@ from typing import List, Set, Dict, Tuple
 
 from .control_flow import IRProgram, IRFunction
 from .basic_block import BasicBlock
-from .ir_instructions import IRInstruction, IROpcode, IROperandType, PhiInst
+from .ir_instructions import IRInstruction, IROpcode, IROperandType, PhiInst, defined_temp, used_temps
+from .dataflow import reaching_definitions
 
 
 class IRValidator:
@@ -60,6 +61,9 @@ class IRValidator:
         for block in func.blocks:
             self._validate_block(block, func, labels, defined_temps)
 
+        # Использования временных без единого достигающего определения
+        self._validate_uses(func, reachable)
+
         # Проверяем PHI nodes
         for block in func.blocks:
             self._validate_phi_nodes(block, func)
@@ -110,26 +114,13 @@ class IRValidator:
                             f"jump to undefined label '{label_name}'"
                         )
 
-        # Проверка использования неопределённых временных
-        for op in instr.operands:
-            if op.operand_type == IROperandType.TEMPORARY:
-                temp_name = str(op.value)
-                if temp_name not in defined_temps:
-                    # Может быть параметром
-                    is_param = any(p.value == temp_name for p in func.parameters)
-                    if not is_param:
-                        self.errors.append(
-                            f"Function '{func.name}', block '{block.label}': "
-                            f"use of undefined temporary '%{temp_name}'"
-                        )
-
         # Отслеживание определённых временных
         if instr.opcode in (IROpcode.ADD, IROpcode.SUB, IROpcode.MUL, IROpcode.DIV,
                             IROpcode.MOD, IROpcode.LOAD, IROpcode.ALLOCA, IROpcode.CALL,
                             IROpcode.NEG, IROpcode.NOT, IROpcode.AND, IROpcode.OR,
                             IROpcode.XOR, IROpcode.CMP_EQ, IROpcode.CMP_NE,
                             IROpcode.CMP_LT, IROpcode.CMP_LE, IROpcode.CMP_GT,
-                            IROpcode.CMP_GE, IROpcode.MOVE, IROpcode.GEP):
+                            IROpcode.CMP_GE, IROpcode.MOVE, IROpcode.GEP, IROpcode.BROADCAST):
             if instr.operands:
                 dest = instr.operands[0]
                 if dest.operand_type == IROperandType.TEMPORARY:
@@ -141,6 +132,45 @@ class IRValidator:
                         )
                     defined_temps[temp_name] = block
 
+    def _validate_uses(self, func: IRFunction, reachable: Set[BasicBlock]):
+        """
+        Проверяет, что до каждого использования временной доходит хотя бы
+        одно её определение (достигающие определения, ir.dataflow).
+        Источники PHI проверяются только на наличие определения в функции.
+        """
+        if not func.blocks:
+            return
+        reaching = reaching_definitions(func)
+        defs_of: Dict[str, int] = {}
+        for i, (_, instr) in enumerate(reaching.numbering.items):
+            name = defined_temp(instr)
+            defs_of[name] = defs_of.get(name, 0) | 1 << i
+        params = {p.value for p in func.parameters}
+
+        def report(block: BasicBlock, name: str):
+            self.errors.append(
+                f"Function '{func.name}', block '{block.label}': "
+                f"use of undefined temporary '%{name}'"
+            )
+
+        for block in func.blocks:
+            if block not in reachable:
+                continue
+            incoming = reaching.in_bits[block]
+            local: Set[str] = set()
+            for instr in block.instructions:
+                for name in used_temps(instr):
+                    if name in params:
+                        continue
+                    if isinstance(instr, PhiInst):
+                        if name not in defs_of:
+                            report(block, name)
+                    elif name not in local and not incoming & defs_of.get(name, 0):
+                        report(block, name)
+                dest = defined_temp(instr)
+                if dest is not None:
+                    local.add(dest)
+
     def _validate_phi_nodes(self, block: BasicBlock, func: IRFunction):
         """Проверяет PHI инструкции."""
         for instr in block.instructions:
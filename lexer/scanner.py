@@ -1,7 +1,8 @@
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from .token import Token, TokenType, KEYWORDS, OPERATORS, DELIMITERS, MAX_IDENTIFIER_LENGTH, MAX_INT_VALUE, \
     MIN_INT_VALUE
 from .errors import *
+from .token_stream import TokenStream
 
 
 class Scanner:
@@ -13,6 +14,7 @@ class Scanner:
         self.line = 1
         self.column = 1
         self.errors: List[LexicalError] = []
+        self._stream: Optional[TokenStream] = None
 
     def scan_tokens(self) -> List[Token]:
         """Сканирует все токены из исходного кода"""
@@ -24,6 +26,27 @@ class Scanner:
         self.tokens.append(Token(TokenType.END_OF_FILE, "", self.line, self.column))
         return self.tokens
 
+    def iter_tokens(self) -> Iterator[Token]:
+        """
+        Лениво выдаёт токены по мере сканирования.
+
+        В отличие от scan_tokens() список всех токенов не накапливается:
+        self.tokens используется как временный буфер и очищается.
+        """
+        tokens = self.tokens
+        while not self.is_at_end():
+            self.start = self.current
+            self._scan_token()
+            if tokens:
+                yield from tokens
+                tokens.clear()
+
+        yield Token(TokenType.END_OF_FILE, "", self.line, self.column)
+
+    def token_stream(self, capacity: int = TokenStream.DEFAULT_CAPACITY) -> TokenStream:
+        """Поток токенов с буфером предпросмотра для Parser."""
+        return TokenStream(self.iter_tokens(), capacity)
+
     def _scan_token(self):
         """Сканирует один токен"""
         char = self._advance()
@@ -413,23 +436,27 @@ class Scanner:
             self.errors.append(error)
             self._add_token(TokenType.INVALID, first_char)
 
-    def next_token(self) -> Token:
-        """Возвращает следующий токен и продвигает указатель"""
-        if not self.tokens:
-            self.scan_tokens()
+    def _next_token_stream(self) -> TokenStream:
+        if self._stream is None:
+            # Если токены уже отсканированы через scan_tokens(), читаем их;
+            # иначе сканируем лениво
+            source = list(self.tokens) if self.tokens else self.iter_tokens()
+            self._stream = TokenStream(source)
+        return self._stream
 
-        if self.tokens:
-            return self.tokens.pop(0)
-        return Token(TokenType.END_OF_FILE, "", self.line, self.column)
+    def next_token(self) -> Token:
+        """Возвращает следующий токен и продвигает указатель (O(1))"""
+        token = self._next_token_stream().next()
+        if token is None:
+            return Token(TokenType.END_OF_FILE, "", self.line, self.column)
+        return token
 
     def peek_token(self) -> Token:
-        """Возвращает следующий токен без продвижения"""
-        if not self.tokens:
-            self.scan_tokens()
-
-        if self.tokens:
-            return self.tokens[0]
-        return Token(TokenType.END_OF_FILE, "", self.line, self.column)
+        """Возвращает следующий токен без продвижения (O(1))"""
+        token = self._next_token_stream().peek()
+        if token is None:
+            return Token(TokenType.END_OF_FILE, "", self.line, self.column)
+        return token
 
     def get_line(self) -> int:
         return self.line
@@ -0,0 +1,220 @@
+import re
+from typing import Dict, Iterator, List
+
+from .scanner import Scanner
+from .token import Token, TokenType, KEYWORDS, OPERATORS, DELIMITERS, MAX_IDENTIFIER_LENGTH, MAX_INT_VALUE, \
+    MIN_INT_VALUE
+from .errors import *
+
+
+# Классы первого символа токена
+_NEWLINE, _SPACE, _IDENT, _DIGIT, _OPERATOR, _DELIMITER, _SLASH, _MINUS = range(8)
+
+# Таблица диспетчеризации по первому символу (только ASCII; остальное — в исходный Scanner)
+_DISPATCH: Dict[str, int] = {'\n': _NEWLINE, '/': _SLASH, '-': _MINUS}
+for _c in ' \t\r':
+    _DISPATCH[_c] = _SPACE
+for _c in 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_':
+    _DISPATCH[_c] = _IDENT
+for _c in '0123456789':
+    _DISPATCH[_c] = _DIGIT
+for _c in '+*%=<>!&|^':
+    _DISPATCH[_c] = _OPERATOR
+for _c in DELIMITERS:
+    _DISPATCH[_c] = _DELIMITER
+
+# Двухсимвольные операторы проверяются раньше односимвольных, как в Scanner._read_operator
+_TWO_CHAR_OPERATORS = {op: tt for op, tt in OPERATORS.items() if len(op) == 2}
+_ONE_CHAR_OPERATORS = {op: tt for op, tt in OPERATORS.items() if len(op) == 1 and op != '.'}
+
+_SPACES = re.compile(r'[ \t\r]+')
+_IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+_NUMBER = re.compile(r'[0-9]+(?:\.[0-9]+)?')
+
+# Символы, после которых быстрый разбор числа не применим (экспонента, лишняя точка)
+_NUMBER_TAIL = frozenset('.eE')
+
+
+class TableScanner(Scanner):
+    """
+    Табличный сканер: выбор ветки по первому символу через словарь,
+    идентификаторы, числа и пробелы — одним вызовом скомпилированного regex.
+
+    Выдаёт ровно тот же поток токенов и ошибок, что и Scanner. Редкие и
+    нетривиальные случаи (строки, многострочные комментарии, экспоненты,
+    отрицательные числа, не-ASCII символы) разбираются методами Scanner.
+    """
+
+    # Размер пачки токенов при потоковом сканировании
+    STREAM_CHUNK = 256
+
+    def scan_tokens(self) -> List[Token]:
+        """Сканирует все токены из исходного кода"""
+        for _ in self._scan(0):
+            pass
+        return self.tokens
+
+    def iter_tokens(self) -> Iterator[Token]:
+        """Лениво выдаёт токены пачками по STREAM_CHUNK, не накапливая весь список"""
+        for batch in self._scan(self.STREAM_CHUNK):
+            yield from batch
+            batch.clear()
+
+    def _scan(self, chunk: int) -> Iterator[List[Token]]:
+        """
+        Основной цикл сканирования. При chunk > 0 отдаёт self.tokens каждый раз,
+        когда в нём набирается chunk токенов (получатель очищает список).
+        """
+        source = self.source
+        length = len(source)
+        tokens = self.tokens
+        append = tokens.append
+        errors = self.errors
+        dispatch = _DISPATCH
+        pos = self.current
+        line = self.line
+        column = self.column
+
+        while pos < length:
+            if chunk and len(tokens) >= chunk:
+                yield tokens
+
+            char = source[pos]
+            kind = dispatch.get(char)
+
+            if kind == _SPACE:
+                end = _SPACES.match(source, pos).end()
+                column += end - pos
+                pos = end
+                continue
+
+            if kind == _NEWLINE:
+                pos += 1
+                line += 1
+                column = 1
+                continue
+
+            if kind == _IDENT:
+                end = _IDENTIFIER.match(source, pos).end()
+                if end < length and source[end] > '\x7f':
+                    # Возможное продолжение идентификатора не-ASCII буквой
+                    pos, line, column = self._fallback(self._read_identifier, pos, line, column)
+                    continue
+                identifier = source[pos:end]
+                if len(identifier) > MAX_IDENTIFIER_LENGTH:
+                    errors.append(IdentifierTooLongError(
+                        len(identifier), MAX_IDENTIFIER_LENGTH, line, column
+                    ))
+                token_type = KEYWORDS.get(identifier)
+                if token_type is None:
+                    append(Token(TokenType.IDENTIFIER, identifier, line, column))
+                elif token_type is TokenType.TRUE or token_type is TokenType.FALSE:
+                    append(Token(token_type, identifier, line, column, token_type is TokenType.TRUE))
+                else:
+                    append(Token(token_type, identifier, line, column))
+                column += end - pos
+                pos = end
+                continue
+
+            if kind == _DIGIT:
+                end = _NUMBER.match(source, pos).end()
+                if end < length and (source[end] in _NUMBER_TAIL or
+                                     (source[end] > '\x7f' and source[end].isdigit())):
+                    pos, line, column = self._fallback(self._read_number, pos, line, column)
+                    continue
+                number_str = source[pos:end]
+                if '.' in number_str:
+                    append(Token(TokenType.FLOAT_LITERAL, number_str, line, column, float(number_str)))
+                else:
+                    if len(number_str) > 1 and number_str[0] == '0':
+                        errors.append(InvalidNumberError(number_str, line, column))
+                    value = int(number_str)
+                    if value > MAX_INT_VALUE or value < MIN_INT_VALUE:
+                        errors.append(IntegerOutOfRangeError(number_str, line, column))
+                    append(Token(TokenType.INT_LITERAL, number_str, line, column, value))
+                column += end - pos
+                pos = end
+                continue
+
+            if kind == _DELIMITER:
+                append(Token(DELIMITERS[char], char, line, column))
+                pos += 1
+                column += 1
+                continue
+
+            if kind == _OPERATOR or kind == _SLASH or kind == _MINUS:
+                pair = source[pos:pos + 2]
+                if kind == _SLASH and (pair == '//' or pair == '/*'):
+                    if pair == '/*':
+                        pos, line, column = self._fallback(self._skip_multi_line_comment, pos + 1, line, column + 1)
+                        continue
+                    end = source.find('\n', pos)
+                    if end < 0:
+                        end = length
+                    column += end - pos
+                    pos = end
+                    continue
+                if kind == _MINUS and self._starts_negative_number(pos):
+                    pos, line, column = self._fallback(self._read_number, pos, line, column)
+                    continue
+                token_type = _TWO_CHAR_OPERATORS.get(pair)
+                if token_type is not None:
+                    append(Token(token_type, pair, line, column))
+                    pos += 2
+                    column += 2
+                else:
+                    append(Token(_ONE_CHAR_OPERATORS[char], char, line, column))
+                    pos += 1
+                    column += 1
+                continue
+
+            # Строки, точка и всё, чего нет в таблице, — исходной реализацией
+            pos, line, column = self._fallback(self._scan_token, pos, line, column, consumed=0)
+
+        self.current = pos
+        self.line = line
+        self.column = column
+        append(Token(TokenType.END_OF_FILE, "", line, column))
+        if chunk:
+            yield tokens
+
+    def _fallback(self, method, pos: int, line: int, column: int, consumed: int = 1):
+        """
+        Передаёт разбор токена, начинающегося в pos, методу Scanner.
+
+        consumed — сколько символов токена уже «прочитано» (как после _advance).
+        Возвращает новое состояние (pos, line, column).
+        """
+        self.start = pos
+        self.current = pos + consumed
+        self.line = line
+        self.column = column + consumed
+        method()
+        return self.current, self.line, self.column
+
+    def _starts_negative_number(self, pos: int) -> bool:
+        """Та же эвристика, что и Scanner._is_negative_number, для минуса в позиции pos."""
+        source = self.source
+        if pos + 1 >= len(source) or not source[pos + 1].isdigit():
+            return False
+        if pos == 0:
+            return True
+        prev_char = source[pos - 1]
+        return prev_char in ' \t\n\r({[' or prev_char in '+-*/%=<>!&|'
+
+
+# Движки сканирования, доступные для выбора (A/B-сравнение)
+SCANNER_ENGINES = {
+    'classic': Scanner,
+    'table': TableScanner,
+}
+
+DEFAULT_SCANNER_ENGINE = 'table'
+
+
+def create_scanner(source: str, engine: str = DEFAULT_SCANNER_ENGINE) -> Scanner:
+    """Создаёт сканер выбранного движка ('classic' или 'table')."""
+    try:
+        return SCANNER_ENGINES[engine](source)
+    except KeyError:
+        raise ValueError(f"Unknown scanner engine: {engine}") from None
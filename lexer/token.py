@@ -70,6 +70,9 @@ class TokenType(Enum):
 
 
 class Token:
+    # Токенов в файле сотни тысяч: без __dict__ каждый занимает вдвое меньше памяти
+    __slots__ = ('type', 'lexeme', 'line', 'column', 'literal')
+
     def __init__(self,
                  type: TokenType,
                  lexeme: str,
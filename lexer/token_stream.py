@@ -0,0 +1,78 @@
+from typing import Iterable, Iterator, List, Optional
+
+from .token import Token
+
+
+class TokenStream:
+    """
+    Ленивый поток токенов с кольцевым буфером.
+
+    Токены забираются из итератора по мере обращения к ним, в памяти
+    хранятся только последние `capacity` токенов. Доступ — по абсолютному
+    номеру токена, как к списку: парсеру нужен предпросмотр на 2 токена
+    вперёд и возврат на 1-2 токена назад.
+    """
+
+    DEFAULT_CAPACITY = 8
+
+    def __init__(self, tokens: Iterable[Token], capacity: int = DEFAULT_CAPACITY):
+        self._source: Iterator[Token] = iter(tokens)
+        self._capacity = capacity
+        self._buffer: List[Optional[Token]] = [None] * capacity
+        self._count = 0  # сколько токенов уже прочитано из источника
+        self._exhausted = False
+        self.position = 0  # курсор для next()/peek()
+
+    def get(self, index: int) -> Optional[Token]:
+        """Токен с номером index или None, если поток закончился раньше."""
+        while index >= self._count:
+            if self._exhausted:
+                return None
+            token = next(self._source, None)
+            if token is None:
+                self._exhausted = True
+                return None
+            self._buffer[self._count % self._capacity] = token
+            self._count += 1
+        if index < self._count - self._capacity or index < 0:
+            raise IndexError(f"token {index} is no longer buffered (capacity {self._capacity})")
+        return self._buffer[index % self._capacity]
+
+    def __getitem__(self, index: int) -> Token:
+        token = self.get(index)
+        if token is None:
+            raise IndexError(f"token {index} is past the end of the stream")
+        return token
+
+    def has(self, index: int) -> bool:
+        """Есть ли в потоке токен с номером index."""
+        return self.get(index) is not None
+
+    def peek(self, offset: int = 0) -> Optional[Token]:
+        """Токен на offset позиций впереди курсора (offset < capacity)."""
+        return self.get(self.position + offset)
+
+    def next(self) -> Optional[Token]:
+        """Возвращает токен под курсором и сдвигает курсор."""
+        token = self.get(self.position)
+        if token is not None:
+            self.position += 1
+        return token
+
+    def __iter__(self) -> Iterator[Token]:
+        while True:
+            token = self.next()
+            if token is None:
+                return
+            yield token
+
+    def drain(self) -> int:
+        """Дочитывает источник до конца (например, чтобы собрать все ошибки лексера)."""
+        while self.get(self._count) is not None:
+            pass
+        return self._count
+
+    @property
+    def consumed(self) -> int:
+        """Сколько токенов прочитано из источника."""
+        return self._count
@@ -13,7 +13,7 @@ import argparse
 import sys
 import os
 from pathlib import Path
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Union
 
 # Version info
 __version__ = "1.0.0"
@@ -23,7 +23,9 @@ __build_date__ = date.today().strftime("%Y-%m-%d")
 
 # Импорты компилятора
 from lexer.scanner import Scanner
+from lexer.table_scanner import SCANNER_ENGINES, DEFAULT_SCANNER_ENGINE, create_scanner
 from lexer.token import Token, TokenType
+from lexer.token_stream import TokenStream
 from lexer.errors import LexicalError
 
 from parser.parser import Parser, ParseError
@@ -34,6 +36,7 @@ from parser.ast import ProgramNode
 
 from semantic.analyzer import SemanticAnalyzer
 from semantic.errors import SemanticError
+from semantic.decorated_ast import DecoratedProgram
 
 from ir.ir_generator import IRGenerator
 from ir.ir_writer import IRWriter
@@ -49,6 +52,9 @@ except ImportError:
     HAS_OPTIMIZER = False
 
 from codegen.x86_generator import X86Generator
+from codegen.assembler import assemble_file
+from codegen.x86_encoder import AssemblerError
+from compile_cache import CompileCache, compiler_fingerprint
 
 # Импорты системы ошибок
 from errors import (
@@ -92,6 +98,9 @@ class CompilerPipeline:
         self.before_optimization_instructions = 0
         self.after_optimization_instructions = 0
 
+        # Кэш артефактов компиляции
+        self.cache = None if getattr(args, 'no_cache', False) else CompileCache()
+
     def run(self) -> int:
         """Main pipeline execution"""
         try:
@@ -103,6 +112,16 @@ class CompilerPipeline:
                 print(f"{Colors.CYAN}==> Reading source file: {self.args.input}{Colors.NC}", file=sys.stderr)
                 print(f"{Colors.CYAN}==> Source size: {len(source)} bytes{Colors.NC}", file=sys.stderr)
 
+            # Кэш: при попадании фазы компиляции не запускаются
+            cache_key = None
+            if self.args.mode == 'compile' and self.cache is not None:
+                cache_key = self._cache_key(source)
+                # --stats, --time-passes и -v печатают данные фаз, поэтому для них нужен полный проход
+                diagnostics = (getattr(self.args, 'stats', False) or getattr(self.args, 'time_passes', False)
+                               or self.args.verbose)
+                if not diagnostics and self.cache.fetch(cache_key, self._artifact_kind(), self._output_path()):
+                    return 0
+
             # Phase 1: Lexer
             if self.args.mode == 'preprocess':
                 return self._run_lexer_output(source)
@@ -110,22 +129,18 @@ class CompilerPipeline:
             if self.args.verbose:
                 print(f"{Colors.CYAN}==> Phase 1: Lexical analysis...{Colors.NC}", file=sys.stderr)
 
-            tokens = self._run_lexer_phase(source)
-
-            if self.args.verbose:
-                print(f"{Colors.CYAN}    Tokens generated: {len(tokens)}{Colors.NC}", file=sys.stderr)
-
-            if self.error_handler.too_many_errors():
-                self.error_handler.print_summary()
-                return 1
+            # Лексер работает лениво: токены сканируются по мере потребления парсером
+            scanner = create_scanner(source, getattr(self.args, 'scanner', DEFAULT_SCANNER_ENGINE))
+            tokens = scanner.token_stream()
 
             # Phase 2: Parser
             if self.args.verbose:
                 print(f"{Colors.CYAN}==> Phase 2: Parsing...{Colors.NC}", file=sys.stderr)
 
-            ast = self._run_parser_phase(tokens)
+            ast = self._run_parser_phase(tokens, scanner)
 
             if self.args.verbose:
+                print(f"{Colors.CYAN}    Tokens generated: {tokens.consumed}{Colors.NC}", file=sys.stderr)
                 func_count = len(
                     [d for d in ast.declarations if hasattr(d, 'node_type') and d.node_type.name == 'FUNCTION_DECL'])
                 print(f"{Colors.CYAN}    Functions parsed: {func_count}{Colors.NC}", file=sys.stderr)
@@ -164,14 +179,14 @@ class CompilerPipeline:
             if self.args.verbose:
                 print(f"{Colors.CYAN}==> Phase 4: IR Generation...{Colors.NC}", file=sys.stderr)
 
-            ir_program = self._run_ir_phase(ast)
+            ir_program = self._run_ir_phase(decorated_ast, analyzer)
 
             if self.args.verbose:
                 total_instr = sum(len(b.instructions) for f in ir_program.functions for b in f.blocks)
                 print(f"{Colors.CYAN}    Functions: {len(ir_program.functions)}{Colors.NC}", file=sys.stderr)
                 print(f"{Colors.CYAN}    Instructions: {total_instr}{Colors.NC}", file=sys.stderr)
 
-            if self.args.optimize:
+            if self.args.opt_level:
                 if self.args.verbose:
                     before = self.before_optimization_instructions
                     after = self.after_optimization_instructions
@@ -194,6 +209,9 @@ class CompilerPipeline:
 
                 result = self._run_codegen(ir_program)
 
+                if result == 0 and cache_key and not self.error_handler.messages:
+                    self.cache.store(cache_key, self._artifact_kind(), self._output_path())
+
                 if self.args.verbose and result == 0:
                     output_file = self.args.output or "a.out"
                     size = os.path.getsize(output_file) if os.path.exists(output_file) else 0
@@ -221,9 +239,13 @@ class CompilerPipeline:
 
     def _run_lexer_phase(self, source: str) -> List[Token]:
         """Run lexer and return tokens"""
-        scanner = Scanner(source)
+        scanner = create_scanner(source, getattr(self.args, 'scanner', DEFAULT_SCANNER_ENGINE))
         tokens = scanner.scan_tokens()
+        self._report_lexer_errors(scanner)
+        return tokens
 
+    def _report_lexer_errors(self, scanner: Scanner):
+        """Register lexical errors collected by the scanner"""
         for error in scanner.errors:
             # Определяем код ошибки по типу
             msg = error.message.lower()
@@ -247,8 +269,6 @@ class CompilerPipeline:
                 line=error.line, column=error.column
             )
 
-        return tokens
-
     def _run_lexer_output(self, source: str) -> int:
         """Just run lexer and output tokens"""
         tokens = self._run_lexer_phase(source)
@@ -273,19 +293,31 @@ class CompilerPipeline:
 
         return 0 if not self.error_handler.has_errors() else 1
 
-    def _run_parser_phase(self, tokens: List[Token]) -> ProgramNode:
-        """Run parser and return AST"""
+    def _run_parser_phase(self, tokens: Union[List[Token], TokenStream],
+                          scanner: Optional[Scanner] = None) -> ProgramNode:
+        """
+        Run parser and return AST.
+
+        When tokens is a lazy stream from scanner, the rest of the source is
+        scanned after parsing and lexical errors are reported before syntax ones.
+        """
         parser = Parser(tokens)
 
         try:
             ast = parser.parse()
         except ParseError as e:
+            self._finish_lexing(tokens, scanner)
             self.error_handler.add_error(
                 ErrorCodes.SYNTAX_UNEXPECTED_TOKEN, e.message,
                 ErrorCategory.SYNTAX, line=e.line, column=e.column
             )
             raise CompilerError("Parse failed", 1)
 
+        self._finish_lexing(tokens, scanner)
+        if self.error_handler.error_count > self.error_handler.max_errors:
+            # Лимит исчерпан лексическими ошибками — run() прервёт компиляцию
+            return ast
+
         for error in parser.errors:
             self.error_handler.add_error(
                 ErrorCodes.SYNTAX_UNEXPECTED_TOKEN, error.message,
@@ -294,6 +326,14 @@ class CompilerPipeline:
 
         return ast
 
+    def _finish_lexing(self, tokens, scanner: Optional[Scanner]):
+        """Scan the remainder of a lazy token stream and report lexical errors"""
+        if scanner is None:
+            return
+        if isinstance(tokens, TokenStream):
+            tokens.drain()
+        self._report_lexer_errors(scanner)
+
     def _run_semantic_phase(self, ast: ProgramNode) -> Tuple[bool, SemanticAnalyzer, any]:
         """Run semantic analysis"""
         analyzer = SemanticAnalyzer()
@@ -315,18 +355,15 @@ class CompilerPipeline:
 
         return len(analyzer.get_errors()) == 0, analyzer, decorated_ast
 
-    def _run_ir_phase(self, ast: ProgramNode, analyzer: SemanticAnalyzer = None) -> IRProgram:
-        """Generate IR from AST"""
-        # Всегда создаём новый анализатор для IR генерации
-        sem_analyzer = SemanticAnalyzer()
-        sem_analyzer.analyze(ast)
-
-        if sem_analyzer.get_errors():
+    def _run_ir_phase(self, decorated_ast: DecoratedProgram, analyzer: SemanticAnalyzer) -> IRProgram:
+        """Generate IR from the decorated AST of the semantic phase"""
+        if analyzer.get_errors():
             raise CompilerError("Semantic errors detected", 1)
 
-        generator = IRGenerator(sem_analyzer.get_symbol_table())
-        generator.analyzer = sem_analyzer
-        ir_program = generator.generate_from_ast(ast)
+        # Таблица символов уже построена в _run_semantic_phase — второй анализ не нужен
+        generator = IRGenerator(analyzer.get_symbol_table())
+        generator.analyzer = analyzer
+        ir_program = generator.generate(decorated_ast)
 
         # Сохраняем количество инструкций до оптимизации
         self.before_optimization_instructions = sum(
@@ -336,10 +373,17 @@ class CompilerPipeline:
         )
 
         # Apply optimizations if requested
-        if self.args.optimize and HAS_OPTIMIZER:
+        if self.args.opt_level and HAS_OPTIMIZER:
             try:
-                optimizer = IROptimizer(ir_program)
+                optimizer = IROptimizer(ir_program, self.args.opt_level,
+                                        getattr(self.args, 'inline_threshold', None),
+                                        time_passes=getattr(self.args, 'time_passes', False),
+                                        stack_array_limit=getattr(self.args, 'stack_array_limit', None))
                 ir_program = optimizer.optimize()
+                if optimizer.time_passes and optimizer.pass_manager is not None:
+                    print(f"{Colors.CYAN}Pass timing (-O{self.args.opt_level}):{Colors.NC}", file=sys.stderr)
+                    for line in optimizer.pass_manager.report():
+                        print(f"{Colors.CYAN}    {line}{Colors.NC}", file=sys.stderr)
 
                 # Сохраняем количество инструкций после оптимизации
                 self.after_optimization_instructions = sum(
@@ -374,28 +418,40 @@ class CompilerPipeline:
                 if self.args.verbose:
                     print(f"Optimizer not available: {e}", file=sys.stderr)
             except Exception as e:
+                # Сбой прохода — ошибка компиляции, а не тихий откат к неоптимизированному IR
                 if self.args.verbose:
-                    print(f"Optimization failed: {e}", file=sys.stderr)
                     import traceback
                     traceback.print_exc()
+                raise CompilerError(f"Optimization failed at -O{self.args.opt_level}: "
+                                    f"{type(e).__name__}: {e}") from e
 
         return ir_program
 
     def _run_codegen(self, ir_program: IRProgram) -> int:
         """Generate assembly and optionally assemble/link"""
         # Generate assembly
-        generator = X86Generator(ir_program)
+        allocate_registers = getattr(self.args, 'opt_level', 0) >= 2
+        peephole = getattr(self.args, 'opt_level', 0) >= 1
+        generator = X86Generator(ir_program, allocate_registers=allocate_registers, peephole=peephole)
         asm_code = generator.generate()
 
-        output_file = self.args.output
-        if not output_file:
-            base = Path(self.args.input).stem
-            if self.args.assemble_only:
-                output_file = f"{base}.asm"
-            elif self.args.compile_only:
-                output_file = f"{base}.o"
-            else:
-                output_file = "a.out"
+        if allocate_registers and (getattr(self.args, 'stats', False) or self.args.verbose):
+            stats = generator.regalloc_stats
+            print(f"{Colors.CYAN}    Register allocation: {stats['registers']} temporaries in registers, "
+                  f"{stats['spilled']} in spill slots{Colors.NC}", file=sys.stderr)
+        if generator.fused_branches and (getattr(self.args, 'stats', False) or self.args.verbose):
+            print(f"{Colors.CYAN}    Compare-and-branch: {generator.fused_branches} fused{Colors.NC}",
+                  file=sys.stderr)
+        if peephole and (getattr(self.args, 'stats', False) or self.args.verbose):
+            rules = generator.peephole.stats
+            hits = ", ".join(f"{rule} {count}" for rule, count in rules.items() if count)
+            print(f"{Colors.CYAN}    Peephole: {sum(rules.values())} rewrites"
+                  f"{f' ({hits})' if hits else ''}{Colors.NC}", file=sys.stderr)
+        if getattr(self.args, 'stats', False) or self.args.verbose:
+            for line in self._dataflow_stats_lines(ir_program):
+                print(f"{Colors.CYAN}    {line}{Colors.NC}", file=sys.stderr)
+
+        output_file = self._output_path()
 
         # Write assembly
         if self.args.assemble_only:
@@ -408,7 +464,6 @@ class CompilerPipeline:
 
         elif self.args.compile_only:
             # Assemble to object file
-            import subprocess
             import tempfile
 
             with tempfile.NamedTemporaryFile(mode='w', suffix='.asm', delete=False) as f:
@@ -416,11 +471,10 @@ class CompilerPipeline:
                 asm_file = f.name
 
             try:
-                result = subprocess.run(['nasm', '-f', 'elf64', '-o', output_file, asm_file],
-                                        capture_output=True, text=True)
-                if result.returncode != 0:
+                errors = self._assemble(asm_file, output_file)
+                if errors is not None:
                     self.error_handler.add_error(
-                        'E500', f"Assembly failed: {result.stderr}",
+                        'E500', f"Assembly failed: {errors}",
                         ErrorCategory.CODEGEN
                     )
                     return 1
@@ -436,7 +490,6 @@ class CompilerPipeline:
 
         else:
             # Full compilation to executable
-            import subprocess
             import tempfile
 
             with tempfile.NamedTemporaryFile(mode='w', suffix='.asm', delete=False) as f:
@@ -444,67 +497,144 @@ class CompilerPipeline:
                 asm_file = f.name
 
             obj_file = f"{asm_file}.o"
-            runtime_obj = f"{asm_file}_runtime.o"
 
             try:
                 # Assemble main program
                 if self.args.verbose:
                     print(f"{Colors.YELLOW}Assembling...{Colors.NC}", file=sys.stderr)
-                result = subprocess.run(['nasm', '-f', 'elf64', '-o', obj_file, asm_file],
-                                        capture_output=True, text=True)
-                if result.returncode != 0:
+                errors = self._assemble(asm_file, obj_file)
+                if errors is not None:
                     self.error_handler.add_error(
-                        'E500', f"Assembly failed: {result.stderr}",
+                        'E500', f"Assembly failed: {errors}",
                         ErrorCategory.CODEGEN
                     )
                     return 1
 
-                # Assemble runtime
-                runtime_dir = Path(__file__).parent / "runtime"
-                result = subprocess.run(['nasm', '-f', 'elf64', '-o', runtime_obj,
-                                         str(runtime_dir / 'runtime.asm')],
-                                        capture_output=True, text=True)
-                if result.returncode != 0:
-                    self.error_handler.add_error(
-                        'E500', f"Runtime assembly failed: {result.stderr}",
-                        ErrorCategory.CODEGEN
-                    )
-                    return 1
-
-                # Link with gcc instead of ld to automatically include libc
-                if self.args.verbose:
-                    print(f"{Colors.YELLOW}Linking...{Colors.NC}", file=sys.stderr)
-                result = subprocess.run(['gcc', '-no-pie', '-o', output_file, runtime_obj, obj_file],
-                                        capture_output=True, text=True)
-                if result.returncode != 0:
-                    # Fallback: try with ld and explicit libc
-                    result = subprocess.run(['ld', '-o', output_file, runtime_obj, obj_file,
-                                             '-lc', '-dynamic-linker', '/lib64/ld-linux-x86-64.so.2'],
-                                            capture_output=True, text=True)
-                    if result.returncode != 0:
-                        self.error_handler.add_error(
-                            'E501', f"Linking failed: {result.stderr}",
-                            ErrorCategory.LINKER
-                        )
-                        return 1
-
-                if self.args.verbose:
-                    print(f"{Colors.GREEN}Executable written to {output_file}{Colors.NC}", file=sys.stderr)
-
-                # Make executable
-                os.chmod(output_file, 0o755)
+                return self._link([obj_file], output_file)
 
             finally:
                 # Cleanup temp files
-                for f in [asm_file, obj_file, runtime_obj]:
+                for f in [asm_file, obj_file]:
                     try:
                         if os.path.exists(f):
                             os.unlink(f)
                     except:
                         pass
 
+    def _assemble(self, asm_file: str, obj_file: str) -> Optional[str]:
+        """Assemble asm_file into an ELF64 object; returns error text on failure"""
+        if getattr(self.args, 'integrated_as', False):
+            try:
+                assemble_file(asm_file, obj_file)
+            except (AssemblerError, OSError) as e:
+                return str(e)
+            return None
+
+        import subprocess
+        result = subprocess.run(['nasm', '-f', 'elf64', '-o', obj_file, asm_file],
+                                capture_output=True, text=True)
+        return result.stderr if result.returncode != 0 else None
+
+    def _link(self, object_files: List[str], output_file: str) -> int:
+        """Link object files with the runtime into an executable"""
+        import subprocess
+        import tempfile
+
+        runtime_fd, runtime_obj = tempfile.mkstemp(suffix='_runtime.o')
+        os.close(runtime_fd)
+
+        try:
+            # Runtime: prebuilt object from the cache, assembled only when runtime.asm changes
+            runtime_asm = Path(__file__).parent / "runtime" / "runtime.asm"
+            runtime_errors = []
+
+            def assemble_runtime(asm_path: str, obj_path: str) -> bool:
+                errors = self._assemble(asm_path, obj_path)
+                if errors is not None:
+                    runtime_errors.append(errors)
+                return errors is None
+
+            cached_runtime = None
+            if self.cache is not None:
+                # Objects from nasm and the integrated assembler are cached separately
+                tag = 'ias' if getattr(self.args, 'integrated_as', False) else ''
+                cached_runtime = self.cache.runtime_object(runtime_asm, assemble_runtime, tag)
+            if cached_runtime is not None:
+                runtime_obj_path = str(cached_runtime)
+            elif not runtime_errors and assemble_runtime(str(runtime_asm), runtime_obj):
+                runtime_obj_path = runtime_obj
+            else:
+                self.error_handler.add_error(
+                    'E500', f"Runtime assembly failed: {runtime_errors[0]}",
+                    ErrorCategory.CODEGEN
+                )
+                return 1
+
+            # Link with gcc instead of ld to automatically include libc
+            if self.args.verbose:
+                print(f"{Colors.YELLOW}Linking...{Colors.NC}", file=sys.stderr)
+            result = subprocess.run(['gcc', '-no-pie', '-o', output_file, runtime_obj_path] + object_files,
+                                    capture_output=True, text=True)
+            if result.returncode != 0:
+                # Fallback: try with ld and explicit libc
+                result = subprocess.run(['ld', '-o', output_file, runtime_obj_path] + object_files +
+                                        ['-lc', '-dynamic-linker', '/lib64/ld-linux-x86-64.so.2'],
+                                        capture_output=True, text=True)
+                if result.returncode != 0:
+                    self.error_handler.add_error(
+                        'E501', f"Linking failed: {result.stderr}",
+                        ErrorCategory.LINKER
+                    )
+                    return 1
+
+            if self.args.verbose:
+                print(f"{Colors.GREEN}Executable written to {output_file}{Colors.NC}", file=sys.stderr)
+
+            # Make executable
+            os.chmod(output_file, 0o755)
+
+        finally:
+            try:
+                if os.path.exists(runtime_obj):
+                    os.unlink(runtime_obj)
+            except:
+                pass
+
         return 0
 
+    def _output_path(self) -> str:
+        """Output file for the compile mode"""
+        if self.args.output:
+            return self.args.output
+        base = Path(self.args.input).stem
+        if self.args.assemble_only:
+            return f"{base}.asm"
+        elif self.args.compile_only:
+            return f"{base}.o"
+        return "a.out"
+
+    def _artifact_kind(self) -> str:
+        """Kind of the compile-mode artifact (cache entry suffix)"""
+        if self.args.assemble_only:
+            return 'asm'
+        elif self.args.compile_only:
+            return 'o'
+        return 'exe'
+
+    def _cache_key(self, source: str) -> str:
+        """Cache key: source bytes, optimization level, target and compiler version"""
+        return CompileCache.make_key(
+            source.encode('utf-8'),
+            opt_level=getattr(self.args, 'opt_level', 0),
+            inline_threshold=getattr(self.args, 'inline_threshold', None),
+            stack_array_limit=getattr(self.args, 'stack_array_limit', None),
+            target=self.args.target,
+            kind=self._artifact_kind(),
+            integrated_as=getattr(self.args, 'integrated_as', False),
+            version=__version__,
+            compiler=compiler_fingerprint(Path(__file__).resolve().parent),
+        )
+
     def _output_ast(self, ast: ProgramNode) -> int:
         """Output AST in specified format"""
         if self.args.ast_format == 'dot':
@@ -627,6 +757,22 @@ class CompilerPipeline:
                 lines.append(f"Constant folding: {stats['constant_folding']} expressions folded")
             if stats.get('constant_propagation', 0) > 0:
                 lines.append(f"Constant propagation: {stats['constant_propagation']} variables propagated")
+            if stats.get('branches_pruned', 0) > 0:
+                lines.append(f"Branches pruned: {stats['branches_pruned']} conditional jumps resolved")
+            if stats.get('tail_calls_eliminated', 0) > 0:
+                lines.append(f"Tail calls: {stats['tail_calls_eliminated']} self-recursive calls turned into jumps")
+            if stats.get('calls_inlined', 0) > 0:
+                lines.append(f"Inlining: {stats['calls_inlined']} calls inlined")
+            if stats.get('stack_arrays', 0) > 0:
+                lines.append(f"Stack arrays: {stats['stack_arrays']} local arrays moved from malloc to the frame")
+            if stats.get('cse_eliminated', 0) > 0 or stats.get('copies_propagated', 0) > 0:
+                lines.append(f"Common subexpressions: {stats.get('cse_eliminated', 0)} eliminated, "
+                             f"{stats.get('copies_propagated', 0)} copies propagated")
+            if stats.get('licm_hoisted', 0) > 0 or stats.get('iv_strength_reduced', 0) > 0:
+                lines.append(f"Loops: {stats.get('licm_hoisted', 0)} invariant instructions hoisted, "
+                             f"{stats.get('iv_strength_reduced', 0)} induction expressions strength-reduced")
+            if stats.get('loops_vectorized', 0) > 0:
+                lines.append(f"Vectorization: {stats['loops_vectorized']} loops vectorized (SSE2, 4 elements)")
             if stats.get('dead_code_removed', 0) > 0:
                 lines.append(f"Dead code elimination: {stats['dead_code_removed']} instructions removed")
             if stats.get('unreachable_blocks_removed', 0) > 0:
@@ -641,8 +787,24 @@ class CompilerPipeline:
 
             lines.append("=" * 60)
 
+        dataflow = self._dataflow_stats_lines(ir_program)
+        if dataflow:
+            lines.append("")
+            lines.extend(dataflow)
+
         return "\n".join(lines)
 
+    @staticmethod
+    def _dataflow_stats_lines(ir_program: IRProgram) -> List[str]:
+        """Итерации и время решателя потока данных по функциям"""
+        lines = []
+        for func in ir_program.functions:
+            stats = func.dataflow_stats
+            if stats['solves']:
+                lines.append(f"Dataflow: {func.name}: {stats['solves']} solves, "
+                             f"{stats['iterations']} iterations, {stats['time'] * 1e3:.2f} ms")
+        return lines
+
     def _read_source(self) -> str:
         """Read source file"""
         try:
@@ -759,7 +921,17 @@ Examples:
 
   # Show IR statistics
   mycc --ir --stats program.src
+
+  # Time each optimization pass
+  mycc -O2 --time-passes program.src -o program
   mycc --ir --optimize --stats program.src
+
+  # Multiple translation units, compiled in parallel and linked together
+  mycc main.src util.src -o program -j 4
+
+  # Compilation cache (~/.cache/mycc, override with MYCC_CACHE_DIR)
+  mycc --no-cache program.src -o program
+  mycc --cache-stats
         """
     )
 
@@ -787,8 +959,34 @@ Examples:
                         help='Show IR statistics and optimization info')
 
     # Optimization
-    parser.add_argument('--optimize', '-O', type=int, choices=[0, 1, 2, 3], const=1, nargs='?',
-                        help='Optimization level (0-3)')
+    parser.add_argument('--optimize', '-O', dest='opt_level', type=int, choices=[0, 1, 2, 3], const=1,
+                        nargs='?', default=0, help='Optimization level (0-3; -O alone means -O1)')
+    parser.add_argument('--inline-threshold', type=int, default=None, metavar='N',
+                        help='Inline calls to functions of at most N IR instructions at -O2 and above '
+                             '(default: 30; 0 disables inlining)')
+    parser.add_argument('--stack-array-limit', type=int, default=None, metavar='BYTES',
+                        help='Place non-escaping constant-size local arrays of at most BYTES bytes '
+                             'in the stack frame at -O1 and above (default: 1024; 0 keeps malloc)')
+    parser.add_argument('--time-passes', action='store_true',
+                        help='Print wall time and IR instruction delta of each optimization pass')
+
+    # Lexer engine
+    parser.add_argument('--scanner', choices=sorted(SCANNER_ENGINES), default=DEFAULT_SCANNER_ENGINE,
+                        help=f'Lexer engine (default: {DEFAULT_SCANNER_ENGINE})')
+
+    # Parallel compilation
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='Parallel jobs for multiple input files (default: CPU count)')
+
+    # Assembler
+    parser.add_argument('--integrated-as', action='store_true',
+                        help='Write ELF64 objects with the built-in assembler instead of nasm')
+
+    # Compilation cache
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not read or write the compilation cache')
+    parser.add_argument('--cache-stats', action='store_true',
+                        help='Show compilation cache statistics')
 
     # Target
     parser.add_argument('--target', default='x86_64',
@@ -826,6 +1024,82 @@ Examples:
     return parser
 
 
+def _compile_unit(args) -> Tuple[int, str, str]:
+    """
+    Compile a single translation unit (runs in a worker process).
+
+    Diagnostics are captured and returned instead of being printed, so that
+    the parent can print them in input order regardless of completion order.
+    """
+    import contextlib
+    import io
+
+    out, err = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+        try:
+            exit_code = CompilerPipeline(args).run()
+        except Exception as e:
+            print(f"{Colors.RED}Internal compiler error in {args.input}: {e}{Colors.NC}", file=sys.stderr)
+            exit_code = 1
+    return exit_code, out.getvalue(), err.getvalue()
+
+
+def compile_units(args, inputs: List[str]) -> int:
+    """
+    Compile several translation units independently and, in full compilation
+    mode, link all objects with a single linker invocation.
+    """
+    import copy
+    import shutil
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+
+    link = args.mode == 'compile' and not (args.assemble_only or args.compile_only)
+    if args.output and not link:
+        print(f"{Colors.RED}Error: cannot specify -o with multiple input files "
+              f"unless linking an executable{Colors.NC}", file=sys.stderr)
+        return 1
+
+    build_dir = tempfile.mkdtemp(prefix='mycc-') if link else None
+    units = []
+    for index, path in enumerate(inputs):
+        unit = copy.copy(args)
+        unit.input = path
+        if link:
+            unit.compile_only = True
+            unit.output = os.path.join(build_dir, f"{index}_{Path(path).stem}.o")
+        units.append(unit)
+
+    try:
+        jobs = args.jobs or os.cpu_count() or 1
+        if jobs > 1:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(units))) as executor:
+                # map() возвращает результаты в порядке входных файлов
+                results = list(executor.map(_compile_unit, units))
+        else:
+            results = [_compile_unit(unit) for unit in units]
+
+        failed = False
+        for exit_code, out, err in results:
+            sys.stdout.write(out)
+            sys.stderr.write(err)
+            failed = failed or exit_code != 0
+        if failed:
+            return 1
+        if not link:
+            return 0
+
+        link_args = copy.copy(args)
+        link_args.input = inputs[0]
+        pipeline = CompilerPipeline(link_args)
+        result = pipeline._link([unit.output for unit in units], args.output or "a.out")
+        pipeline.error_handler.print_summary()
+        return result
+    finally:
+        if build_dir:
+            shutil.rmtree(build_dir, ignore_errors=True)
+
+
 def main():
     """Main entry point"""
     parser = create_argument_parser()
@@ -844,6 +1118,10 @@ def main():
         print(f"Target: {__target__}")
         return 0
 
+    if args.cache_stats and not args.input:
+        print(CompileCache().format_stats())
+        return 0
+
     # Check that input file is provided for operations that need it
     if not args.input:
         parser.print_help()
@@ -860,22 +1138,21 @@ def main():
     else:
         args.mode = 'compile'
 
-    # For now, only support single input file
-    if len(args.input) > 1:
-        print(f"{Colors.YELLOW}Warning: Multiple input files not yet fully supported. Using first file.{Colors.NC}",
-              file=sys.stderr)
-
-    args.input = args.input[0]  # Take first file for now
+    if args.jobs is not None and args.jobs < 1:
+        print(f"{Colors.RED}Error: -j requires a positive number of jobs{Colors.NC}", file=sys.stderr)
+        return 1
 
-    # Set optimization level
-    if args.optimize is not None:
-        args.optimize = True
+    inputs = args.input
+    if len(inputs) > 1:
+        exit_code = compile_units(args, inputs)
     else:
-        args.optimize = False
+        # Run compilation pipeline
+        args.input = inputs[0]
+        pipeline = CompilerPipeline(args)
+        exit_code = pipeline.run()
 
-    # Run compilation pipeline
-    pipeline = CompilerPipeline(args)
-    exit_code = pipeline.run()
+    if args.cache_stats:
+        print(CompileCache().format_stats(), file=sys.stderr)
 
     return exit_code
 
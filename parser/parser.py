@@ -1,7 +1,8 @@
 # parser/parser.py
-from typing import List, Optional, Union, Any
+from typing import Iterable, List, Optional, Union
 from lexer.token import Token, TokenType
 from lexer.errors import LexicalError
+from lexer.token_stream import TokenStream
 from .ast import *
 
 
@@ -22,14 +23,21 @@ class Parser:
     Реализует LL(1) грамматику с одним токеном предпросмотра.
     """
 
-    def __init__(self, tokens: List[Token]):
+    def __init__(self, tokens: Union[List[Token], TokenStream, Iterable[Token]]):
         """
-        Инициализация парсера списком токенов.
+        Инициализация парсера токенами.
 
         Args:
-            tokens: Список токенов от лексера
+            tokens: Список токенов от лексера или ленивый поток
+                    (TokenStream / любой итератор токенов, например Scanner.iter_tokens())
         """
-        self.tokens = tokens
+        if isinstance(tokens, list):
+            self.tokens = tokens
+            self._token_at = self._list_token_at
+        else:
+            stream = tokens if isinstance(tokens, TokenStream) else TokenStream(tokens)
+            self.tokens = stream
+            self._token_at = stream.get
         self.current = 0
         self.errors: List[ParseError] = []
 
@@ -55,14 +63,22 @@ class Parser:
 
     # ============= Вспомогательные методы =============
 
+    def _list_token_at(self, index: int) -> Optional[Token]:
+        """Токен с номером index из списка или None за его концом"""
+        if index < len(self.tokens):
+            return self.tokens[index]
+        return None
+
     def is_at_end(self) -> bool:
         """Проверяет, достигнут ли конец токенов"""
-        return self.current >= len(self.tokens) or self.peek().type == TokenType.END_OF_FILE
+        token = self._token_at(self.current)
+        return token is None or token.type == TokenType.END_OF_FILE
 
     def peek(self) -> Token:
         """Возвращает текущий токен без продвижения"""
-        if self.current < len(self.tokens):
-            return self.tokens[self.current]
+        token = self._token_at(self.current)
+        if token is not None:
+            return token
         # Если вышли за границы, возвращаем EOF токен
         return Token(TokenType.END_OF_FILE, "", 0, 0)
 
@@ -829,9 +845,8 @@ class Parser:
         """
         Проверяет следующий токен (lookahead = 2)
         """
-        if self.current + 1 >= len(self.tokens):
-            return False
-        return self.tokens[self.current + 1].type == token_type
+        token = self._token_at(self.current + 1)
+        return token is not None and token.type == token_type
 
     def parse_call(self, name: str, line: int, column: int) -> CallExprNode:
         """
@@ -16,7 +16,7 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/Galaxiace/compiler-project",
-    py_modules=['mycc', 'errors'],
+    py_modules=['mycc', 'errors', 'compile_cache'],
     packages=find_packages(),
     classifiers=[
         "Programming Language :: Python :: 3",
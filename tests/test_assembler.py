@@ -0,0 +1,149 @@
+import pytest
+import struct
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from codegen.x86_encoder import X86Encoder, AssemblerError, parse_operand, REL32, BRANCH32
+from codegen.assembler import Assembler, assemble, R_X86_64_PC32, R_X86_64_PLT32
+
+
+def encode(line):
+    mnemonic, _, rest = line.partition(' ')
+    operands = [parse_operand(op.strip()) for op in rest.split(',')] if rest else []
+    return X86Encoder().encode(mnemonic, operands)
+
+
+class TestX86Encoder:
+    @pytest.mark.parametrize('line, expected', [
+        ('ret', 'c3'),
+        ('push rbp', '55'),
+        ('push r12', '41 54'),
+        ('mov rbp, rsp', '48 89 e5'),
+        ('mov rax, rbx', '48 89 d8'),
+        ('sub rsp, 16', '48 83 ec 10'),
+        ('sub rsp, 256', '48 81 ec 00 01 00 00'),
+        ('mov dword [rbp-8], eax', '89 45 f8'),
+        ('mov eax, dword [rbp-8]', '8b 45 f8'),
+        ('mov qword [rsp], 0', '48 c7 04 24 00 00 00 00'),
+        ('mov r8d, dword [r13+4]', '45 8b 45 04'),
+        ('mov eax, 42', 'b8 2a 00 00 00'),
+        ('mov rax, -1', '48 c7 c0 ff ff ff ff'),
+        ('mov rax, 0x123456789', '48 b8 89 67 45 23 01 00 00 00'),
+        ('imul eax, ecx', '0f af c1'),
+        ('cdq', '99'),
+        ('idiv ecx', 'f7 f9'),
+        ('cmp eax, 0', '83 f8 00'),
+        ('setl al', '0f 9c c0'),
+        ('movzx eax, al', '0f b6 c0'),
+        ('movss xmm0, dword [rbp-12]', 'f3 0f 10 45 f4'),
+        ('ucomiss xmm0, xmm1', '0f 2e c1'),
+        ('cvtsi2ss xmm0, eax', 'f3 0f 2a c0'),
+        ('pmuludq xmm0, xmm1', '66 0f f4 c1'),
+        ('punpckldq xmm0, xmm2', '66 0f 62 c2'),
+        ('pshufd xmm2, xmm0, 0xF5', '66 0f 70 d0 f5'),
+        ('lea rcx, [rax+rbx*4+8]', '48 8d 4c 98 08'),
+    ])
+    def test_known_encodings(self, line, expected):
+        encoding = encode(line)
+        assert encoding.data.hex(' ') == expected
+        assert encoding.fixups == []
+
+    def test_call_is_branch_fixup(self):
+        encoding = encode('call print_int')
+        assert encoding.data[0] == 0xe8 and len(encoding.data) == 5
+        fixup, = encoding.fixups
+        assert (fixup.offset, fixup.kind, fixup.symbol, fixup.addend) == (1, BRANCH32, 'print_int', -4)
+
+    def test_rip_relative_symbol(self):
+        # [symbol] адресуется относительно RIP; поле смещения не последнее в инструкции
+        encoding = encode('mov dword [counter], 5')
+        fixup, = encoding.fixups
+        assert fixup.kind == REL32
+        assert fixup.addend == -(len(encoding.data) - fixup.offset)
+
+    def test_unknown_instruction(self):
+        with pytest.raises(AssemblerError):
+            encode('frobnicate eax')
+
+    def test_operand_size_mismatch(self):
+        with pytest.raises(AssemblerError):
+            encode('mov eax, rbx')
+
+
+def read_elf(data):
+    """Секции объектного файла: имя -> (заголовок, содержимое)."""
+    shoff, = struct.unpack_from('<Q', data, 0x28)
+    shnum, shstrndx = struct.unpack_from('<HH', data, 0x3c)
+    headers = [struct.unpack_from('<IIQQQQIIQQ', data, shoff + i * 64) for i in range(shnum)]
+    strtab = headers[shstrndx]
+    names = data[strtab[4]:strtab[4] + strtab[5]]
+    sections = {}
+    for header in headers[1:]:
+        name = names[header[0]:names.index(b'\0', header[0])].decode()
+        sections[name] = (header, data[header[4]:header[4] + header[5]])
+    return sections
+
+
+class TestAssembler:
+    SOURCE = [
+        "section .data",
+        "    counter dd 0",
+        "section .rodata",
+        "    LC0: dd 1078523331  ; float 3.14",
+        "section .text",
+        "global main",
+        "extern print_int",
+        "main:",
+        "    mov edi, dword [counter]",
+        "    call print_int",
+        "    jmp .done",
+        ".done:",
+        "    ret",
+    ]
+
+    def test_elf_header(self):
+        data = assemble(self.SOURCE)
+        assert data[:4] == b'\x7fELF'
+        assert data[4] == 2 and data[5] == 1  # ELFCLASS64, little-endian
+        assert struct.unpack_from('<HH', data, 16) == (1, 62)  # ET_REL, EM_X86_64
+
+    def test_sections_and_local_jump(self):
+        sections = read_elf(assemble(self.SOURCE))
+        assert {'.text', '.data', '.bss', '.rodata', '.symtab', '.strtab', '.rela.text'} <= set(sections)
+        text = sections['.text'][1]
+        # jmp .done разрешён на месте: rel32 == 0, сразу за ним ret
+        assert text[-6:] == bytes.fromhex('e9 00 00 00 00 c3')
+        assert sections['.rodata'][1] == struct.pack('<I', 1078523331)
+
+    def test_relocations(self):
+        sections = read_elf(assemble(self.SOURCE))
+        rela = sections['.rela.text'][1]
+        types = sorted(struct.unpack_from('<QQq', rela, i)[1] & 0xffffffff for i in range(0, len(rela), 24))
+        assert types == [R_X86_64_PC32, R_X86_64_PLT32]
+
+    def test_symbols_locals_before_globals(self):
+        sections = read_elf(assemble(self.SOURCE))
+        header, symtab = sections['.symtab']
+        first_global = header[7]
+        binds = [symtab[i + 4] >> 4 for i in range(0, len(symtab), 24)]
+        assert all(b == 0 for b in binds[:first_global])
+        assert all(b == 1 for b in binds[first_global:])
+        assert len(binds) - first_global == 2  # main и print_int
+
+    def test_bss_reservation(self):
+        sections = read_elf(assemble(["section .bss", "buffer resb 64", "section .text", "ret"]))
+        header, _ = sections['.bss']
+        assert header[1] == 8 and header[5] == 64  # SHT_NOBITS, размер
+
+    def test_undefined_symbol(self):
+        with pytest.raises(AssemblerError, match='not defined'):
+            assemble(["section .text", "jmp missing"])
+
+    def test_redefined_symbol(self):
+        with pytest.raises(AssemblerError, match='line 3'):
+            Assembler().assemble(["section .text", "a:", "a:"])
+
+    def test_comment_inside_string(self):
+        sections = read_elf(assemble(["section .rodata", "msg db 'a;b', 0"]))
+        assert sections['.rodata'][1] == b'a;b\0'
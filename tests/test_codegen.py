@@ -466,6 +466,34 @@ class TestX86Generator:
         asm = gen.generate()
         assert 'global fcmp' in asm
 
+    def test_float_comparison_branchless(self):
+        from semantic.symbol_table import Type
+        expected = {
+            IROpcode.CMP_EQ: ["ucomiss xmm0, dword [rbp-12]", "sete al", "setnp cl", "and al, cl"],
+            IROpcode.CMP_NE: ["ucomiss xmm0, dword [rbp-12]", "setne al", "setp cl", "or al, cl"],
+            IROpcode.CMP_LT: ["ucomiss xmm0, dword [rbp-8]", "seta al"],
+            IROpcode.CMP_GE: ["ucomiss xmm0, dword [rbp-12]", "setae al"],
+        }
+        for opcode, sequence in expected.items():
+            program = IRProgram()
+            func = IRFunction("fcmp", "int")
+            block = BasicBlock("entry")
+            block.add_instruction(IRInstruction(opcode, [
+                Temp("%r1"), Temp("%a", Type('float')), Temp("%b", Type('float'))
+            ]))
+            block.add_instruction(IRInstruction(IROpcode.RETURN, [Temp("%r1")]))
+            func.blocks.append(block)
+            func.entry_block = block
+            program.functions.append(func)
+            gen = X86Generator(program)
+            lines = [line.strip() for line in gen.generate().splitlines()]
+            i = lines.index(sequence[0])
+            assert lines[i:i + len(sequence)] == sequence
+            body = lines[lines.index("fcmp:"):]
+            # Ни внутренних меток, ни переходов, кроме выхода из функции
+            assert [line for line in body if line.startswith("j")] == ["jmp fcmp.fcmp_return"]
+            assert sum(line.endswith(":") for line in body) == 3
+
     def test_generate_jump_if_not(self):
         program = IRProgram()
         func = IRFunction("test", "int")
@@ -674,3 +702,199 @@ class TestX86Generator:
         gen = X86Generator(program)
         asm = gen.generate()
         assert 'global main' in asm
+
+    def test_every_emitted_line_is_single(self):
+        from semantic.symbol_table import Type
+        program = IRProgram()
+        func = IRFunction("main", "int")
+        block = BasicBlock("entry")
+        block.add_instruction(IRInstruction(IROpcode.CMP_GE, [
+            Temp("r1"), Temp("a", Type('float')), Temp("b", Type('float'))
+        ]))
+        block.add_instruction(IRInstruction(IROpcode.DIV, [Temp("r2"), Temp("r1"), Lit(3)]))
+        block.add_instruction(IRInstruction(IROpcode.RETURN, [Temp("r2")]))
+        func.blocks.append(block)
+        func.entry_block = block
+        program.functions.append(func)
+
+        gen = X86Generator(program)
+        gen.generate()
+        assert all('\n' not in line for line in gen.output)
+        # GE: ucomiss a, b и setae без переходов
+        assert "    movss xmm0, dword [rbp-8]" in gen.output
+        assert "    ucomiss xmm0, dword [rbp-12]" in gen.output
+        assert "    setae al" in gen.output
+        assert gen.output.index("    cdq") > gen.output.index("    ; Float comparison GE")
+
+    def test_unknown_opcode_comment(self):
+        program = IRProgram()
+        func = IRFunction("main", "int")
+        block = BasicBlock("entry")
+        block.add_instruction(IRInstruction(IROpcode.GEP, [Temp("r1"), Temp("r2")]))
+        func.blocks.append(block)
+        func.entry_block = block
+        program.functions.append(func)
+
+        asm = X86Generator(program).generate()
+        assert "; Unknown: GEP" in asm
+
+    def test_type_classification_cached(self):
+        from semantic.symbol_table import Type
+        gen = X86Generator(IRProgram())
+        ptr = Type('int', is_array=True, size_bytes=8)
+        a, b = Temp("a", ptr), Temp("b", ptr)
+        assert gen._is_ptr_type(a) and not gen._is_float_type(a)
+        assert gen._is_ptr_type(b)
+        assert len(gen._type_classes) == 1
+        assert gen._is_float_type(Temp("f", Type('float')))
+        assert not gen._is_ptr_type(Temp("s", "int"))  # тип без атрибутов
+
+
+class TestCompareBranchFusion:
+    def _generate(self, instructions):
+        program = IRProgram()
+        func = IRFunction("f", "int")
+        entry = BasicBlock("entry")
+        for instr in instructions:
+            entry.add_instruction(instr)
+        target = BasicBlock("target")
+        target.add_instruction(IRInstruction(IROpcode.RETURN, [Lit(1)]))
+        func.blocks.extend([entry, target])
+        func.entry_block = entry
+        program.functions.append(func)
+        gen = X86Generator(program)
+        asm = gen.generate()
+        return [line.strip() for line in asm.splitlines()], gen
+
+    def _branch(self, opcode, jump, a, b):
+        return [
+            IRInstruction(opcode, [Temp("%c"), a, b]),
+            IRInstruction(jump, [Temp("%c"), Label("target")]),
+            IRInstruction(IROpcode.RETURN, [Lit(0)]),
+        ]
+
+    def test_int_compare_fused(self):
+        lines, gen = self._generate(self._branch(IROpcode.CMP_LT, IROpcode.JUMP_IF, Temp("%a"), Lit(10)))
+        assert gen.fused_branches == 1
+        assert not any(line.startswith("set") for line in lines)
+        i = lines.index("cmp dword [rbp-4], 10")
+        assert lines[i + 1] == "jl f.target"
+
+    def test_jump_if_not_inverted(self):
+        lines, _ = self._generate(self._branch(IROpcode.CMP_LE, IROpcode.JUMP_IF_NOT, Temp("%a"), Temp("%b")))
+        i = lines.index("cmp eax, dword [rbp-8]")
+        assert lines[i + 1] == "jg f.target"
+
+    def test_result_used_elsewhere_not_fused(self):
+        instructions = self._branch(IROpcode.CMP_EQ, IROpcode.JUMP_IF, Temp("%a"), Lit(0))
+        instructions[-1] = IRInstruction(IROpcode.RETURN, [Temp("%c")])
+        lines, gen = self._generate(instructions)
+        assert gen.fused_branches == 0
+        assert "sete al" in lines
+
+    def test_float_branches_unordered(self):
+        from semantic.symbol_table import Type
+        a, b = Temp("%x", Type('float')), Temp("%y", Type('float'))
+        # EQ ложно при NaN: jp обходит je
+        lines, _ = self._generate(self._branch(IROpcode.CMP_EQ, IROpcode.JUMP_IF, a, b))
+        i = lines.index("ucomiss xmm0, dword [rbp-8]")
+        assert lines[i + 1:i + 4] == ["jp f.ordered_0", "je f.target", "f.ordered_0:"]
+        # NOT (x == y) истинно при NaN
+        lines, _ = self._generate(self._branch(IROpcode.CMP_EQ, IROpcode.JUMP_IF_NOT, a, b))
+        i = lines.index("ucomiss xmm0, dword [rbp-8]")
+        assert lines[i + 1:i + 3] == ["jp f.target", "jne f.target"]
+        # x < y: операнды переставлены, ja ложно при NaN
+        lines, _ = self._generate(self._branch(IROpcode.CMP_LT, IROpcode.JUMP_IF, a, b))
+        i = lines.index("movss xmm0, dword [rbp-8]")
+        assert lines[i + 1:i + 3] == ["ucomiss xmm0, dword [rbp-4]", "ja f.target"]
+        # NOT (x > y): jbe переходит и при NaN
+        lines, _ = self._generate(self._branch(IROpcode.CMP_GT, IROpcode.JUMP_IF_NOT, a, b))
+        assert "jbe f.target" in lines
+        assert not any(line.startswith("set") for line in lines)
+
+
+class TestLinearScanAllocator:
+    def _function(self, instructions):
+        func = IRFunction("f", "int")
+        block = BasicBlock("entry")
+        for instr in instructions:
+            block.add_instruction(instr)
+        func.blocks.append(block)
+        func.entry_block = block
+        return func
+
+    def _allocate(self, func):
+        from codegen.register_allocator import LinearScanAllocator
+        allocator = LinearScanAllocator(lambda instr, index: False)
+        return allocator, allocator.allocate(func, func.blocks)
+
+    def test_chain_fits_in_registers(self):
+        func = self._function([
+            IRInstruction(IROpcode.MOVE, [Temp("%t1"), Lit(1)]),
+            IRInstruction(IROpcode.ADD, [Temp("%t2"), Temp("%t1"), Lit(2)]),
+            IRInstruction(IROpcode.ADD, [Temp("%t3"), Temp("%t2"), Lit(3)]),
+            IRInstruction(IROpcode.RETURN, [Temp("%t3")]),
+        ])
+        allocator, assignment = self._allocate(func)
+        assert set(assignment) == {"%t1", "%t2", "%t3"}
+        assert allocator.stats == {"registers": 3, "spilled": 0}
+        assert assignment["%t1"] != assignment["%t2"]
+        assert assignment["%t2"] != assignment["%t3"]
+
+    def test_interval_across_call_gets_callee_saved(self):
+        func = self._function([
+            IRInstruction(IROpcode.MOVE, [Temp("%t1"), Lit(1)]),
+            IRInstruction(IROpcode.CALL, [Temp("%t2"), Lit("g")]),
+            IRInstruction(IROpcode.ADD, [Temp("%t3"), Temp("%t1"), Temp("%t2")]),
+            IRInstruction(IROpcode.RETURN, [Temp("%t3")]),
+        ])
+        _, assignment = self._allocate(func)
+        assert assignment["%t1"] in ('rbx', 'r12', 'r13', 'r14', 'r15')
+
+    def test_pressure_spills(self):
+        count = 10
+        instructions = [IRInstruction(IROpcode.MOVE, [Temp(f"%t{i}"), Lit(i)]) for i in range(count)]
+        acc = "%t0"
+        for i in range(1, count):
+            instructions.append(IRInstruction(IROpcode.ADD, [Temp(f"%s{i}"), Temp(acc), Temp(f"%t{i}")]))
+            acc = f"%s{i}"
+        instructions.append(IRInstruction(IROpcode.RETURN, [Temp(acc)]))
+        allocator, assignment = self._allocate(self._function(instructions))
+        assert allocator.stats["spilled"] > 0
+        assert len(set(assignment.values())) <= 7
+
+    def test_liveness_follows_cfg_back_edge(self):
+        func = IRFunction("f", "int")
+        blocks = {}
+        for label, instructions in (
+            ("entry", [IRInstruction(IROpcode.MOVE, [Temp("%n"), Lit(10)]),
+                       IRInstruction(IROpcode.MOVE, [Temp("%i"), Lit(0)]),
+                       IRInstruction(IROpcode.JUMP, [Label("head")])]),
+            ("head", [IRInstruction(IROpcode.CMP_LT, [Temp("%c"), Temp("%i"), Temp("%n")]),
+                      IRInstruction(IROpcode.JUMP_IF_NOT, [Temp("%c"), Label("exit")]),
+                      IRInstruction(IROpcode.JUMP, [Label("body")])]),
+            ("exit", [IRInstruction(IROpcode.RETURN, [Temp("%i")])]),
+            ("body", [IRInstruction(IROpcode.ADD, [Temp("%i"), Temp("%i"), Lit(1)]),
+                      IRInstruction(IROpcode.JUMP, [Label("head")])]),
+        ):
+            blocks[label] = BasicBlock(label)
+            for instr in instructions:
+                blocks[label].add_instruction(instr)
+            func.blocks.append(blocks[label])
+        func.entry_block = blocks["entry"]
+        func.rebuild_cfg()
+        allocator, _ = self._allocate(func)
+        # %n последний раз читается в head, но живёт до конца body (ребро body -> head)
+        body_end = allocator.intervals["%i"].end
+        assert allocator.intervals["%n"].end >= body_end
+
+    def test_generator_uses_registers(self):
+        program = IRProgram()
+        program.functions.append(self._function([
+            IRInstruction(IROpcode.ADD, [Temp("%t1"), Lit(2), Lit(3)]),
+            IRInstruction(IROpcode.RETURN, [Temp("%t1")]),
+        ]))
+        gen = X86Generator(program, allocate_registers=True)
+        asm = gen.generate()
+        assert gen.regalloc_stats["registers"] == 1
+        assert 'r10' in asm
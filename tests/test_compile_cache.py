@@ -0,0 +1,130 @@
+import os
+import subprocess
+import sys
+
+from compile_cache import CompileCache, compiler_fingerprint
+
+MYCC = [sys.executable, 'mycc.py']
+
+
+def _artifact(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(b'x' * size)
+    return str(path)
+
+
+class TestCompileCache:
+    def test_key_depends_on_source_and_flags(self):
+        base = CompileCache.make_key(b'int main() {}', opt_level=0, target='x86_64')
+        assert base == CompileCache.make_key(b'int main() {}', target='x86_64', opt_level=0)
+        assert base != CompileCache.make_key(b'int main() { }', opt_level=0, target='x86_64')
+        assert base != CompileCache.make_key(b'int main() {}', opt_level=2, target='x86_64')
+
+    def test_store_and_fetch(self, tmp_path):
+        cache = CompileCache(tmp_path / 'cache')
+        key = CompileCache.make_key(b'src')
+        assert cache.lookup(key, 'o') is None
+
+        cache.store(key, 'o', _artifact(tmp_path, 'a.o', 10))
+        dest = tmp_path / 'out.o'
+        assert cache.fetch(key, 'o', str(dest))
+        assert dest.read_bytes() == b'x' * 10
+        assert cache.lookup(key, 'asm') is None
+
+        stats = cache.stats()
+        assert stats['entries'] == 1
+        assert stats['hits'] == 1
+        assert stats['misses'] == 2
+
+    def test_lru_eviction(self, tmp_path):
+        cache = CompileCache(tmp_path / 'cache', max_size=25)
+        keys = [CompileCache.make_key(bytes([i])) for i in range(3)]
+        cache.store(keys[0], 'o', _artifact(tmp_path, '0.o', 10))
+        cache.store(keys[1], 'o', _artifact(tmp_path, '1.o', 10))
+        # Делаем первую запись самой старой по времени доступа, затем обращаемся к ней
+        old = cache._entry_path(keys[1], 'o')
+        os.utime(old, ns=(1, 1))
+        os.utime(cache._entry_path(keys[0], 'o'), ns=(2, 2))
+        assert cache.lookup(keys[0], 'o') is not None
+
+        cache.store(keys[2], 'o', _artifact(tmp_path, '2.o', 10))
+        assert cache.lookup(keys[1], 'o') is None
+        assert cache.lookup(keys[0], 'o') is not None
+        assert cache.lookup(keys[2], 'o') is not None
+        assert cache.stats()['evictions'] == 1
+
+    def test_runtime_object_built_once_per_source(self, tmp_path):
+        cache = CompileCache(tmp_path / 'cache')
+        runtime = tmp_path / 'runtime.asm'
+        runtime.write_text('; v1')
+        calls = []
+
+        def assemble(asm, obj):
+            calls.append(asm)
+            with open(obj, 'w') as f:
+                f.write(open(asm).read())
+            return True
+
+        first = cache.runtime_object(runtime, assemble)
+        assert cache.runtime_object(runtime, assemble) == first
+        assert len(calls) == 1
+
+        runtime.write_text('; v2')
+        second = cache.runtime_object(runtime, assemble)
+        assert second != first
+        assert second.read_text() == '; v2'
+        assert len(calls) == 2
+
+    def test_runtime_object_tag(self, tmp_path):
+        cache = CompileCache(tmp_path / 'cache')
+        runtime = tmp_path / 'runtime.asm'
+        runtime.write_text('; v1')
+        assemble = lambda asm, obj: open(obj, 'w').close() or True
+        nasm = cache.runtime_object(runtime, assemble)
+        integrated = cache.runtime_object(runtime, assemble, 'ias')
+        assert nasm != integrated
+        assert integrated.name.startswith('runtime-ias-')
+
+    def test_runtime_object_failure(self, tmp_path):
+        cache = CompileCache(tmp_path / 'cache')
+        runtime = tmp_path / 'runtime.asm'
+        runtime.write_text('; broken')
+        assert cache.runtime_object(runtime, lambda asm, obj: False) is None
+        assert not list((tmp_path / 'cache' / 'runtime').iterdir())
+
+    def test_fingerprint_changes_with_sources(self, tmp_path):
+        (tmp_path / 'mycc.py').write_text('a')
+        (tmp_path / 'ir').mkdir()
+        (tmp_path / 'ir' / 'x.py').write_text('a')
+        before = compiler_fingerprint(tmp_path)
+        (tmp_path / 'ir' / 'x.py').write_text('ab')
+        assert compiler_fingerprint(tmp_path) != before
+
+
+class TestCompileCacheCLI:
+    def test_assembly_cached(self, tmp_path):
+        cache_dir = tmp_path / 'cache'
+        env = dict(os.environ, MYCC_CACHE_DIR=str(cache_dir))
+        out = tmp_path / 'demo.asm'
+        cmd = MYCC + ['-S', 'examples/optimization_demo.src', '-o', str(out)]
+
+        first = subprocess.run(cmd, capture_output=True, text=True, env=env)
+        assert first.returncode == 0
+        expected = out.read_text()
+        out.unlink()
+
+        second = subprocess.run(cmd, capture_output=True, text=True, env=env)
+        assert second.returncode == 0
+        assert out.read_text() == expected
+        assert CompileCache(cache_dir).stats()['hits'] == 1
+
+        third = subprocess.run(cmd + ['--no-cache'], capture_output=True, text=True, env=env)
+        assert third.returncode == 0
+        assert CompileCache(cache_dir).stats()['hits'] == 1
+
+    def test_cache_stats(self, tmp_path):
+        env = dict(os.environ, MYCC_CACHE_DIR=str(tmp_path / 'cache'))
+        result = subprocess.run(MYCC + ['--cache-stats'], capture_output=True, text=True, env=env)
+        assert result.returncode == 0
+        assert 'Entries:' in result.stdout
+        assert 'Hit rate:' in result.stdout
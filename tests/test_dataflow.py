@@ -0,0 +1,183 @@
+"""Тесты решателя потока данных: живость, достигающие определения, доступные выражения"""
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ir.dataflow import (
+    BitNumbering, DataflowProblem, solve, reverse_postorder,
+    live_variables, reaching_definitions, available_expressions, expression_key
+)
+from ir.validator import IRValidator
+from ir.ir_instructions import PhiInst, Temp, Lit
+from tests.test_ssa import make_function, jump, branch, move, add, ret, blocks_by_label, diamond
+
+
+def counting_loop():
+    # i = 0; while (c) { i = i + 1 }; return i
+    return make_function(
+        ("entry", [move("i", Lit(0)), jump("header")]),
+        ("header", [branch("c", "body"), jump("exit")]),
+        ("body", [add("i", Temp("i"), Lit(1)), jump("header")]),
+        ("exit", [ret(Temp("i"))]),
+    )
+
+
+class TestBitNumbering:
+    def test_dense_numbers(self):
+        numbering = BitNumbering()
+        assert numbering.add("a") == 0
+        assert numbering.add("b") == 1
+        assert numbering.add("a") == 0
+        assert len(numbering) == 2
+        assert numbering.universe == 0b11
+
+    def test_bits_and_decode(self):
+        numbering = BitNumbering()
+        for name in "abc":
+            numbering.add(name)
+        bits = numbering.bits(["c", "a", "missing"])
+        assert bits == 0b101
+        assert numbering.decode(bits) == ["a", "c"]
+
+    def test_item_differs_from_key(self):
+        numbering = BitNumbering()
+        numbering.add(42, ("block", "instr"))
+        assert numbering.decode(1) == [("block", "instr")]
+
+
+class TestSolver:
+    def test_reverse_postorder_unreachable_last(self):
+        _, func = make_function(
+            ("entry", [jump("b")]),
+            ("dead", [jump("b")]),
+            ("b", [ret(Lit(0))]),
+        )
+        b = blocks_by_label(func)
+        succs = {block: block.successors for block in func.blocks}
+        order = reverse_postorder(func.blocks, succs)
+        assert order == [b["entry"], b["b"], b["dead"]]
+
+    def test_forward_problem_converges(self):
+        _, func = counting_loop()
+        b = blocks_by_label(func)
+        numbering = BitNumbering()
+        bit = 1 << numbering.add("x")
+        problem = DataflowProblem(func.blocks, {b["body"]: bit}, {}, numbering)
+        result = solve(problem)
+        # x порождается в цикле и доходит до заголовка по обратному ребру
+        assert result.contains_in(b["header"], "x")
+        assert result.contains_in(b["exit"], "x")
+        assert not result.contains_in(b["body"], "y")
+        assert not result.contains_out(b["entry"], "x")
+
+    def test_stats_recorded_on_function(self):
+        _, func = counting_loop()
+        live_variables(func)
+        reaching_definitions(func)
+        stats = func.dataflow_stats
+        assert stats["solves"] == 2
+        assert stats["iterations"] >= 2
+        assert stats["time"] > 0
+
+
+class TestLiveVariables:
+    def test_loop_variable_live_around_back_edge(self):
+        _, func = counting_loop()
+        b = blocks_by_label(func)
+        live = live_variables(func)
+        assert set(live.in_items(b["header"])) == {"i", "c"}
+        assert set(live.out_items(b["body"])) == {"i", "c"}
+        assert "i" not in live.in_items(b["entry"])
+        assert live.out_items(b["exit"]) == []
+
+    def test_tracked_subset(self):
+        _, func = counting_loop()
+        b = blocks_by_label(func)
+        live = live_variables(func, tracked=lambda name: name == "i")
+        assert live.in_items(b["header"]) == ["i"]
+
+    def test_phi_source_live_only_on_its_edge(self):
+        _, func = make_function(
+            ("entry", [move("a", Lit(1)), move("b", Lit(2)), branch("c", "then"), jump("join")]),
+            ("then", [jump("join")]),
+            ("join", [PhiInst(Temp("x"), [(Temp("a"), "entry"), (Temp("b"), "then")]),
+                      ret(Temp("x"))]),
+        )
+        b = blocks_by_label(func)
+        live = live_variables(func)
+        assert live.in_items(b["then"]) == ["b"]
+        assert "x" not in live.in_items(b["join"])
+
+
+class TestReachingDefinitions:
+    def test_both_definitions_reach_join(self):
+        _, func = diamond()
+        b = blocks_by_label(func)
+        reaching = reaching_definitions(func)
+        sources = {block.label for block, _ in reaching.in_items(b["join"])}
+        assert sources == {"then", "else"}
+        assert reaching.in_items(b["then"]) == []
+
+    def test_redefinition_kills(self):
+        _, func = counting_loop()
+        b = blocks_by_label(func)
+        reaching = reaching_definitions(func)
+        out_body = reaching.out_items(b["body"])
+        assert [block.label for block, _ in out_body] == ["body"]
+        assert {block.label for block, _ in reaching.in_items(b["exit"])} == {"entry", "body"}
+
+
+class TestAvailableExpressions:
+    def test_available_on_all_paths(self):
+        e = add("t", Temp("a"), Temp("b"))
+        _, func = make_function(
+            ("entry", [e, branch("c", "then"), jump("join")]),
+            ("then", [add("u", Temp("a"), Lit(1)), jump("join")]),
+            ("join", [ret(Temp("t"))]),
+        )
+        b = blocks_by_label(func)
+        avail = available_expressions(func)
+        assert avail.in_items(b["join"]) == [expression_key(e)]
+
+    def test_killed_by_operand_redefinition(self):
+        e = add("t", Temp("a"), Temp("b"))
+        _, func = make_function(
+            ("entry", [e, branch("c", "then"), jump("join")]),
+            ("then", [move("a", Lit(5)), jump("join")]),
+            ("join", [ret(Temp("t"))]),
+        )
+        b = blocks_by_label(func)
+        avail = available_expressions(func)
+        assert avail.in_items(b["then"]) == [expression_key(e)]
+        assert avail.out_items(b["then"]) == []
+        assert avail.in_items(b["join"]) == []
+
+    def test_only_pure_opcodes(self):
+        assert expression_key(move("x", Temp("y"))) is None
+        assert expression_key(add("x", Temp("y"), Lit(1))) is not None
+
+
+class TestValidatorUses:
+    def test_definition_on_one_path_is_enough(self):
+        program, _ = make_function(
+            ("entry", [move("c", Lit(1)), branch("c", "then"), jump("join")]),
+            ("then", [move("x", Lit(1)), jump("join")]),
+            ("join", [ret(Temp("x"))]),
+        )
+        errors, _ = IRValidator().validate(program)
+        assert errors == []
+
+    def test_use_without_reaching_definition(self):
+        # y определена в блоке, который выполняется только после использования
+        program, _ = make_function(
+            ("entry", [move("c", Lit(1)), jump("join")]),
+            ("join", [move("x", Temp("y")), branch("c", "late"), ret(Temp("x"))]),
+            ("late", [move("y", Lit(2)), ret(Temp("y"))]),
+        )
+        errors, _ = IRValidator().validate(program)
+        assert errors == ["Function 'test', block 'join': use of undefined temporary '%y'"]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,222 @@
+"""Тесты анализа убегания и размещения локальных массивов на стеке"""
+import pytest
+import subprocess
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from codegen.x86_generator import X86Generator
+from ir.call_graph import call_target
+from ir.escape import EscapeAnalysis
+from ir.optimizer import IROptimizer, StackArrayPromoter, TailCallEliminator
+from ir.ir_instructions import IROpcode
+from tests.test_ir_generator import generate_ir
+
+
+def functions(program):
+    return {func.name: func for func in program.functions}
+
+
+def opcodes(func, opcode):
+    return [instr for block in func.blocks for instr in block.instructions if instr.opcode == opcode]
+
+
+def mallocs(func):
+    return [instr for instr in opcodes(func, IROpcode.CALL) if call_target(instr) == "malloc"]
+
+
+def promote(source, limit=None):
+    program = generate_ir(source)
+    promoter = StackArrayPromoter(limit)
+    promoter.run(program)
+    return functions(program), promoter
+
+
+READERS = """
+fn sum(int a[], int n) -> int {
+    int s = 0;
+    for (int i = 0; i < n; i = i + 1) { s = s + a[i]; }
+    return s;
+}
+
+fn walk(int a[], int n) -> int {
+    if (n == 0) { return a[0]; }
+    return walk(a, n - 1);
+}
+"""
+
+HELPERS = READERS + """
+extern void record(int a[]);
+
+fn log(int a[]) -> void {
+    record(a);
+}
+
+fn keep(int a[], int n) -> int {
+    if (n == 0) { record(a); return 0; }
+    return keep(a, n - 1);
+}
+"""
+
+
+class TestEscapeAnalysis:
+    def setup_method(self):
+        self.program = generate_ir(HELPERS)
+        self.escape = EscapeAnalysis(self.program)
+
+    def test_loads_do_not_escape(self):
+        assert not self.escape.param_escapes("sum", 0)
+        assert not self.escape.param_escapes("sum", 1)
+
+    def test_param_passed_on_escapes(self):
+        assert self.escape.param_escapes("log", 0)
+
+    def test_recursion_fixed_point(self):
+        # keep отдаёт a внешней функции через рекурсивный вызов, walk — только читает
+        assert self.escape.param_escapes("keep", 0)
+        assert not self.escape.param_escapes("walk", 0)
+        assert self.escape.iterations >= 2
+
+    def test_external_function_escapes(self):
+        assert self.escape.param_escapes("record", 0)
+        assert self.escape.param_escapes("malloc", 0)
+
+
+class TestStackArrayPromoter:
+    def test_loop_array_promoted(self):
+        funcs, promoter = promote(HELPERS + """
+fn main() -> int {
+    int total = 0;
+    for (int k = 0; k < 10; k = k + 1) {
+        int buf[8];
+        for (int i = 0; i < 8; i = i + 1) { buf[i] = i; }
+        total = total + sum(buf, 8) + walk(buf, 3);
+    }
+    return total;
+}
+""")
+        main = funcs["main"]
+        assert mallocs(main) == []
+        allocas = opcodes(main, IROpcode.ALLOCA)
+        assert len(allocas) == 1 and allocas[0].operands[1].value == 32
+        assert promoter.stats["promoted"] == 1
+        # PARAM размера ушёл вместе с вызовом
+        assert [p.operands[1].value for p in opcodes(main, IROpcode.PARAM)
+                if isinstance(p.operands[1].value, int)] == [8, 3]
+
+    def test_size_limit(self):
+        source = "fn main() -> int { int big[300]; big[0] = 1; return big[0]; }"
+        funcs, promoter = promote(source)
+        assert len(mallocs(funcs["main"])) == 1
+        assert promoter.stats["too_large"] == 1
+        funcs, promoter = promote(source, limit=2048)
+        assert mallocs(funcs["main"]) == []
+        funcs, promoter = promote("fn main() -> int { int a[2]; a[0] = 1; return a[0]; }", limit=0)
+        assert promoter.stats["promoted"] == 0
+
+    def test_escaping_arrays_kept(self):
+        funcs, promoter = promote(HELPERS + """
+fn direct() -> int {
+    int a[4];
+    record(a);
+    return a[0];
+}
+fn pass_on() -> int {
+    int b[4];
+    int c[4];
+    int d[4];
+    log(c);
+    b[0] = keep(d, 2);
+    return b[0];
+}
+""")
+        assert len(mallocs(funcs["direct"])) == 1
+        assert len(mallocs(funcs["pass_on"])) == 2
+        assert len(opcodes(funcs["pass_on"], IROpcode.ALLOCA)) == 1
+        assert promoter.stats["escaping"] == 3
+
+    def test_live_across_allocation_kept(self):
+        # После устранения хвостовой рекурсии массив прошлого вызова ещё нужен
+        program = generate_ir("""
+fn chain(int prev[], int n) -> int {
+    int cur[2];
+    cur[0] = prev[0] + 1;
+    if (n == 0) { return cur[0]; }
+    return chain(cur, n - 1);
+}
+""")
+        TailCallEliminator().run(program)
+        promoter = StackArrayPromoter()
+        promoter.run(program)
+        assert promoter.stats["live"] == 1
+        assert len(mallocs(functions(program)["chain"])) == 1
+
+    def test_user_malloc_left_alone(self):
+        funcs, promoter = promote("""
+fn malloc(int n) -> int { return n; }
+fn main() -> int { int b[2]; b[0] = 3; return b[0]; }
+""")
+        assert len(mallocs(funcs["main"])) == 1
+        assert promoter.stats["promoted"] == 0
+
+    def test_pipeline_levels(self):
+        source = "fn main() -> int { int a[4]; a[1] = 5; return a[1]; }"
+        for level, count in ((0, 0), (1, 1), (2, 1)):
+            optimizer = IROptimizer(generate_ir(source), level)
+            optimizer.optimize()
+            assert optimizer.stats["stack_arrays"] == count
+        optimizer = IROptimizer(generate_ir(source), 2, stack_array_limit=0)
+        optimizer.optimize()
+        assert optimizer.stats["stack_arrays"] == 0
+
+
+class TestCodegen:
+    def test_frame_region(self):
+        source = "fn main() -> int { int a[5]; a[4] = 2; return a[4]; }"
+        program = IROptimizer(generate_ir(source), 1).optimize()
+        asm = X86Generator(program).generate()
+        assert "lea" in asm and "call malloc" not in asm
+        assert "sub rsp, rax" not in asm
+
+
+MYCC = [sys.executable, 'mycc.py']
+
+LOOP_PROGRAM = READERS + """
+fn main() -> int {
+    int total = 0;
+    for (int k = 0; k < 1000; k = k + 1) {
+        int buf[8];
+        for (int i = 0; i < 8; i = i + 1) { buf[i] = i * k; }
+        total = (total + sum(buf, 8) + walk(buf, 2)) % 1000;
+    }
+    int big[400];
+    big[399] = 7;
+    return total + big[399];
+}
+"""
+
+
+class TestMyCCStackArrays:
+    def compile_and_run(self, src, tmp_path, level):
+        exe = tmp_path / f'arrays_{level}'
+        result = subprocess.run(MYCC + [level, str(src), '-o', str(exe)], capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        return subprocess.run([str(exe)], capture_output=True, timeout=5).returncode
+
+    def test_same_result(self, tmp_path):
+        src = tmp_path / 'arrays.src'
+        src.write_text(LOOP_PROGRAM)
+        expected = (sum(28 * k for k in range(1000)) % 1000 + 7) % 256
+        assert self.compile_and_run(src, tmp_path, '-O0') == expected
+        assert self.compile_and_run(src, tmp_path, '-O2') == expected
+
+        result = subprocess.run(MYCC + ['-O2', '--ir', '--stats', str(src)], capture_output=True, text=True)
+        assert 'Stack arrays: 1 local arrays' in result.stdout
+        result = subprocess.run(MYCC + ['-O2', '--stack-array-limit', '0', '--ir', '--stats', str(src)],
+                                capture_output=True, text=True)
+        assert 'Stack arrays:' not in result.stdout
+        assert 'ALLOCA' not in result.stdout
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -11,6 +11,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from lexer.scanner import Scanner
+from lexer.table_scanner import SCANNER_ENGINES
 from lexer.token import TokenType
 
 
@@ -36,20 +37,21 @@ def normalize_output(output):
     return '\n'.join(lines) + '\n'
 
 
-def compare_with_expected(source_file, expected_file):
+def compare_with_expected(source_file, expected_file, scanner_class=Scanner):
     """
     Сравнивает вывод лексера для source_file с содержимым expected_file.
 
     Args:
         source_file: Path к .src файлу с исходным кодом
         expected_file: Path к .expected файлу с ожидаемым выводом
+        scanner_class: движок сканирования (Scanner или TableScanner)
     """
     # Читаем исходный код
     with open(source_file, 'r', encoding='utf-8') as f:
         source = f.read()
 
     # Сканируем токены
-    scanner = Scanner(source)
+    scanner = scanner_class(source)
     tokens = scanner.scan_tokens()
 
     # Форматируем вывод как в спецификации
@@ -188,6 +190,18 @@ def test_unterminated_string():
     compare_with_expected(source, expected)
 
 
+# ========== ВСЕ ДВИЖКИ СКАНИРОВАНИЯ ==========
+
+LEXER_SOURCES = sorted((Path(__file__).parent / "lexer").glob("*/*.src"))
+
+
+@pytest.mark.parametrize("engine", sorted(SCANNER_ENGINES))
+@pytest.mark.parametrize("source", LEXER_SOURCES, ids=lambda p: f"{p.parent.name}/{p.stem}")
+def test_engine_matches_expected(engine, source):
+    """Каждый движок сканирования выдаёт вывод из .expected файла"""
+    compare_with_expected(source, source.with_suffix('.expected'), SCANNER_ENGINES[engine])
+
+
 # ========== ДОПОЛНИТЕЛЬНЫЕ ТЕСТЫ ==========
 
 def test_all_expected_files_exist():
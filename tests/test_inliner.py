@@ -0,0 +1,266 @@
+"""Тесты межпроцедурных проходов: граф вызовов, встраивание, хвостовые вызовы"""
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ir.call_graph import CallGraph, call_target
+from ir.optimizer import FunctionInliner, TailCallEliminator, IROptimizer
+from ir.validator import IRValidator
+from ir.ir_instructions import IROpcode, IROperandType
+from tests.test_ir_generator import generate_ir
+
+
+HELPERS = """
+fn square(int x) -> int {
+    return x * x;
+}
+
+fn absdiff(int a, int b) -> int {
+    if (a > b) {
+        return a - b;
+    }
+    return b - a;
+}
+
+fn fact(int n) -> int {
+    if (n <= 1) { return 1; }
+    return n * fact(n - 1);
+}
+
+fn ping(int n) -> int {
+    if (n == 0) { return 0; }
+    return pong(n - 1);
+}
+
+fn pong(int n) -> int {
+    return ping(n);
+}
+"""
+
+
+def functions(program):
+    return {func.name: func for func in program.functions}
+
+
+def calls(func, name=None):
+    return [instr for block in func.blocks for instr in block.instructions
+            if instr.opcode == IROpcode.CALL and (name is None or call_target(instr) == name)]
+
+
+def inline(source, threshold=None):
+    program = generate_ir(source)
+    inliner = FunctionInliner(threshold)
+    inliner.run(program)
+    errors, _ = IRValidator().validate(program)
+    assert errors == []
+    return functions(program), inliner
+
+
+class TestCallGraph:
+    def test_edges_and_external_calls(self):
+        graph = CallGraph(generate_ir(HELPERS + """
+fn main() -> int {
+    int a[2];
+    return square(2) + fact(3);
+}
+"""))
+        assert graph.callees["main"] == ["square", "fact"]
+        assert graph.callers["square"] == ["main"]
+        # malloc для массива — внешняя функция, не вершина графа
+        assert len(graph.sites["main"]) == 2
+
+    def test_recursion_by_components(self):
+        graph = CallGraph(generate_ir(HELPERS))
+        assert graph.is_recursive("fact")
+        assert graph.is_recursive("ping") and graph.is_recursive("pong")
+        assert graph.same_component("ping", "pong")
+        assert not graph.is_recursive("square")
+
+    def test_bottom_up_order(self):
+        graph = CallGraph(generate_ir(HELPERS + """
+fn twice(int x) -> int { return square(x) * 2; }
+fn main() -> int { return twice(3); }
+"""))
+        order = [func.name for func in graph.bottom_up()]
+        assert order.index("square") < order.index("twice") < order.index("main")
+
+
+class TestFunctionInliner:
+    def test_single_block_spliced(self):
+        funcs, inliner = inline(HELPERS + """
+fn main() -> int {
+    int y = square(7);
+    return y;
+}
+""")
+        main = funcs["main"]
+        assert calls(main, "square") == []
+        assert len(main.blocks) == 1
+        assert inliner.stats["inlined"] == 1
+        # Параметр @x заменён временной с аргументом
+        assert not any(op.operand_type is IROperandType.VARIABLE
+                       for block in main.blocks for instr in block.instructions for op in instr.operands)
+
+    def test_multiple_returns_join_continuation(self):
+        funcs, _ = inline(HELPERS + """
+fn main() -> int {
+    return absdiff(2, 9) + 1;
+}
+""")
+        main = funcs["main"]
+        assert calls(main) == []
+        labels = [block.label for block in main.blocks]
+        continuation = next(label for label in labels if label.startswith("absdiff_return_"))
+        jumps = [instr for block in main.blocks for instr in block.instructions
+                 if instr.opcode == IROpcode.JUMP and instr.operands[0].value == continuation]
+        assert len(jumps) == 2
+
+    def test_recursive_not_inlined(self):
+        funcs, inliner = inline(HELPERS + """
+fn main() -> int {
+    return fact(5) + ping(4);
+}
+""")
+        assert len(calls(funcs["main"])) == 2
+        assert len(calls(funcs["fact"], "fact")) == 1
+        assert inliner.stats["inlined"] == 0
+
+    def test_nested_inlined_bottom_up(self):
+        funcs, inliner = inline(HELPERS + """
+fn twice(int x) -> int { return square(x) * 2; }
+fn main() -> int { return twice(3) + twice(4); }
+""")
+        assert calls(funcs["main"]) == []
+        assert inliner.stats["inlined"] == 3
+
+    def test_threshold(self):
+        source = HELPERS + "fn main() -> int { return square(3) + absdiff(1, 2); }"
+        funcs, _ = inline(source, threshold=8)
+        assert [call_target(instr) for instr in calls(funcs["main"])] == ["absdiff"]
+        funcs, inliner = inline(source, threshold=0)
+        assert len(calls(funcs["main"])) == 2
+        assert inliner.stats["inlined"] == 0
+
+    def test_float_arguments(self):
+        funcs, _ = inline("""
+fn above(float x, float k) -> int {
+    if (x * k > 5.5) { return 1; }
+    return 0;
+}
+fn main() -> int {
+    return above(1.5, 4.0);
+}
+""")
+        assert calls(funcs["main"]) == []
+
+    def test_enabled_at_o2_only(self):
+        source = HELPERS + "fn main() -> int { return square(3); }"
+        o1 = IROptimizer(generate_ir(source), 1)
+        program = o1.optimize()
+        assert len(calls(functions(program)["main"])) == 1
+        o2 = IROptimizer(generate_ir(source), 2)
+        program = o2.optimize()
+        assert calls(functions(program)["main"]) == []
+        assert o2.stats["calls_inlined"] == 1
+        # После встраивания SCCP сворачивает 3 * 3
+        ret = functions(program)["main"].blocks[-1].instructions[-1]
+        assert ret.opcode == IROpcode.RETURN and ret.operands[0].value == 9
+
+
+def eliminate_tail_calls(source):
+    program = generate_ir(source)
+    tce = TailCallEliminator()
+    tce.run(program)
+    errors, _ = IRValidator().validate(program)
+    assert errors == []
+    return functions(program), tce
+
+
+class TestTailCallEliminator:
+    def test_direct_tail_call(self):
+        funcs, tce = eliminate_tail_calls("""
+fn gcd(int a, int b) -> int {
+    if (b == 0) { return a; }
+    return gcd(b, a % b);
+}
+""")
+        gcd = funcs["gcd"]
+        assert calls(gcd) == []
+        assert tce.stats["eliminated"] == 1
+        assert gcd.blocks[1].label.startswith("tailrecurse")
+        # Аргументы сначала копируются во временные: gcd(b, a % b) меняет a и b одновременно
+        site = next(block for block in gcd.blocks
+                    if block.instructions[-1].opcode == IROpcode.JUMP
+                    and block.instructions[-1].operands[0].value == gcd.blocks[1].label and block is not gcd.blocks[0])
+        moves = [instr for instr in site.instructions if instr.opcode == IROpcode.MOVE]
+        assert [m.operands[0].value.startswith("tail_arg") for m in moves] == [True, True, False, False]
+
+    def test_void_call_through_jump(self):
+        # Второй рекурсивный вызов quicksort доходит до RETURN через переход в общий блок
+        funcs, tce = eliminate_tail_calls("""
+fn walk(int arr[], int low, int high) -> void {
+    if (low < high) {
+        walk(arr, low, high - 2);
+        walk(arr, low + 1, high);
+    }
+}
+""")
+        assert len(calls(funcs["walk"], "walk")) == 1
+        assert tce.stats["eliminated"] == 1
+
+    def test_accumulator(self):
+        funcs, tce = eliminate_tail_calls("""
+fn fib(int n) -> int {
+    if (n <= 1) { return n; }
+    return fib(n - 1) + fib(n - 2);
+}
+""")
+        fib = funcs["fib"]
+        assert len(calls(fib, "fib")) == 1
+        assert tce.stats["accumulated"] == 1
+        returns = [instr for block in fib.blocks for instr in block.instructions if instr.opcode == IROpcode.RETURN]
+        assert len(returns) >= 1
+        assert all(ret.operands[0].value.startswith("acc_ret") for ret in returns)
+
+    def test_not_a_tail_call(self):
+        funcs, tce = eliminate_tail_calls("""
+fn depth(int n) -> int {
+    if (n == 0) { return 0; }
+    int d = depth(n - 1);
+    return d - 1;
+}
+fn half(float x, int n) -> float {
+    if (n == 0) { return x; }
+    return half(x, n - 1) * 0.5;
+}
+""")
+        # SUB не ассоциативна, вещественные не накапливаются
+        assert len(calls(funcs["depth"], "depth")) == 1
+        assert len(calls(funcs["half"], "half")) == 1
+        assert tce.stats["eliminated"] == 0
+
+    def test_enables_inlining(self):
+        source = """
+fn gcd(int a, int b) -> int {
+    if (b == 0) { return a; }
+    return gcd(b, a % b);
+}
+fn main() -> int { return gcd(12, 18); }
+"""
+        optimizer = IROptimizer(generate_ir(source), 2)
+        program = optimizer.optimize()
+        assert optimizer.stats["tail_calls_eliminated"] == 1
+        assert optimizer.stats["calls_inlined"] == 1
+        assert calls(functions(program)["main"]) == []
+
+    def test_disabled_at_o0(self):
+        source = "fn f(int n) -> int { if (n == 0) { return 0; } return f(n - 1); }"
+        optimizer = IROptimizer(generate_ir(source), 0)
+        program = optimizer.optimize()
+        assert optimizer.stats["tail_calls_eliminated"] == 0
+        assert len(calls(functions(program)["f"])) == 1
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -277,5 +277,25 @@ def test_ir_validation():
     assert len(errors) == 0, f"Validation errors: {errors}"
 
 
+def test_ir_validation_loop_has_no_undefined_temporaries():
+    """Первое определение временной в цикле не считается использованием."""
+    source = """
+    fn main() -> int {
+        int sum = 0;
+        int i = 0;
+        while (i < 10) {
+            sum = sum + i;
+            i = i + 1;
+        }
+        return sum;
+    }
+    """
+    _, ir_program = generate_ir(source)
+
+    errors, _ = IRValidator().validate(ir_program)
+
+    assert errors == []
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
\ No newline at end of file
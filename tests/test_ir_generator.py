@@ -73,3 +73,98 @@ class TestIRGenerator:
         gen = IRGenerator(symtab)
         ir = gen.generate_from_ast(ast)
         assert len(ir.functions) == 1
+
+
+class TestGenerateFromDecorated:
+    @pytest.mark.parametrize("path", [
+        "examples/quicksort.src",
+        "examples/test_complete.src",
+        "examples/optimization_demo.src",
+    ])
+    def test_matches_generate_from_ast(self, path):
+        from lexer.scanner import Scanner
+        from parser.parser import Parser
+        from semantic.analyzer import SemanticAnalyzer
+        from ir.ir_writer import IRWriter
+
+        root = os.path.dirname(os.path.dirname(__file__))
+        with open(os.path.join(root, path)) as f:
+            ast = Parser(Scanner(f.read()).scan_tokens()).parse()
+
+        analyzer = SemanticAnalyzer()
+        decorated = analyzer.analyze(ast)
+        assert not analyzer.get_errors()
+
+        from_decorated = IRGenerator(SymbolTable()).generate(decorated)
+        from_ast = IRGenerator(analyzer.get_symbol_table()).generate_from_ast(ast)
+        assert IRWriter().write_program(from_decorated) == IRWriter().write_program(from_ast)
+
+
+def generate_ir(source):
+    from lexer.scanner import Scanner
+    from parser.parser import Parser
+    from semantic.analyzer import SemanticAnalyzer
+    analyzer = SemanticAnalyzer()
+    decorated = analyzer.analyze(Parser(Scanner(source).scan_tokens()).parse())
+    return IRGenerator(analyzer.get_symbol_table()).generate(decorated)
+
+
+class TestControlFlowGraph:
+    SOURCE = """
+fn main() -> int {
+    int x = 3;
+    int acc = 0;
+    while (x > 0) {
+        if (x > 1 && acc < 5) {
+            acc = acc + x;
+        }
+        x = x - 1;
+    }
+    return acc;
+}
+"""
+
+    def test_edges_match_jumps(self):
+        from ir.control_flow import jump_targets
+        func = generate_ir(self.SOURCE).functions[0]
+        for block in func.blocks:
+            expected = list(dict.fromkeys(func.get_block(label) for label in jump_targets(block)))
+            assert block.successors == expected
+            for succ in block.successors:
+                assert block in succ.predecessors
+
+    def test_label_index(self):
+        func = generate_ir(self.SOURCE).functions[0]
+        assert all(func.get_block(block.label) is block for block in func.blocks)
+        assert func.get_block("no_such_label") is None
+
+    def test_forward_jump_resolved_when_block_created(self):
+        # land_false создаётся после перехода на него
+        func = generate_ir(self.SOURCE).functions[0]
+        false_block = next(b for b in func.blocks if b.label.startswith("land_false"))
+        assert len(false_block.predecessors) == 2
+        assert not func._reserved_blocks
+
+    def test_loop_back_edge(self):
+        func = generate_ir(self.SOURCE).functions[0]
+        header = next(b for b in func.blocks if b.label.startswith("while_header"))
+        body_side = [p for p in header.predecessors if p is not func.entry_block]
+        assert body_side
+
+    def test_dead_jump_after_return_has_no_edge(self):
+        source = "fn main() -> int {\n    while (1 > 0) {\n        return 1;\n    }\n    return 0;\n}\n"
+        func = generate_ir(source).functions[0]
+        body = next(b for b in func.blocks if b.label.startswith("while_body"))
+        assert body.successors == []
+
+    def test_rebuild_and_remove_blocks(self):
+        func = generate_ir(self.SOURCE).functions[0]
+        edges = {b.label: [s.label for s in b.successors] for b in func.blocks}
+        func.rebuild_cfg()
+        assert {b.label: [s.label for s in b.successors] for b in func.blocks} == edges
+
+        exit_block = next(b for b in func.blocks if b.label.startswith("while_exit"))
+        func.remove_blocks({exit_block})
+        assert exit_block not in func.blocks
+        assert func.get_block(exit_block.label) is None
+        assert all(exit_block not in b.successors for b in func.blocks)
@@ -6,8 +6,9 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from ir.ir_instructions import (
     IRInstruction, IROpcode, IROperand, IROperandType,
-    Temp, Lit, Label, Var, Global
+    Temp, Lit, Label, Var, Global, LabelInst, PhiInst
 )
+from semantic.symbol_table import Type
 
 class TestIROperand:
     def test_temp_operand(self):
@@ -61,6 +62,59 @@ class TestIRInstruction:
         for op in opcodes:
             assert hasattr(IROpcode, op.name)
 
+class TestCompactRepresentation:
+    def test_operand_has_no_dict(self):
+        assert not hasattr(Temp("t1"), '__dict__')
+        assert not hasattr(Lit(1000), '__dict__')
+
+    def test_instruction_has_no_dict(self):
+        instr = IRInstruction(IROpcode.ADD, [Temp("t1"), Lit(1), Lit(2)])
+        assert not hasattr(instr, '__dict__')
+        assert instr.is_float_comparison is False
+        instr.is_float_comparison = True
+        assert instr.is_float_comparison
+
+    def test_subclasses_keep_attributes(self):
+        label = LabelInst("L1")
+        assert label.name == "L1"
+        assert str(label) == "L1:"
+        phi = PhiInst(Temp("t1"), [(Lit(1), "B1"), (Lit(2), "B2")])
+        assert str(phi) == "%t1 = PHI [ 1, %B1 ], [ 2, %B2 ]"
+
+    def test_small_literals_interned(self):
+        assert Lit(0) is Lit(0)
+        assert Lit(1, Type('int', size_bytes=4, alignment=4)) is Lit(1, Type('int', size_bytes=4, alignment=4))
+
+    def test_interning_keeps_value_kind(self):
+        assert Lit(True) is not Lit(1)
+        assert isinstance(Lit(True).value, bool)
+        assert Lit(0, Type('int', size_bytes=4)) is not Lit(0, Type('bool', size_bytes=1))
+        assert Lit(0).ir_type is None
+
+    def test_not_interned(self):
+        assert Lit(100000) is not Lit(100000)
+        assert Lit(0.0) is not Lit(0.0)
+        ptr = Type('ptr', is_array=True, size_bytes=8)
+        assert Lit(0, ptr) is not Lit(0, ptr)
+        assert Temp("t1") is not Temp("t1")
+
+    def test_labels_interned(self):
+        assert Label("loop_start") is Label("loop_start")
+        assert LabelInst("L7").operands[0] is Label("L7")
+
+    def test_equality_by_fields(self):
+        assert Lit(100000) == Lit(100000)
+        assert Temp("t1") != Var("t1")
+        assert IRInstruction(IROpcode.RETURN, [Lit(0)]) == IRInstruction(IROpcode.RETURN, [Lit(0)])
+        assert IRInstruction(IROpcode.RETURN, [Lit(0)]) != IRInstruction(IROpcode.RETURN, [Lit(1)])
+
+    def test_token_has_no_dict(self):
+        from lexer.token import Token, TokenType
+        token = Token(TokenType.INT_LITERAL, "1", 1, 1, 1)
+        assert not hasattr(token, '__dict__')
+        assert str(token) == '1:1 INT_LITERAL "1" 1'
+
+
 class TestIROperandType:
     def test_all_types(self):
         types = [
@@ -485,4 +485,97 @@ def test_mixed_tokens():
 
 
 if __name__ == '__main__':
-    pytest.main([__file__, '-v'])
\ No newline at end of file
+    pytest.main([__file__, '-v'])
+
+def _scan_dump(scanner_class, source):
+    scanner = scanner_class(source)
+    tokens = [(t.type, t.lexeme, t.line, t.column, t.literal, type(t.literal)) for t in scanner.scan_tokens()]
+    errors = [(type(e).__name__, str(e)) for e in scanner.errors]
+    return tokens, errors
+
+
+@pytest.mark.parametrize("source", [
+    "fn main() -> int { return -5 - -3 + x-1; }",
+    "a -= 1; b->c; /* multi\nline */ d // tail",
+    "float f = 1.5e-3 + .5 + 2. + 1e+;",
+    "int x = 007 + 2147483648 + 0;",
+    'print("a\\n\\"b"); "unterminated\nnext',
+    "x... y.z 3..4",
+    "é_var café ٣ 4٣ ² \xa0 # @ $",
+    "a&&b||c&d|e^f!g!=h<=i>=j==k",
+    "x" * 300,
+    "/* unterminated",
+    "-1",
+])
+def test_table_scanner_matches_classic(source):
+    """TableScanner выдаёт те же токены и ошибки, что и Scanner"""
+    from lexer.table_scanner import TableScanner
+    assert _scan_dump(TableScanner, source) == _scan_dump(Scanner, source)
+
+
+def test_table_scanner_random_sources():
+    """Дифференциальная проверка TableScanner на случайных входах"""
+    import random
+    from lexer.table_scanner import TableScanner
+
+    alphabet = list("abz_09 \t\r\n/*-+=<>!&|^%.,;(){}[]#eE") + ['"', '\\',
+        'fn', 'int', 'true', '->', '//', '/*', '*/', '...', '1.5', '1e5', '01', '-3', 'é', '٣', '²']
+    rng = random.Random(1234)
+    for _ in range(2000):
+        source = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        assert _scan_dump(TableScanner, source) == _scan_dump(Scanner, source), repr(source)
+
+
+def test_create_scanner_engines():
+    from lexer.table_scanner import TableScanner, create_scanner
+    assert type(create_scanner("x", "classic")) is Scanner
+    assert type(create_scanner("x", "table")) is TableScanner
+    with pytest.raises(ValueError):
+        create_scanner("x", "unknown")
+
+
+def test_token_stream_lookahead_and_window():
+    """TokenStream: предпросмотр, возврат назад в пределах буфера"""
+    from lexer.token_stream import TokenStream
+    source = "a b c d e f g h i j"
+    stream = TokenStream(Scanner(source).iter_tokens(), capacity=4)
+    assert stream.peek().lexeme == "a"
+    assert stream.peek(1).lexeme == "b"
+    assert stream.next().lexeme == "a"
+    for _ in range(5):
+        stream.next()
+    assert stream[stream.position - 1].lexeme == "f"
+    assert stream[stream.position - 3].lexeme == "d"
+    with pytest.raises(IndexError):
+        stream[0]
+    assert stream.drain() == 11
+    assert stream.get(11) is None
+    assert stream[10].type == TokenType.END_OF_FILE
+
+
+def test_iter_tokens_is_lazy():
+    """iter_tokens не сканирует весь исходник заранее"""
+    from lexer.table_scanner import TableScanner
+    source = "x = 1;\n" * 10000
+    for scanner_class in (Scanner, TableScanner):
+        scanner = scanner_class(source)
+        stream = scanner.token_stream()
+        assert stream.peek().lexeme == "x"
+        assert scanner.current < len(source) // 2
+        assert len(scanner.tokens) <= TableScanner.STREAM_CHUNK
+
+
+def test_next_token_matches_scan_tokens():
+    source = "fn main() -> int { return 1 + 2; }"
+    expected = [(t.type, t.lexeme) for t in Scanner(source).scan_tokens()]
+    scanner = Scanner(source)
+    actual = []
+    while True:
+        peeked = scanner.peek_token()
+        token = scanner.next_token()
+        assert peeked is token
+        actual.append((token.type, token.lexeme))
+        if token.type == TokenType.END_OF_FILE:
+            break
+    assert actual == expected
+    assert scanner.next_token().type == TokenType.END_OF_FILE
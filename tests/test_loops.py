@@ -0,0 +1,268 @@
+"""Тесты циклов: естественные циклы, предзаголовки, LICM и понижение силы"""
+import pytest
+import subprocess
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ir.loops import natural_loops, insert_preheader, loops_with_preheaders
+from ir.optimizer import (
+    IROptimizer, LoopInvariantCodeMotion, InductionVariableStrengthReduction,
+    SparseConditionalConstantPropagator, GlobalValueNumbering
+)
+from ir.ssa import SSABuilder, phis
+from ir.validator import IRValidator
+from ir.ir_instructions import IROpcode, PhiInst, Temp, Lit
+from tests.test_ir_generator import generate_ir
+from tests.test_ssa import make_function, jump, branch, move, add, ret, blocks_by_label
+
+
+def nested_loops():
+    return make_function(
+        ("entry", [move("i", Lit(0)), jump("outer")]),
+        ("outer", [branch("c", "inner"), jump("exit")]),
+        ("inner", [branch("d", "inner_body"), jump("outer_latch")]),
+        ("inner_body", [jump("inner")]),
+        ("outer_latch", [add("i", Temp("i"), Lit(1)), jump("outer")]),
+        ("exit", [ret(Temp("i"))]),
+    )
+
+
+def count(func, opcode, blocks=None):
+    return sum(instr.opcode == opcode for block in func.blocks
+               if blocks is None or block in blocks for instr in block.instructions)
+
+
+def optimize_loops(source):
+    """SSA, SCCP, GVN и проходы по циклам, как на -O2; последняя функция программы."""
+    program = SSABuilder().build(generate_ir(source))
+    SparseConditionalConstantPropagator().propagate(program)
+    GlobalValueNumbering().run(program)
+    licm = LoopInvariantCodeMotion()
+    licm.run(program)
+    ivsr = InductionVariableStrengthReduction()
+    ivsr.run(program)
+    return program.functions[-1], licm, ivsr
+
+
+def run_ir(source, opt_level):
+    program = IROptimizer(generate_ir(source), opt_level).optimize()
+    errors, _ = IRValidator().validate(program)
+    assert errors == []
+    return program.functions[-1]
+
+
+class TestNaturalLoops:
+    def test_nested_loops_inner_first(self):
+        _, func = nested_loops()
+        b = blocks_by_label(func)
+        loops = natural_loops(func)
+        assert [loop.header.label for loop in loops] == ["inner", "outer"]
+        assert loops[0].blocks == {b["inner"], b["inner_body"]}
+        assert loops[1].blocks == {b["outer"], b["inner"], b["inner_body"], b["outer_latch"]}
+        assert loops[1].latches == [b["outer_latch"]]
+
+    def test_existing_preheader(self):
+        _, func = nested_loops()
+        loops = natural_loops(func)
+        # entry — единственный внешний вход outer и переходит только в него
+        assert loops[1].preheader.label == "entry"
+        # у inner внешний вход outer имеет два преемника
+        assert loops[0].preheader is None
+
+    def test_no_loops(self):
+        _, func = make_function(("entry", [ret(Lit(0))]))
+        assert natural_loops(func) == []
+
+
+class TestPreheader:
+    def test_inserted_between_outside_preds(self):
+        _, func = nested_loops()
+        b = blocks_by_label(func)
+        inner = natural_loops(func)[0]
+        preheader = insert_preheader(func, inner)
+        assert preheader.successors == [b["inner"]]
+        assert preheader.predecessors == [b["outer"]]
+        assert b["outer"].successors[0] is preheader
+        assert b["outer"].instructions[0].operands[1].value == preheader.label
+
+    def test_phi_sources_merged(self):
+        # Два внешних входа с разными значениями x: PHI переезжает в предзаголовок
+        _, func = make_function(
+            ("entry", [branch("c", "left"), jump("right")]),
+            ("left", [jump("header")]),
+            ("right", [jump("header")]),
+            ("header", [PhiInst(Temp("x.1"), [(Lit(1), "left"), (Lit(2), "right"), (Temp("x.2"), "body")]),
+                        branch("d", "body"), jump("exit")]),
+            ("body", [add("x.2", Temp("x.1"), Lit(1)), jump("header")]),
+            ("exit", [ret(Temp("x.1"))]),
+        )
+        b = blocks_by_label(func)
+        preheader = insert_preheader(func, natural_loops(func)[0])
+        merged = phis(preheader)[0]
+        assert [label for _, label in merged.sources] == ["left", "right"]
+        header_phi = phis(b["header"])[0]
+        assert [label for _, label in header_phi.sources] == ["body", preheader.label]
+        assert header_phi.sources[1][0].value == merged.operands[0].value
+
+    def test_loops_with_preheaders_recomputes(self):
+        _, func = nested_loops()
+        dom, loops, created = loops_with_preheaders(func)
+        assert created == 1
+        assert all(loop.preheader is not None for loop in loops)
+        assert all(loop.preheader in dom.idom for loop in loops)
+
+
+class TestLoopInvariantCodeMotion:
+    def test_invariant_multiplication_hoisted(self):
+        func, licm, _ = optimize_loops("""
+fn f(int x, int n) -> int {
+    int s = 0;
+    for (int i = 0; i < n; i = i + 1) {
+        s = s + x * 7;
+    }
+    return s;
+}
+""")
+        loop = natural_loops(func)[0]
+        assert count(func, IROpcode.MUL, loop.blocks) == 0
+        assert count(func, IROpcode.MUL) == 1
+        assert licm.stats["hoisted"] == 1
+
+    def test_division_not_hoisted(self):
+        # Цикл может не выполниться ни разу: x / d нельзя вычислять заранее
+        func, licm, _ = optimize_loops("""
+fn f(int x, int d, int n) -> int {
+    int s = 0;
+    for (int i = 0; i < n; i = i + 1) {
+        s = s + x / d;
+    }
+    return s;
+}
+""")
+        loop = natural_loops(func)[0]
+        assert count(func, IROpcode.DIV, loop.blocks) == 1
+        assert licm.stats["hoisted"] == 0
+
+    def test_hoisted_through_nested_loops(self):
+        func, _, _ = optimize_loops("""
+fn f(int x, int n) -> int {
+    int s = 0;
+    for (int i = 0; i < n; i = i + 1) {
+        for (int j = 0; j < n; j = j + 1) {
+            s = s + (x + 3);
+        }
+    }
+    return s;
+}
+""")
+        outer = natural_loops(func)[-1]
+        assert count(func, IROpcode.ADD, outer.blocks) == 3
+
+
+class TestInductionVariableStrengthReduction:
+    def test_array_index_becomes_pointer(self):
+        func, _, ivsr = optimize_loops("""
+fn fill(int a[], int n) -> void {
+    for (int i = 0; i < n; i = i + 1) {
+        a[i] = i;
+    }
+}
+""")
+        loop = natural_loops(func)[0]
+        assert count(func, IROpcode.MUL, loop.blocks) == 0
+        assert ivsr.stats["reduced"] == 2
+        assert ivsr.stats["induction_variables"] == 1
+        # Адрес увеличивается на размер элемента
+        steps = [instr.operands[2].value for block in loop.blocks for instr in block.instructions
+                 if instr.opcode == IROpcode.ADD and instr.operands[0].value.startswith("iv")]
+        assert steps == [4]
+
+    def test_offset_index(self):
+        func, _, ivsr = optimize_loops("""
+fn f(int a[], int n) -> int {
+    int s = 0;
+    for (int i = 0; i < n; i = i + 1) {
+        s = s + a[i + 1];
+    }
+    return s;
+}
+""")
+        loop = natural_loops(func)[0]
+        assert count(func, IROpcode.MUL, loop.blocks) == 0
+        assert ivsr.stats["reduced"] == 2
+
+    def test_float_not_reduced(self):
+        _, _, ivsr = optimize_loops("""
+fn f(int n) -> float {
+    float s = 0.0;
+    float x = 0.0;
+    for (int i = 0; i < n; i = i + 1) {
+        s = s + x * 2.5;
+        x = x + 1.0;
+    }
+    return s;
+}
+""")
+        assert ivsr.stats["reduced"] == 0
+
+    def test_fewer_multiplications_at_o2(self):
+        source = """
+fn f(int a[]) -> int {
+    for (int i = 0; i < 10; i = i + 1) {
+        a[i] = i * 3;
+    }
+    int s = 0;
+    for (int i = 9; i >= 0; i = i - 1) {
+        s = s + a[i];
+    }
+    return s;
+}
+"""
+        o2 = run_ir(source, 2)
+        o1 = run_ir(source, 1)
+        assert count(o2, IROpcode.MUL) < count(o1, IROpcode.MUL)
+
+    def test_disabled_at_o1(self):
+        source = """
+fn f(int a[], int n) -> void {
+    for (int i = 0; i < n; i = i + 1) {
+        a[i] = 0;
+    }
+}
+"""
+        o1 = IROptimizer(generate_ir(source), 1)
+        o1.optimize()
+        o2 = IROptimizer(generate_ir(source), 2)
+        o2.optimize()
+        assert o1.stats["iv_strength_reduced"] == 0
+        assert o2.stats["iv_strength_reduced"] > 0
+
+
+    @pytest.mark.parametrize('opt', ['-O0', '-O2', '-O3'])
+    def test_pointer_iv_from_nonzero_start(self, tmp_path, opt):
+        # Начальное значение указателя считается в предзаголовке как база + lo*4;
+        # сложение должно идти в 64 битах, иначе адрес выше 4 ГБ обрезается
+        src = tmp_path / 'fill.src'
+        src.write_text("""
+fn fill(int a[], int lo, int n) -> void {
+    for (int i = lo; i < n; i = i + 1) {
+        a[i] = i;
+    }
+}
+
+fn main() -> int {
+    int a[200000];
+    a[0] = 0;
+    fill(a, 5, 200000);
+    return a[199999] % 256 + a[5];
+}
+""")
+        exe = str(tmp_path / 'fill')
+        result = subprocess.run([sys.executable, 'mycc.py', opt, str(src), '-o', exe, '--no-cache'],
+                                capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        assert subprocess.run([exe], timeout=10).returncode == 68
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
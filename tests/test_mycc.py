@@ -2,6 +2,7 @@ import pytest
 import subprocess
 import sys
 import os
+import shutil
 
 MYCC = [sys.executable, 'mycc.py']
 
@@ -108,9 +109,186 @@ class TestMyCCOptimization:
         result = subprocess.run(['/tmp/test_O3'], capture_output=True, text=True)
         assert result.returncode == 105
 
+    def test_inline_threshold(self):
+        result = subprocess.run(MYCC + ['-O2', '--ir', '--stats', 'examples/quicksort.src'],
+                              capture_output=True, text=True)
+        assert result.returncode == 0
+        assert 'Inlining: 4 calls inlined' in result.stdout
+
+        result = subprocess.run(MYCC + ['-O2', '--inline-threshold', '0', '--ir', '--stats', 'examples/quicksort.src'],
+                              capture_output=True, text=True)
+        assert result.returncode == 0
+        assert 'Inlining:' not in result.stdout
+        assert 'CALL "swap"' in result.stdout
+
+    def test_time_passes(self):
+        result = subprocess.run(MYCC + ['-O2', '--time-passes', '--ir', 'examples/quicksort.src'],
+                              capture_output=True, text=True)
+        assert result.returncode == 0
+        assert 'Pass timing (-O2)' in result.stderr
+        assert 'gvn-loops:' in result.stderr
+        result = subprocess.run(MYCC + ['-O0', '--time-passes', '--ir', 'examples/quicksort.src'],
+                              capture_output=True, text=True)
+        assert result.returncode == 0
+        assert 'Pass timing' not in result.stderr
+
+    def test_optimizer_failure_fails_compile(self, monkeypatch, capsys):
+        # Исключение в проходе — ошибка компиляции, а не тихий вывод неоптимизированного кода
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        import mycc
+
+        def broken(self):
+            raise RuntimeError('pass exploded')
+        monkeypatch.setattr(mycc.IROptimizer, 'optimize', broken)
+        monkeypatch.setattr(sys, 'argv', ['mycc', '-O2', '--ir', '--no-cache', 'examples/quicksort.src'])
+        assert mycc.main() == 1
+        captured = capsys.readouterr()
+        assert 'Optimization failed at -O2: RuntimeError: pass exploded' in captured.out + captured.err
+
+    def test_compare_branch_stats(self):
+        result = subprocess.run(MYCC + ['--stats', '-S', 'examples/quicksort.src', '-o', '/tmp/test_fused.asm'],
+                              capture_output=True, text=True)
+        assert result.returncode == 0
+        assert 'Compare-and-branch: 5 fused' in result.stderr
+        with open('/tmp/test_fused.asm') as f:
+            assert 'setl' not in f.read()
+
+    def test_float_compare_levels(self, tmp_path):
+        # Материализованный bool живёт через следующее вещественное сравнение;
+        # результат не должен зависеть от уровня оптимизации
+        src = tmp_path / 'fcmp.src'
+        src.write_text("""
+fn order(float x, float y) -> int {
+    bool c = y < x;
+    bool d = x < y;
+    if (c) {
+        return 1;
+    }
+    if (d) {
+        return 2;
+    }
+    return 3;
+}
+
+fn same(float x, float y) -> int {
+    bool e = x == y;
+    bool n = x != y;
+    if (e) {
+        return 4;
+    }
+    if (n) {
+        return 5;
+    }
+    return 6;
+}
+
+fn mask(float x, float y) -> int {
+    bool lt = x < y;
+    bool le = x <= y;
+    bool gt = x > y;
+    bool ge = x >= y;
+    int m = 0;
+    if (lt) { m = m + 1; }
+    if (le) { m = m + 2; }
+    if (gt) { m = m + 4; }
+    if (ge) { m = m + 8; }
+    return m;
+}
+
+fn main() -> int {
+    int r = order(1.0, 2.0) + order(2.0, 1.0) * 3 + order(1.5, 1.5) * 9;
+    r = r + same(1.0, 2.0) * 27 + same(2.5, 2.5) * 2;
+    r = r + mask(1.0, 2.0) + mask(2.0, 1.0) * 5 + mask(1.5, 1.5) * 11;
+    return r % 256;
+}
+""")
+        codes = {}
+        for opt in ['-O0', '-O1', '-O2', '-O3']:
+            exe = str(tmp_path / f'fcmp{opt}')
+            result = subprocess.run(MYCC + [opt, str(src), '-o', exe, '--no-cache'],
+                                    capture_output=True, text=True)
+            assert result.returncode == 0, result.stderr
+            codes[opt] = subprocess.run([exe], timeout=10).returncode
+        assert codes == dict.fromkeys(codes, 92)
+
 class TestMyCCVerbose:
     def test_verbose(self):
         result = subprocess.run(MYCC + ['-v', 'examples/optimization_demo.src', '-o', '/tmp/test_verbose'],
                               capture_output=True, text=True)
         assert result.returncode == 0
         assert 'Phase 1' in result.stderr
+
+class TestMyCCMultiFile:
+    MAIN = "extern int add3(int a, int b, int c);\nfn main() -> int {\n    return add3(1, 2, 3);\n}\n"
+    LIB = "fn add3(int a, int b, int c) -> int {\n    return a + b + c;\n}\n"
+
+    def _write(self, tmp_path, name, text):
+        path = tmp_path / name
+        path.write_text(text)
+        return str(path)
+
+    def test_link_multiple_units(self, tmp_path):
+        main_src = self._write(tmp_path, 'main.src', self.MAIN)
+        lib_src = self._write(tmp_path, 'lib.src', self.LIB)
+        exe = str(tmp_path / 'prog')
+        result = subprocess.run(MYCC + [main_src, lib_src, '-o', exe, '-j', '2', '--no-cache'],
+                                capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+
+        result = subprocess.run([exe], capture_output=True, text=True)
+        assert result.returncode == 6
+
+    def test_compile_only_writes_object_per_unit(self, tmp_path):
+        main_src = self._write(tmp_path, 'main.src', self.MAIN)
+        lib_src = self._write(tmp_path, 'lib.src', self.LIB)
+        mycc = [sys.executable, os.path.abspath('mycc.py')]
+        result = subprocess.run(mycc + ['-c', main_src, lib_src, '--no-cache'],
+                                capture_output=True, text=True, cwd=str(tmp_path))
+        assert result.returncode == 0, result.stderr
+        assert (tmp_path / 'main.o').exists()
+        assert (tmp_path / 'lib.o').exists()
+
+    def test_errors_in_input_order(self, tmp_path):
+        bad_b = self._write(tmp_path, 'b.src', "fn g() -> int { return y; }\n")
+        bad_a = self._write(tmp_path, 'a.src', "fn f() -> int { return x; }\n")
+        result = subprocess.run(MYCC + [bad_b, bad_a, '-j', '2', '--color=never', '--no-cache'],
+                                capture_output=True, text=True)
+        assert result.returncode != 0
+        assert result.stderr.index("'y'") < result.stderr.index("'x'")
+
+    def test_output_with_compile_only_rejected(self, tmp_path):
+        main_src = self._write(tmp_path, 'main.src', self.MAIN)
+        lib_src = self._write(tmp_path, 'lib.src', self.LIB)
+        result = subprocess.run(MYCC + ['-c', main_src, lib_src, '-o', str(tmp_path / 'x.o')],
+                                capture_output=True, text=True)
+        assert result.returncode != 0
+
+class TestMyCCIntegratedAs:
+    PROGRAMS = ['examples/optimization_demo.src', 'examples/demo_fibonacci.src', 'examples/test_quick.src']
+
+    def _run(self, source, exe, flags):
+        result = subprocess.run(MYCC + [source, '-o', exe, '--no-cache'] + flags,
+                                capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        return subprocess.run([exe], capture_output=True, text=True, timeout=10)
+
+    @pytest.mark.parametrize('source', PROGRAMS)
+    @pytest.mark.parametrize('opt', ['-O0', '-O2'])
+    def test_matches_nasm(self, tmp_path, source, opt):
+        if shutil.which('nasm') is None:
+            pytest.skip('nasm not installed')
+        reference = self._run(source, str(tmp_path / 'nasm'), [opt])
+        integrated = self._run(source, str(tmp_path / 'ias'), [opt, '--integrated-as'])
+        assert (integrated.returncode, integrated.stdout) == (reference.returncode, reference.stdout)
+
+    def test_executable(self, tmp_path):
+        # Программа и рантайм собираются встроенным ассемблером, nasm не нужен
+        result = self._run('examples/quicksort.src', str(tmp_path / 'qs'), ['--integrated-as'])
+        assert result.returncode == 94
+
+    def test_object_file(self, tmp_path):
+        obj = tmp_path / 'qs.o'
+        result = subprocess.run(MYCC + ['-c', 'examples/quicksort.src', '-o', str(obj), '--integrated-as', '--no-cache'],
+                                capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        assert obj.read_bytes()[:4] == b'\x7fELF'
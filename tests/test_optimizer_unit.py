@@ -1,4 +1,5 @@
 import pytest
+import subprocess
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
@@ -49,6 +50,30 @@ class TestConstantFolder:
         instr = result.functions[0].blocks[0].instructions[0]
         assert instr.operands[1].value == 20
 
+    def test_fold_div_mod_truncate_toward_zero(self):
+        # Как в C и idiv: частное усекается к нулю, остаток со знаком делимого
+        cases = [
+            (IROpcode.DIV, -7, 2, -3), (IROpcode.DIV, 7, -2, -3), (IROpcode.DIV, -7, -2, 3),
+            (IROpcode.MOD, -9, 4, -1), (IROpcode.MOD, 9, -4, 1), (IROpcode.MOD, -9, -4, -1),
+        ]
+        for opcode, a, b, expected in cases:
+            program, func, block = make_program()
+            block.add_instruction(IRInstruction(opcode, [Temp("%r1"), Lit(a), Lit(b)]))
+            instr = ConstantFolder().fold(program).functions[0].blocks[0].instructions[0]
+            assert instr.operands[1].value == expected, (opcode, a, b)
+
+    def test_fold_wraps_to_int32(self):
+        cases = [
+            (IROpcode.ADD, 2147483647, 1, -2147483648),
+            (IROpcode.MUL, 65536, 65536, 0),
+            (IROpcode.DIV, -2147483648, -1, -2147483648),
+        ]
+        for opcode, a, b, expected in cases:
+            program, func, block = make_program()
+            block.add_instruction(IRInstruction(opcode, [Temp("%r1"), Lit(a), Lit(b)]))
+            instr = ConstantFolder().fold(program).functions[0].blocks[0].instructions[0]
+            assert instr.operands[1].value == expected, (opcode, a, b)
+
     def test_fold_division_by_zero(self):
         program, func, block = make_program()
         block.add_instruction(IRInstruction(IROpcode.DIV, [
@@ -252,6 +277,49 @@ class TestDeadCodeEliminator:
         )
         assert has_call
 
+    def test_dead_chain_removed_in_one_run(self):
+        from ir.optimizer import DeadCodeEliminator
+        program, func, block = make_program()
+        # %t0 -> %t1 -> ... -> %t49: результат цепочки не используется
+        block.add_instruction(IRInstruction(IROpcode.MOVE, [Temp("%t0"), Lit(1)]))
+        for i in range(1, 50):
+            block.add_instruction(IRInstruction(IROpcode.ADD, [
+                Temp(f"%t{i}"), Temp(f"%t{i - 1}"), Lit(i)
+            ]))
+        block.add_instruction(IRInstruction(IROpcode.RETURN, [Lit(0)]))
+
+        dce = DeadCodeEliminator()
+        dce.eliminate(program)
+        assert [i.opcode for i in block.instructions] == [IROpcode.RETURN]
+        assert dce.stats["removed"] == 50
+
+    def test_store_operands_stay_live(self):
+        from ir.optimizer import DeadCodeEliminator
+        program, func, block = make_program()
+        block.add_instruction(IRInstruction(IROpcode.MUL, [Temp("%v"), Temp("%n"), Lit(3)]))
+        block.add_instruction(IRInstruction(IROpcode.STORE, [Temp("%p"), Temp("%v")]))
+        block.add_instruction(IRInstruction(IROpcode.RETURN, [Lit(0)]))
+
+        DeadCodeEliminator().eliminate(program)
+        assert [i.opcode for i in block.instructions] == [
+            IROpcode.MUL, IROpcode.STORE, IROpcode.RETURN
+        ]
+
+    def test_def_use_chains(self):
+        program, func, block = make_program()
+        add = IRInstruction(IROpcode.ADD, [Temp("%y"), Temp("%x"), Temp("%x")])
+        block.add_instruction(IRInstruction(IROpcode.MOVE, [Temp("%x"), Lit(2)]))
+        block.add_instruction(add)
+        chains = func.def_use_chains()
+        assert chains.use_count("%x") == 1
+        assert chains.users("%x") == [(block, add)]
+        assert func.def_use_chains() is chains
+        assert chains.remove(block, add) == ["%x"]
+        assert chains.use_count("%x") == 0
+        assert chains.defs["%y"] == []
+        func.invalidate_def_use()
+        assert func.def_use_chains() is not chains
+
 class TestIROptimizerPrintStats:
     def test_print_stats(self):
         from ir.optimizer import IROptimizer
@@ -266,3 +334,186 @@ class TestIROptimizerPrintStats:
         stats_str = opt.print_stats()
         assert 'Optimization Report' in stats_str
         assert 'Constant folding' in stats_str
+
+class TestSparseConditionalConstantPropagator:
+    def run_sccp(self, source):
+        from ir.optimizer import SparseConditionalConstantPropagator
+        from ir.ssa import SSABuilder
+        from tests.test_ir_generator import generate_ir
+        program = SSABuilder().build(generate_ir(source))
+        sccp = SparseConditionalConstantPropagator()
+        sccp.propagate(program)
+        return program.functions[-1], sccp
+
+    def returned(self, func):
+        return next(i.operands[0] for b in func.blocks for i in b.instructions
+                    if i.opcode == IROpcode.RETURN)
+
+    def test_prunes_constant_branch(self):
+        func, sccp = self.run_sccp("""
+fn main() -> int {
+    int x = 1;
+    int y = 0;
+    if (x > 0) { y = 5; } else { y = 7; }
+    return y;
+}
+""")
+        # Ветка else не исполняется, поэтому PHI на слиянии — константа
+        ret = self.returned(func)
+        assert ret.operand_type == IROperandType.LITERAL and ret.value == 5
+        assert sccp.stats["branches_pruned"] == 1
+        assert not any(i.opcode in (IROpcode.JUMP_IF, IROpcode.JUMP_IF_NOT)
+                       for b in func.blocks for i in b.instructions)
+
+    def test_same_constant_on_both_paths(self):
+        func, _ = self.run_sccp("""
+fn f(int n) -> int {
+    int y = 0;
+    if (n > 0) { y = 3; } else { y = 1 + 2; }
+    return y;
+}
+""")
+        ret = self.returned(func)
+        assert ret.operand_type == IROperandType.LITERAL and ret.value == 3
+
+    def test_loop_variable_is_not_constant(self):
+        func, sccp = self.run_sccp("""
+fn main() -> int {
+    int i = 0;
+    while (i < 10) { i = i + 1; }
+    return i;
+}
+""")
+        assert self.returned(func).operand_type == IROperandType.TEMPORARY
+        assert sccp.stats["branches_pruned"] == 0
+
+    NEGATIVE_DIV_MOD = """
+fn main() -> int {
+    int a = 0 - 9;
+    int b = 0 - 5;
+    if (a < 0) {
+        b = b - 2;
+    }
+    return (a % 4 + 10) * 16 + (b / 2 + 10);
+}
+"""
+
+    def test_negative_div_mod_through_join(self):
+        # b = -7 приходит через слияние ветвей: -7 / 2 == -3, -9 % 4 == -1
+        func, _ = self.run_sccp(self.NEGATIVE_DIV_MOD)
+        ret = self.returned(func)
+        assert ret.operand_type == IROperandType.LITERAL and ret.value == 151
+
+    @pytest.mark.parametrize('opt', ['-O0', '-O1', '-O2', '-O3'])
+    def test_negative_div_mod_matches_o0(self, tmp_path, opt):
+        src = tmp_path / 'divmod.src'
+        src.write_text(self.NEGATIVE_DIV_MOD)
+        exe = str(tmp_path / 'divmod')
+        result = subprocess.run([sys.executable, 'mycc.py', opt, str(src), '-o', exe, '--no-cache'],
+                                capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        assert subprocess.run([exe], timeout=10).returncode == 151
+
+
+class TestGlobalValueNumbering:
+    def run_gvn(self, source):
+        from ir.optimizer import GlobalValueNumbering
+        from ir.ssa import SSABuilder
+        from tests.test_ir_generator import generate_ir
+        program = SSABuilder().build(generate_ir(source))
+        gvn = GlobalValueNumbering()
+        gvn.run(program)
+        return program.functions[-1], gvn
+
+    def count(self, func, opcode):
+        return sum(i.opcode == opcode for b in func.blocks for i in b.instructions)
+
+    def test_repeated_address_arithmetic(self):
+        func, gvn = self.run_gvn("""
+fn swap(int arr[], int i, int j) -> void {
+    int temp = arr[i];
+    arr[i] = arr[j];
+    arr[j] = temp;
+}
+""")
+        # arr[i] и arr[j] адресуются дважды: второй MUL + ADD лишние
+        assert self.count(func, IROpcode.MUL) == 2
+        assert gvn.stats["eliminated"] == 4
+        assert self.count(func, IROpcode.LOAD) == 2
+
+    def test_load_not_reused_across_store(self):
+        func, gvn = self.run_gvn("""
+fn f(int arr[]) -> int {
+    int a = arr[0];
+    arr[0] = 5;
+    int b = arr[0];
+    return a + b;
+}
+""")
+        assert self.count(func, IROpcode.LOAD) == 2
+        assert gvn.stats["loads"] == 0
+
+    def test_load_reused_without_clobber(self):
+        func, gvn = self.run_gvn("""
+fn f(int arr[]) -> int {
+    int a = arr[1];
+    int b = arr[1];
+    return a + b;
+}
+""")
+        assert self.count(func, IROpcode.LOAD) == 1
+        assert gvn.stats["loads"] == 1
+
+    def test_call_clobbers_memory(self):
+        func, _ = self.run_gvn("""
+fn g() -> int { return 0; }
+fn f(int arr[]) -> int {
+    int a = arr[1];
+    g();
+    int b = arr[1];
+    return a + b;
+}
+""")
+        assert self.count(func, IROpcode.LOAD) == 2
+
+    def test_sibling_branch_does_not_reuse(self):
+        func, gvn = self.run_gvn("""
+fn f(int x, int y) -> int {
+    int r = 0;
+    if (x > 0) { r = x * y; } else { r = y * x + 1; }
+    return r;
+}
+""")
+        # Ветки не доминируют друг над другом: оба умножения остаются
+        assert self.count(func, IROpcode.MUL) == 2
+        assert gvn.stats["eliminated"] == 0
+
+    def test_commutative_operands(self):
+        func, gvn = self.run_gvn("""
+fn f(int x, int y) -> int {
+    int a = x * y;
+    int b = y * x;
+    return a - b;
+}
+""")
+        assert self.count(func, IROpcode.MUL) == 1
+        sub = next(i for b in func.blocks for i in b.instructions if i.opcode == IROpcode.SUB)
+        assert sub.operands[1].value == sub.operands[2].value
+
+    def test_enabled_at_o2_only(self):
+        from ir.optimizer import IROptimizer
+        from tests.test_ir_generator import generate_ir
+        source = """
+fn f(int x, int y) -> int {
+    int a = x * y;
+    int b = x * y;
+    return a + b;
+}
+"""
+        o1 = IROptimizer(generate_ir(source), 1)
+        o1.optimize()
+        o2 = IROptimizer(generate_ir(source), 2)
+        o2.optimize()
+        assert o1.stats["cse_eliminated"] == 0
+        assert o2.stats["cse_eliminated"] == 1
+        assert o2.stats["total_instructions_after"] < o1.stats["total_instructions_after"]
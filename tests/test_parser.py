@@ -685,5 +685,26 @@ def test_complete_program():
     assert isinstance(body.statements[2], ExprStmtNode)  # print(fact);
 
 
+@pytest.mark.parametrize("path", sorted(
+    str(p) for p in (Path(__file__).parent.parent / "examples").glob("*.src")
+))
+def test_parse_from_token_stream_matches_list(path):
+    """Парсер над ленивым потоком токенов строит то же AST, что и над списком"""
+    from parser.json_generator import JsonGenerator
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+
+    list_parser = Parser(Scanner(source).scan_tokens())
+    list_ast = list_parser.parse()
+
+    scanner = Scanner(source)
+    stream = scanner.token_stream()
+    stream_parser = Parser(stream)
+    stream_ast = stream_parser.parse()
+
+    assert JsonGenerator().generate(stream_ast) == JsonGenerator().generate(list_ast)
+    assert [e.message for e in stream_parser.errors] == [e.message for e in list_parser.errors]
+
+
 if __name__ == '__main__':
-    pytest.main([__file__, '-v'])
\ No newline at end of file
+    pytest.main([__file__, '-v'])
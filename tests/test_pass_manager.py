@@ -0,0 +1,143 @@
+"""Тесты менеджера проходов: кэш анализов, неподвижная точка, конвейеры -O"""
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ir.pass_manager import (
+    AnalysisManager, PassManager, Pass, FunctionPass, FixedPoint, StatsPass,
+    DOMINATORS, DEF_USE, INSTRUCTION_ANALYSES, EDGE_ANALYSES
+)
+from ir.optimizer import IROptimizer
+from ir.ssa import DominatorTree
+from tests.test_ir_generator import generate_ir
+from tests.test_ssa import LOOP_SOURCE
+
+
+class Counter:
+    """Проход, меняющий IR первые changes запусков."""
+
+    def __init__(self, changes):
+        self.left = changes
+        self.stats = {"runs": 0, "changed": 0}
+
+    def run(self, program):
+        self.stats["runs"] += 1
+        if self.left:
+            self.left -= 1
+            self.stats["changed"] += 1
+        return program
+
+
+class NeedsDominators(Pass):
+    name = "needs-dominators"
+    requires = (DOMINATORS,)
+    invalidates = ()
+
+    def run(self, program, manager):
+        self.seen = manager.analyses.get(DOMINATORS, program.functions[0])
+        return False
+
+
+class TestAnalysisManager:
+    def test_cached_until_invalidated(self):
+        program = generate_ir(LOOP_SOURCE)
+        func = program.functions[0]
+        analyses = AnalysisManager(program)
+        dom = analyses.get(DOMINATORS, func)
+        assert isinstance(dom, DominatorTree)
+        assert analyses.get(DOMINATORS, func) is dom
+        assert analyses.stats["computed"] == 1 and analyses.stats["reused"] == 1
+
+        analyses.invalidate(program, INSTRUCTION_ANALYSES)
+        assert analyses.cached(DOMINATORS, func)
+        analyses.invalidate(program, EDGE_ANALYSES)
+        assert not analyses.cached(DOMINATORS, func)
+        assert analyses.get(DOMINATORS, func) is not dom
+
+    def test_def_use_lives_in_function(self):
+        program = generate_ir(LOOP_SOURCE)
+        func = program.functions[0]
+        analyses = AnalysisManager(program)
+        assert analyses.get(DEF_USE, func) is func.def_use_chains()
+        analyses.invalidate(program, (DEF_USE,))
+        assert func.def_use is None
+
+
+class TestPassManager:
+    def test_required_analysis_reused(self):
+        program = generate_ir(LOOP_SOURCE)
+        first, second = NeedsDominators(), NeedsDominators()
+        manager = PassManager([first, second])
+        manager.run(program)
+        assert first.seen is second.seen
+        assert manager.analyses.stats["computed"] == 1
+
+    def test_change_invalidates(self):
+        program = generate_ir(LOOP_SOURCE)
+        check = NeedsDominators()
+        changer = FunctionPass("changer", lambda program: True, invalidates=EDGE_ANALYSES)
+        manager = PassManager([NeedsDominators(), changer, check])
+        manager.run(program)
+        assert manager.analyses.stats["computed"] == 2
+
+    def test_fixed_point_stops_without_changes(self):
+        a, b = Counter(2), Counter(1)
+        group = FixedPoint([StatsPass("a", a, "run", ["changed"]), StatsPass("b", b, "run", ["changed"])])
+        manager = PassManager([group])
+        manager.run(generate_ir(LOOP_SOURCE))
+        # Второй раз a запускается после изменения b, b — после второго изменения a;
+        # собственное изменение прохода повторного запуска не требует
+        assert a.stats["runs"] == 2
+        assert b.stats["runs"] == 2
+        assert group.iterations == 2
+
+    def test_fixed_point_limit(self):
+        a, b = Counter(100), Counter(100)
+        group = FixedPoint([StatsPass("a", a, "run", ["changed"]), StatsPass("b", b, "run", ["changed"])], 3)
+        PassManager([group]).run(generate_ir(LOOP_SOURCE))
+        assert a.stats["runs"] == 3 and group.iterations == 3
+
+    def test_time_passes_report(self):
+        optimizer = IROptimizer(generate_ir(LOOP_SOURCE), 2, time_passes=True)
+        optimizer.optimize()
+        timings = optimizer.pass_manager.timings
+        assert {"sccp", "gvn", "licm", "dce", "ssa-destruct"} <= set(timings)
+        delta = sum(timing.delta for timing in timings.values())
+        stats = optimizer.stats
+        assert delta == stats["total_instructions_after"] - stats["total_instructions_before"]
+        report = optimizer.pass_manager.report()
+        assert report[0].split()[0] == "Pass"
+        assert any(line.startswith("gvn-loops:") for line in report)
+
+
+class TestPipelines:
+    def names(self, level):
+        passes = IROptimizer(generate_ir(LOOP_SOURCE), level).pipeline()
+        flat = []
+        for p in passes:
+            flat += [inner.name for inner in p.passes] if isinstance(p, FixedPoint) else [p.name]
+        return flat
+
+    def test_levels(self):
+        assert self.names(0) == []
+        o1 = self.names(1)
+        assert o1[:4] == ["tail-calls", "stack-arrays", "ssa-build", "sccp"]
+        assert "inline" not in o1 and "gvn" not in o1
+        o2 = self.names(2)
+        assert o2[:3] == ["tail-calls", "inline", "stack-arrays"]
+        assert o2.index("gvn") < o2.index("licm") < o2.index("iv-strength") < o2.index("ssa-destruct")
+        assert "vectorize" not in o2
+        o3 = self.names(3)
+        assert [name for name in o3 if name != "vectorize"] == o2
+        assert o3.index("unreachable") < o3.index("vectorize") < o3.index("gvn")
+
+    def test_o0_leaves_ir(self):
+        program = generate_ir(LOOP_SOURCE)
+        before = [str(instr) for block in program.functions[0].blocks for instr in block.instructions]
+        IROptimizer(program, 0).optimize()
+        assert [str(instr) for block in program.functions[0].blocks for instr in block.instructions] == before
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
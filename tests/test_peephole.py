@@ -0,0 +1,247 @@
+"""Тесты peephole-оптимизатора ассемблера"""
+import pytest
+import subprocess
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from codegen.peephole import AsmLine, PeepholeOptimizer
+from codegen.x86_generator import X86Generator
+from ir.optimizer import IROptimizer
+from tests.test_ir_generator import generate_ir
+
+
+def peephole(*lines):
+    optimizer = PeepholeOptimizer()
+    result = optimizer.optimize([AsmLine.parse(line) for line in lines])
+    return [line.render().strip() for line in result], optimizer.stats
+
+
+class TestAsmLine:
+    def test_parse_and_render(self):
+        line = AsmLine.parse("    mov dword [rbp-8], eax")
+        assert line.kind == AsmLine.INSTR
+        assert line.mnemonic == "mov"
+        assert line.operands == ["dword [rbp-8]", "eax"]
+        assert line.render() == "    mov dword [rbp-8], eax"
+        label = AsmLine.parse("main.if_then_1:")
+        assert label.kind == AsmLine.LABEL and label.render() == "main.if_then_1:"
+        assert AsmLine.parse("    ; comment").kind == AsmLine.COMMENT
+
+    def test_rewrite(self):
+        line = AsmLine.parse("    imul eax, 8")
+        line.rewrite("shl", "eax", "3")
+        assert line.render() == "    shl eax, 3"
+
+
+class TestRules:
+    def test_redundant_load_after_store(self):
+        lines, stats = peephole(
+            "mov dword [rbp-8], eax",
+            "mov ecx, 1",
+            "mov eax, dword [rbp-8]",
+        )
+        assert lines == ["mov dword [rbp-8], eax", "mov ecx, 1"]
+        assert stats["redundant-load"] == 1
+
+    def test_redundant_store_after_load(self):
+        lines, stats = peephole(
+            "mov eax, dword [rbp-8]",
+            "mov dword [rbp-8], eax",
+            "ret",
+        )
+        assert lines == ["mov eax, dword [rbp-8]", "ret"]
+        assert stats["redundant-store"] == 1
+
+    def test_load_kept_after_clobber(self):
+        # Регистр перезаписан, слот перезаписан, адрес через изменённый регистр
+        for middle in ("add eax, 1", "mov dword [rbp-8], ecx", "call f"):
+            lines, _ = peephole("mov dword [rbp-8], eax", middle, "mov eax, dword [rbp-8]")
+            assert len(lines) == 3, middle
+        lines, _ = peephole("mov eax, dword [rcx]", "mov rcx, qword [rbp-16]", "mov eax, dword [rcx]")
+        assert len(lines) == 3
+
+    def test_load_across_label_kept(self):
+        lines, _ = peephole("mov dword [rbp-8], eax", "f.loop:", "mov eax, dword [rbp-8]", "jmp f.loop")
+        assert "mov eax, dword [rbp-8]" in lines
+
+    def test_zero_idiom(self):
+        lines, stats = peephole("mov eax, 0", "ret")
+        assert lines == ["xor eax, eax", "ret"]
+        assert stats["zero-idiom"] == 1
+        # Флаги cmp ещё нужны jl
+        lines, _ = peephole("cmp ecx, 1", "mov eax, 0", "jl f.a", "ret", "f.a:", "ret")
+        assert "mov eax, 0" in lines
+        # Память и 8-битные регистры не трогаем
+        lines, _ = peephole("mov dword [rbp-8], 0", "mov al, 0", "ret")
+        assert lines[:2] == ["mov dword [rbp-8], 0", "mov al, 0"]
+
+    def test_mul_pow2(self):
+        lines, stats = peephole("imul eax, 8", "imul ecx, 1", "imul edx, 6", "ret")
+        assert lines == ["shl eax, 3", "imul edx, 6", "ret"]
+        assert stats["mul-pow2"] == 2
+
+    def test_setcc_branch(self):
+        lines, stats = peephole(
+            "cmp ecx, edx",
+            "setl al",
+            "movzx eax, al",
+            "mov dword [rbp-8], eax",
+            "cmp dword [rbp-8], 0",
+            "je f.else",
+            "mov eax, 1",
+            "ret",
+            "f.else:",
+            "ret",
+        )
+        assert "cmp dword [rbp-8], 0" not in lines
+        assert "jge f.else" in lines
+        assert stats["setcc-branch"] == 1
+
+    def test_setcc_branch_stops_at_flag_setter(self):
+        # Между setcc и test флаги переписаны вторым сравнением
+        for middle in ("ucomiss xmm0, dword [rbp-12]", "cmp ecx, 1", "add ecx, 1", "idiv ecx"):
+            lines, stats = peephole(
+                "ucomiss xmm0, dword [rbp-8]",
+                "seta al",
+                "movzx eax, al",
+                "mov dword [rbp-4], eax",
+                middle,
+                "cmp dword [rbp-4], 0",
+                "je f.else",
+                "mov eax, 1",
+                "ret",
+                "f.else:",
+                "ret",
+            )
+            assert "cmp dword [rbp-4], 0" in lines, middle
+            assert stats["setcc-branch"] == 0, middle
+
+    def test_branch_over_jump(self):
+        lines, stats = peephole(
+            "cmp eax, 0",
+            "jl f.then",
+            "jmp f.end",
+            "f.then:",
+            "mov eax, 1",
+            "f.end:",
+            "ret",
+        )
+        assert lines[:3] == ["cmp eax, 0", "jge f.end", "mov eax, 1"]
+        assert stats["branch-over-jump"] == 1
+        assert stats["dead-label"] == 1
+
+    def test_jump_thread_and_next(self):
+        lines, stats = peephole(
+            "cmp eax, 0",
+            "je f.a",
+            "mov eax, 2",
+            "jmp f.b",
+            "f.a:",
+            "jmp f.b",
+            "f.b:",
+            "ret",
+        )
+        assert "je f.b" in lines
+        assert "jmp f.b" not in lines
+        assert "f.a:" not in lines
+        assert stats["jump-thread"] >= 1 and stats["jump-next"] >= 1
+
+    def test_jump_cycle_terminates(self):
+        lines, _ = peephole("f.a:", "jmp f.b", "f.b:", "jmp f.a")
+        assert lines[-1].startswith("jmp")
+
+    def test_unreachable(self):
+        lines, stats = peephole("jmp f.end", "mov eax, 1", "add eax, 2", "f.end:", "ret", "mov eax, 3")
+        assert lines == ["ret"]
+        assert stats["unreachable"] == 3
+
+
+class TestGenerator:
+    SOURCE = """
+fn scale(int arr[], int n) -> int {
+    int total = 0;
+    for (int i = 0; i < n; i = i + 1) {
+        if (arr[i] > 0) {
+            total = total + arr[i] * 4;
+        }
+    }
+    return total;
+}
+
+fn main() -> int {
+    int a[3];
+    a[0] = 1;
+    a[1] = -2;
+    a[2] = 3;
+    return scale(a, 3);
+}
+"""
+
+    def generate(self, level, peephole):
+        program = IROptimizer(generate_ir(self.SOURCE), level).optimize()
+        generator = X86Generator(program, allocate_registers=level >= 2, peephole=peephole)
+        return generator.generate(), generator
+
+    def instructions(self, asm):
+        return [line for line in asm.splitlines() if line.startswith("    ") and not line.strip().startswith(";")]
+
+    def test_fewer_instructions(self):
+        for level in (1, 2):
+            plain, _ = self.generate(level, False)
+            optimized, generator = self.generate(level, True)
+            assert len(self.instructions(optimized)) < len(self.instructions(plain))
+            assert sum(generator.peephole.stats.values()) > 0
+            assert "imul" not in optimized.split("scale:")[1].split("main:")[0]
+
+    def test_disabled_by_default(self):
+        asm, generator = self.generate(1, False)
+        assert generator.peephole is None
+        assert "scale:" in asm
+
+
+MYCC = [sys.executable, 'mycc.py']
+
+
+class TestMyCCPeephole:
+    def test_stats(self):
+        result = subprocess.run(MYCC + ['-O2', '--stats', '-S', 'examples/quicksort.src', '-o', '/tmp/test_peephole.asm'],
+                                capture_output=True, text=True)
+        assert result.returncode == 0
+        assert 'Peephole:' in result.stderr
+        assert 'jump-next' in result.stderr
+
+        result = subprocess.run(MYCC + ['-O0', '--stats', '-S', 'examples/quicksort.src', '-o', '/tmp/test_peephole.asm'],
+                                capture_output=True, text=True)
+        assert result.returncode == 0
+        assert 'Peephole:' not in result.stderr
+
+
+    @pytest.mark.parametrize('opt', ['-O0', '-O1', '-O2', '-O3'])
+    def test_setcc_branch_across_float_compare(self, tmp_path, opt):
+        src = tmp_path / 'flags.src'
+        src.write_text("""
+fn t(float x, float y) -> int {
+    bool c = y < x;
+    bool d = x < y;
+    if (c) {
+        return 10;
+    }
+    if (d) {
+        return 30;
+    }
+    return 20;
+}
+
+fn main() -> int {
+    return t(1.0, 2.0);
+}
+""")
+        exe = str(tmp_path / 'flags')
+        result = subprocess.run(MYCC + [opt, str(src), '-o', exe, '--no-cache'], capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        assert subprocess.run([exe], timeout=10).returncode == 30
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,208 @@
+"""Тесты SSA: доминаторы, размещение PHI, переименование и выход из SSA"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ir.ssa import DominatorTree, SSABuilder, SSADestructor, ssa_base, defined_temp
+from ir.optimizer import IROptimizer
+from ir.control_flow import IRProgram, IRFunction
+from ir.basic_block import BasicBlock
+from ir.ir_instructions import IRInstruction, IROpcode, IROperandType, PhiInst, Temp, Lit, Label
+from tests.test_ir_generator import generate_ir
+
+
+LOOP_SOURCE = """
+fn main() -> int {
+    int sum = 0;
+    int i = 0;
+    while (i < 10) {
+        int t = i * 2;
+        sum = sum + t;
+        i = i + 1;
+    }
+    return sum;
+}
+"""
+
+
+def make_function(*blocks):
+    """Функция из блоков (label, [инструкции]); рёбра строятся по переходам."""
+    program = IRProgram()
+    func = IRFunction("test", "int")
+    for label, instructions in blocks:
+        block = BasicBlock(label)
+        block.instructions = list(instructions)
+        func.blocks.append(block)
+    func.entry_block = func.blocks[0]
+    program.functions.append(func)
+    func.rebuild_cfg()
+    return program, func
+
+
+def jump(label):
+    return IRInstruction(IROpcode.JUMP, [Label(label)])
+
+
+def branch(cond, label):
+    return IRInstruction(IROpcode.JUMP_IF, [Temp(cond), Label(label)])
+
+
+def move(dest, src):
+    return IRInstruction(IROpcode.MOVE, [Temp(dest), src])
+
+
+def add(dest, a, b):
+    return IRInstruction(IROpcode.ADD, [Temp(dest), a, b])
+
+
+def ret(value):
+    return IRInstruction(IROpcode.RETURN, [value])
+
+
+def diamond():
+    return make_function(
+        ("entry", [branch("c", "then"), jump("else")]),
+        ("then", [move("x", Lit(1)), jump("join")]),
+        ("else", [move("x", Lit(2)), jump("join")]),
+        ("join", [IRInstruction(IROpcode.RETURN, [Temp("x")])]),
+    )
+
+
+def blocks_by_label(func):
+    return {block.label: block for block in func.blocks}
+
+
+class TestDominatorTree:
+    def test_diamond_idom(self):
+        _, func = diamond()
+        b = blocks_by_label(func)
+        dom = DominatorTree(func)
+        assert dom.idom[b["then"]] is b["entry"]
+        assert dom.idom[b["else"]] is b["entry"]
+        assert dom.idom[b["join"]] is b["entry"]
+        assert b["join"].idom is b["entry"]
+        assert func.entry_block.idom is None
+
+    def test_diamond_frontiers(self):
+        _, func = diamond()
+        b = blocks_by_label(func)
+        frontier = DominatorTree(func).frontiers()
+        assert frontier[b["then"]] == [b["join"]]
+        assert frontier[b["else"]] == [b["join"]]
+        assert frontier[b["entry"]] == []
+
+    def test_loop_header_in_own_frontier(self):
+        func = generate_ir(LOOP_SOURCE).functions[0]
+        dom = DominatorTree(func)
+        header = next(b for b in func.blocks if b.label.startswith("while_header"))
+        body = next(b for b in func.blocks if b.label.startswith("while_body"))
+        assert dom.dominates(header, body)
+        assert not dom.dominates(body, header)
+        assert header in dom.frontiers()[body]
+
+    def test_unreachable_block_ignored(self):
+        _, func = make_function(
+            ("entry", [IRInstruction(IROpcode.RETURN, [Lit(0)])]),
+            ("dead", [jump("entry")]),
+        )
+        dom = DominatorTree(func)
+        assert [block.label for block in dom.rpo] == ["entry"]
+
+
+class TestSSABuilder:
+    def test_phi_at_join(self):
+        program, func = diamond()
+        SSABuilder().build(program)
+        join = blocks_by_label(func)["join"]
+        phi = join.instructions[0]
+        assert isinstance(phi, PhiInst)
+        assert ssa_base(phi.operands[0].value) == "x"
+        assert {label for _, label in phi.sources} == {"then", "else"}
+        assert join.instructions[1].operands[0].value == phi.operands[0].value
+
+    def test_single_definition_per_temp(self):
+        program = generate_ir(LOOP_SOURCE)
+        SSABuilder().build(program)
+        defined = [defined_temp(instr) for block in program.functions[0].blocks
+                   for instr in block.instructions]
+        defined = [name for name in defined if name]
+        assert len(defined) == len(set(defined))
+
+    def test_pruned_phi_placement(self):
+        program = generate_ir(LOOP_SOURCE)
+        builder = SSABuilder()
+        builder.build(program)
+        func = program.functions[0]
+        header = next(b for b in func.blocks if b.label.startswith("while_header"))
+        bases = {ssa_base(instr.operands[0].value) for instr in header.instructions
+                 if isinstance(instr, PhiInst)}
+        # t определяется заново на каждой итерации и не жива в заголовке
+        assert bases == {func.var_to_temp["sum"].value, func.var_to_temp["i"].value}
+        assert builder.stats["phi_inserted"] == 2
+
+    def test_phi_sources_follow_predecessors(self):
+        program = generate_ir(LOOP_SOURCE)
+        SSABuilder().build(program)
+        for block in program.functions[0].blocks:
+            for instr in block.instructions:
+                if isinstance(instr, PhiInst):
+                    assert [label for _, label in instr.sources] == \
+                        [pred.label for pred in block.predecessors]
+                    assert all(value is not None for value, _ in instr.sources)
+
+
+class TestSSADestructor:
+    def test_round_trip_coalesces(self):
+        program = generate_ir(LOOP_SOURCE)
+        SSABuilder().build(program)
+        destructor = SSADestructor()
+        destructor.destruct(program)
+        for block in program.functions[0].blocks:
+            for instr in block.instructions:
+                assert not isinstance(instr, PhiInst)
+                for op in instr.operands:
+                    if op.operand_type == IROperandType.TEMPORARY:
+                        assert "." not in op.value
+        assert destructor.stats["copies"] == 0
+
+    def test_swap_cycle_on_critical_edge(self):
+        # a и b меняются местами на каждой итерации: PHI образуют цикл копий
+        program, func = make_function(
+            ("entry", [move("a.1", Lit(1)), move("b.1", Lit(2)), jump("loop")]),
+            ("loop", [
+                PhiInst(Temp("a.2"), [(Temp("a.1"), "entry"), (Temp("b.2"), "loop")]),
+                PhiInst(Temp("b.2"), [(Temp("b.1"), "entry"), (Temp("a.2"), "loop")]),
+                branch("c", "loop"),
+                jump("exit"),
+            ]),
+            ("exit", [IRInstruction(IROpcode.RETURN, [Temp("a.2")])]),
+        )
+        destructor = SSADestructor()
+        destructor.destruct(program)
+        b = blocks_by_label(func)
+        assert destructor.stats["edges_split"] == 1
+        split = b["loop_from_loop"]
+        assert b["loop"].instructions[0].operands[1].value == "loop_from_loop"
+        assert b["loop"].successors == [split, b["exit"]]
+        assert split.successors == [b["loop"]]
+
+        # Последовательные копии должны выполнить обмен значений
+        values = {"a": 1, "b": 2}
+        for instr in split.instructions[:-1]:
+            assert instr.opcode == IROpcode.MOVE
+            values[instr.operands[0].value] = values[instr.operands[1].value]
+        assert (values["a"], values["b"]) == (2, 1)
+        assert not any(isinstance(instr, PhiInst) for instr in b["loop"].instructions)
+
+
+class TestOptimizerOnSSA:
+    def test_loop_variable_not_folded_to_initial_value(self):
+        # Раньше константа 0 из инициализации распространялась в цикл
+        program = generate_ir(LOOP_SOURCE)
+        optimizer = IROptimizer(program)
+        func = optimizer.optimize().functions[0]
+        ret = next(instr for block in func.blocks for instr in block.instructions
+                   if instr.opcode == IROpcode.RETURN)
+        assert ret.operands[0].operand_type == IROperandType.TEMPORARY
+        assert optimizer.stats["phi_inserted"] == 2
+        assert "phi nodes" in optimizer.print_stats()
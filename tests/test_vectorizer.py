@@ -0,0 +1,216 @@
+"""Тесты векторизации счётных циклов (SSE2, -O3)"""
+import pytest
+import subprocess
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from codegen.x86_generator import X86Generator
+from ir.ir_instructions import IROpcode, PhiInst, is_vector_type
+from ir.optimizer import IROptimizer
+from ir.pass_manager import PassManager
+from tests.test_ir_generator import generate_ir
+
+
+def vectorize(source):
+    """Конвейер -O3 до векторизации включительно; IR остаётся в SSA."""
+    optimizer = IROptimizer(generate_ir(source), 3)
+    passes = optimizer.pipeline()
+    names = [p.name for p in passes]
+    program = PassManager(passes[:names.index("vectorize") + 1]).run(optimizer.program)
+    return {func.name: func for func in program.functions}, optimizer.vectorizer
+
+
+def vector_instructions(func):
+    return [instr for block in func.blocks for instr in block.instructions
+            if instr.operands and any(is_vector_type(op.ir_type) for op in instr.operands)]
+
+
+ADD = """
+fn add(int a[], int b[], int c[], int n) -> void {
+    for (int i = 0; i < n; i = i + 1) {
+        a[i] = b[i] + c[i];
+    }
+}
+"""
+
+FLOAT = """
+fn scale(float y[], float x[], int n) -> void {
+    float alpha = x[0];
+    for (int i = 0; i <= n; i = i + 1) {
+        y[i] = x[i] * alpha + 1.5;
+    }
+}
+"""
+
+
+class TestLoopVectorizer:
+    def test_int_loop(self):
+        funcs, vectorizer = vectorize(ADD)
+        assert vectorizer.stats["vectorized"] == 1
+        ops = [instr.opcode for instr in vector_instructions(funcs["add"])]
+        assert ops == [IROpcode.LOAD, IROpcode.LOAD, IROpcode.ADD, IROpcode.STORE]
+
+    def test_scalar_epilogue(self):
+        funcs, _ = vectorize(ADD)
+        func = funcs["add"]
+        header = next(block for block in func.blocks if block.label.startswith("for_header"))
+        vector_header = next(block for block in func.blocks if block.label.startswith("vector_header"))
+        # Скалярный цикл продолжает со счётчика векторного
+        counter = vector_header.instructions[0]
+        assert isinstance(counter, PhiInst)
+        (phi,) = [instr for instr in header.instructions if isinstance(instr, PhiInst)]
+        assert counter.operands[0].value in [value.value for value, _ in phi.sources]
+        assert [pred.label for pred in header.predecessors] == [label for _, label in phi.sources]
+        # Условие векторного цикла — для последнего из 4 элементов
+        assert [instr.opcode for instr in vector_header.instructions[1:3]] == [IROpcode.ADD, IROpcode.CMP_LT]
+        assert vector_header.instructions[1].operands[2].value == 3
+
+    def test_float_loop_broadcasts(self):
+        funcs, vectorizer = vectorize(FLOAT)
+        assert vectorizer.stats["vectorized"] == 1
+        func = funcs["scale"]
+        broadcasts = [instr for instr in vector_instructions(func) if instr.opcode == IROpcode.BROADCAST]
+        assert len(broadcasts) == 2
+        assert all(instr.operands[0].ir_type.name == "vector_float" for instr in broadcasts)
+        # Инварианты размножаются до цикла, в предзаголовке
+        entry = func.blocks[0]
+        assert all(instr in entry.instructions for instr in broadcasts)
+
+    @pytest.mark.parametrize("body", [
+        "s = s + a[i];",                       # редукция: второй PHI
+        "a[i] = a[i + 1];",                    # соседний элемент
+        "a[i] = i;",                           # счётчик как значение
+        "a[i] = a[i] / 3;",                    # целого деления в SSE нет
+        "a[i] = ext(a[i]);",                   # вызов
+        "if (a[i] > 0) { a[i] = 0; }",         # ветвление в теле
+    ])
+    def test_rejected(self, body):
+        _, vectorizer = vectorize(f"""
+extern int ext(int x);
+fn g(int a[], int n) -> int {{
+    int s = 0;
+    for (int i = 0; i < n; i = i + 1) {{ {body} }}
+    return s;
+}}
+""")
+        assert vectorizer.stats["vectorized"] == 0
+
+    def test_rejected_stride(self):
+        _, vectorizer = vectorize("""
+fn g(int a[], int n) -> void {
+    for (int i = 0; i < n; i = i + 2) { a[i] = a[i] + 1; }
+}
+""")
+        assert vectorizer.stats["vectorized"] == 0
+
+    def test_only_o3(self):
+        for level, count in ((2, 0), (3, 1)):
+            optimizer = IROptimizer(generate_ir(ADD), level)
+            optimizer.optimize()
+            assert optimizer.stats["loops_vectorized"] == count
+
+
+class TestCodegen:
+    def generate(self, source, allocate_registers=True):
+        program = IROptimizer(generate_ir(source), 3).optimize()
+        return X86Generator(program, allocate_registers=allocate_registers).generate()
+
+    def test_int_mnemonics(self):
+        asm = self.generate(ADD)
+        assert "paddd" in asm and "movdqu" in asm
+
+    def test_int_multiply_without_sse41(self):
+        asm = self.generate("""
+fn mul(int a[], int b[], int n) -> void {
+    int k = b[0];
+    for (int i = 0; i < n; i = i + 1) { a[i] = b[i] * k; }
+}
+""")
+        assert "pmuludq" in asm and "punpckldq" in asm and "pshufd" in asm
+        assert "pmulld" not in asm
+
+    def test_float_mnemonics(self):
+        for allocate_registers in (True, False):
+            asm = self.generate(FLOAT, allocate_registers)
+            assert "mulps" in asm and "addps" in asm and "shufps" in asm and "movups" in asm
+
+
+MYCC = [sys.executable, 'mycc.py']
+
+VECTOR_PROGRAM = """
+fn scale(int a[], int b[], int n) -> void {
+    int k = b[1];
+    for (int i = 0; i < n; i = i + 1) {
+        a[i] = b[i] * k - 7;
+    }
+}
+
+fn halves(float y[], float x[], int n) -> void {
+    for (int i = 0; i < n; i = i + 1) {
+        y[i] = x[i] / 2.0 + y[i];
+    }
+}
+
+fn main() -> int {
+    int a[11];
+    int b[11];
+    float x[11];
+    float y[11];
+    float f = 0.0;
+    int check = 0;
+    for (int n = 0; n <= 11; n = n + 1) {
+        for (int i = 0; i < 11; i = i + 1) { a[i] = -1; b[i] = i - 4; x[i] = f; y[i] = 1.0; f = f + 1.0; }
+        f = 0.0;
+        scale(a, b, n);
+        halves(y, x, n);
+        for (int i = 0; i < 11; i = i + 1) {
+            check = (check * 3 + a[i]) % 10007;
+            if (y[i] == 1.0) { check = check + 1; }
+        }
+    }
+    return check % 256;
+}
+"""
+
+
+def expected_result():
+    check = 0
+    for n in range(12):
+        b = [i - 4 for i in range(11)]
+        a = [b[i] * b[1] - 7 if i < n else -1 for i in range(11)]
+        y = [i / 2 + 1.0 if i < n else 1.0 for i in range(11)]
+        for i in range(11):
+            # % в языке — как в C: знак остатка по делимому
+            value = check * 3 + a[i]
+            check = value - 10007 * int(value / 10007)
+            if y[i] == 1.0:
+                check += 1
+    return check % 256
+
+
+class TestMyCCVectorize:
+    def compile_and_run(self, src, tmp_path, *options):
+        exe = tmp_path / f"vector_{len(list(tmp_path.iterdir()))}"
+        result = subprocess.run(MYCC + ['--no-cache', *options, str(src), '-o', str(exe)],
+                                capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        return subprocess.run([str(exe)], capture_output=True, timeout=5).returncode
+
+    def test_same_result_as_scalar(self, tmp_path):
+        src = tmp_path / 'vector.src'
+        src.write_text(VECTOR_PROGRAM)
+        expected = expected_result()
+        assert self.compile_and_run(src, tmp_path, '-O0') == expected
+        assert self.compile_and_run(src, tmp_path, '-O2') == expected
+        assert self.compile_and_run(src, tmp_path, '-O3') == expected
+        assert self.compile_and_run(src, tmp_path, '-O3', '--integrated-as') == expected
+
+        result = subprocess.run(MYCC + ['-O3', '--ir', '--stats', str(src)], capture_output=True, text=True)
+        # Копии, встроенные в main, векторизуются вместе с исходными функциями
+        assert 'Vectorization: 4 loops vectorized' in result.stdout
+        assert 'BROADCAST' in result.stdout
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])